@@ -16,9 +16,11 @@ from api.views import (
     feeds_revoke,
     feeds_share,
     feeds_tokens,
+    feeds_trending,
     general_honeypot_list,
     health_view,
     news_view,
+    scoring_metrics_view,
 )
 
 # Routers provide an easy way of automatically determining the URL conf.
@@ -34,6 +36,7 @@ urlpatterns = [
     path("feeds/tokens/", feeds_tokens),
     path("feeds/advanced/", feeds_advanced),
     path("feeds/asn/", feeds_asn),
+    path("feeds/trending/", feeds_trending),
     path("feeds/<str:feed_type>/<str:attack_type>/<str:prioritize>.<str:format_>", feeds),
     path("enrichment", enrichment_view),
     path("cowrie_session", cowrie_session_view),
@@ -41,6 +44,7 @@ urlpatterns = [
     path("general_honeypot", general_honeypot_list),
     path("news/", news_view),
     path("health/", health_view),
+    path("scoring/metrics/", scoring_metrics_view),
     # router viewsets
     path("", include(router.urls)),
     # certego_saas:
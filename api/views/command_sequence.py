@@ -1,9 +1,13 @@
 # This file is a part of GreedyBear https://github.com/honeynet/GreedyBear
 # See the file 'LICENSE' for copying permission.
+import hashlib
 import logging
 
 from certego_saas.apps.auth.backend import CookieTokenAuthentication
 from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Q
+from django.db.models.functions import Collate
 from django.http import Http404, HttpResponseBadRequest
 from rest_framework import status
 from rest_framework.decorators import (
@@ -32,6 +36,7 @@ def command_sequence_view(request):
     If IP address is given, returns all command sequences executed from this IP.
     If SHA-256 hash is given, returns details about the specific command sequence.
     Can include similar command sequences if requested.
+    Responses are cached until the extraction pipeline or the clustering job changes the command sequences.
 
     Args:
         request: The HTTP request object containing query parameters
@@ -56,53 +61,88 @@ def command_sequence_view(request):
     request_source.save()
 
     if is_ip_address(observable):
-        sessions = CowrieSession.objects.filter(source__name=observable, start_time__isnull=False, commands__isnull=False)
-        sequences = {s.commands for s in sessions}
-        seqs = [
-            {
-                "time": s.start_time,
-                "command_sequence": "\n".join(s.commands.commands),
-                "command_sequence_hash": s.commands.commands_hash,
-            }
-            for s in sessions
-        ]
-        related_iocs = IOC.objects.filter(cowriesession__commands__in=sequences).distinct().only("name")
-        if include_similar:
-            related_clusters = {s.cluster for s in sequences if s.cluster is not None}
-            if related_clusters:
-                cluster_iocs = IOC.objects.filter(cowriesession__commands__cluster__in=related_clusters).distinct().only("name")
-                related_iocs = related_iocs.union(cluster_iocs)
-        if not seqs:
+        data = _get_cached_data(observable, include_similar, _ip_address_data)
+        if data is None:
             raise Http404(f"No command sequences found for IP: {observable}")
-        data = {
-            "executed_commands": seqs,
-            "executed_by": sorted([ioc.name for ioc in related_iocs]),
+    elif is_sha256hash(observable):
+        data = _get_cached_data(observable, include_similar, _hash_data)
+        if data is None:
+            raise Http404(f"No command sequences found with hash: {observable}")
+    else:
+        return HttpResponseBadRequest("Query must be a valid IP address or SHA-256 hash")
+
+    if settings.FEEDS_LICENSE:
+        data = {**data, "license": settings.FEEDS_LICENSE}
+    return Response(data, status=status.HTTP_200_OK)
+
+
+def _get_cached_data(observable: str, include_similar: bool, get_data) -> dict | None:
+    """
+    Return the response data of a query from the API response cache, computing and caching it on a miss.
+    The cache is invalidated by bumping the command sequences version, results that are not found are not cached.
+
+    Args:
+        observable: The queried IP address or hash.
+        include_similar: Whether similar command sequences are included.
+        get_data: Function computing the response data from observable and include_similar.
+
+    Returns:
+        The response data, None if nothing was found.
+    """
+    version = caches["django-q"].get("command_sequences_version", 1)
+    response_cache = caches["api-responses"]
+    observable_hash = hashlib.sha256(observable.encode("utf-8")).hexdigest()
+    cache_key = f"command_sequence_v{version}_{observable_hash}_{include_similar}"
+    data = response_cache.get(cache_key)
+    if data is not None:
+        return data
+
+    data = get_data(observable, include_similar)
+    if data is not None:
+        # the timeout bounds the staleness caused by changes outside of extraction and clustering, e.g. the cleanup
+        response_cache.set(cache_key, data, timeout=3600)
+    return data
+
+
+def _ip_address_data(observable: str, include_similar: bool) -> dict | None:
+    """Collect the command sequences executed from an IP address and the IOCs that executed them."""
+    sessions = CowrieSession.objects.filter(source__name=observable, start_time__isnull=False, commands__isnull=False)
+    seqs = [
+        {
+            "time": s["start_time"],
+            "command_sequence": "\n".join(s["commands__commands"]),
+            "command_sequence_hash": s["commands__commands_hash"],
         }
-        if settings.FEEDS_LICENSE:
-            data["license"] = settings.FEEDS_LICENSE
-        return Response(data, status=status.HTTP_200_OK)
-
-    if is_sha256hash(observable):
-        try:
-            seq = CommandSequence.objects.get(commands_hash=observable)
-            seqs = CommandSequence.objects.filter(cluster=seq.cluster) if include_similar and seq.cluster is not None else [seq]
-            commands = ["\n".join(seq.commands) for seq in seqs]
-            sessions = CowrieSession.objects.filter(commands__in=seqs, start_time__isnull=False)
-            iocs = [
-                {
-                    "time": s.start_time,
-                    "ip": s.source.name,
-                }
-                for s in sessions
-            ]
-            data = {
-                "commands": commands,
-                "iocs": sorted(iocs, key=lambda d: d["time"], reverse=True),
-            }
-            if settings.FEEDS_LICENSE:
-                data["license"] = settings.FEEDS_LICENSE
-            return Response(data, status=status.HTTP_200_OK)
-        except CommandSequence.DoesNotExist as exc:
-            raise Http404(f"No command sequences found with hash: {observable}") from exc
-
-    return HttpResponseBadRequest("Query must be a valid IP address or SHA-256 hash")
+        for s in sessions.order_by("-start_time").values("start_time", "commands__commands", "commands__commands_hash")
+    ]
+    if not seqs:
+        return None
+
+    sequence_ids = sessions.values("commands")
+    executed_by = Q(cowriesession__commands__in=sequence_ids)
+    if include_similar:
+        clusters = CommandSequence.objects.filter(pk__in=sequence_ids, cluster__isnull=False).values("cluster")
+        executed_by |= Q(cowriesession__commands__cluster__in=clusters)
+    # the "C" collation sorts the names like Python does
+    names = IOC.objects.filter(executed_by).annotate(sort_name=Collate("name", "C")).values_list("sort_name", flat=True).distinct().order_by("sort_name")
+    return {
+        "executed_commands": seqs,
+        "executed_by": list(names),
+    }
+
+
+def _hash_data(observable: str, include_similar: bool) -> dict | None:
+    """Collect a command sequence, optionally with the sequences of its cluster, and the IOCs that executed them."""
+    seqs = CommandSequence.objects.filter(commands_hash=observable)
+    if include_similar:
+        clusters = seqs.filter(cluster__isnull=False).values("cluster")
+        seqs = CommandSequence.objects.filter(Q(commands_hash=observable) | Q(cluster__in=clusters))
+    commands = ["\n".join(commands) for commands in seqs.order_by("pk").values_list("commands", flat=True)]
+    if not commands:
+        return None
+
+    sessions = CowrieSession.objects.filter(commands__in=seqs, start_time__isnull=False).order_by("-start_time")
+    return {
+        "commands": commands,
+        "iocs": list(sessions.values(time=F("start_time"), ip=F("source__name"))),
+    }
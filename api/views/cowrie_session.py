@@ -5,6 +5,9 @@ import logging
 
 from certego_saas.apps.auth.backend import CookieTokenAuthentication
 from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Case, CharField, Count, F, Func, Q, Value, When
+from django.db.models.functions import Concat
 from django.http import Http404, HttpResponseBadRequest
 from rest_framework import status
 from rest_framework.decorators import (
@@ -21,6 +24,19 @@ from greedybear.utils import is_ip_address, is_sha256hash
 
 logger = logging.getLogger(__name__)
 
+SESSIONS_DEFAULT_PAGE_SIZE = 100
+SESSIONS_MAX_PAGE_SIZE = 1000
+
+# server-side equivalents of str(Credential) and "\n".join(CommandSequence.commands)
+CREDENTIAL_STRING = Concat(
+    "credentials__username",
+    Value(" | "),
+    "credentials__password",
+    Case(When(credentials__protocol="", then=Value("")), default=Concat(Value(" | "), "credentials__protocol")),
+    output_field=CharField(),
+)
+COMMANDS_STRING = Func(F("commands__commands"), Value("\n"), function="array_to_string", output_field=CharField())
+
 
 @api_view([GET])
 @authentication_classes([CookieTokenAuthentication])
@@ -43,6 +59,8 @@ def cowrie_session_view(request):
             Default: false
         include_session_data (bool, optional): When "true", includes detailed information about matching Cowrie sessions.
             Default: false
+        page (int, optional): Page of the session details, most recent sessions first. Default: 1
+        page_size (int, optional): Number of session details per page, at most 1000. Default: 100
 
     Returns:
         Response (200): JSON object containing:
@@ -50,7 +68,8 @@ def cowrie_session_view(request):
             - commands (list[str]): Unique command sequences (newline-delimited strings)
             - sources (list[str]): Unique source IP addresses
             - credentials (list[str], optional): Unique credentials if include_credentials=true
-            - sessions (list[dict], optional): Session details if include_session_data=true
+            - session_count (int, optional): Total number of matching sessions if include_session_data=true
+            - sessions (list[dict], optional): One page of session details if include_session_data=true
                 - time (datetime): Session start time
                 - duration (float): Session duration in seconds
                 - source (str): Source IP address
@@ -65,6 +84,7 @@ def cowrie_session_view(request):
         /api/cowrie_session?query=1.2.3.4
         /api/cowrie_session?query=5120e94e366ec83a79ee80454e4d1c76c06499ab19032bcdc7f0b4523bdb37a6
         /api/cowrie_session?query=1.2.3.4&include_credentials=true&include_session_data=true&include_similar=true
+        /api/cowrie_session?query=1.2.3.4&include_session_data=true&page=2&page_size=500
         /api/cowrie_session?query=admin123
     """
     observable = request.query_params.get("query")
@@ -77,55 +97,80 @@ def cowrie_session_view(request):
     if not observable:
         return HttpResponseBadRequest("Missing required 'query' parameter")
 
-    if is_ip_address(observable):
-        sessions = CowrieSession.objects.filter(source__name=observable, duration__gt=0).prefetch_related("source", "commands", "credentials")
-        if not sessions.exists():
-            raise Http404(f"No information found for IP: {observable}")
+    try:
+        page = int(request.query_params.get("page", 1))
+        page_size = int(request.query_params.get("page_size", SESSIONS_DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return HttpResponseBadRequest("page and page_size must be integers")
+    if page < 1 or not 1 <= page_size <= SESSIONS_MAX_PAGE_SIZE:
+        return HttpResponseBadRequest(f"page must be positive and page_size between 1 and {SESSIONS_MAX_PAGE_SIZE}")
 
+    if is_ip_address(observable):
+        sessions = CowrieSession.objects.filter(source__name=observable, duration__gt=0)
     elif is_sha256hash(observable):
         try:
             commands = CommandSequence.objects.get(commands_hash=observable.lower())
         except CommandSequence.DoesNotExist as exc:
             raise Http404(f"No command sequences found with hash: {observable}") from exc
-        sessions = CowrieSession.objects.filter(commands=commands, duration__gt=0).prefetch_related("source", "commands", "credentials")
+        sessions = CowrieSession.objects.filter(commands=commands, duration__gt=0)
     else:
         if len(observable) > 256:  # max_length of Credential.password field
             return HttpResponseBadRequest("Query exceeds maximum password length")
-        sessions = CowrieSession.objects.filter(credentials__password=observable, duration__gt=0).prefetch_related("source", "commands", "credentials")
-        if not sessions.exists():
-            raise Http404(f"No information found for password: {observable}")
+        # a subquery avoids duplicate sessions when several credentials share the password
+        sessions_with_password = CowrieSession.credentials.through.objects.filter(credential__password=observable).values("cowriesession_id")
+        sessions = CowrieSession.objects.filter(session_id__in=sessions_with_password, duration__gt=0)
+
+    if include_similar:
+        # a single filter instead of a union, so that the result can still be aggregated and annotated
+        clusters = CommandSequence.objects.filter(cowriesession__in=sessions, cluster__isnull=False).values("cluster")
+        sessions = CowrieSession.objects.filter(Q(session_id__in=sessions.values("session_id")) | Q(commands__cluster__in=clusters), duration__gt=0)
+
+    aggregations = {
+        "commands": ArrayAgg(COMMANDS_STRING, distinct=True, filter=Q(commands__isnull=False), default=[]),
+        "sources": ArrayAgg("source__name", distinct=True, default=[]),
+    }
+    if include_credentials:
+        aggregations["credentials"] = ArrayAgg(CREDENTIAL_STRING, distinct=True, filter=Q(credentials__isnull=False), default=[])
+    if include_session_data:
+        aggregations["session_count"] = Count("session_id", distinct=True)
+    summary = sessions.aggregate(**aggregations)
+
+    if not summary["sources"] and not is_sha256hash(observable):
+        if is_ip_address(observable):
+            raise Http404(f"No information found for IP: {observable}")
+        raise Http404(f"No information found for password: {observable}")
 
     source_ip = str(request.META["REMOTE_ADDR"])
     Statistics(source=source_ip, view=ViewType.COWRIE_SESSION_VIEW.value).save()
 
-    if include_similar:
-        commands = {s.commands for s in sessions if s.commands}
-        clusters = {cmd.cluster for cmd in commands if cmd.cluster is not None}
-        related_sessions = CowrieSession.objects.filter(commands__cluster__in=clusters, duration__gt=0).prefetch_related("source", "commands", "credentials")
-        sessions = sessions.union(related_sessions)
-
     response_data = {
         "query": observable,
     }
     if settings.FEEDS_LICENSE:
         response_data["license"] = settings.FEEDS_LICENSE
 
-    unique_commands = {s.commands for s in sessions if s.commands}
-    response_data["commands"] = sorted("\n".join(cmd.commands) for cmd in unique_commands)
-    response_data["sources"] = sorted({s.source.name for s in sessions}, key=lambda ip: ipaddress.ip_address(ip))
+    response_data["commands"] = sorted(summary["commands"])
+    response_data["sources"] = sorted(summary["sources"], key=lambda ip: ipaddress.ip_address(ip))
     if include_credentials:
-        response_data["credentials"] = sorted({str(c) for s in sessions for c in s.credentials.all()})
+        response_data["credentials"] = sorted(summary["credentials"])
     if include_session_data:
+        offset = (page - 1) * page_size
+        session_page = (
+            sessions.values("session_id", "start_time", "duration", "interaction_count", "source__name", "commands__commands")
+            .annotate(credential_list=ArrayAgg(CREDENTIAL_STRING, distinct=True, filter=Q(credentials__isnull=False), default=[]))
+            .order_by(F("start_time").desc(nulls_last=True), "-session_id")[offset : offset + page_size]
+        )
+        response_data["session_count"] = summary["session_count"]
         response_data["sessions"] = [
             {
-                "time": s.start_time,
-                "duration": s.duration,
-                "source": s.source.name,
-                "interactions": s.interaction_count,
-                "credentials": [str(c) for c in s.credentials.all()],
-                "commands": "\n".join(s.commands.commands) if s.commands else "",
+                "time": s["start_time"],
+                "duration": s["duration"],
+                "source": s["source__name"],
+                "interactions": s["interaction_count"],
+                "credentials": s["credential_list"],
+                "commands": "\n".join(s["commands__commands"]) if s["commands__commands"] else "",
             }
-            for s in sessions
+            for s in session_page
         ]
 
     return Response(response_data, status=status.HTTP_200_OK)
@@ -5,6 +5,7 @@ import logging
 
 from certego_saas.apps.auth.backend import CookieTokenAuthentication
 from certego_saas.ext.pagination import CustomPageNumberPagination
+from django.conf import settings
 from django.core import signing
 from django.utils import timezone
 from rest_framework import status
@@ -25,8 +26,10 @@ from api.views.utils import (
     feeds_response,
     get_queryset,
     get_valid_feed_types,
+    trending_attackers,
 )
 from greedybear.consts import GET
+from greedybear.cronjobs.trending import DEFAULT_TRENDING_WINDOW, trending_windows
 from greedybear.models import ShareToken
 
 logger = logging.getLogger(__name__)
@@ -41,6 +44,9 @@ ALLOWED_UNAUTHENTICATED_QUERY_PARAMS = [
     "prioritize",
 ]
 
+TRENDING_DEFAULT_LIMIT = 20
+TRENDING_MAX_LIMIT = 100
+
 _TOKEN_LIST_FIELDS = (
     "token_hash",
     "reason",
@@ -206,6 +212,48 @@ def feeds_asn(request):
     return Response(data)
 
 
+@api_view([GET])
+@authentication_classes([CookieTokenAuthentication])
+@permission_classes([IsAuthenticated])
+@throttle_classes([FeedsAdvancedThrottle])
+def feeds_trending(request):
+    """
+    Retrieve the attackers with the most interactions in a rolling time window,
+    ranked against the previous window of the same length.
+
+    Args:
+        request: The HTTP request object.
+        window (str): Length of the window, one of '1h', '6h', '24h', '7d'. Default: '24h'.
+        feed_type (str): Filter by feed type (e.g. 'cowrie', 'honeytrap'). Default: 'all'.
+        limit (int): Maximum number of attackers to return. Default: 20, maximum: 100.
+
+    Returns:
+     Response: HTTP response with a JSON object containing:
+            window (str): The requested window.
+            window_end (DateTime): End of the window, None if no activity was aggregated yet.
+            feed_type (str): The requested feed type.
+            attackers (List[dict]): Ranked attackers, each with attacker_ip, current_interactions,
+                previous_interactions, interaction_delta, growth_score, current_rank, previous_rank and rank_delta.
+    """
+    logger.info(f"request /api/feeds/trending/ with params: {request.query_params}")
+    windows = trending_windows(settings.TRENDING_MAX_WINDOW_MINUTES)
+    window = request.query_params.get("window", DEFAULT_TRENDING_WINDOW)
+    if window not in windows:
+        return Response({"error": f"Invalid window, must be one of: {', '.join(windows)}"}, status=status.HTTP_400_BAD_REQUEST)
+    feed_type = request.query_params.get("feed_type", "all").lower()
+    if feed_type not in get_valid_feed_types():
+        return Response({"error": f"Invalid feed_type: {feed_type}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = int(request.query_params.get("limit", TRENDING_DEFAULT_LIMIT))
+    except ValueError:
+        return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= TRENDING_MAX_LIMIT:
+        return Response({"error": f"limit must be between 1 and {TRENDING_MAX_LIMIT}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = trending_attackers(windows[window], feed_type, limit)
+    return Response({"window": window, "feed_type": feed_type, **data})
+
+
 @api_view([GET])
 @authentication_classes([CookieTokenAuthentication])
 @permission_classes([IsAuthenticated])
@@ -16,12 +16,16 @@ from greedybear.models import (
     CowrieSession,
     FireHolList,
     Honeypot,
+    HoneypotHitCount,
     MassScanner,
     TorExitNode,
 )
 
 logger = logging.getLogger(__name__)
 
+# A honeypot is flagged when its latest hourly rate falls below this share of its rate in the preceding windows
+INGESTION_DROP_RATIO = 0.5
+
 
 def get_db_status():
     """Check database connectivity."""
@@ -95,6 +99,49 @@ def get_observables_overview(last_24h):
     }
 
 
+def get_hourly_rate(hit_counts):
+    """Average number of hits per hour over the windows of the given hit counts, None without windows."""
+    hours = sum((hit_count.window_end - hit_count.window_start).total_seconds() for hit_count in hit_counts) / 3600
+    return round(sum(hit_count.hits for hit_count in hit_counts) / hours, 2) if hours else None
+
+
+def get_ingestion_overview(last_24h):
+    """
+    Summarizes the log ingestion of the active honeypots from the hit counts stored by the honeypot monitoring.
+
+    For every honeypot, the latest window is compared with the preceding windows of the last 24 hours.
+    Its status is "no logs" without hits, "drop" if its hourly rate fell below INGESTION_DROP_RATIO
+    of the preceding rate and "ok" otherwise.
+    """
+
+    hit_counts = (
+        HoneypotHitCount.objects.filter(honeypot__active=True, window_end__gte=last_24h).select_related("honeypot").order_by("honeypot__name", "-window_end")
+    )
+
+    windows_per_honeypot = {}
+    for hit_count in hit_counts:
+        windows_per_honeypot.setdefault(hit_count.honeypot.name, []).append(hit_count)
+
+    ingestion = {}
+    for name, (latest, *previous) in windows_per_honeypot.items():
+        rate = get_hourly_rate([latest])
+        baseline = get_hourly_rate(previous)
+        if not latest.hits:
+            status = "no logs"
+        elif baseline and rate < baseline * INGESTION_DROP_RATIO:
+            status = "drop"
+        else:
+            status = "ok"
+        ingestion[name] = {
+            "last_window_end": latest.window_end,
+            "last_window_hits": latest.hits,
+            "hits_per_hour": rate,
+            "previous_hits_per_hour": baseline,
+            "status": status,
+        }
+    return ingestion
+
+
 def get_job_stats(last_24h, last_10min):
     """
     Aggregates Django-Q job statistics and determines cluster status.
@@ -142,12 +189,14 @@ def get_status_overview():
     if db_status == "up":
         try:
             observables = get_observables_overview(last_24h)
+            ingestion = get_ingestion_overview(last_24h)
             job_data = get_job_stats(last_24h, last_10min)
 
             q_status = job_data.pop("q_status")
 
             overview = {
                 **observables,
+                "ingestion": ingestion,
                 "jobs": job_data,
             }
 
@@ -185,6 +234,7 @@ def health_view(request):
      - sessions: total Cowrie sessions and sessions in the last 24h
      - honeypots: total and active honeypots
      - threat_lists: counts of firehol, mass_scanners, tor_exit_nodes
+     - ingestion: hits and hourly ingestion rate of each active honeypot, with status "ok", "drop" or "no logs"
      - jobs: Django-Q jobs (scheduled, failed last 24h, successful last 24h)
     """
     data = get_status_overview()
@@ -0,0 +1,62 @@
+# This file is a part of GreedyBear https://github.com/honeynet/GreedyBear
+# See the file 'LICENSE' for copying permission.
+import logging
+
+from django.http import HttpResponseBadRequest
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from greedybear.consts import GET
+from greedybear.cronjobs.repositories import ScoringRunRepository
+from greedybear.models import ScoringJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUN_LIMIT = 30
+MAX_RUN_LIMIT = 365
+
+
+@api_view([GET])
+@permission_classes([IsAdminUser])
+def scoring_metrics_view(request):
+    """
+    Scoring metrics endpoint.
+
+    Returns the metrics recorded by the most recent model training and score update runs,
+    newest first, to monitor score drift and scoring latency. Accessible only to admin users.
+
+    Args:
+        request: The HTTP request object containing query parameters
+        job (str): Only return runs of this kind, "training" or "scoring". Default: all runs.
+        limit (int): Maximum number of runs to return. Default: 30, maximum: 365.
+
+    Returns:
+        Response object with the list of runs. Each run includes:
+         - job, run_date, duration (seconds), rows_processed, rows_updated
+         - metrics: feature means and, depending on the job,
+           per-model recall AUC and training duration or score histograms and scoring duration
+    """
+    job = request.query_params.get("job")
+    if job is not None and job not in ScoringJob.values:
+        return HttpResponseBadRequest(f"Invalid 'job' parameter, must be one of: {', '.join(ScoringJob.values)}")
+    try:
+        limit = int(request.query_params.get("limit", DEFAULT_RUN_LIMIT))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid 'limit' parameter, must be an integer")
+    if not 1 <= limit <= MAX_RUN_LIMIT:
+        return HttpResponseBadRequest(f"Invalid 'limit' parameter, must be between 1 and {MAX_RUN_LIMIT}")
+
+    runs = ScoringRunRepository().get_recent_runs(job=job, limit=limit)
+    data = [
+        {
+            "job": run.job,
+            "run_date": run.run_date,
+            "duration": run.duration,
+            "rows_processed": run.rows_processed,
+            "rows_updated": run.rows_updated,
+            "metrics": run.metrics,
+        }
+        for run in runs
+    ]
+    return Response({"runs": data})
@@ -3,14 +3,15 @@
 import logging
 
 from certego_saas.ext.helpers import parse_humanized_range
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Sum
 from django.db.models.functions import Trunc
 from django.http import HttpResponseServerError
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from greedybear.models import IOC, Honeypot, Statistics, ViewType
+from greedybear.models import IOC, Honeypot, SensorActivityBucket, Statistics, ViewType
 
 logger = logging.getLogger(__name__)
 
@@ -107,6 +108,44 @@ class StatisticsViewSet(viewsets.ViewSet):
         ]
         return Response(data)
 
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
+    def sensors(self, request):
+        """
+        Retrieve the number of hits per sensor and honeypot for the selected time range.
+        The counts are collected during extraction, so no Elasticsearch query is needed.
+        Only available to authenticated users, as it discloses the sensor addresses.
+
+        Args:
+            request: The incoming request object. Supports the optional query parameters
+                `sensor` (sensor address) and `honeypot` (honeypot name) to filter the counts.
+
+        Returns:
+            Response: A JSON list of {date, sensor, label, honeypot, hits} objects ordered by date.
+        """
+        delta, basis = self.__parse_range(self.request)
+        qs = SensorActivityBucket.objects.filter(bucket_start__gte=delta)
+        if sensor := request.query_params.get("sensor"):
+            qs = qs.filter(sensor__address=sensor)
+        if honeypot := request.query_params.get("honeypot"):
+            qs = qs.filter(feed_type=honeypot.lower())
+        qs = (
+            qs.annotate(date=Trunc("bucket_start", basis))
+            .values("date", "sensor__address", "sensor__label", "feed_type")
+            .annotate(hits=Sum("hit_count"))
+            .order_by("date", "sensor__address", "feed_type")
+        )
+        data = [
+            {
+                "date": item["date"],
+                "sensor": item["sensor__address"],
+                "label": item["sensor__label"],
+                "honeypot": item["feed_type"],
+                "hits": item["hits"],
+            }
+            for item in qs
+        ]
+        return Response(data)
+
     @action(detail=False, methods=["get"])
     def feeds_types(self, request):
         """
@@ -20,6 +20,8 @@ from stix2 import Bundle, ExternalReference, Indicator
 
 from api.serializers import FeedsRequestSerializer, parse_feed_types
 from greedybear.consts import CACHE_KEY_GREEDYBEAR_NEWS, CACHE_TIMEOUT_SECONDS, RSS_FEED_URL
+from greedybear.cronjobs.repositories import TrendingBucketRepository
+from greedybear.cronjobs.trending import build_ranked_attackers
 from greedybear.enums import IpReputation
 from greedybear.models import IOC, Honeypot, Statistics
 from greedybear.utils import is_ip_address, is_valid_domain
@@ -559,6 +561,43 @@ def asn_aggregated_queryset(iocs_qs, request, feed_params):
     return result
 
 
+def trending_attackers(window_hours: int, feed_type: str, limit: int) -> dict:
+    """
+    Rank the attackers of a rolling window against the previous window of the same length.
+    Reads the window aggregates maintained by the extraction pipeline and caches the result,
+    keyed by the trending feeds version and the end of the window.
+
+    Args:
+        window_hours (int): Length of the window in hours
+        feed_type (str): Feed type to include, "all" for every feed type
+        limit (int): Maximum number of attackers to return
+
+    Returns:
+        dict: The window end and the list of ranked attackers
+    """
+    repository = TrendingBucketRepository()
+    window_end = repository.get_window_end(window_hours)
+
+    shared_cache = caches["django-q"]
+    version = shared_cache.get("trending_feeds_version", 1)
+    cache_key = f"trending_feeds_v{version}_{window_end.isoformat() if window_end else 'none'}_{window_hours}_{feed_type}_{limit}"
+    cached_result = shared_cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    window_end, current_counts = repository.get_window_counts(window_hours, feed_type)
+    # the previous window is the difference between the double-length window and the current one
+    _, double_counts = repository.get_window_counts(2 * window_hours, feed_type)
+    previous_counts = {ip: count - current_counts.get(ip, 0) for ip, count in double_counts.items() if count > current_counts.get(ip, 0)}
+
+    result = {
+        "window_end": window_end,
+        "attackers": build_ranked_attackers(current_counts, previous_counts, limit),
+    }
+    shared_cache.set(cache_key, result, timeout=3600)
+    return result
+
+
 def get_greedybear_news() -> list[dict]:
     """
     Fetch GreedyBear-related blog posts from the IntelOwl RSS feed.
@@ -9,15 +9,18 @@ from django.utils.translation import ngettext
 from greedybear.models import (
     IOC,
     AttackerActivityBucket,
+    AttackerActivityDailyBucket,
     CommandSequence,
     CowrieSession,
     Credential,
     FireHolList,
     Honeypot,
     MassScanner,
+    ScoringRun,
     Sensor,
     Statistics,
     TorExitNode,
+    TrendingWindow,
     WhatsMyIPDomain,
 )
 
@@ -194,6 +197,30 @@ class AttackerActivityBucketAdmin(admin.ModelAdmin):
     ordering = ["-bucket_start"]
 
 
+@admin.register(AttackerActivityDailyBucket)
+class AttackerActivityDailyBucketAdmin(admin.ModelAdmin):
+    list_display = ["attacker_ip", "feed_type", "bucket_date", "interaction_count"]
+    list_filter = ["feed_type"]
+    search_fields = ["attacker_ip"]
+    search_help_text = "search for the attacker IP address"
+    date_hierarchy = "bucket_date"
+    ordering = ["-bucket_date"]
+
+
+@admin.register(TrendingWindow)
+class TrendingWindowAdmin(admin.ModelAdmin):
+    list_display = ["span_hours", "daily", "window_end"]
+    ordering = ["span_hours"]
+
+
+@admin.register(ScoringRun)
+class ScoringRunAdmin(admin.ModelAdmin):
+    list_display = ["job", "run_date", "duration", "rows_processed", "rows_updated"]
+    list_filter = ["job"]
+    date_hierarchy = "run_date"
+    ordering = ["-run_date"]
+
+
 @admin.register(Honeypot)
 class HoneypotAdmin(admin.ModelAdmin):
     list_display = [
@@ -5,9 +5,13 @@ from django.utils import timezone
 
 from greedybear.cronjobs.base import Cronjob
 from greedybear.cronjobs.repositories import TrendingBucketRepository
+from greedybear.cronjobs.trending import HOURLY_WINDOW_MAX_HOURS
 
 DEFAULT_TRENDING_MAX_WINDOW_MINUTES = (24 * 31 * 60) // 2
-DEFAULT_TRENDING_BUCKET_RETENTION_HOURS = 24 * 31
+DEFAULT_TRENDING_BUCKET_RETENTION_HOURS = 24 * 3
+DEFAULT_TRENDING_DAILY_BUCKET_RETENTION_DAYS = 31
+# daily partitions of the hourly buckets are created this many days ahead
+BUCKET_PARTITIONS_AHEAD_DAYS = 7
 
 
 class TrendingBucketCleanupCron(Cronjob):
@@ -23,7 +27,7 @@ class TrendingBucketCleanupCron(Cronjob):
 
         return parsed_value
 
-    def _validated_settings(self) -> tuple[int, int]:
+    def _validated_settings(self) -> tuple[int, int, int]:
         max_window_minutes = self._positive_int_setting(
             "TRENDING_MAX_WINDOW_MINUTES",
             getattr(settings, "TRENDING_MAX_WINDOW_MINUTES", DEFAULT_TRENDING_MAX_WINDOW_MINUTES),
@@ -38,8 +42,9 @@ class TrendingBucketCleanupCron(Cronjob):
             getattr(settings, "TRENDING_BUCKET_RETENTION_HOURS", DEFAULT_TRENDING_BUCKET_RETENTION_HOURS),
         )
 
+        # hourly buckets only serve the windows up to a day, longer windows are served from the daily buckets
         retention_minutes = retention_hours * 60
-        required_retention_minutes = 2 * max_window_minutes
+        required_retention_minutes = 2 * min(max_window_minutes, HOURLY_WINDOW_MAX_HOURS * 60)
         if retention_minutes < required_retention_minutes:
             raise ValueError(
                 "TRENDING_BUCKET_RETENTION_HOURS must retain at least two windows "
@@ -47,10 +52,30 @@ class TrendingBucketCleanupCron(Cronjob):
                 f"required >= {required_retention_minutes} minutes, got {retention_minutes}"
             )
 
-        return max_window_minutes, retention_hours
+        daily_retention_days = self._positive_int_setting(
+            "TRENDING_DAILY_BUCKET_RETENTION_DAYS",
+            getattr(settings, "TRENDING_DAILY_BUCKET_RETENTION_DAYS", DEFAULT_TRENDING_DAILY_BUCKET_RETENTION_DAYS),
+        )
+        daily_retention_minutes = daily_retention_days * 24 * 60
+        if daily_retention_minutes < 2 * max_window_minutes:
+            raise ValueError(
+                "TRENDING_DAILY_BUCKET_RETENTION_DAYS must retain at least two windows "
+                f"for TRENDING_MAX_WINDOW_MINUTES={max_window_minutes}: "
+                f"required >= {2 * max_window_minutes} minutes, got {daily_retention_minutes}"
+            )
+
+        return max_window_minutes, retention_hours, daily_retention_days
 
     def run(self) -> None:
         now = timezone.now().replace(minute=0, second=0, microsecond=0)
-        _, retention_hours = self._validated_settings()
+        _, retention_hours, daily_retention_days = self._validated_settings()
         cutoff = now - timedelta(hours=retention_hours)
-        TrendingBucketRepository().delete_older_than(cutoff)
+        repository = TrendingBucketRepository()
+        created = repository.create_partitions(cutoff.date(), now.date() + timedelta(days=BUCKET_PARTITIONS_AHEAD_DAYS))
+        dropped = repository.drop_partitions_older_than(cutoff)
+        # only the partition the cutoff falls into and the default partition still hold expired buckets
+        deleted = repository.delete_older_than(cutoff)
+        self.log.info(f"Created {created} and dropped {dropped} bucket partitions, deleted {deleted} expired buckets")
+        repository.delete_daily_older_than(now.date() - timedelta(days=daily_retention_days))
+        # the hit counts per sensor are small enough to be kept as long as the daily buckets
+        repository.delete_sensor_buckets_older_than(now - timedelta(days=daily_retention_days))
@@ -15,7 +15,8 @@ class CleanUp(Cronjob):
 
     This job handles deletion of old IOCs, CowrieSessions, and CommandSequences based on
     retention periods defined in the application settings. All deletion operations are logged
-    with counts of removed objects.
+    with counts of removed objects. Records are deleted in throttled batches, so that a run
+    interrupted by the task timeout continues where it left off on the next run.
     """
 
     def __init__(self, ioc_repo=None, cowrie_repo=None):
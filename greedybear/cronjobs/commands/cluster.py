@@ -1,10 +1,23 @@
+import hashlib
 from collections import defaultdict
 
-from django.db.models import Prefetch
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Case, F, Max, Prefetch, Q, Value, When
+from django.db.models.functions import Coalesce
 
 from greedybear.cronjobs.base import Cronjob
-from greedybear.cronjobs.commands.lsh import LSHConnectedComponents
-from greedybear.models import IOC, CommandSequence, CowrieSession
+from greedybear.cronjobs.commands.lsh import (
+    LSH_NUM_PERM,
+    LSH_THRESHOLD,
+    LSHConnectedComponents,
+    UnionFind,
+    get_band_keys,
+    get_signatures,
+)
+from greedybear.models import IOC, CommandSequence, CommandSequenceBucket, CowrieSession
+
+BUCKET_BATCH_SIZE = 10_000
 
 
 def tokenize(sequence: list[str]) -> list[str]:
@@ -28,14 +41,35 @@ def tokenize(sequence: list[str]) -> list[str]:
     return result
 
 
+def clustering_digest(tokens: list[str]) -> str:
+    """
+    Compute a digest of a tokenized clustering input and the LSH parameters.
+    A sequence has to be hashed again whenever its digest changes.
+
+    Args:
+        tokens: Tokenized clustering input of a command sequence.
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    payload = "\n".join([f"{LSH_THRESHOLD}:{LSH_NUM_PERM}", *tokens])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
 class ClusterCommandSequences(Cronjob):
     """
     A cronjob that clusters command sequences based on their similarity.
 
-    This job processes all CommandSequence objects in the database, clusters them
-    with locality-sensitive hashing (LSH) connected components over tokenized
-    command sequences, and assigns cluster labels back to the objects. Commands
-    within the same cluster represent similar execution patterns.
+    This job clusters CommandSequence objects with locality-sensitive hashing (LSH)
+    connected components over tokenized command sequences, and assigns cluster labels
+    back to the objects. Commands within the same cluster represent similar execution patterns.
+
+    The LSH buckets of every sequence are persisted, and sequences are marked as updated
+    whenever their clustering input may have changed, so that only these have to be retrieved
+    and only those whose input actually changed have to be hashed. Their similar sequences are looked up
+    in the stored buckets and clusters are merged incrementally, keeping existing cluster ids.
+    Clusters are never split incrementally. The whole collection is only clustered from
+    scratch when no sequence has been indexed yet.
     """
 
     def _build_payload_urls_by_sequence_id(self, sequence_ids: list[int]) -> dict[int, set[str]]:
@@ -91,27 +125,163 @@ class ClusterCommandSequences(Cronjob):
 
         return tokenized_sequences
 
+    def _replace_buckets(self, band_keys_by_id: dict[int, list[int]]) -> None:
+        """
+        Replace the stored LSH buckets of the given command sequences.
+        """
+        CommandSequenceBucket.objects.filter(command_sequence_id__in=band_keys_by_id).delete()
+        CommandSequenceBucket.objects.bulk_create(
+            (
+                CommandSequenceBucket(command_sequence_id=seq_id, band=band, bucket=bucket)
+                for seq_id, band_keys in band_keys_by_id.items()
+                for band, bucket in enumerate(band_keys)
+            ),
+            batch_size=BUCKET_BATCH_SIZE,
+        )
+
+    def _find_similar(self, band_keys_by_id: dict[int, list[int]]) -> dict[int, set[int]]:
+        """
+        Find the command sequences sharing an LSH bucket with each of the given sequences.
+        """
+        ids_by_band_key = defaultdict(set)
+        for seq_id, band_keys in band_keys_by_id.items():
+            for band, bucket in enumerate(band_keys):
+                ids_by_band_key[(band, bucket)].add(seq_id)
+
+        # join on (band, bucket) pairs so that the lookups use the (band, bucket) index
+        table = connection.ops.quote_name(CommandSequenceBucket._meta.db_table)
+        query = (
+            f"SELECT b.command_sequence_id, b.band, b.bucket FROM {table} b "
+            "JOIN unnest(%s::smallint[], %s::bigint[]) AS k(band, bucket) ON b.band = k.band AND b.bucket = k.bucket"
+        )
+        similar = defaultdict(set)
+        band_keys = sorted(ids_by_band_key)
+        for batch_start in range(0, len(band_keys), BUCKET_BATCH_SIZE):
+            batch = band_keys[batch_start : batch_start + BUCKET_BATCH_SIZE]
+            with connection.cursor() as cursor:
+                cursor.execute(query, [[band for band, _ in batch], [bucket for _, bucket in batch]])
+                rows = cursor.fetchall()
+            for other_id, band, bucket in rows:
+                for seq_id in ids_by_band_key.get((band, bucket), ()):
+                    if other_id != seq_id:
+                        similar[seq_id].add(other_id)
+        return similar
+
+    def _merge_clusters(self, sequences: list[CommandSequence], similar: dict[int, set[int]], indexed_ids: list[int]) -> list[int | None]:
+        """
+        Merge the clusters of newly indexed sequences with the clusters of their similar sequences.
+
+        Sequences sharing a cluster id stay together. A merged cluster takes the smallest
+        existing id among its parts, clusters made up of new sequences only get the next free ids.
+
+        Returns:
+            list[int | None]: Cluster labels in the order of the sequences.
+        """
+        cluster_by_id = {seq.id: seq.cluster for seq in sequences}
+
+        def node(seq_id: int) -> tuple[str, int]:
+            cluster = cluster_by_id[seq_id]
+            return ("cluster", cluster) if cluster is not None else ("sequence", seq_id)
+
+        nodes: dict[tuple[str, int], int] = {}
+        edges = []
+        for seq_id in indexed_ids:
+            i = nodes.setdefault(node(seq_id), len(nodes))
+            for other_id in sorted(similar.get(seq_id, ())):
+                if other_id in cluster_by_id:
+                    edges.append((i, nodes.setdefault(node(other_id), len(nodes))))
+
+        u = UnionFind(len(nodes))
+        for i, j in edges:
+            u.union(i, j)
+        components = defaultdict(list)
+        for n, i in nodes.items():
+            components[u.find_representative(i)].append(n)
+
+        next_label = CommandSequence.objects.aggregate(max_cluster=Coalesce(Max("cluster"), -1))["max_cluster"] + 1
+        label_by_node = {}
+        for root in sorted(components):
+            existing = [value for kind, value in components[root] if kind == "cluster"]
+            if existing:
+                label = min(existing)
+            else:
+                label = next_label
+                next_label += 1
+            for n in components[root]:
+                label_by_node[n] = label
+        return [label_by_node.get(node(seq.id), seq.cluster) for seq in sequences]
+
     def run(self) -> None:
         """
         Workflow:
-        1. Retrieve all command sequences with their current cluster assignments
-        2. Early exit if no sequences exist
-        3. Build tokenized clustering input and compute LSH connected components
-        4. Identify sequences whose cluster assignment has changed
-        5. Perform batched bulk updates for changed sequences only
+        1. Retrieve the command sequences updated since they were last clustered,
+           or all of them if no sequence has been indexed yet
+        2. Early exit if there are none
+        3. Build their tokenized clustering input and find new or changed sequences by their digest
+        4. Hash new or changed sequences and replace their stored LSH buckets
+        5. Compute LSH connected components if nothing was indexed before,
+           otherwise merge the clusters of new or changed sequences with their similar sequences
+        6. Perform batched bulk updates of the retrieved sequences and relabel merged clusters
         """
-        sequences = list(CommandSequence.objects.order_by("id").only("id", "commands", "cluster"))
+        bootstrap = not CommandSequence.objects.exclude(clustering_digest="").exists()
+        sequences = CommandSequence.objects.order_by("id").only("id", "commands", "cluster", "clustering_digest", "updated")
+        if not bootstrap:
+            sequences = sequences.filter(Q(clustered__isnull=True) | Q(updated__gt=F("clustered")))
+        sequences = list(sequences)
         if not sequences:
-            self.log.info("no sequences found to cluster")
+            self.log.info("no new or updated command sequences to cluster")
             return
-        self.log.info(f"clustering {len(sequences)} command sequences")
+        for seq in sequences:
+            # a sequence updated while this job runs has a newer `updated` value and is clustered again by the next run
+            seq.clustered = seq.updated
+
         tokenized_seqs = self._build_clustering_input(sequences)
-        cluster_labels = LSHConnectedComponents().get_components(tokenized_seqs)
-        seqs_to_update = []
-        for seq, label in zip(sequences, cluster_labels, strict=False):
-            if seq.cluster != label:
+        digests = [clustering_digest(tokens) for tokens in tokenized_seqs]
+        changed = [(seq, tokens, digest) for seq, tokens, digest in zip(sequences, tokenized_seqs, digests, strict=True) if seq.clustering_digest != digest]
+        if not changed:
+            CommandSequence.objects.bulk_update(sequences, ["clustered"], batch_size=1000)
+            self.log.info(f"clustering input of {len(sequences)} updated command sequences did not change")
+            return
+
+        self.log.info(f"hashing {len(changed)} new or changed command sequences")
+        signatures = get_signatures([tokens for _, tokens, _ in changed], LSH_NUM_PERM)
+        band_keys_by_id = {}
+        for (seq, _, digest), signature in zip(changed, signatures, strict=True):
+            seq.clustering_digest = digest
+            band_keys_by_id[seq.id] = get_band_keys(signature, LSH_THRESHOLD, LSH_NUM_PERM)
+
+        with transaction.atomic():
+            self._replace_buckets(band_keys_by_id)
+            renamed_clusters = {}
+            if bootstrap:
+                self.log.info(f"clustering {len(sequences)} command sequences from scratch")
+                cluster_labels = LSHConnectedComponents(LSH_THRESHOLD, LSH_NUM_PERM).get_components(tokenized_seqs, signatures=signatures)
+            else:
+                self.log.info(f"merging clusters of {len(changed)} command sequences")
+                similar = self._find_similar(band_keys_by_id)
+                loaded_ids = {seq.id for seq in sequences}
+                similar_ids = {other_id for other_ids in similar.values() for other_id in other_ids} - loaded_ids
+                similar_seqs = list(CommandSequence.objects.filter(id__in=similar_ids).only("id", "cluster"))
+                cluster_labels = self._merge_clusters(sequences + similar_seqs, similar, list(band_keys_by_id))
+                for seq, label in zip(sequences + similar_seqs, cluster_labels, strict=True):
+                    if seq.cluster is not None and seq.cluster != label:
+                        renamed_clusters[seq.cluster] = label
+
+            relabelled = 0
+            if renamed_clusters:
+                self.log.info(f"merging {len(renamed_clusters)} clusters into their similar clusters")
+                relabelled = CommandSequence.objects.filter(cluster__in=renamed_clusters).update(
+                    cluster=Case(*(When(cluster=old, then=Value(new)) for old, new in renamed_clusters.items()))
+                )
+            for seq, label in zip(sequences, cluster_labels, strict=False):
                 seq.cluster = label
-                seqs_to_update.append(seq)
-        self.log.info(f"writing updated clusters for {len(seqs_to_update)} command sequences to DB")
-        result = CommandSequence.objects.bulk_update(seqs_to_update, ["cluster"], batch_size=1000) if seqs_to_update else 0
-        self.log.info(f"{result} command sequences were updated")
+            self.log.info(f"writing clusters of {len(sequences)} command sequences to DB, {len(changed)} of them were indexed")
+            result = CommandSequence.objects.bulk_update(sequences, ["cluster", "clustering_digest", "clustered"], batch_size=1000)
+        self.log.info(f"{result} command sequences were updated, {relabelled} were moved into merged clusters")
+
+        # similar command sequences served by the API depend on the clusters
+        shared_cache = caches["django-q"]
+        try:
+            shared_cache.incr("command_sequences_version")
+        except ValueError:
+            shared_cache.set("command_sequences_version", 2, timeout=None)
@@ -1,5 +1,123 @@
+import hashlib
+from functools import cache
+
+import numpy as np
 from datasketch import MinHash, MinHashLSH
 
+LSH_THRESHOLD = 0.55
+LSH_NUM_PERM = 128
+
+
+# datasketch's MinHash permutation constants
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+# upper bound of tokens permuted at once, limits the permutation matrix to 64 MiB at 128 permutations
+MAX_CHUNK_TOKENS = 65_536
+
+
+@cache
+def get_permutations(num_perm: int = LSH_NUM_PERM) -> np.ndarray:
+    """
+    Get the permutation parameters of datasketch's MinHash with the default seed.
+
+    Args:
+        num_perm: Number of permutation functions
+
+    Returns:
+        np.ndarray: Read-only uint64 array of shape (2, num_perm) holding the a and b parameters
+    """
+    permutations = MinHash(num_perm=num_perm).permutations
+    permutations.setflags(write=False)
+    return permutations
+
+
+def hash_token(token: str) -> int:
+    """
+    Hash a token to 32 bit like datasketch's default hash function.
+
+    Args:
+        token: A string token
+
+    Returns:
+        int: The first 4 bytes of the token's SHA-1 digest as little endian integer
+    """
+    return int.from_bytes(hashlib.sha1(token.encode("utf8")).digest()[:4], "little")
+
+
+def get_signatures(sequences: list[list[str]], num_perm: int = LSH_NUM_PERM) -> np.ndarray:
+    """
+    Compute MinHash signatures of all input sequences in a vectorized way.
+    Every distinct token is hashed once, then all permutations of all tokens are
+    computed by broadcasting and reduced to the minimum of each sequence.
+    The result is identical to updating a datasketch MinHash with each token.
+
+    Args:
+        sequences: List of sequences, where each sequence is a list of string tokens
+        num_perm: Number of permutation functions for MinHash
+
+    Returns:
+        np.ndarray: uint64 array of shape (len(sequences), num_perm), one signature per row
+    """
+    signatures = np.full((len(sequences), num_perm), MAX_HASH, dtype=np.uint64)
+    token_hashes: dict[str, int] = {}
+    lengths = np.fromiter((len(seq) for seq in sequences), dtype=np.int64, count=len(sequences))
+    hashes = np.fromiter(
+        (token_hashes[token] if token in token_hashes else token_hashes.setdefault(token, hash_token(token)) for seq in sequences for token in seq),
+        dtype=np.uint64,
+        count=int(lengths.sum()),
+    )
+    a, b = (p.reshape(1, -1) for p in get_permutations(num_perm))
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+    chunk_start = 0
+    while chunk_start < len(sequences):
+        # extend the chunk by whole sequences, but always take at least one sequence
+        chunk_end = max(int(np.searchsorted(offsets, offsets[chunk_start] + MAX_CHUNK_TOKENS, side="right")) - 1, chunk_start + 1)
+        rows = np.flatnonzero(lengths[chunk_start:chunk_end]) + chunk_start
+        if rows.size:
+            chunk_hashes = hashes[offsets[chunk_start] : offsets[chunk_end]].reshape(-1, 1)
+            permuted = np.bitwise_and((chunk_hashes * a + b) % MERSENNE_PRIME, MAX_HASH)
+            signatures[rows] = np.minimum.reduceat(permuted, offsets[rows] - offsets[chunk_start], axis=0)
+        chunk_start = chunk_end
+    return signatures
+
+
+@cache
+def get_band_ranges(threshold: float = LSH_THRESHOLD, num_perm: int = LSH_NUM_PERM) -> list[tuple[int, int]]:
+    """
+    Get the signature slices that make up the LSH bands.
+    Uses the same band count and band width as a MinHashLSH index with the given parameters.
+
+    Args:
+        threshold: Jaccard similarity threshold
+        num_perm: Number of permutation functions for MinHash
+
+    Returns:
+        list[tuple[int, int]]: Start and end position of each band in the signature
+    """
+    return list(MinHashLSH(threshold=threshold, num_perm=num_perm).hashranges)
+
+
+def get_band_keys(hashvalues: np.ndarray, threshold: float = LSH_THRESHOLD, num_perm: int = LSH_NUM_PERM) -> list[int]:
+    """
+    Compute the LSH bucket of a MinHash signature in each band.
+    Two signatures sharing a bucket in any band are candidates for being similar.
+    Each bucket is a signed 64 bit digest of the band, so that it fits a database integer column.
+
+    Args:
+        hashvalues: MinHash signature
+        threshold: Jaccard similarity threshold
+        num_perm: Number of permutation functions for MinHash
+
+    Returns:
+        list[int]: Bucket of the signature in each band
+    """
+    hashvalues = np.asarray(hashvalues, dtype=np.uint64)
+    return [
+        int.from_bytes(hashlib.blake2b(hashvalues[start:end].tobytes(), digest_size=8).digest(), "big", signed=True)
+        for start, end in get_band_ranges(threshold, num_perm)
+    ]
+
 
 class UnionFind:
     """
@@ -10,6 +128,9 @@ class UnionFind:
     This data structure supports two primary operations:
     - Find: Determine which subset a particular element is in
     - Union: Join two subsets into a single subset
+
+    Parents and set sizes are stored in lists, finds are iterative with path halving
+    and unions attach the smaller set to the larger one, so trees stay shallow on large inputs.
     """
 
     def __init__(self, size: int):
@@ -20,12 +141,13 @@ class UnionFind:
             size (int): Number of elements in the data structure
         """
         self.parents = list(range(size))
+        self.sizes = [1] * size
 
     def find_representative(self, i: int) -> int:
         """
         Find the representative of the set containing element i.
-        Uses path compression optimization to flatten the tree structure,
-        making subsequent find operations faster.
+        Uses path halving to flatten the tree structure: every visited element
+        is pointed to its grandparent, making subsequent find operations faster.
 
         Args:
             i (int): Element to find the representative for
@@ -33,9 +155,11 @@ class UnionFind:
         Returns:
             int: The representative of the set containing i
         """
-        if self.parents[i] != i:
-            self.parents[i] = self.find_representative(self.parents[i])
-        return self.parents[i]
+        parents = self.parents
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
 
     def union(self, i: int, j: int) -> None:
         """
@@ -48,7 +172,12 @@ class UnionFind:
         """
         i_representative = self.find_representative(i)
         j_representative = self.find_representative(j)
-        self.parents[i_representative] = j_representative
+        if i_representative == j_representative:
+            return
+        if self.sizes[i_representative] < self.sizes[j_representative]:
+            i_representative, j_representative = j_representative, i_representative
+        self.parents[j_representative] = i_representative
+        self.sizes[i_representative] += self.sizes[j_representative]
 
 
 class LSHConnectedComponents:
@@ -59,9 +188,13 @@ class LSHConnectedComponents:
     similar above a given threshold, then groups them into connected components using
     Union-Find. Two sequences are considered similar if their Jaccard similarity
     (estimated via MinHash) exceeds the threshold.
+
+    Sequences are bucketed by each band of their signatures, using the band layout of MinHashLSH.
+    Instead of querying the index once per sequence, every member of a bucket is joined
+    with the first member of that bucket, which connects the same sequences in linear time.
     """
 
-    def __init__(self, threshold: float = 0.55, num_perm: int = 128):
+    def __init__(self, threshold: float = LSH_THRESHOLD, num_perm: int = LSH_NUM_PERM):
         """
         Initialize the LSH connected components finder.
 
@@ -72,29 +205,31 @@ class LSHConnectedComponents:
         self.threshold = threshold
         self.num_perm = num_perm
 
-    def _get_min_hashes(self, sequences: list[list[str]]) -> list[MinHash]:
+    def _get_candidate_pairs(self, signatures: np.ndarray):
         """
-        Generate MinHash signatures for all input sequences.
-        Converts each sequence of tokens into a MinHash signature that can be used for efficient similarity estimation.
+        Gather candidate pairs from the LSH buckets of all bands in bulk.
+        For every band, yields each sequence that shares its bucket with an earlier sequence,
+        together with the first sequence of that bucket.
 
         Args:
-            sequences: List of sequences, where each sequence is a list of string tokens
+            signatures: uint64 array of shape (number of sequences, num_perm)
 
-        Returns:
-            list[MinHash]: List of MinHash objects, one for each input sequence
+        Yields:
+            tuple[np.ndarray, np.ndarray]: Indices of sequences and of the first sequence in their bucket
         """
-        result = []
-        for seq in sequences:
-            min_hash = MinHash(num_perm=self.num_perm)
-            for token in seq:
-                min_hash.update(token.encode("utf8"))
-            result.append(min_hash)
-        return result
+        positions = np.arange(len(signatures))
+        for start, end in get_band_ranges(self.threshold, self.num_perm):
+            band = np.ascontiguousarray(signatures[:, start:end])
+            _, first_members, bucket_ids = np.unique(band, axis=0, return_index=True, return_inverse=True)
+            representatives = first_members[bucket_ids.ravel()]
+            members = np.flatnonzero(representatives != positions)
+            yield members, representatives[members]
 
     def _get_labels(self, sequences: list[list[str]], u: UnionFind) -> list[int]:
         """
         Convert Union-Find structure to component labels.
         Maps each sequence to its connected component ID. Sequences in the same component will have the same label.
+        Labels are assigned in the order the components first appear in the sequences.
 
         Args:
             sequences: Original input sequences
@@ -103,19 +238,13 @@ class LSHConnectedComponents:
         Returns:
             list[int]: List of component labels, where sequences[i] belongs to component labels[i]
         """
-        components = {}
-        labels = []
-        next_label = 0
-        for idx, _ in enumerate(sequences):
-            root = u.find_representative(idx)
-            if root not in components:
-                components[root] = next_label
-                next_label += 1
-            labels.append(components[root])
-
-        return labels
-
-    def get_components(self, sequences: list[list[str]]) -> list[int]:
+        roots = np.fromiter((u.find_representative(idx) for idx in range(len(sequences))), dtype=np.int64, count=len(sequences))
+        _, first_positions, component_ids = np.unique(roots, return_index=True, return_inverse=True)
+        ranks = np.empty(len(first_positions), dtype=np.int64)
+        ranks[np.argsort(first_positions)] = np.arange(len(first_positions))
+        return ranks[component_ids.ravel()].tolist()
+
+    def get_components(self, sequences: list[list[str]], signatures: np.ndarray | None = None) -> list[int]:
         """
         Find connected components among sequences based on similarity.
         Uses LSH to efficiently identify pairs of sequences with Jaccard similarity above the threshold,
@@ -123,6 +252,8 @@ class LSHConnectedComponents:
 
         Args:
             sequences: List of sequences to cluster. Each sequence should be a list of string tokens.
+            signatures: Precomputed MinHash signatures of the sequences, as returned by get_signatures.
+                Computed from the sequences if None.
 
         Returns:
             list[int]: Component labels for each sequence. Sequences with the same label belong to the same connected component.
@@ -130,15 +261,12 @@ class LSHConnectedComponents:
         if not sequences:
             return []
 
-        min_hashes = self._get_min_hashes(sequences)
-        lsh = MinHashLSH(threshold=self.threshold, num_perm=self.num_perm)
-        for idx, min_hash in enumerate(min_hashes):
-            lsh.insert(idx, min_hash)
+        if signatures is None:
+            signatures = get_signatures(sequences, self.num_perm)
 
         u = UnionFind(len(sequences))
-        for idx, min_hash in enumerate(min_hashes):
-            for similar_idx in lsh.query(min_hash):
-                if similar_idx != idx:
-                    u.union(idx, similar_idx)
+        for members, representatives in self._get_candidate_pairs(signatures):
+            for i, j in zip(members.tolist(), representatives.tolist(), strict=True):
+                u.union(i, j)
 
         return self._get_labels(sequences, u)
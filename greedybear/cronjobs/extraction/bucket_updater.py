@@ -1,21 +1,29 @@
 import logging
+import time
 from collections import Counter
 from collections.abc import Iterable
 from datetime import datetime
-from ipaddress import ip_address
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 
 from greedybear.cronjobs.extraction.utils import parse_timestamp
 from greedybear.cronjobs.repositories import TrendingBucketRepository
-from greedybear.utils import is_non_global_ip
+from greedybear.cronjobs.trending import daily_window_spans, trending_window_spans
+from greedybear.utils import global_ip_address
 
 logger = logging.getLogger(__name__)
 
 BucketKey = tuple[str, str, datetime]
+SensorBucketKey = tuple[int, str, datetime]
 
 
 class BucketUpdater:
     def __init__(self):
         self.counters: Counter[BucketKey] = Counter()
+        self.sensor_counters: Counter[SensorBucketKey] = Counter()
         self.total_update_count: int = 0
 
     def collect_hits(self, hits: Iterable[dict]) -> None:
@@ -24,13 +32,38 @@ class BucketUpdater:
             if key is not None:
                 self.counters[key] += 1
 
-    def update(self) -> int:
-        if not self.counters:
-            return 0
+    def collect_sensor_hits(self, hits: Iterable[dict]) -> None:
+        """Count the hits per sensor, including the hits of honeypots that are not extracted."""
+        for hit in hits:
+            sensor_key = _sensor_bucket_key_from_hit(hit)
+            if sensor_key is not None:
+                self.sensor_counters[sensor_key] += 1
 
+    def update(self) -> int:
+        """
+        Upsert the collected hourly and daily bucket counts and keep the rolling trending windows up to date.
+        The windows are moved to the current hour first, then the new counts are added to them.
+        The hourly hit counts per sensor are upserted in the same transaction.
+        """
+        repository = TrendingBucketRepository()
         try:
-            update_count = TrendingBucketRepository().upsert_bucket_counts(self.counters)
-            logger.debug(f"Updated {update_count} buckets")
+            with transaction.atomic():
+                repository.advance_windows(
+                    trending_window_spans(settings.TRENDING_MAX_WINDOW_MINUTES),
+                    timezone.now(),
+                    daily_spans=daily_window_spans(settings.TRENDING_MAX_WINDOW_MINUTES),
+                    retention_hours=settings.TRENDING_BUCKET_RETENTION_HOURS,
+                    daily_retention_days=settings.TRENDING_DAILY_BUCKET_RETENTION_DAYS,
+                )
+                if not self.counters and not self.sensor_counters:
+                    return 0
+                upsert_start = time.perf_counter()
+                update_count = repository.upsert_bucket_counts(self.counters)
+                upsert_duration = time.perf_counter() - upsert_start
+                repository.add_to_windows(self.counters)
+                sensor_update_count = repository.upsert_sensor_bucket_counts(self.sensor_counters)
+            logger.info(f"Updated {update_count} buckets in {upsert_duration:.3f}s ({update_count / max(upsert_duration, 1e-6):.0f} rows/s)")
+            logger.info(f"Updated {sensor_update_count} sensor buckets")
             self.total_update_count += update_count
             return update_count
         except Exception as exc:
@@ -38,11 +71,17 @@ class BucketUpdater:
             return 0
         finally:
             self.counters = Counter()
+            self.sensor_counters = Counter()
+
+
+@lru_cache(maxsize=4096)
+def _hour_start(hour_prefix: str) -> datetime:
+    return parse_timestamp(hour_prefix).replace(minute=0, second=0, microsecond=0)
 
 
 def _bucket_start(timestamp: str) -> datetime:
-    parsed = parse_timestamp(timestamp)
-    return parsed.replace(minute=0, second=0, microsecond=0)
+    # the hour of an ISO timestamp only depends on its "YYYY-MM-DDTHH" prefix
+    return _hour_start(timestamp[:13])
 
 
 def _bucket_key_from_hit(hit: dict) -> BucketKey | None:
@@ -54,14 +93,25 @@ def _bucket_key_from_hit(hit: dict) -> BucketKey | None:
 
     normalized_ip = str(attacker_ip)
     try:
-        parsed_ip = ip_address(normalized_ip)
+        if global_ip_address(normalized_ip) is None:
+            return None
     except ValueError:
         return None
 
-    if is_non_global_ip(parsed_ip):
+    try:
+        return normalized_ip, str(feed_type).lower(), _bucket_start(timestamp)
+    except Exception:
+        return None
+
+
+def _sensor_bucket_key_from_hit(hit: dict) -> SensorBucketKey | None:
+    sensor = hit.get("_sensor")
+    feed_type = hit.get("type")
+    timestamp = hit.get("@timestamp")
+    if sensor is None or not feed_type or not timestamp:
         return None
 
     try:
-        return normalized_ip, str(feed_type).lower(), _bucket_start(timestamp)
+        return sensor.pk, str(feed_type).lower(), _bucket_start(timestamp)
     except Exception:
         return None
@@ -50,10 +50,10 @@ class ExtractionPipeline:
 
         Performs the following steps:
         1. Search Elasticsearch for honeypot log entries in chunks
-        2. For each chunk, group hits by honeypot type and extract sensors
+        2. For each chunk, group hits by honeypot type and resolve their sensors at once
         3. Apply honeypot-specific extraction strategies
         4. Update IOC scores
-        5. Update activity buckets
+        5. Update activity buckets and save changed sensor countries
 
         Returns:
             Number of IOC records processed.
@@ -67,6 +67,8 @@ class ExtractionPipeline:
         for chunk in self.elastic_repo.search(self._minutes_back_to_lookup):
             ioc_records = []
             hits_by_honeypot = defaultdict(list)
+            sensor_hits = []
+            sensor_countries = {}
 
             # 2. Group by honeypot
             self.log.info("Grouping hits by honeypot type")
@@ -81,15 +83,22 @@ class ExtractionPipeline:
                     continue
 
                 if "t-pot_ip_ext" in hit:
-                    sensor = self.sensor_repo.get_or_create_sensor(hit["t-pot_ip_ext"])
-                    hit["_sensor"] = sensor  # include sensor for strategies
-
+                    sensor_hits.append(hit)
                     sensor_country = hit.get("geoip_ext", {}).get("country_name")
                     if sensor_country is not None:
-                        self.sensor_repo.update_country(sensor, sensor_country)
+                        sensor_countries[hit["t-pot_ip_ext"]] = sensor_country
 
                 hits_by_honeypot[hit["type"]].append(hit)
 
+            # resolve the sensors of the chunk at once, creating the new ones in bulk
+            if sensor_hits:
+                sensors = self.sensor_repo.get_or_create_sensors({hit["t-pot_ip_ext"] for hit in sensor_hits})
+                for hit in sensor_hits:
+                    hit["_sensor"] = sensors.get(hit["t-pot_ip_ext"])  # include sensor for strategies
+                for address, sensor_country in sensor_countries.items():
+                    self.sensor_repo.update_country(sensors.get(address), sensor_country)
+                bucket_updater.collect_sensor_hits(sensor_hits)
+
             # 3. Extract using strategies
             for honeypot, hits in sorted(hits_by_honeypot.items()):
                 if not self.ioc_repo.is_ready_for_extraction(honeypot):
@@ -117,6 +126,8 @@ class ExtractionPipeline:
             self.log.info("Updating activity buckets")
             bucket_updater.update()
 
+            self.sensor_repo.save_countries()
+
         # 6. Invalidate API caches only if any IOC records were processed
         if ioc_record_count > 0:
             # Use the shared DB-backed cache so the version bump is visible to
@@ -127,6 +138,11 @@ class ExtractionPipeline:
                 shared_cache.incr("asn_feeds_version")
             except ValueError:
                 shared_cache.set("asn_feeds_version", 2, timeout=None)
+            self.log.info("Invalidating command sequence cache")
+            try:
+                shared_cache.incr("command_sequences_version")
+            except ValueError:
+                shared_cache.set("command_sequences_version", 2, timeout=None)
 
         if bucket_updater.total_update_count > 0:
             self.log.info("Invalidating feeds trending cache")
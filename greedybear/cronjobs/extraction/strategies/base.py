@@ -19,6 +19,7 @@ class BaseExtractionStrategy(metaclass=ABCMeta):
         log: Logger instance for this class.
         ioc_processor: Processor for creating and updating IOC records.
         ioc_records: List of IOC records extracted during processing.
+        related_ioc_pairs: Pairs of IOC names to be linked by `_link_related_iocs`.
     """
 
     def __init__(
@@ -34,6 +35,7 @@ class BaseExtractionStrategy(metaclass=ABCMeta):
         self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.ioc_processor = IocProcessor(self.ioc_repo, self.sensor_repo)
         self.ioc_records = []
+        self.related_ioc_pairs = set()
 
     @abstractmethod
     def extract_from_hits(self, hits: list[dict]) -> None:
@@ -49,20 +51,18 @@ class BaseExtractionStrategy(metaclass=ABCMeta):
 
     def _add_fks(self, scanner_ip: str, hostname: str) -> None:
         """
-        Link related IOCs bidirectionally (scanner IP <-> hostname).
+        Queue a bidirectional link between related IOCs (scanner IP <-> hostname).
+        The links are created by `_link_related_iocs`.
 
         Args:
             scanner_ip: Scanner IP address.
             hostname: Hostname to link with scanner.
         """
-        scanner_ip_instance = self.ioc_repo.get_ioc_by_name(scanner_ip)
-        hostname_instance = self.ioc_repo.get_ioc_by_name(hostname)
+        self.related_ioc_pairs.add((scanner_ip, hostname))
 
-        if not scanner_ip_instance or not hostname_instance:
-            self.log.warning(
-                f"Cannot link IOCs - missing from database: scanner_ip={scanner_ip_instance is not None}, hostname={hostname_instance is not None}"
-            )
+    def _link_related_iocs(self) -> None:
+        """Link all queued pairs of related IOCs at once."""
+        if not self.related_ioc_pairs:
             return
-
-        scanner_ip_instance.related_ioc.add(hostname_instance)
-        hostname_instance.related_ioc.add(scanner_ip_instance)
+        self.ioc_repo.link_related_iocs(self.related_ioc_pairs)
+        self.related_ioc_pairs = set()
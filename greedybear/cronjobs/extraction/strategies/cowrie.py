@@ -14,6 +14,7 @@ from greedybear.cronjobs.extraction.utils import (
 )
 from greedybear.cronjobs.repositories import (
     CowrieSessionRepository,
+    CredentialRepository,
     IocRepository,
     SensorRepository,
 )
@@ -60,7 +61,7 @@ class CowrieExtractionStrategy(BaseExtractionStrategy):
     Extracts scanner IPs, payload URLs from login attempts and file
     downloads, and session data including credentials and command
     sequences. Links related IOCs (scanners to download URLs) and
-    deduplicates command sequences by hash.
+    deduplicates command sequences by hash, upserting them once per chunk.
     """
 
     def __init__(
@@ -69,9 +70,16 @@ class CowrieExtractionStrategy(BaseExtractionStrategy):
         ioc_repo: IocRepository,
         sensor_repo: SensorRepository,
         session_repo: CowrieSessionRepository = None,
+        credential_repo: CredentialRepository = None,
     ):
         super().__init__(honeypot, ioc_repo, sensor_repo)
         self.session_repo = session_repo or CowrieSessionRepository()
+        self.credential_repo = credential_repo or CredentialRepository()
+        # IDs of the source IOCs and sessions of each (username, password, protocol) tuple
+        self.credential_sources = defaultdict(set)
+        self.credential_sessions = defaultdict(set)
+        # sessions with commands, saved once the command sequences of the chunk are stored
+        self.command_sessions = []
         self.payloads_in_message = 0
         self.added_url_downloads = 0
 
@@ -79,13 +87,20 @@ class CowrieExtractionStrategy(BaseExtractionStrategy):
         """
         Main extraction entry point. Processes hits and extracts scanners,
         payloads, downloads, and sessions.
+        The deferred sessions with commands, IOC links and credentials collected
+        before an error are still stored, before the error is raised.
 
         Args:
             hits: List of Elasticsearch hit documents
         """
-        self._get_scanners(hits)
-        self._extract_possible_payload_in_messages(hits)
-        self._get_url_downloads(hits)
+        try:
+            self._get_scanners(hits)
+            self._extract_possible_payload_in_messages(hits)
+            self._get_url_downloads(hits)
+        finally:
+            self._save_command_sequences()
+            self._link_related_iocs()
+            self._save_credentials()
         self.log.info(
             f"added {len(self.ioc_records)} scanners, {self.payloads_in_message} payloads found in messages, {self.added_url_downloads} download URLs"
         )
@@ -209,13 +224,15 @@ class CowrieExtractionStrategy(BaseExtractionStrategy):
             for hit in sorted(session_hits, key=lambda hit: hit["timestamp"]):
                 self._process_session_hit(session_record, hit, ioc)
 
-            if session_record.commands is not None:
-                self._deduplicate_command_sequence(session_record)
-                self.session_repo.save_command_sequence(session_record.commands)
-                self.log.info(f"saved new command execute from {ioc.name} with hash {session_record.commands.commands_hash}")
-
             self.ioc_repo.save(session_record.source)
-            self.session_repo.save_session(session_record)
+            if session_record.commands is None:
+                self.session_repo.save_session(session_record)
+                continue
+
+            commands_str = "\n".join(session_record.commands.commands)
+            session_record.commands.commands_hash = sha256(commands_str.encode()).hexdigest()
+            self.log.info(f"found command execution from {ioc.name} with hash {session_record.commands.commands_hash}")
+            self.command_sessions.append(session_record)
 
         self.log.info(f"{len(hits_per_session)} sessions added")
 
@@ -238,7 +255,9 @@ class CowrieExtractionStrategy(BaseExtractionStrategy):
                 session_record.login_attempt = True
                 username = normalize_credential_field(hit["username"])
                 password = normalize_credential_field(hit["password"])
-                self.session_repo.add_credential(session_record, username, password)
+                key = (username, password, "")
+                self.credential_sources[key].add(session_record.source.pk)
+                self.credential_sessions[key].add(session_record.session_id)
 
             case "cowrie.command.input":
                 self.log.info(f"found a command execution from {ioc.name}")
@@ -273,25 +292,25 @@ class CowrieExtractionStrategy(BaseExtractionStrategy):
 
         session_record.interaction_count += 1
 
-    def _deduplicate_command_sequence(self, session: CowrieSession) -> bool:
+    def _save_command_sequences(self) -> None:
         """
-        Deduplicate command sequences by hashing and merging with existing sequences.
-
-        Args:
-            session: CowrieSession instance containing command sequence data
-
-        Returns:
-            True if merged with existing sequence, False if new sequence
+        Store the command sequences of all processed sessions in one upsert, merging sequences with the same hash,
+        then save the sessions referencing them.
         """
-        commands_str = "\n".join(session.commands.commands)
-        commands_hash = sha256(commands_str.encode()).hexdigest()
-
-        cmd_seq = self.session_repo.get_command_sequence_by_hash(commands_hash=commands_hash)
-        if cmd_seq is None:
-            session.commands.commands_hash = commands_hash
-            return False
-
-        last_seen = session.commands.last_seen
-        session.commands = cmd_seq
-        session.commands.last_seen = last_seen
-        return True
+        if not self.command_sessions:
+            return
+        ids = self.session_repo.save_command_sequences(session.commands for session in self.command_sessions)
+        for session in self.command_sessions:
+            session.commands.pk = ids[session.commands.commands_hash]
+            self.session_repo.save_session(session)
+        self.log.info(f"saved {len(ids)} command sequences from {len(self.command_sessions)} cowrie sessions")
+        self.command_sessions = []
+
+    def _save_credentials(self) -> None:
+        """Store the credentials of all processed sessions at once, after the sessions were saved."""
+        if not self.credential_sessions:
+            return
+        self.credential_repo.add_credentials(self.credential_sources, self.credential_sessions)
+        self.log.info(f"stored {len(self.credential_sessions)} credentials from cowrie sessions")
+        self.credential_sources = defaultdict(set)
+        self.credential_sessions = defaultdict(set)
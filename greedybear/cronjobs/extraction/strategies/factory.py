@@ -5,7 +5,7 @@ from greedybear.cronjobs.extraction.strategies import (
     HeraldingExtractionStrategy,
     TannerExtractionStrategy,
 )
-from greedybear.cronjobs.repositories import IocRepository, SensorRepository
+from greedybear.cronjobs.repositories import CowrieSessionRepository, IocRepository, SensorRepository
 
 
 class ExtractionStrategyFactory:
@@ -25,8 +25,10 @@ class ExtractionStrategyFactory:
         """
         self.ioc_repo = ioc_repo
         self.sensor_repo = sensor_repo
+        # shared by all chunks, so that its cache of stored command sequences lasts for the whole run
+        self.session_repo = CowrieSessionRepository()
         self._strategies = {
-            "Cowrie": lambda: CowrieExtractionStrategy("Cowrie", self.ioc_repo, self.sensor_repo),
+            "Cowrie": lambda: CowrieExtractionStrategy("Cowrie", self.ioc_repo, self.sensor_repo, self.session_repo),
             "Heralding": lambda: HeraldingExtractionStrategy("Heralding", self.ioc_repo, self.sensor_repo),
             "Tanner": lambda: TannerExtractionStrategy("Tanner", self.ioc_repo, self.sensor_repo),
         }
@@ -7,8 +7,7 @@ from greedybear.cronjobs.extraction.utils import (
     normalize_credential_field,
     threatfox_submission,
 )
-from greedybear.cronjobs.repositories import IocRepository, SensorRepository
-from greedybear.models import Credential
+from greedybear.cronjobs.repositories import CredentialRepository, IocRepository, SensorRepository
 
 HERALDING_HONEYPOT = "Heralding"
 
@@ -48,8 +47,10 @@ class HeraldingExtractionStrategy(BaseExtractionStrategy):
         honeypot: str,
         ioc_repo: IocRepository,
         sensor_repo: SensorRepository,
+        credential_repo: CredentialRepository = None,
     ):
         super().__init__(honeypot, ioc_repo, sensor_repo)
+        self.credential_repo = credential_repo or CredentialRepository()
         self.credentials_added = 0
 
     def extract_from_hits(self, hits: list[dict]) -> None:
@@ -86,7 +87,8 @@ class HeraldingExtractionStrategy(BaseExtractionStrategy):
         Extracts username/password pairs from Heralding hits and stores them
         together with the normalized protocol on the Credential model.
         Duplicate tuples in the same batch are deduplicated while preserving
-        the mapping to source IPs for linking via Credential.sources.
+        the mapping to source IPs for linking via Credential.sources,
+        and all of them are stored in bulk.
 
         Args:
             hits: List of Elasticsearch hit documents.
@@ -107,21 +109,16 @@ class HeraldingExtractionStrategy(BaseExtractionStrategy):
             key = (username, password, protocol)
             credentials.setdefault(key, set()).add(hit.get("src_ip", ""))
 
+        if not credentials:
+            return
+
         ioc_by_ip = {ioc.name: ioc for ioc in self.ioc_records}
+        sources = {key: {ioc_by_ip[ip].pk for ip in src_ips if ip in ioc_by_ip} for key, src_ips in credentials.items()}
 
-        for (username, password, protocol), src_ips in sorted(credentials.items()):
-            credential, created = Credential.objects.get_or_create(
-                username=username,
-                password=password,
-                protocol=protocol,
-            )
-            for ip in src_ips:
-                ioc_record = ioc_by_ip.get(ip)
-                if ioc_record:
-                    credential.sources.add(ioc_record)
-            if created:
-                self.credentials_added += 1
-                self.log.info(f"stored credential for protocol={protocol}")
+        created_count = self.credential_repo.add_credentials(sources)
+        if created_count:
+            self.credentials_added += created_count
+            self.log.info(f"stored {created_count} new credentials")
 
     def _extract_protocol(self, hit: dict) -> str | None:
         """
@@ -101,6 +101,7 @@ class TannerExtractionStrategy(BaseExtractionStrategy):
         self.attack_tags_set = set()
         self._get_scanners(hits)
         self._classify_attacks(hits)
+        self._link_related_iocs()
 
         tag_entries = [{"ioc_id": ioc_id, "key": "attack_type", "value": attack_type} for ioc_id, attack_type in self.attack_tags_set]
         self.attack_tags_added += self.tag_repo.add_tags(TANNER_SOURCE, tag_entries)
@@ -1,15 +1,13 @@
 from collections import defaultdict
-from ipaddress import ip_address, ip_network
 from logging import Logger
 from urllib.parse import urlparse
 
-import requests
 from django.conf import settings
 
-from greedybear.cronjobs.repositories import ASRepository
+from greedybear.cronjobs.repositories import ASRepository, FireHolRepository, ThreatFoxSubmissionRepository
 from greedybear.enums import IpReputation
-from greedybear.models import IOC, FireHolList, MassScanner
-from greedybear.utils import get_ioc_type, is_non_global_ip, parse_timestamp
+from greedybear.models import IOC, MassScanner
+from greedybear.utils import get_ioc_type, global_ip_address, parse_timestamp
 
 
 def normalize_credential_field(value: object, max_length: int = 256) -> str:
@@ -61,30 +59,6 @@ def correct_ip_reputation(ip: str, ip_reputation: str, mass_scanner_ips: set) ->
     return ip_reputation
 
 
-def get_firehol_categories(ip: str, extracted_ip, firehol_exact_map: dict, cidr_entries: list) -> list[str]:
-    """
-    Get FireHol categories for an IP address.
-    Checks both exact IP matches (for .ipset files) and network range
-    membership (for .netset files with CIDR notation).
-
-    Args:
-        ip: IP address string.
-        extracted_ip: Parsed IP address object from ipaddress library.
-        firehol_exact_map: Dict mapping IPs to lists of FireHol sources.
-        cidr_entries: List of tuples (ip_network, source) for CIDR entries.
-
-    Returns:
-        List of FireHol source categories.
-    """
-    firehol_categories = list(firehol_exact_map.get(ip, []))
-
-    for network, source in cidr_entries:
-        if source and extracted_ip in network and source not in firehol_categories:
-            firehol_categories.append(source)
-
-    return firehol_categories
-
-
 def iocs_from_hits(hits: list[dict]) -> list[IOC]:
     """
     Convert Elasticsearch hits into IOC objects with associated sensors.
@@ -107,22 +81,10 @@ def iocs_from_hits(hits: list[dict]) -> list[IOC]:
         hits_by_ip[hit["src_ip"]].append(hit)
 
     all_ips = list(hits_by_ip.keys())
+    global_ips = [ip for ip in all_ips if global_ip_address(ip) is not None]
 
-    # --- Bulk prefetch: FireHol exact matches ---
-    firehol_exact_map = defaultdict(list)
-    for entry_ip, source in FireHolList.objects.filter(
-        ip_address__in=all_ips,
-    ).values_list("ip_address", "source"):
-        if source:
-            firehol_exact_map[entry_ip].append(source)
-
-    # --- Bulk prefetch: FireHol CIDR entries ---
-    cidr_entries = []
-    for entry in FireHolList.objects.filter(ip_address__contains="/"):
-        try:
-            cidr_entries.append((ip_network(entry.ip_address, strict=False), entry.source))
-        except (ValueError, IndexError):
-            continue
+    # --- Bulk prefetch: FireHol exact and network matches ---
+    firehol_categories_map = FireHolRepository().get_categories(global_ips)
 
     # --- Bulk prefetch: MassScanner IPs ---
     mass_scanner_ips = set(
@@ -134,11 +96,10 @@ def iocs_from_hits(hits: list[dict]) -> list[IOC]:
     iocs = []
     as_repository = ASRepository()  # single instance for this batch
     for ip, hits in hits_by_ip.items():
-        extracted_ip = ip_address(ip)
-        if is_non_global_ip(extracted_ip):
+        if global_ip_address(ip) is None:
             continue
 
-        firehol_categories = get_firehol_categories(ip, extracted_ip, firehol_exact_map, cidr_entries)
+        firehol_categories = firehol_categories_map.get(ip, [])
 
         # Single pass over hits to accumulate all derived data
         dest_ports = []
@@ -194,13 +155,15 @@ def iocs_from_hits(hits: list[dict]) -> list[IOC]:
 
 def threatfox_submission(ioc_record: IOC, related_urls: list, log: Logger) -> None:
     """
-    Submit IOC URLs to ThreatFox threat intelligence platform.
+    Queue IOC URLs for submission to ThreatFox threat intelligence platform.
     Only submits payload request IOCs with URLs containing paths,
     because they are more reliable than scanners.
     Requires THREATFOX_API_KEY to be configured in settings.
+    The queued URLs are sent by the ThreatFox submission job,
+    so extraction does not wait on the ThreatFox API.
 
     Args:
-        ioc_record: IOC record containing honeypot associations.
+        ioc_record: IOC record the URLs were requested from.
         related_urls: List of URLs to potentially submit.
         log: Logger instance for status messages.
     """
@@ -224,36 +187,5 @@ def threatfox_submission(ioc_record: IOC, related_urls: list, log: Logger) -> No
         log.info("No URLs with paths to submit")
         return
 
-    headers = {"Auth-Key": settings.THREATFOX_API_KEY}
-    log.info(f"submitting IOC {urls_to_submit} to Threatfox")
-
-    if hasattr(ioc_record, "_seen_honeypots"):
-        seen_honeypots = ioc_record._seen_honeypots
-    else:
-        seen_honeypots = [hp.name for hp in ioc_record.honeypots.all()]
-
-    seen_honeypots_str = ", ".join(seen_honeypots)
-
-    json_data = {
-        "query": "submit_ioc",
-        "threat_type": "payload_delivery",
-        "ioc_type": "url",
-        "malware": "unknown",
-        "confidence_level": "75",
-        "reference": "https://greedybear.honeynet.org",
-        "comment": f"Seen requesting a payload from {seen_honeypots_str} honeypot and collected in Greedybear, the Threat Intel Platform for T-POTs.",
-        "anonymous": 0,
-        "tags": ["honeypot"],
-        "iocs": urls_to_submit,
-    }
-    try:
-        r = requests.post(
-            "https://threatfox-api.abuse.ch/api/v1/",
-            headers=headers,
-            json=json_data,
-            timeout=5,
-        )
-    except requests.RequestException as e:
-        log.exception(f"Threatfox push error: {e}")
-    else:
-        log.info(f"Threatfox submission successful. Received response: {r.text}")
+    log.info(f"queueing IOC {urls_to_submit} for submission to Threatfox")
+    ThreatFoxSubmissionRepository().enqueue(ioc_record, urls_to_submit)
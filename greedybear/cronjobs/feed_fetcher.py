@@ -0,0 +1,146 @@
+import hashlib
+import logging
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+import requests
+from django.core.cache import caches
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = 60
+MAX_WORKERS = 4
+
+
+@cache
+def get_session() -> requests.Session:
+    """
+    Return the HTTP session shared by all feed downloads of this process.
+    Its connection pools are kept alive between downloads and jobs.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=MAX_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "GreedyBear"
+    return session
+
+
+class FeedFetcher:
+    """
+    Download external threat lists with a pooled session, concurrently and with conditional requests.
+
+    The ETag and Last-Modified validators of a feed are stored in the shared cache once the feed
+    has been processed, so that an unchanged feed is not downloaded and processed again.
+    """
+
+    def __init__(self, session: requests.Session | None = None, cache=None, max_workers: int = MAX_WORKERS):
+        """
+        Initialize the fetcher.
+
+        Args:
+            session: Optional requests session, defaults to the shared session of this process.
+            cache: Optional Django cache for the feed validators, defaults to the shared django-q cache.
+            max_workers: Maximum number of concurrent downloads.
+        """
+        self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.session = session if session is not None else get_session()
+        self.cache = cache if cache is not None else caches["django-q"]
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _cache_key(url: str) -> str:
+        return f"feed_validators_{hashlib.sha256(url.encode()).hexdigest()}"
+
+    def _conditional_headers(self, url: str) -> dict[str, str]:
+        validators = self.cache.get(self._cache_key(url)) or {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def _get(self, url: str, headers: dict[str, str], timeout: int, stream: bool) -> requests.Response | None:
+        response = self.session.get(url, headers=headers, timeout=timeout, stream=stream)
+        if response.status_code == 304:
+            response.close()
+            self.log.info(f"{url} not modified since the last download")
+            return None
+        response.raise_for_status()
+        return response
+
+    def fetch(self, url: str, timeout: int = DEFAULT_TIMEOUT, conditional: bool = True, stream: bool = True) -> requests.Response | None:
+        """
+        Download a feed.
+
+        Args:
+            url: URL of the feed.
+            timeout: Request timeout in seconds.
+            conditional: Send the validators of the last processed download, if any.
+            stream: Defer downloading the body until it is consumed.
+
+        Returns:
+            The response, or None if the feed did not change since it was last processed.
+
+        Raises:
+            requests.RequestException: If the download fails.
+        """
+        headers = self._conditional_headers(url) if conditional else {}
+        return self._get(url, headers, timeout, stream)
+
+    def fetch_all(self, urls: Mapping[str, str], timeout: int = DEFAULT_TIMEOUT) -> dict[str, requests.Response | requests.RequestException | None]:
+        """
+        Download several feeds concurrently, reading their whole body in the worker threads.
+
+        Args:
+            urls: Feed URLs by name.
+            timeout: Request timeout in seconds.
+
+        Returns:
+            By name, the response, None if the feed did not change, or the exception if the download failed.
+        """
+
+        def _fetch(url: str, headers: dict[str, str]) -> requests.Response | requests.RequestException | None:
+            try:
+                return self._get(url, headers, timeout, stream=False)
+            except requests.RequestException as exc:
+                return exc
+
+        if not urls:
+            return {}
+        # the validators are read here, so that the worker threads do not open database connections
+        headers = [self._conditional_headers(url) for url in urls.values()]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(_fetch, urls.values(), headers), strict=True))
+
+    def mark_processed(self, url: str, response: requests.Response) -> None:
+        """
+        Remember the validators of a successfully processed download,
+        so that the next download of the feed is skipped if it did not change.
+
+        Args:
+            url: URL the feed was requested from.
+            response: The processed response.
+        """
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["last_modified"] = response.headers["Last-Modified"]
+        if validators:
+            self.cache.set(self._cache_key(url), validators, timeout=None)
+
+    @staticmethod
+    def iter_lines(response: requests.Response) -> Iterator[str]:
+        """
+        Iterate over the lines of a response body without loading it as a single string.
+
+        Args:
+            response: The response to read.
+
+        Yields:
+            The decoded lines of the body.
+        """
+        for line in response.iter_lines(decode_unicode=True):
+            yield line.decode("utf-8", errors="replace") if isinstance(line, bytes) else line
@@ -1,6 +1,7 @@
 import requests
 
 from greedybear.cronjobs.base import Cronjob
+from greedybear.cronjobs.feed_fetcher import FeedFetcher
 from greedybear.cronjobs.repositories import FireHolRepository
 from greedybear.utils import is_valid_cidr, is_valid_ipv4
 
@@ -13,22 +14,24 @@ class FireHolCron(Cronjob):
     Automatically cleans up entries older than 30 days.
     """
 
-    def __init__(self, firehol_repo=None):
+    def __init__(self, firehol_repo=None, fetcher=None):
         """
         Initialize the FireHol cronjob with repository dependency.
 
         Args:
             firehol_repo: Optional FireHolRepository instance for testing.
+            fetcher: Optional FeedFetcher instance for testing.
         """
         super().__init__()
         self.firehol_repo = firehol_repo if firehol_repo is not None else FireHolRepository()
+        self.fetcher = fetcher if fetcher is not None else FeedFetcher()
 
     def run(self) -> None:
         """
         Fetch blocklists from FireHol sources and store them in the database.
 
-        Processes multiple sources (blocklist_de, greensnow, bruteforceblocker, dshield),
-        parses IP addresses and CIDR blocks, and stores new entries.
+        Downloads multiple sources (blocklist_de, greensnow, bruteforceblocker, dshield) concurrently,
+        parses IP addresses and CIDR blocks and syncs the stored entries of each source with its list.
         Finally cleans up old entries.
         """
         base_path = "https://raw.githubusercontent.com/firehol/blocklist-ipsets/master"
@@ -39,18 +42,21 @@ class FireHolCron(Cronjob):
             "dshield": f"{base_path}/dshield.netset",
         }
 
+        responses = self.fetcher.fetch_all(sources)
         for source, url in sources.items():
             self.log.info(f"Processing {source} from {url}")
+            response = responses[source]
             try:
-                try:
-                    response = requests.get(url, timeout=60)
-                    response.raise_for_status()
-                except requests.RequestException as e:
-                    self.log.error(f"Network error fetching {source}: {e}")
+                if isinstance(response, requests.RequestException):
+                    self.log.error(f"Network error fetching {source}: {response}")
+                    continue
+                if response is None:
+                    # the list did not change, keep its entries from expiring
+                    self.firehol_repo.refresh_source(source)
                     continue
 
-                lines = response.text.splitlines()
-                for line in lines:
+                entries = set()
+                for line in self.fetcher.iter_lines(response):
                     line = line.strip()
                     if not line or line.startswith("#"):
                         continue
@@ -63,10 +69,14 @@ class FireHolCron(Cronjob):
 
                     # FireHol .ipset and .netset files contain IPs or CIDRs, one per line
                     # Comments (lines starting with #) are filtered out above
+                    entries.add(line)
 
-                    entry, created = self.firehol_repo.get_or_create(line, source)
-                    if created:
-                        self.log.debug(f"Added new entry: {line} from {source}")
+                if not entries:
+                    # an empty list is more likely a broken download than an empty blocklist
+                    self.log.warning(f"No entries found for {source}, keeping the stored entries")
+                    continue
+                self.firehol_repo.sync_source(source, entries)
+                self.fetcher.mark_processed(url, response)
 
             except Exception as e:
                 self.log.exception(f"Unexpected error processing {source}: {e}")
@@ -1,16 +1,27 @@
 # This file is a part of GreedyBear https://github.com/honeynet/GreedyBear
 # See the file 'LICENSE' for copying permission.
+from datetime import datetime, timedelta
+
 from greedybear.cronjobs.base import Cronjob
-from greedybear.cronjobs.repositories import ElasticRepository, IocRepository
+from greedybear.cronjobs.repositories import ElasticRepository, HoneypotHitCountRepository, IocRepository, get_time_window
+
+# How long hit counts are kept for the health overview
+HIT_COUNT_RETENTION = timedelta(days=7)
 
 
 class MonitorHoneypots(Cronjob):
-    """Monitor active honeypots for recent log activity."""
+    """
+    Monitor active honeypots for recent log activity.
+
+    The hits of all honeypots are counted in a single Elasticsearch aggregation
+    and stored, so that the health overview can compare ingestion rates over time.
+    """
 
     def __init__(
         self,
         ioc_repo: IocRepository | None = None,
         elastic_repo: ElasticRepository | None = None,
+        hit_count_repo: HoneypotHitCountRepository | None = None,
         minutes_back: int = 60,
     ):
         """Initialize the monitoring.
@@ -18,19 +29,29 @@ class MonitorHoneypots(Cronjob):
         Args:
             ioc_repo: Repository for accessing known honeypots.
             elastic_repo: Repository for querying Elasticsearch logs.
+            hit_count_repo: Repository for storing the hit counts of the honeypots.
             minutes_back: Time window in minutes to check for activity.
         """
         super().__init__()
         self.ioc_repo = ioc_repo or IocRepository()
         self.elastic_repo = elastic_repo or ElasticRepository()
+        self.hit_count_repo = hit_count_repo or HoneypotHitCountRepository()
         self.minutes_back = minutes_back
 
     def run(self):
-        """Check all active honeypots for recent log activity."""
-        for honeypot in self.ioc_repo.get_active_honeypots():
-            honeypot_name = honeypot.name
+        """Check all active honeypots for recent log activity and store their hit counts."""
+        now = datetime.now()
+        window_start, window_end = get_time_window(now, self.minutes_back)
+        counts = self.elastic_repo.count_hits_per_honeypot(window_start, window_end)
+
+        honeypots = self.ioc_repo.get_active_honeypots()
+        for honeypot in honeypots:
             self.log.info(f"checking if logs from the honeypot {honeypot} are available")
-            if self.elastic_repo.has_honeypot_been_hit(self.minutes_back, honeypot_name):
-                self.log.info(f"logs available for {honeypot}")
+            hits = counts.get(honeypot.name, 0)
+            if hits:
+                self.log.info(f"logs available for {honeypot}: {hits} hits")
                 continue
             self.log.warning(f"no logs available for {honeypot} - something could be wrong with T-Pot")
+
+        self.hit_count_repo.save_counts(honeypots, counts, window_start, window_end)
+        self.hit_count_repo.delete_older_than(now - HIT_COUNT_RETENTION)
@@ -0,0 +1,229 @@
+import asyncio
+import ipaddress
+import logging
+import secrets
+import struct
+from collections.abc import Iterable
+
+DNS_PORT = 53
+DNS_TIMEOUT = 2
+ATTEMPTS = 2
+MAX_CONCURRENCY = 1000
+RESOLV_CONF = "/etc/resolv.conf"
+
+QTYPE_PTR = 12
+QCLASS_IN = 1
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+FLAG_RESPONSE = 0x8000
+FLAG_TRUNCATED = 0x0200
+FLAG_RECURSION_DESIRED = 0x0100
+
+HEADER = struct.Struct("!HHHHHH")
+QUESTION = struct.Struct("!HH")
+RECORD = struct.Struct("!HHIH")
+
+
+def default_nameserver() -> str:
+    """Return the first nameserver configured in resolv.conf, or the local host if there is none."""
+    try:
+        with open(RESOLV_CONF) as resolv_conf:
+            for line in resolv_conf:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    return fields[1]
+    except OSError:
+        pass
+    return "127.0.0.1"
+
+
+def build_query(query_id: int, name: str) -> bytes:
+    """Build a recursive DNS query for the PTR record of a name."""
+    qname = b"".join(bytes([len(label)]) + label.encode("ascii") for label in name.split(".")) + b"\x00"
+    return HEADER.pack(query_id, FLAG_RECURSION_DESIRED, 1, 0, 0, 0) + qname + QUESTION.pack(QTYPE_PTR, QCLASS_IN)
+
+
+def _read_name(data: bytes, offset: int) -> tuple[str, int]:
+    """Read a possibly compressed domain name, returning it and the offset right after it."""
+    labels = []
+    end = None
+    for _ in range(128):
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = struct.unpack_from("!H", data, offset)[0] & 0x3FFF
+            continue
+        if length & 0xC0:
+            raise ValueError(f"invalid label length {length:#x}")
+        offset += 1
+        if not length:
+            return ".".join(labels), end if end is not None else offset
+        if offset + length > len(data):
+            raise ValueError("label exceeds the message")
+        labels.append(data[offset : offset + length].decode("ascii", errors="replace"))
+        offset += length
+    raise ValueError("too many labels or compression loop")
+
+
+def parse_response(data: bytes, query_id: int, name: str) -> str | None:
+    """
+    Extract the PTR record from the response to a query.
+
+    Args:
+        data: The response message.
+        query_id: ID of the query.
+        name: The name that was queried.
+
+    Returns:
+        The PTR hostname, an empty string if the name has no PTR record, or None if the server could not answer.
+
+    Raises:
+        ValueError: If the message is malformed or does not answer the query.
+    """
+    try:
+        response_id, flags, question_count, answer_count, _, _ = HEADER.unpack_from(data)
+        if response_id != query_id or not flags & FLAG_RESPONSE or question_count != 1:
+            raise ValueError("message does not answer the query")
+        question_name, offset = _read_name(data, HEADER.size)
+        qtype, _ = QUESTION.unpack_from(data, offset)
+        if question_name.lower() != name.lower() or qtype != QTYPE_PTR:
+            raise ValueError("message does not answer the query")
+        rcode = flags & 0x000F
+        if rcode == RCODE_NXDOMAIN:
+            return ""
+        if rcode != RCODE_NOERROR or flags & FLAG_TRUNCATED:
+            return None
+        offset += QUESTION.size
+        # classless delegations answer with a CNAME followed by the PTR record of its target
+        for _ in range(answer_count):
+            _, offset = _read_name(data, offset)
+            rtype, rclass, _, rdlength = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if rtype == QTYPE_PTR and rclass == QCLASS_IN:
+                return _read_name(data, offset)[0]
+            offset += rdlength
+        return ""
+    except (IndexError, struct.error) as exc:
+        raise ValueError("truncated message") from exc
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    """
+    Dispatch the responses received on the resolver socket to the pending queries.
+
+    A response completes a query only if both its ID and its question match, so late responses
+    to timed out queries whose ID was reused and spoofed responses are ignored.
+    The futures of the queries receive the parsed PTR record.
+    """
+
+    def __init__(self):
+        self.pending: dict[int, tuple[str, asyncio.Future]] = {}
+
+    def new_query(self, name: str) -> tuple[int, asyncio.Future]:
+        """Register a query for a name, returning its ID and the future of its PTR record."""
+        query_id = secrets.randbits(16)
+        while query_id in self.pending:
+            query_id = secrets.randbits(16)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[query_id] = (name, future)
+        return query_id, future
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if len(data) < HEADER.size:
+            return
+        query_id = struct.unpack_from("!H", data)[0]
+        if query_id not in self.pending:
+            return
+        name, future = self.pending[query_id]
+        if future.done():
+            return
+        try:
+            future.set_result(parse_response(data, query_id, name))
+        except ValueError:
+            # not an answer to the query, which keeps waiting for it
+            pass
+
+    def error_received(self, exc: Exception) -> None:
+        # errors of a UDP socket cannot be attributed to a query, the affected queries time out instead
+        pass
+
+
+class PtrResolver:
+    """
+    Resolve the PTR records of many IP addresses concurrently.
+
+    All queries of a batch are multiplexed over a single UDP socket by an asyncio event loop,
+    each one with its own timeout, so no thread or process-wide socket setting is involved.
+    """
+
+    def __init__(
+        self,
+        nameserver: str | None = None,
+        port: int = DNS_PORT,
+        timeout: float = DNS_TIMEOUT,
+        attempts: int = ATTEMPTS,
+        concurrency: int = MAX_CONCURRENCY,
+    ):
+        """
+        Initialize the resolver.
+
+        Args:
+            nameserver: Address of the recursive nameserver, defaults to the first one in resolv.conf.
+            port: Port of the nameserver.
+            timeout: Timeout in seconds for each query.
+            attempts: Number of queries sent for an IP address before giving up.
+            concurrency: Maximum number of queries in flight.
+        """
+        self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.nameserver = nameserver if nameserver is not None else default_nameserver()
+        self.port = port
+        self.timeout = timeout
+        self.attempts = attempts
+        self.concurrency = concurrency
+
+    def resolve(self, ips: Iterable[str]) -> dict[str, str | None]:
+        """
+        Resolve the PTR records of IP addresses.
+
+        Args:
+            ips: IP addresses to resolve.
+
+        Returns:
+            Dict mapping each IP address to its PTR hostname, to an empty string if it has no PTR record,
+            or to None if the lookup failed.
+        """
+        return asyncio.run(self.resolve_many(ips))
+
+    async def resolve_many(self, ips: Iterable[str]) -> dict[str, str | None]:
+        """Coroutine version of `resolve`, for callers already running an event loop."""
+        ips = list(dict.fromkeys(ips))
+        if not ips:
+            return {}
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_datagram_endpoint(_DnsProtocol, remote_addr=(self.nameserver, self.port))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            results = await asyncio.gather(*(self._resolve_one(transport, protocol, semaphore, ip) for ip in ips))
+        finally:
+            transport.close()
+        return dict(zip(ips, results, strict=True))
+
+    async def _resolve_one(self, transport: asyncio.DatagramTransport, protocol: _DnsProtocol, semaphore: asyncio.Semaphore, ip: str) -> str | None:
+        try:
+            name = ipaddress.ip_address(ip).reverse_pointer
+        except ValueError:
+            self.log.warning(f"Cannot resolve PTR record of invalid IP address {ip!r}")
+            return None
+        async with semaphore:
+            for _ in range(self.attempts):
+                query_id, future = protocol.new_query(name)
+                try:
+                    transport.sendto(build_query(query_id, name))
+                    return await asyncio.wait_for(future, self.timeout)
+                except TimeoutError:
+                    continue
+                finally:
+                    del protocol.pending[query_id]
+        self.log.debug(f"PTR lookup of {ip} timed out")
+        return None
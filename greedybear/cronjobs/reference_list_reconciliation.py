@@ -0,0 +1,27 @@
+from greedybear.cronjobs.base import Cronjob
+from greedybear.cronjobs.repositories import ReferenceListChangeRepository
+
+
+class ReferenceListReconciliationCron(Cronjob):
+    """
+    Update existing IOCs after changes of the reference lists.
+
+    The mass scanner, Tor exit node and FireHol jobs record the entries they add or remove
+    in a change log. This job applies all logged changes to the IOCs with a few set-based
+    statements, instead of updating the IOCs one IP address at a time.
+    """
+
+    def __init__(self, change_repo=None):
+        """
+        Initialize the reconciliation cronjob with repository dependency.
+
+        Args:
+            change_repo: Optional ReferenceListChangeRepository instance for testing.
+        """
+        super().__init__()
+        self.change_repo = change_repo if change_repo is not None else ReferenceListChangeRepository()
+
+    def run(self) -> None:
+        reputations_updated, categories_updated = self.change_repo.reconcile()
+        if reputations_updated or categories_updated:
+            self.log.info(f"Updated the reputation of {reputations_updated} and the FireHol categories of {categories_updated} IOCs")
@@ -1,10 +1,17 @@
 from greedybear.cronjobs.repositories.autonomous_system import *
+from greedybear.cronjobs.repositories.chunked_delete import *
 from greedybear.cronjobs.repositories.cowrie_session import *
+from greedybear.cronjobs.repositories.credential import *
 from greedybear.cronjobs.repositories.elastic import *
 from greedybear.cronjobs.repositories.firehol import *
+from greedybear.cronjobs.repositories.honeypot_hit_count import *
 from greedybear.cronjobs.repositories.ioc import *
 from greedybear.cronjobs.repositories.mass_scanner import *
+from greedybear.cronjobs.repositories.reference_list_change import *
+from greedybear.cronjobs.repositories.reverse_dns_lookup import *
+from greedybear.cronjobs.repositories.scoring_run import *
 from greedybear.cronjobs.repositories.sensor import *
 from greedybear.cronjobs.repositories.tag import *
+from greedybear.cronjobs.repositories.threatfox_submission import *
 from greedybear.cronjobs.repositories.tor import *
 from greedybear.cronjobs.repositories.trending_bucket import *
@@ -1,15 +1,33 @@
 import logging
+from collections.abc import Iterable
 
+from django.db import connection
+
+from greedybear.cronjobs.repositories.chunked_delete import ChunkedDeleteRepository
 from greedybear.models import IOC, CommandSequence, CowrieFileTransfer, CowrieSession
 
 
 class CowrieSessionRepository:
     """
     Repository for data access to Cowrie sessions and command sequences.
+
+    Keeps the ID and stored time range of every command sequence it saved,
+    so that an instance shared by all chunks of an extraction run skips redundant writes.
     """
 
-    def __init__(self):
+    BATCH_SIZE = 1000
+
+    def __init__(self, delete_repo=None):
+        """
+        Initialize the repository.
+
+        Args:
+            delete_repo: Optional ChunkedDeleteRepository instance for testing.
+        """
         self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.delete_repo = delete_repo if delete_repo is not None else ChunkedDeleteRepository()
+        # commands_hash -> (id, first_seen, last_seen) as stored in the database
+        self._command_sequence_cache = {}
 
     def get_or_create_session(self, session_id: str, source: IOC) -> CowrieSession:
         """
@@ -65,21 +83,6 @@ class CowrieSessionRepository:
             transfer.save()
         return transfer
 
-    def get_command_sequence_by_hash(self, commands_hash: str) -> CommandSequence | None:
-        """
-        Retrieve a command sequence by its hash.
-
-        Args:
-            commands_hash: SHA256 hash identifying the command sequence.
-
-        Returns:
-            The matching CommandSequence, or None if not found.
-        """
-        try:
-            return CommandSequence.objects.get(commands_hash=commands_hash)
-        except CommandSequence.DoesNotExist:
-            return None
-
     def save_session(self, session: CowrieSession) -> CowrieSession:
         """
         Persist a CowrieSession to the database.
@@ -93,18 +96,56 @@ class CowrieSessionRepository:
         session.save()
         return session
 
-    def save_command_sequence(self, cmd: CommandSequence) -> CommandSequence:
+    def save_command_sequences(self, sequences: Iterable[CommandSequence]) -> dict[str, int]:
         """
-        Persist a CommandSequence to the database.
+        Store command sequences, identified by their hash, in a single upsert.
+
+        Sequences that already exist keep their commands, only their time range is extended
+        and they are marked as updated, since new sessions may add payload URLs to their clustering input.
+        Sequences whose time range was already stored by this repository instance are not written again,
+        so that scripts replayed by bots across many sessions cause at most one write per change.
 
         Args:
-            cmd: The CommandSequence instance to save.
+            sequences: CommandSequence instances with commands_hash, commands, first_seen and last_seen set.
 
         Returns:
-            The saved CommandSequence instance.
-        """
-        cmd.save()
-        return cmd
+            Dict mapping the hash of each sequence to the ID of its stored CommandSequence.
+        """
+        merged = {}
+        for sequence in sequences:
+            first_seen, last_seen = sequence.first_seen, sequence.last_seen
+            if sequence.commands_hash in merged:
+                _, other_first_seen, other_last_seen = merged[sequence.commands_hash]
+                first_seen, last_seen = min(first_seen, other_first_seen), max(last_seen, other_last_seen)
+            merged[sequence.commands_hash] = (sequence.commands, first_seen, last_seen)
+
+        pending = []
+        for commands_hash, (commands, first_seen, last_seen) in sorted(merged.items()):
+            cached = self._command_sequence_cache.get(commands_hash)
+            if cached is not None and cached[1] <= first_seen and last_seen <= cached[2]:
+                continue
+            pending.append((commands_hash, commands, first_seen, last_seen))
+
+        table = connection.ops.quote_name(CommandSequence._meta.db_table)
+        with connection.cursor() as cursor:
+            for i in range(0, len(pending), self.BATCH_SIZE):
+                batch = pending[i : i + self.BATCH_SIZE]
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table} AS sequence (commands_hash, commands, first_seen, last_seen, clustering_digest)
+                    VALUES {", ".join(["(%s, %s, %s, %s, '')"] * len(batch))}
+                    ON CONFLICT (commands_hash) DO UPDATE
+                    SET first_seen = LEAST(sequence.first_seen, EXCLUDED.first_seen), last_seen = GREATEST(sequence.last_seen, EXCLUDED.last_seen),
+                    updated = STATEMENT_TIMESTAMP()
+                    RETURNING id, commands_hash, first_seen, last_seen
+                    """,
+                    [value for row in batch for value in row],
+                )
+                self._command_sequence_cache.update(
+                    {commands_hash: (pk, first_seen, last_seen) for pk, commands_hash, first_seen, last_seen in cursor.fetchall()}
+                )
+        self.log.debug(f"stored {len(pending)} of {len(merged)} command sequences")
+        return {commands_hash: self._command_sequence_cache[commands_hash][0] for commands_hash in merged}
 
     def delete_old_command_sequences(self, cutoff_date) -> int:
         """
@@ -116,8 +157,7 @@ class CowrieSessionRepository:
         Returns:
             Number of CommandSequence objects deleted.
         """
-        deleted_count, _ = CommandSequence.objects.filter(last_seen__lte=cutoff_date).delete()
-        return deleted_count
+        return self.delete_repo.delete(CommandSequence.objects.filter(last_seen__lte=cutoff_date), "old_command_sequences")
 
     def delete_incomplete_sessions(self) -> int:
         """
@@ -126,8 +166,7 @@ class CowrieSessionRepository:
         Returns:
             Number of sessions deleted.
         """
-        deleted_count, _ = CowrieSession.objects.filter(start_time__isnull=True).delete()
-        return deleted_count
+        return self.delete_repo.delete(CowrieSession.objects.filter(start_time__isnull=True), "incomplete_sessions")
 
     def delete_sessions_without_login(self, cutoff_date) -> int:
         """
@@ -139,8 +178,7 @@ class CowrieSessionRepository:
         Returns:
             Number of sessions deleted.
         """
-        deleted_count, _ = CowrieSession.objects.filter(start_time__lte=cutoff_date, login_attempt=False).delete()
-        return deleted_count
+        return self.delete_repo.delete(CowrieSession.objects.filter(start_time__lte=cutoff_date, login_attempt=False), "sessions_without_login")
 
     def delete_sessions_without_commands(self, cutoff_date) -> int:
         """
@@ -152,33 +190,4 @@ class CowrieSessionRepository:
         Returns:
             Number of sessions deleted.
         """
-        deleted_count, _ = CowrieSession.objects.filter(start_time__lte=cutoff_date, commands__isnull=True).delete()
-        return deleted_count
-
-    def add_credential(
-        self,
-        session: CowrieSession,
-        username: str,
-        password: str,
-        protocol: str | None = None,
-    ) -> None:
-        """
-        Get or create a Credential and associate it with the session.
-
-        Args:
-            session: The CowrieSession instance to associate the credential with.
-            username: The credential username.
-            password: The credential password.
-            protocol: Optional protocol associated with the credential.
-        """
-        from greedybear.models import Credential
-
-        normalized_protocol = protocol or ""
-        credential, _ = Credential.objects.get_or_create(
-            username=username,
-            password=password,
-            protocol=normalized_protocol,
-        )
-        session.credentials.add(credential)
-        credential.sources.add(session.source)
-        self.log.debug(f"linked source {session.source.name} to credential '{credential}'")
+        return self.delete_repo.delete(CowrieSession.objects.filter(start_time__lte=cutoff_date, commands__isnull=True), "sessions_without_commands")
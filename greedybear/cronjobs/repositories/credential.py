@@ -0,0 +1,117 @@
+import logging
+from collections.abc import Iterable, Mapping
+
+from django.db import connection
+
+from greedybear.models import CowrieSession, Credential
+
+# (username, password, protocol)
+CredentialKey = tuple[str, str, str]
+
+
+class CredentialRepository:
+    """Repository for storing credentials in bulk and linking them to their sources and Cowrie sessions."""
+
+    BATCH_SIZE = 1000
+
+    def __init__(self):
+        self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def get_ids(self, keys: Iterable[CredentialKey]) -> dict[CredentialKey, int]:
+        """
+        Look up the IDs of existing credentials.
+
+        Args:
+            keys: (username, password, protocol) tuples to look up.
+
+        Returns:
+            Dict mapping each existing credential tuple to its ID.
+        """
+        keys = list(keys)
+        table = connection.ops.quote_name(Credential._meta.db_table)
+        ids = {}
+        with connection.cursor() as cursor:
+            for i in range(0, len(keys), self.BATCH_SIZE):
+                usernames, passwords, protocols = zip(*keys[i : i + self.BATCH_SIZE], strict=True)
+                cursor.execute(
+                    f"""
+                    SELECT credential.id, credential.username, credential.password, credential.protocol
+                    FROM {table} AS credential
+                    JOIN unnest(%s::text[], %s::text[], %s::text[]) AS wanted(username, password, protocol)
+                    ON credential.username = wanted.username AND credential.password = wanted.password AND credential.protocol = wanted.protocol
+                    """,
+                    [list(usernames), list(passwords), list(protocols)],
+                )
+                ids.update({(username, password, protocol): pk for pk, username, password, protocol in cursor.fetchall()})
+        return ids
+
+    def get_or_create_ids(self, keys: Iterable[CredentialKey]) -> tuple[dict[CredentialKey, int], int]:
+        """
+        Look up the IDs of credentials, inserting the missing ones first.
+        The insert returns the credentials it actually created, so credentials inserted concurrently
+        by another worker are not counted and only they and the existing ones are looked up afterwards.
+
+        Args:
+            keys: (username, password, protocol) tuples to look up.
+
+        Returns:
+            Tuple of (dict mapping each credential tuple to its ID, number of newly created credentials).
+        """
+        # sorted, so that concurrent inserts lock the unique index entries in the same order
+        keys = sorted(set(keys))
+        table = connection.ops.quote_name(Credential._meta.db_table)
+        ids = {}
+        with connection.cursor() as cursor:
+            for i in range(0, len(keys), self.BATCH_SIZE):
+                usernames, passwords, protocols = zip(*keys[i : i + self.BATCH_SIZE], strict=True)
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table} (username, password, protocol)
+                    SELECT * FROM unnest(%s::text[], %s::text[], %s::text[])
+                    ON CONFLICT DO NOTHING
+                    RETURNING id, username, password, protocol
+                    """,
+                    [list(usernames), list(passwords), list(protocols)],
+                )
+                ids.update({(username, password, protocol): pk for pk, username, password, protocol in cursor.fetchall()})
+        created_count = len(ids)
+        remaining = [key for key in keys if key not in ids]
+        if remaining:
+            ids.update(self.get_ids(remaining))
+        return ids, created_count
+
+    def add_credentials(
+        self,
+        sources: Mapping[CredentialKey, Iterable[int]],
+        sessions: Mapping[CredentialKey, Iterable[int]] | None = None,
+    ) -> int:
+        """
+        Store credentials and link them to the IOCs and Cowrie sessions they were used from.
+        Existing credentials and links are left as they are.
+
+        Args:
+            sources: IDs of the source IOCs by (username, password, protocol) tuple.
+            sessions: IDs of the Cowrie sessions by (username, password, protocol) tuple.
+
+        Returns:
+            Number of newly created credentials.
+        """
+        sessions = sessions or {}
+        if not sources and not sessions:
+            return 0
+        ids, created_count = self.get_or_create_ids(sources.keys() | sessions.keys())
+
+        source_through = Credential.sources.through
+        source_through.objects.bulk_create(
+            [source_through(credential_id=ids[key], ioc_id=ioc_id) for key, ioc_ids in sources.items() for ioc_id in set(ioc_ids)],
+            batch_size=self.BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        session_through = CowrieSession.credentials.through
+        session_through.objects.bulk_create(
+            [session_through(credential_id=ids[key], cowriesession_id=session_id) for key, session_ids in sessions.items() for session_id in set(session_ids)],
+            batch_size=self.BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        self.log.debug(f"stored {len(ids)} credentials, {created_count} of them new")
+        return created_count
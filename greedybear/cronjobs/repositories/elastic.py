@@ -8,6 +8,9 @@ from elasticsearch.dsl import Q, Search
 from greedybear.consts import FIELDS_TO_EXTRACT
 from greedybear.settings import EXTRACTION_INTERVAL
 
+# Maximum number of honeypots whose hits are counted, far above the number of honeypots in T-Pot
+HONEYPOT_AGGREGATION_SIZE = 1000
+
 
 class ElasticRepository:
     """
@@ -27,25 +30,23 @@ class ElasticRepository:
         self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.elastic_client = settings.ELASTIC_CLIENT
 
-    def has_honeypot_been_hit(self, minutes_back_to_lookup: int, honeypot_name: str) -> bool:
+    def count_hits_per_honeypot(self, window_start: datetime, window_end: datetime) -> dict[str, int]:
         """
-        Check if a specific honeypot has been hit within a given time window.
+        Count the log entries of every honeypot within a time window in a single aggregation.
 
         Args:
-            minutes_back_to_lookup: Number of minutes to look back from the current
-                time when searching for honeypot hits.
-            honeypot_name: The name/type of the honeypot to check for hits.
+            window_start: Start of the time window (inclusive).
+            window_end: End of the time window (exclusive).
 
         Returns:
-            True if at least one hit was recorded for the specified honeypot within
-            the time window, False otherwise.
+            Dict mapping each honeypot name with at least one hit to its number of hits.
         """
         search = Search(using=self.elastic_client, index="logstash-*")
-        window_start, window_end = get_time_window(datetime.now(), minutes_back_to_lookup)
         q = Q("range", **{"@timestamp": {"gte": window_start, "lt": window_end}})
-        search = search.query(q)
-        search = search.filter("term", **{"type.keyword": honeypot_name})
-        return search.count() > 0
+        search = search.query(q).extra(size=0)
+        search.aggs.bucket("honeypots", "terms", field="type.keyword", size=HONEYPOT_AGGREGATION_SIZE)
+        response = search.execute()
+        return {bucket.key: bucket.doc_count for bucket in response.aggregations.honeypots.buckets}
 
     def search(self, minutes_back_to_lookup: int) -> Iterator[list]:
         """
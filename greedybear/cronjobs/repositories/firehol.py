@@ -1,7 +1,12 @@
 import logging
 from datetime import datetime, timedelta
+from ipaddress import ip_network
 
-from greedybear.models import FireHolList
+from django.db import connection, transaction
+from django.db.models.functions import Now
+
+from greedybear.cronjobs.repositories.reference_list_change import ReferenceListChangeRepository
+from greedybear.models import FireHolList, ReferenceList
 
 
 class FireHolRepository:
@@ -9,9 +14,17 @@ class FireHolRepository:
     Repository for data access to FireHol blocklist entries.
     """
 
-    def __init__(self):
-        """Initialize the repository."""
+    BATCH_SIZE = 1000
+
+    def __init__(self, change_repo=None):
+        """
+        Initialize the repository.
+
+        Args:
+            change_repo: Optional ReferenceListChangeRepository instance for testing.
+        """
         self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.change_repo = change_repo if change_repo is not None else ReferenceListChangeRepository()
 
     def get_or_create(self, ip_address: str, source: str) -> tuple[FireHolList, bool]:
         """
@@ -27,6 +40,98 @@ class FireHolRepository:
         entry, created = FireHolList.objects.get_or_create(ip_address=ip_address, source=source)
         return entry, created
 
+    def sync_source(self, source: str, ip_addresses: set[str]) -> tuple[int, int, int]:
+        """
+        Make the stored entries of a source match the current list of that source, in one transaction.
+        New entries are created, the `added` timestamp of entries that are still listed is refreshed
+        and entries that dropped off the list are deleted. Created and deleted entries are recorded
+        in the reference list change log.
+
+        Args:
+            source: Source name (e.g., 'blocklist_de', 'greensnow').
+            ip_addresses: IP addresses and CIDR blocks currently listed by the source.
+                Networks are stored in prefix notation, so netmask notation like
+                `10.0.0.0/255.0.0.0` is converted to `10.0.0.0/8`.
+
+        Returns:
+            Tuple of (created, refreshed, deleted) entry counts.
+        """
+        ip_addresses = self._normalize_entries(ip_addresses)
+        with transaction.atomic():
+            existing_entries = list(FireHolList.objects.filter(source=source).values_list("pk", "ip_address"))
+            existing_ips = {ip_address for _, ip_address in existing_entries}
+            stale_entries = [(pk, ip_address) for pk, ip_address in existing_entries if ip_address not in ip_addresses]
+            stale_pks = [pk for pk, _ in stale_entries]
+
+            for batch_start in range(0, len(stale_pks), self.BATCH_SIZE):
+                FireHolList.objects.filter(pk__in=stale_pks[batch_start : batch_start + self.BATCH_SIZE]).delete()
+            refreshed = FireHolList.objects.filter(source=source).update(added=Now())
+            new_entries = [FireHolList(ip_address=ip_address, source=source) for ip_address in ip_addresses - existing_ips]
+            FireHolList.objects.bulk_create(new_entries, batch_size=self.BATCH_SIZE)
+            self.change_repo.record(ReferenceList.FIREHOL, [ip_address for _, ip_address in stale_entries] + [entry.ip_address for entry in new_entries])
+
+        self.log.info(f"Synced {source}: {len(new_entries)} created, {refreshed} refreshed, {len(stale_pks)} deleted")
+        return len(new_entries), refreshed, len(stale_pks)
+
+    def _normalize_entries(self, ip_addresses: set[str]) -> set[str]:
+        """
+        Convert CIDR blocks to prefix notation, which is the only notation Postgres accepts
+        for the `inet` cast of the `network` column. Invalid blocks are skipped.
+        """
+        normalized = set()
+        for ip_address in ip_addresses:
+            if "/" not in ip_address:
+                normalized.add(ip_address)
+                continue
+            try:
+                normalized.add(str(ip_network(ip_address, strict=False)))
+            except ValueError:
+                self.log.warning(f"Skipping invalid CIDR block: {ip_address}")
+        return normalized
+
+    def refresh_source(self, source: str) -> int:
+        """
+        Refresh the `added` timestamp of all entries of a source whose list did not change,
+        so that they are not cleaned up while they are still listed.
+
+        Args:
+            source: Source name (e.g., 'blocklist_de', 'greensnow').
+
+        Returns:
+            Number of refreshed entries.
+        """
+        return FireHolList.objects.filter(source=source).update(added=Now())
+
+    def get_categories(self, ip_addresses: list[str]) -> dict[str, list[str]]:
+        """
+        Get the FireHol categories of several IP addresses.
+        Exact entries (.ipset files) and networks (.netset files) containing an address
+        are matched in one query per batch, using the GiST index on the inet column.
+
+        Args:
+            ip_addresses: Valid IP addresses.
+
+        Returns:
+            Dict mapping each listed IP address to its sources, exact matches first and without duplicates.
+            Addresses that are not listed are omitted.
+        """
+        quoted_table_name = connection.ops.quote_name(FireHolList._meta.db_table)
+        query = f"""
+            SELECT ips.ip_address, firehol.source
+            FROM unnest(%s::text[]) AS ips(ip_address)
+            JOIN {quoted_table_name} AS firehol ON firehol.network >>= ips.ip_address::inet
+            WHERE firehol.source <> ''
+            GROUP BY ips.ip_address, firehol.source
+            ORDER BY ips.ip_address, max(masklen(firehol.network)) DESC, min(firehol.id)
+        """
+        categories = {}
+        with connection.cursor() as cursor:
+            for batch_start in range(0, len(ip_addresses), self.BATCH_SIZE):
+                cursor.execute(query, [ip_addresses[batch_start : batch_start + self.BATCH_SIZE]])
+                for ip_address, source in cursor.fetchall():
+                    categories.setdefault(ip_address, []).append(source)
+        return categories
+
     def save(self, entry: FireHolList) -> FireHolList:
         """
         Save a FireHolList entry to the database.
@@ -42,7 +147,7 @@ class FireHolRepository:
 
     def delete_old_entries(self, cutoff_date: datetime) -> int:
         """
-        Delete FireHolList entries older than the specified date.
+        Delete FireHolList entries older than the specified date and record them in the reference list change log.
 
         Args:
             cutoff_date: DateTime threshold - entries added before this will be deleted.
@@ -50,7 +155,10 @@ class FireHolRepository:
         Returns:
             Number of entries deleted.
         """
-        deleted_count, _ = FireHolList.objects.filter(added__lt=cutoff_date).delete()
+        with transaction.atomic():
+            expired_entries = FireHolList.objects.filter(added__lt=cutoff_date)
+            self.change_repo.record(ReferenceList.FIREHOL, expired_entries.values_list("ip_address", flat=True))
+            deleted_count, _ = expired_entries.delete()
         return deleted_count
 
     def cleanup_old_entries(self, days: int = 30) -> int:
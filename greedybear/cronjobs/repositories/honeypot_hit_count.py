@@ -0,0 +1,50 @@
+import logging
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+
+from greedybear.models import Honeypot, HoneypotHitCount
+
+
+class HoneypotHitCountRepository:
+    """Repository for the number of log entries per honeypot found by the honeypot monitoring."""
+
+    def __init__(self):
+        self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def save_counts(self, honeypots: Iterable[Honeypot], counts: Mapping[str, int], window_start: datetime, window_end: datetime) -> int:
+        """
+        Store the hit counts of honeypots for a time window, replacing counts stored for the same window.
+
+        Args:
+            honeypots: Honeypots to store counts for.
+            counts: Number of hits by honeypot name, honeypots without an entry had no hits.
+            window_start: Start of the time window.
+            window_end: End of the time window.
+
+        Returns:
+            Number of stored counts.
+        """
+        hit_counts = [
+            HoneypotHitCount(honeypot=honeypot, window_start=window_start, window_end=window_end, hits=counts.get(honeypot.name, 0)) for honeypot in honeypots
+        ]
+        HoneypotHitCount.objects.bulk_create(
+            hit_counts,
+            update_conflicts=True,
+            unique_fields=["honeypot", "window_end"],
+            update_fields=["window_start", "hits"],
+        )
+        return len(hit_counts)
+
+    def delete_older_than(self, cutoff: datetime) -> int:
+        """
+        Delete counts of time windows that ended before the cutoff.
+
+        Args:
+            cutoff: DateTime threshold.
+
+        Returns:
+            Number of deleted counts.
+        """
+        deleted_count, _ = HoneypotHitCount.objects.filter(window_end__lt=cutoff).delete()
+        self.log.debug(f"Deleted {deleted_count} honeypot hit counts")
+        return deleted_count
@@ -1,10 +1,13 @@
 import logging
+from collections.abc import Iterable
 
 from django.contrib.postgres.aggregates import ArrayAgg
 from django.db import IntegrityError
 from django.db.models import F
+from django.db.models.functions import Now
 
-from greedybear.models import IOC, Honeypot
+from greedybear.cronjobs.repositories.chunked_delete import ChunkedDeleteRepository
+from greedybear.models import IOC, CommandSequence, Honeypot
 
 
 class IocRepository:
@@ -15,9 +18,15 @@ class IocRepository:
     and updated when new honeypots are created.
     """
 
-    def __init__(self):
-        """Initialize the repository and populate the honeypot cache from the database."""
+    def __init__(self, delete_repo=None):
+        """
+        Initialize the repository and populate the honeypot cache from the database.
+
+        Args:
+            delete_repo: Optional ChunkedDeleteRepository instance for testing.
+        """
         self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.delete_repo = delete_repo if delete_repo is not None else ChunkedDeleteRepository()
         self._honeypot_cache = {self._normalize_name(hp.name): hp for hp in Honeypot.objects.all()}
 
     def _normalize_name(self, name: str) -> str:
@@ -260,40 +269,57 @@ class IocRepository:
         Returns:
             Number of IOC objects deleted.
         """
-        deleted_count, _ = IOC.objects.filter(last_seen__lte=cutoff_date).delete()
-        return deleted_count
+        return self.delete_repo.delete(IOC.objects.filter(last_seen__lte=cutoff_date), "old_iocs")
 
-    def update_ioc_reputation(self, ip_address: str, reputation: str) -> bool:
+    def bulk_update_ioc_reputation(self, ip_addresses: list[str], reputation: str) -> int:
         """
-        Update the IP reputation for a specific IOC.
+        Bulk update the IP reputation for a list of IOCs.
 
         Args:
-            ip_address: IP address to update.
+            ip_addresses: List of IP addresses to update.
             reputation: New reputation value.
 
         Returns:
-            True if IOC was found and updated, False otherwise.
+            Number of IOC records updated.
         """
-        try:
-            ioc = IOC.objects.get(name=ip_address)
-            ioc.ip_reputation = reputation
-            ioc.save()
-            self.log.info(f"Updated IOC {ip_address} reputation to '{reputation}'")
-            return True
-        except IOC.DoesNotExist:
-            return False
+        if not ip_addresses:
+            return 0
+        return IOC.objects.filter(name__in=ip_addresses).update(ip_reputation=reputation)
 
-    def bulk_update_ioc_reputation(self, ip_addresses: list[str], reputation: str) -> int:
+    def link_related_iocs(self, pairs: Iterable[tuple[str, str]]) -> int:
         """
-        Bulk update the IP reputation for a list of IOCs.
+        Link pairs of IOCs bidirectionally, resolving all names in a single query.
+        Pairs that are already linked are left as they are.
+        The command sequences of the linked IOCs are marked as updated, so that they are clustered again.
 
         Args:
-            ip_addresses: List of IP addresses to update.
-            reputation: New reputation value.
+            pairs: Pairs of IOC names to link, e.g. (scanner IP, payload hostname).
 
         Returns:
-            Number of IOC records updated.
+            Number of pairs whose IOCs both exist and were linked.
         """
-        if not ip_addresses:
+        pairs = set(pairs)
+        if not pairs:
             return 0
-        return IOC.objects.filter(name__in=ip_addresses).update(ip_reputation=reputation)
+        names = {name for pair in pairs for name in pair}
+        ids_by_name = dict(IOC.objects.filter(name__in=names).values_list("name", "id"))
+        links = set()
+        linked_count = 0
+        for first, second in pairs:
+            if first not in ids_by_name or second not in ids_by_name:
+                continue
+            links.add((ids_by_name[first], ids_by_name[second]))
+            links.add((ids_by_name[second], ids_by_name[first]))
+            linked_count += 1
+        if linked_count < len(pairs):
+            self.log.warning(f"Cannot link {len(pairs) - linked_count} IOC pairs - missing from database")
+        through = IOC.related_ioc.through
+        through.objects.bulk_create(
+            [through(from_ioc_id=from_id, to_ioc_id=to_id) for from_id, to_id in links],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        # payload URLs of related IOCs are part of the clustering input of the scanners' command sequences
+        linked_ids = {ioc_id for link in links for ioc_id in link}
+        CommandSequence.objects.filter(cowriesession__source_id__in=linked_ids).update(updated=Now())
+        return linked_count
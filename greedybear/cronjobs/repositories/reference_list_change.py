@@ -0,0 +1,111 @@
+import logging
+from collections.abc import Iterable
+
+from django.db import connection, transaction
+
+from greedybear.enums import IpReputation
+from greedybear.models import IOC, FireHolList, IocType, ReferenceList, ReferenceListChange
+
+
+class ReferenceListChangeRepository:
+    """
+    Repository for the change log of the reference lists (mass scanners, Tor exit nodes and FireHol)
+    and for reconciling the IOCs affected by those changes.
+    """
+
+    BATCH_SIZE = 1000
+    REPUTATIONS = {
+        ReferenceList.MASS_SCANNERS: IpReputation.MASS_SCANNER,
+        ReferenceList.TOR_EXIT_NODES: IpReputation.TOR_EXIT_NODE,
+    }
+
+    def __init__(self):
+        """Initialize the repository."""
+        self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def record(self, reference_list: ReferenceList, networks: Iterable[str]) -> int:
+        """
+        Record addresses or networks that were added to or removed from a reference list.
+
+        Args:
+            reference_list: The reference list that changed.
+            networks: IP addresses and CIDR blocks that were added or removed.
+
+        Returns:
+            Number of recorded changes.
+        """
+        changes = ReferenceListChange.objects.bulk_create(
+            [ReferenceListChange(reference_list=reference_list, network=network) for network in networks],
+            batch_size=self.BATCH_SIZE,
+        )
+        return len(changes)
+
+    def reconcile(self) -> tuple[int, int]:
+        """
+        Bring the IOCs affected by the recorded changes in line with the reference lists, in one transaction.
+        The reputation of IOCs added to the mass scanner or Tor exit node list is set, the most recent change
+        winning, and the FireHol categories of IOCs within a changed FireHol entry are recomputed.
+        Reconciled changes are deleted, changes recorded meanwhile are left for the next run.
+
+        Returns:
+            Tuple of (IOCs with updated reputation, IOCs with updated FireHol categories).
+        """
+        quote_name = connection.ops.quote_name
+        changes_table = quote_name(ReferenceListChange._meta.db_table)
+        ioc_table = quote_name(IOC._meta.db_table)
+        firehol_table = quote_name(FireHolList._meta.db_table)
+        reputation_cases = " ".join("WHEN %s THEN %s" for _ in self.REPUTATIONS)
+        reputation_params = [value for item in self.REPUTATIONS.items() for value in item]
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"SELECT max(id) FROM {changes_table}")
+            last_change_id = cursor.fetchone()[0]
+            if last_change_id is None:
+                return 0, 0
+
+            cursor.execute(
+                f"""
+                UPDATE {ioc_table} AS ioc
+                SET ip_reputation = changes.reputation
+                FROM (
+                    SELECT DISTINCT ON (network) host(network) AS ip_address, CASE reference_list {reputation_cases} END AS reputation
+                    FROM {changes_table}
+                    WHERE id <= %s AND reference_list = ANY(%s)
+                    ORDER BY network, id DESC
+                ) AS changes
+                WHERE ioc.type = %s AND ioc.name = changes.ip_address AND ioc.ip_reputation <> changes.reputation
+                """,
+                [*reputation_params, last_change_id, list(self.REPUTATIONS), IocType.IP],
+            )
+            reputations_updated = cursor.rowcount
+
+            # the IOCs within the changed networks are found through the index on their address
+            cursor.execute(
+                f"""
+                UPDATE {ioc_table} AS ioc
+                SET firehol_categories = affected.categories
+                FROM (
+                    SELECT ips.id, ARRAY(
+                        SELECT firehol.source
+                        FROM {firehol_table} AS firehol
+                        WHERE firehol.network >>= ips.address AND firehol.source <> ''
+                        GROUP BY firehol.source
+                        ORDER BY max(masklen(firehol.network)) DESC, min(firehol.id)
+                    ) AS categories
+                    FROM (
+                        SELECT DISTINCT ioc.id, ioc.address
+                        FROM {changes_table} AS changes
+                        JOIN {ioc_table} AS ioc ON ioc.address <<= changes.network
+                        WHERE changes.id <= %s AND changes.reference_list = %s
+                    ) AS ips
+                ) AS affected
+                WHERE ioc.id = affected.id AND ioc.firehol_categories <> affected.categories
+                """,
+                [last_change_id, ReferenceList.FIREHOL],
+            )
+            categories_updated = cursor.rowcount
+
+            ReferenceListChange.objects.filter(id__lte=last_change_id).delete()
+
+        self.log.info(f"Reconciled changes up to {last_change_id}: {reputations_updated} reputations and {categories_updated} categories updated")
+        return reputations_updated, categories_updated
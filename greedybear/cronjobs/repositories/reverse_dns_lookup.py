@@ -0,0 +1,72 @@
+import logging
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+
+from greedybear.models import ReverseDnsLookup
+
+
+class ReverseDnsLookupRepository:
+    """Repository for the cached results of reverse DNS lookups."""
+
+    BATCH_SIZE = 1000
+
+    def __init__(self):
+        """Initialize the repository."""
+        self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def get_results(self, ip_addresses: Iterable[str]) -> dict[str, str]:
+        """
+        Get the cached lookup results of IP addresses.
+
+        Args:
+            ip_addresses: IP addresses to look up.
+
+        Returns:
+            Dict mapping each cached IP address to its PTR record, or to an empty string if it has none.
+        """
+        ip_addresses = list(ip_addresses)
+        results = {}
+        for i in range(0, len(ip_addresses), self.BATCH_SIZE):
+            batch = ip_addresses[i : i + self.BATCH_SIZE]
+            results.update(ReverseDnsLookup.objects.filter(ip_address__in=batch).values_list("ip_address", "ptr_record"))
+        return results
+
+    def save_results(self, results: Mapping[str, str], checked: datetime) -> int:
+        """
+        Store lookup results, replacing previous results of the same IP addresses.
+
+        Args:
+            results: Dict mapping IP address to PTR record, or to an empty string if it has none.
+            checked: When the lookups were made.
+
+        Returns:
+            Number of stored results.
+        """
+        lookups = ReverseDnsLookup.objects.bulk_create(
+            [ReverseDnsLookup(ip_address=ip, ptr_record=ptr, checked=checked) for ip, ptr in results.items()],
+            batch_size=self.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["ip_address"],
+            update_fields=["ptr_record", "checked"],
+        )
+        return len(lookups)
+
+    def delete_expired(self, positive_ttl: timedelta, negative_ttl: timedelta, now: datetime) -> int:
+        """
+        Delete results that are due to be looked up again.
+
+        Args:
+            positive_ttl: How long a PTR record is kept.
+            negative_ttl: How long the absence of a PTR record is kept.
+            now: Reference time for the expiry.
+
+        Returns:
+            Number of deleted results.
+        """
+        deleted_count, _ = ReverseDnsLookup.objects.filter(
+            Q(ptr_record="", checked__lt=now - negative_ttl) | (~Q(ptr_record="") & Q(checked__lt=now - positive_ttl))
+        ).delete()
+        self.log.debug(f"Deleted {deleted_count} expired reverse DNS lookups")
+        return deleted_count
@@ -0,0 +1,57 @@
+import logging
+
+from greedybear.models import ScoringRun
+
+
+class ScoringRunRepository:
+    """Repository for data access to the metrics recorded by scoring and training runs."""
+
+    def __init__(self):
+        self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def record_run(
+        self,
+        job: str,
+        duration: float,
+        rows_processed: int = 0,
+        rows_updated: int = 0,
+        metrics: dict | None = None,
+    ) -> ScoringRun:
+        """
+        Store the metrics of a finished scoring or training run.
+
+        Args:
+            job: Kind of run, one of the ScoringJob choices.
+            duration: Wall clock duration of the run in seconds.
+            rows_processed: Number of IoCs the run worked on.
+            rows_updated: Number of IoCs whose scores changed.
+            metrics: JSON serializable per-run metrics.
+
+        Returns:
+            The created ScoringRun object.
+        """
+        run = ScoringRun.objects.create(
+            job=job,
+            duration=duration,
+            rows_processed=rows_processed,
+            rows_updated=rows_updated,
+            metrics=metrics or {},
+        )
+        self.log.info(f"recorded {job} run: {duration:.2f}s, {rows_processed} rows processed, {rows_updated} rows updated")
+        return run
+
+    def get_recent_runs(self, job: str | None = None, limit: int = 30) -> list[ScoringRun]:
+        """
+        Retrieve the most recent runs, newest first.
+
+        Args:
+            job: Only return runs of this kind. All kinds if None.
+            limit: Maximum number of runs to return.
+
+        Returns:
+            List of ScoringRun objects.
+        """
+        runs = ScoringRun.objects.all()
+        if job is not None:
+            runs = runs.filter(job=job)
+        return list(runs.order_by("-run_date", "-pk")[:limit])
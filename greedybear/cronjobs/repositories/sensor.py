@@ -1,6 +1,9 @@
 import logging
+from collections.abc import Iterable
+from ipaddress import ip_address
+
+from django.db import connection
 
-from greedybear.consts import IP
 from greedybear.models import Sensor
 
 
@@ -16,6 +19,7 @@ class SensorRepository:
         """Initialize the repository and populate the cache from the database."""
         self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.cache: dict[str, Sensor] = {}
+        self.changed_countries: dict[str, Sensor] = {}
         self._fill_cache()
 
     def get_or_create_sensor(self, ip: str) -> Sensor | None:
@@ -30,18 +34,47 @@ class SensorRepository:
         Returns:
             Sensor object if valid, None if invalid IP format.
         """
-        from greedybear.utils import get_ioc_type
-
-        if ip in self.cache:
-            return self.cache[ip]
-        if get_ioc_type(ip) != IP:
-            self.log.debug(f"{ip} is not an IP address - won't add as a sensor")
-            return None
-        sensor, created = Sensor.objects.get_or_create(address=ip)
-        self.cache[ip] = sensor
-        if created:
-            self.log.info(f"added sensor {ip} to the database")
-        return sensor
+        return self.get_or_create_sensors([ip]).get(ip)
+
+    def get_or_create_sensors(self, ips: Iterable[str]) -> dict[str, Sensor]:
+        """
+        Get existing sensors and create the missing ones in a single bulk insert.
+        Addresses that are not valid IP addresses are skipped.
+        Addresses are compared in their normalized form, as stored by the database,
+        so that differently written IPv6 addresses resolve to the same sensor.
+
+        Args:
+            ips: IP address strings, duplicates are allowed.
+
+        Returns:
+            Sensor objects by IP address string as given, without the invalid addresses.
+        """
+        addresses = {}
+        for ip in set(ips):
+            try:
+                addresses[ip] = ip_address(ip).compressed
+            except ValueError:
+                self.log.debug(f"{ip} is not an IP address - won't add as a sensor")
+
+        new_addresses = sorted(set(addresses.values()) - self.cache.keys())
+        if new_addresses:
+            table = connection.ops.quote_name(Sensor._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {table} (address, country, label)
+                    SELECT address, '', '' FROM unnest(%s::inet[]) AS address
+                    ON CONFLICT (address) DO NOTHING
+                    RETURNING id
+                    """,
+                    [new_addresses],
+                )
+                added = len(cursor.fetchall())
+            # sensors added concurrently by another process are loaded as well
+            self.cache.update({sensor.address: sensor for sensor in Sensor.objects.filter(address__in=new_addresses)})
+            self.log.info(f"added {added} sensors to the database")
+
+        return {ip: self.cache[address] for ip, address in addresses.items() if address in self.cache}
 
     def _fill_cache(self) -> None:
         """Load sensor objects from the database into the cache."""
@@ -51,6 +84,7 @@ class SensorRepository:
     def update_country(self, sensor: Sensor, country: str) -> None:
         """
         Update the country of a sensor if it has changed.
+        The change is only applied in memory until save_countries() is called.
 
         Args:
             sensor: The Sensor instance to update.
@@ -64,4 +98,18 @@ class SensorRepository:
 
         self.log.debug(f"Updating country for sensor {sensor.address} to {country}")
         sensor.country = country
-        sensor.save(update_fields=["country"])
+        self.changed_countries[sensor.address] = sensor
+
+    def save_countries(self) -> int:
+        """
+        Write the pending country changes to the database in a single bulk update.
+
+        Returns:
+            Number of updated sensors.
+        """
+        if not self.changed_countries:
+            return 0
+        sensors = list(self.changed_countries.values())
+        Sensor.objects.bulk_update(sensors, ["country"])
+        self.changed_countries = {}
+        return len(sensors)
@@ -0,0 +1,66 @@
+import logging
+from collections.abc import Iterable
+
+from django.db.models.functions import Now
+
+from greedybear.models import IOC, ThreatFoxSubmission
+
+
+class ThreatFoxSubmissionRepository:
+    """Repository for the outbox of payload URLs to be submitted to ThreatFox."""
+
+    def __init__(self):
+        self.log = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def enqueue(self, ioc: IOC, urls: Iterable[str]) -> None:
+        """
+        Queue URLs for submission. URLs that were already queued or submitted are skipped.
+
+        Args:
+            ioc: The payload request IOC the URLs were requested from.
+            urls: URLs to submit.
+        """
+        ThreatFoxSubmission.objects.bulk_create(
+            [ThreatFoxSubmission(ioc=ioc, url=url) for url in dict.fromkeys(urls)],
+            ignore_conflicts=True,
+        )
+
+    def get_pending(self, limit: int) -> list[ThreatFoxSubmission]:
+        """
+        Get the oldest queued submissions, with the honeypots of their IOC.
+        Submissions that ThreatFox refused are not returned.
+
+        Args:
+            limit: Maximum number of submissions to return.
+
+        Returns:
+            List of pending ThreatFoxSubmission objects.
+        """
+        pending = ThreatFoxSubmission.objects.filter(submitted__isnull=True, error="")
+        return list(pending.select_related("ioc").prefetch_related("ioc__honeypots").order_by("id")[:limit])
+
+    def mark_submitted(self, submissions: Iterable[ThreatFoxSubmission]) -> int:
+        """
+        Mark submissions as sent, so that they are neither sent again nor queued again.
+
+        Args:
+            submissions: The sent submissions.
+
+        Returns:
+            Number of updated submissions.
+        """
+        return ThreatFoxSubmission.objects.filter(pk__in=[submission.pk for submission in submissions]).update(submitted=Now())
+
+    def mark_rejected(self, submissions: Iterable[ThreatFoxSubmission], error: str) -> int:
+        """
+        Record why ThreatFox refused submissions, so that they are not sent again.
+
+        Args:
+            submissions: The refused submissions.
+            error: Reason of the refusal.
+
+        Returns:
+            Number of updated submissions.
+        """
+        max_length = ThreatFoxSubmission._meta.get_field("error").max_length
+        return ThreatFoxSubmission.objects.filter(pk__in=[submission.pk for submission in submissions]).update(error=error[:max_length])
@@ -1,30 +1,70 @@
 from collections import Counter
-from collections.abc import Iterable
-from datetime import datetime
+from collections.abc import Collection, Iterable
+from datetime import date, datetime, timedelta
 
-from django.db import connection
+from django.db import connection, transaction
 from django.db.models import Sum
 
-from greedybear.models import AttackerActivityBucket
+from greedybear.models import AttackerActivityBucket, AttackerActivityDailyBucket, AttackerWindowCount, SensorActivityBucket, TrendingWindow
 
 BucketKey = tuple[str, str, datetime]
+SensorBucketKey = tuple[int, str, datetime]
+WindowCountKey = tuple[int, str, str]
 
 
 class TrendingBucketRepository:
-    """Repository for reading and writing aggregated attacker activity buckets."""
+    """Repository for reading and writing aggregated attacker activity buckets and their daily rollups."""
 
     UPSERT_BATCH_SIZE = 10_000
+    # above this number of keys the counts are loaded with COPY instead of a VALUES list
+    COPY_THRESHOLD = 5_000
+    PARTITION_SUFFIX_FORMAT = "p%Y%m%d"
     _UPSERT_VALUE_PLACEHOLDER = "(%s, %s, %s, %s)"
+    _STAGING_TABLE_NAME = "bucket_counts_staging"
 
     @classmethod
     def _build_upsert_query(cls, quoted_table_name: str, row_count: int) -> str:
         values_sql = ",".join([cls._UPSERT_VALUE_PLACEHOLDER] * row_count)
+        return cls._build_rollup_upsert_query(quoted_table_name, f"VALUES {values_sql}")
+
+    @classmethod
+    def _build_staging_upsert_query(cls, quoted_table_name: str) -> str:
+        return cls._build_rollup_upsert_query(
+            quoted_table_name,
+            f"SELECT attacker_ip, feed_type, bucket_start, interaction_count FROM {cls._STAGING_TABLE_NAME}",
+        )
+
+    @staticmethod
+    def _build_rollup_upsert_query(quoted_table_name: str, source_sql: str) -> str:
+        # a single statement upserts the hourly buckets and rolls the same counts up into the daily buckets
+        quoted_daily_table_name = connection.ops.quote_name(AttackerActivityDailyBucket._meta.db_table)
         return f"""
-            INSERT INTO {quoted_table_name} (attacker_ip, feed_type, bucket_start, interaction_count)
+            WITH new_counts (attacker_ip, feed_type, bucket_start, interaction_count) AS (
+                {source_sql}
+            ), hourly AS (
+                INSERT INTO {quoted_table_name} (attacker_ip, feed_type, bucket_start, interaction_count)
+                SELECT attacker_ip::inet, feed_type, bucket_start, interaction_count FROM new_counts
+                ON CONFLICT (attacker_ip, feed_type, bucket_start)
+                DO UPDATE
+                SET interaction_count = {quoted_table_name}.interaction_count + EXCLUDED.interaction_count
+            )
+            INSERT INTO {quoted_daily_table_name} (attacker_ip, feed_type, bucket_date, interaction_count)
+            SELECT attacker_ip::inet, feed_type, bucket_start::date, SUM(interaction_count) FROM new_counts
+            GROUP BY attacker_ip, feed_type, bucket_start::date
+            ON CONFLICT (attacker_ip, feed_type, bucket_date)
+            DO UPDATE
+            SET interaction_count = {quoted_daily_table_name}.interaction_count + EXCLUDED.interaction_count
+        """
+
+    @classmethod
+    def _build_sensor_upsert_query(cls, quoted_table_name: str, row_count: int) -> str:
+        values_sql = ",".join([cls._UPSERT_VALUE_PLACEHOLDER] * row_count)
+        return f"""
+            INSERT INTO {quoted_table_name} (sensor_id, feed_type, bucket_start, hit_count)
             VALUES {values_sql}
-            ON CONFLICT (attacker_ip, feed_type, bucket_start)
+            ON CONFLICT (sensor_id, feed_type, bucket_start)
             DO UPDATE
-            SET interaction_count = {quoted_table_name}.interaction_count + EXCLUDED.interaction_count
+            SET hit_count = {quoted_table_name}.hit_count + EXCLUDED.hit_count
         """
 
     @staticmethod
@@ -34,6 +74,46 @@ class TrendingBucketRepository:
             params.extend((attacker_ip, feed_type, bucket_start, interaction_count))
         return params
 
+    @classmethod
+    def _build_window_upsert_query(cls, quoted_table_name: str, row_count: int) -> str:
+        values_sql = ",".join([cls._UPSERT_VALUE_PLACEHOLDER] * row_count)
+        return f"""
+            INSERT INTO {quoted_table_name} (window_id, attacker_ip, feed_type, interaction_count)
+            VALUES {values_sql}
+            ON CONFLICT (window_id, attacker_ip, feed_type)
+            DO UPDATE
+            SET interaction_count = {quoted_table_name}.interaction_count + EXCLUDED.interaction_count
+        """
+
+    @staticmethod
+    def _build_window_add_range_query(quoted_counts_table: str, quoted_buckets_table: str, time_column: str) -> str:
+        return f"""
+            INSERT INTO {quoted_counts_table} (window_id, attacker_ip, feed_type, interaction_count)
+            SELECT %s, attacker_ip, feed_type, SUM(interaction_count)
+            FROM {quoted_buckets_table}
+            WHERE {time_column} > %s AND {time_column} <= %s
+            GROUP BY attacker_ip, feed_type
+            ON CONFLICT (window_id, attacker_ip, feed_type)
+            DO UPDATE
+            SET interaction_count = {quoted_counts_table}.interaction_count + EXCLUDED.interaction_count
+        """
+
+    @staticmethod
+    def _build_window_subtract_range_query(quoted_counts_table: str, quoted_buckets_table: str, time_column: str) -> str:
+        return f"""
+            UPDATE {quoted_counts_table} AS window_count
+            SET interaction_count = window_count.interaction_count - expired.total
+            FROM (
+                SELECT attacker_ip, feed_type, SUM(interaction_count) AS total
+                FROM {quoted_buckets_table}
+                WHERE {time_column} > %s AND {time_column} <= %s
+                GROUP BY attacker_ip, feed_type
+            ) AS expired
+            WHERE window_count.window_id = %s
+            AND window_count.attacker_ip = expired.attacker_ip
+            AND window_count.feed_type = expired.feed_type
+        """
+
     @staticmethod
     def _normalize_feed_types(feed_types: str | Iterable[str]) -> list[str]:
         if isinstance(feed_types, str):
@@ -41,12 +121,20 @@ class TrendingBucketRepository:
         return list(feed_types)
 
     def upsert_bucket_counts(self, counters: Counter[BucketKey]) -> int:
-        """Insert or increment bucket counts in batches and return the number of unique keys."""
+        """
+        Insert or increment hourly and daily bucket counts and return the number of unique hourly keys.
+        Small sets of counts are sent as batched VALUES lists, larger ones are copied into a staging table
+        and upserted with a single INSERT ... SELECT.
+        """
         if not counters:
             return 0
 
         table_name = AttackerActivityBucket._meta.db_table
         quoted_table_name = connection.ops.quote_name(table_name)
+        if len(counters) > self.COPY_THRESHOLD:
+            self._copy_upsert_bucket_counts(quoted_table_name, counters)
+            return len(counters)
+
         counter_items = list(counters.items())
         with connection.cursor() as cursor:
             for batch_start in range(0, len(counter_items), self.UPSERT_BATCH_SIZE):
@@ -57,17 +145,273 @@ class TrendingBucketRepository:
 
         return len(counters)
 
-    def get_counts_in_window(self, window_start: datetime, window_end: datetime, feed_types: str | Iterable[str]) -> dict[str, int]:
-        """Return summed interaction counts per attacker IP inside the requested time window."""
-        queryset = AttackerActivityBucket.objects.filter(bucket_start__gte=window_start, bucket_start__lt=window_end)
-        normalized_feed_types = self._normalize_feed_types(feed_types)
+    def upsert_sensor_bucket_counts(self, counters: Counter[SensorBucketKey]) -> int:
+        """
+        Insert or increment the hourly hit counts per sensor and feed type.
+
+        Args:
+            counters: Hit counts by (sensor id, feed type, bucket start).
+
+        Returns:
+            The number of unique sensor bucket keys.
+        """
+        if not counters:
+            return 0
+
+        quoted_table_name = connection.ops.quote_name(SensorActivityBucket._meta.db_table)
+        counter_items = list(counters.items())
+        with connection.cursor() as cursor:
+            for batch_start in range(0, len(counter_items), self.UPSERT_BATCH_SIZE):
+                batch = counter_items[batch_start : batch_start + self.UPSERT_BATCH_SIZE]
+                query = self._build_sensor_upsert_query(quoted_table_name, len(batch))
+                cursor.execute(query, self._build_upsert_params(batch))
+        return len(counters)
+
+    def _copy_upsert_bucket_counts(self, quoted_table_name: str, counters: Counter[BucketKey]) -> None:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TEMPORARY TABLE IF NOT EXISTS {self._STAGING_TABLE_NAME} (
+                    attacker_ip inet NOT NULL,
+                    feed_type varchar(32) NOT NULL,
+                    bucket_start timestamp NOT NULL,
+                    interaction_count integer NOT NULL
+                ) ON COMMIT DROP
+                """
+            )
+            cursor.execute(f"TRUNCATE {self._STAGING_TABLE_NAME}")
+            with cursor.copy(f"COPY {self._STAGING_TABLE_NAME} (attacker_ip, feed_type, bucket_start, interaction_count) FROM STDIN") as copy:
+                for (attacker_ip, feed_type, bucket_start), interaction_count in counters.items():
+                    copy.write_row((attacker_ip, feed_type, bucket_start, interaction_count))
+            cursor.execute(self._build_staging_upsert_query(quoted_table_name))
+
+    @staticmethod
+    def _window_bounds(daily: bool, span_hours: int, window_end: datetime) -> tuple[datetime | date, datetime | date]:
+        """Return the exclusive start and inclusive end of a window, as bucket starts or bucket dates for daily windows."""
+        if daily:
+            return window_end.date() - timedelta(days=span_hours // 24), window_end.date()
+        return window_end - timedelta(hours=span_hours), window_end
+
+    def advance_windows(
+        self,
+        spans: Iterable[int],
+        window_end: datetime,
+        daily_spans: Collection[int] = (),
+        retention_hours: int | None = None,
+        daily_retention_days: int | None = None,
+    ) -> int:
+        """
+        Move the rolling windows of the trending aggregates to end at the hour of window_end.
+
+        Counts of buckets that left a window are subtracted and counts of buckets that entered it are added.
+        A window is rebuilt from the buckets if it is new, changed granularity, moved backwards or moved by a whole span or more.
+        It is also rebuilt if the buckets that left it may already have been deleted by the retention cleanup,
+        e.g. after the extraction was paused, since their counts could not be subtracted anymore.
+        Windows with other spans are dropped.
+
+        Args:
+            spans: Span of each window in hours.
+            window_end: End of the windows, truncated to the hour.
+            daily_spans: Spans of the windows computed from the daily buckets, they only slide when the day changes.
+            retention_hours: Retention of the hourly buckets, None if they are never deleted.
+            daily_retention_days: Retention of the daily buckets, None if they are never deleted.
+
+        Returns:
+            The number of windows that were moved.
+        """
+        spans = sorted(set(spans))
+        window_end = window_end.replace(minute=0, second=0, microsecond=0)
+        quoted_counts_table = connection.ops.quote_name(AttackerWindowCount._meta.db_table)
+        range_queries = {}
+        for daily, model, time_column in ((False, AttackerActivityBucket, "bucket_start"), (True, AttackerActivityDailyBucket, "bucket_date")):
+            quoted_buckets_table = connection.ops.quote_name(model._meta.db_table)
+            range_queries[daily] = (
+                self._build_window_add_range_query(quoted_counts_table, quoted_buckets_table, time_column),
+                self._build_window_subtract_range_query(quoted_counts_table, quoted_buckets_table, time_column),
+            )
+
+        # buckets before these bounds may have been deleted by the retention cleanup
+        retained_since = {
+            False: window_end - timedelta(hours=retention_hours) if retention_hours is not None else None,
+            True: window_end.date() - timedelta(days=daily_retention_days) if daily_retention_days is not None else None,
+        }
+
+        moved = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            TrendingWindow.objects.exclude(span_hours__in=spans).delete()
+            for span in spans:
+                daily = span in daily_spans
+                window, _ = TrendingWindow.objects.select_for_update().get_or_create(span_hours=span)
+                if window.window_end == window_end and window.daily == daily:
+                    continue
+                add_range_query, subtract_range_query = range_queries[daily]
+                new_start, new_end = self._window_bounds(daily, span, window_end)
+                if window.window_end is None or window.daily != daily or window.window_end > window_end:
+                    old_start = old_end = None
+                else:
+                    old_start, old_end = self._window_bounds(daily, span, window.window_end)
+                if old_start is not None and retained_since[daily] is not None and old_start < retained_since[daily]:
+                    old_start = old_end = None
+                if old_end is None or old_end <= new_start:
+                    cursor.execute(f"DELETE FROM {quoted_counts_table} WHERE window_id = %s", [window.pk])
+                    cursor.execute(add_range_query, [window.pk, new_start, new_end])
+                elif old_end != new_end:
+                    cursor.execute(subtract_range_query, [old_start, new_start, window.pk])
+                    cursor.execute(add_range_query, [window.pk, old_end, new_end])
+                    cursor.execute(f"DELETE FROM {quoted_counts_table} WHERE window_id = %s AND interaction_count <= 0", [window.pk])
+                window.window_end = window_end
+                window.daily = daily
+                window.save(update_fields=["window_end", "daily"])
+                moved += 1
+        return moved
+
+    def add_to_windows(self, counters: Counter[BucketKey]) -> int:
+        """
+        Add freshly upserted bucket counts to every rolling window that covers their bucket.
+        Buckets outside of a window, e.g. from before its start or after its end, are skipped.
+
+        Args:
+            counters: Interaction counts by bucket key, as passed to upsert_bucket_counts.
+
+        Returns:
+            The number of window counts that were inserted or incremented.
+        """
+        windows = [
+            (window.pk, window.daily, *self._window_bounds(window.daily, window.span_hours, window.window_end))
+            for window in TrendingWindow.objects.exclude(window_end=None)
+        ]
+        window_counts: Counter[WindowCountKey] = Counter()
+        for (attacker_ip, feed_type, bucket_start), interaction_count in counters.items():
+            for window_id, daily, window_start, window_end in windows:
+                if window_start < (bucket_start.date() if daily else bucket_start) <= window_end:
+                    window_counts[(window_id, attacker_ip, feed_type)] += interaction_count
+        if not window_counts:
+            return 0
+
+        quoted_table_name = connection.ops.quote_name(AttackerWindowCount._meta.db_table)
+        window_items = list(window_counts.items())
+        with connection.cursor() as cursor:
+            for batch_start in range(0, len(window_items), self.UPSERT_BATCH_SIZE):
+                batch = window_items[batch_start : batch_start + self.UPSERT_BATCH_SIZE]
+                query = self._build_window_upsert_query(quoted_table_name, len(batch))
+                cursor.execute(query, self._build_upsert_params(batch))
+        return len(window_counts)
 
+    def get_window_end(self, span_hours: int) -> datetime | None:
+        """Return the end of a rolling window, None if the window does not exist yet."""
+        return TrendingWindow.objects.filter(span_hours=span_hours).values_list("window_end", flat=True).first()
+
+    def get_window_counts(self, span_hours: int, feed_types: str | Iterable[str]) -> tuple[datetime | None, dict[str, int]]:
+        """
+        Return the end of a rolling window and its summed interaction counts per attacker IP.
+
+        Args:
+            span_hours: Span of the window in hours.
+            feed_types: Feed types to include, "all" includes every feed type.
+
+        Returns:
+            Tuple of (window end, counts by attacker IP), the window end is None if the window does not exist yet.
+        """
+        window = TrendingWindow.objects.filter(span_hours=span_hours).first()
+        if window is None or window.window_end is None:
+            return None, {}
+        queryset = AttackerWindowCount.objects.filter(window=window)
+        normalized_feed_types = self._normalize_feed_types(feed_types)
         if "all" not in normalized_feed_types:
             queryset = queryset.filter(feed_type__in=normalized_feed_types)
+        counts = dict(queryset.values("attacker_ip").annotate(total=Sum("interaction_count")).values_list("attacker_ip", "total"))
+        return window.window_end, counts
 
-        return dict(queryset.values("attacker_ip").annotate(total=Sum("interaction_count")).values_list("attacker_ip", "total"))
+    @classmethod
+    def _partition_name(cls, day: date) -> str:
+        return f"{AttackerActivityBucket._meta.db_table}_{day.strftime(cls.PARTITION_SUFFIX_FORMAT)}"
+
+    def get_partitions(self) -> dict[date, str]:
+        """Return the names of the daily partitions of the bucket table by day, excluding the default partition."""
+        table_name = AttackerActivityBucket._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = %s
+                """,
+                [table_name],
+            )
+            partition_names = [row[0] for row in cursor.fetchall()]
+        partitions = {}
+        for partition_name in partition_names:
+            try:
+                day = datetime.strptime(partition_name.removeprefix(f"{table_name}_"), self.PARTITION_SUFFIX_FORMAT).date()
+            except ValueError:
+                continue
+            partitions[day] = partition_name
+        return partitions
+
+    def create_partitions(self, first_day: date, last_day: date) -> int:
+        """
+        Create the missing daily partitions of the bucket table from first_day to last_day, both included.
+        Buckets of those days that landed in the default partition are moved into the new partitions.
+
+        Args:
+            first_day: First day to create a partition for.
+            last_day: Last day to create a partition for.
+
+        Returns:
+            The number of partitions that were created.
+        """
+        existing_partitions = self.get_partitions()
+        quoted_table_name = connection.ops.quote_name(AttackerActivityBucket._meta.db_table)
+        quoted_default_name = connection.ops.quote_name(f"{AttackerActivityBucket._meta.db_table}_default")
+        created = 0
+        day = first_day
+        while day <= last_day:
+            if day not in existing_partitions:
+                next_day = day + timedelta(days=1)
+                quoted_partition_name = connection.ops.quote_name(self._partition_name(day))
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(f"CREATE TABLE {quoted_partition_name} (LIKE {quoted_table_name} INCLUDING DEFAULTS)")
+                    cursor.execute(
+                        f"""
+                        WITH moved AS (
+                            DELETE FROM {quoted_default_name} WHERE bucket_start >= %s AND bucket_start < %s RETURNING *
+                        )
+                        INSERT INTO {quoted_partition_name} SELECT * FROM moved
+                        """,
+                        [day, next_day],
+                    )
+                    cursor.execute(
+                        f"ALTER TABLE {quoted_table_name} ATTACH PARTITION {quoted_partition_name} "
+                        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{next_day.isoformat()}')"
+                    )
+                created += 1
+            day += timedelta(days=1)
+        return created
+
+    def drop_partitions_older_than(self, cutoff: datetime) -> int:
+        """Drop the daily partitions whose buckets are all older than the cutoff and return their number."""
+        dropped = 0
+        with connection.cursor() as cursor:
+            for day, partition_name in sorted(self.get_partitions().items()):
+                if datetime.combine(day + timedelta(days=1), datetime.min.time()) > cutoff:
+                    break
+                cursor.execute(f"DROP TABLE {connection.ops.quote_name(partition_name)}")
+                dropped += 1
+        return dropped
 
     def delete_older_than(self, cutoff: datetime) -> int:
         """Delete buckets older than the cutoff and return Django's reported delete count."""
         deleted_count, _ = AttackerActivityBucket.objects.filter(bucket_start__lt=cutoff).delete()
         return deleted_count
+
+    def delete_daily_older_than(self, cutoff: date) -> int:
+        """Delete daily buckets older than the cutoff and return Django's reported delete count."""
+        deleted_count, _ = AttackerActivityDailyBucket.objects.filter(bucket_date__lt=cutoff).delete()
+        return deleted_count
+
+    def delete_sensor_buckets_older_than(self, cutoff: datetime) -> int:
+        """Delete sensor buckets older than the cutoff and return Django's reported delete count."""
+        deleted_count, _ = SensorActivityBucket.objects.filter(bucket_start__lt=cutoff).delete()
+        return deleted_count
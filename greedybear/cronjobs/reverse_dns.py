@@ -1,23 +1,23 @@
-import socket
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from itertools import batched
 
 from django.db.models import F
+from django.utils import timezone
 
 from greedybear.consts import MASS_SCANNER_DOMAINS
 from greedybear.cronjobs.base import Cronjob
-from greedybear.cronjobs.repositories import IocRepository
+from greedybear.cronjobs.ptr_resolver import PtrResolver
+from greedybear.cronjobs.repositories import IocRepository, ReverseDnsLookupRepository
 from greedybear.cronjobs.repositories.tag import TagRepository
 from greedybear.enums import IpReputation
 from greedybear.models import IOC, IocType
 
-# Number of concurrent DNS lookups.
-THREAD_POOL_SIZE = 20
+# Number of candidate IPs resolved and stored together.
+CANDIDATE_CHUNK_SIZE = 10_000
 
-# Maximum number of candidate IPs to check per run.
-MAX_CANDIDATES = 500
-
-# Timeout in seconds for each DNS lookup.
-DNS_TIMEOUT = 2
+# How long lookup results are kept before an IP is looked up again.
+POSITIVE_TTL = timedelta(days=30)
+NEGATIVE_TTL = timedelta(days=7)
 
 SOURCE_NAME = "rdns"
 
@@ -26,70 +26,81 @@ class ReverseDNSCron(Cronjob):
     """
     Identify mass scanning services via reverse DNS lookups.
 
-    Runs daily, selects the top candidates most likely to be mass scanners
+    Runs daily, selects all candidates likely to be mass scanners
     based on behavioral heuristics (persistent, no login attempts, low
-    interaction-to-attack ratio), resolves their PTR records in parallel,
+    interaction-to-attack ratio), resolves their PTR records concurrently,
     and marks matches against a curated list of mass scanner domains.
-    Only IPs with actual PTR records are tagged, so IPs without records
-    are rechecked on subsequent runs.
+    Only IPs with actual PTR records are tagged. Lookup results, including
+    the absence of a PTR record, are cached for a while, so IPs without
+    records are only rechecked once their cached result has expired.
     """
 
-    def __init__(self, tag_repo=None, ioc_repo=None):
+    def __init__(self, tag_repo=None, ioc_repo=None, lookup_repo=None, resolver=None):
         """
         Initialize the cron job with repository dependencies.
 
         Args:
             tag_repo: Optional TagRepository instance for testing.
             ioc_repo: Optional IocRepository instance for testing.
+            lookup_repo: Optional ReverseDnsLookupRepository instance for testing.
+            resolver: Optional PtrResolver instance for testing.
         """
         super().__init__()
         self.tag_repo = tag_repo if tag_repo is not None else TagRepository()
         self.ioc_repo = ioc_repo if ioc_repo is not None else IocRepository()
+        self.lookup_repo = lookup_repo if lookup_repo is not None else ReverseDnsLookupRepository()
+        self.resolver = resolver if resolver is not None else PtrResolver()
 
     def run(self) -> None:
         """
-        Perform reverse DNS lookups on the most probable scanner candidates.
+        Perform reverse DNS lookups on all probable scanner candidates.
 
-        1. Select top candidates using behavioral heuristics.
-        2. Resolve PTR records in parallel.
-        3. Store non-empty PTR results as tags.
-        4. Update reputation for IPs matching mass scanner domains.
+        1. Drop expired lookup results.
+        2. Select all candidates using behavioral heuristics.
+        3. Resolve their PTR records chunk by chunk, skipping cached results.
+        4. Store non-empty PTR results as tags.
+        5. Update reputation for IPs matching mass scanner domains.
         """
+        self.lookup_repo.delete_expired(POSITIVE_TTL, NEGATIVE_TTL, timezone.now())
         candidates = self._get_candidates()
 
         if not candidates:
             self.log.info("No IOCs to check")
             return
 
-        ip_to_id = {name: ioc_id for ioc_id, name in candidates}
+        checked_count = created_count = matched_count = 0
+        for chunk in batched(candidates, CANDIDATE_CHUNK_SIZE, strict=False):
+            ip_to_id = {name: ioc_id for ioc_id, name in chunk}
+
+            ptr_results = self._resolve_batch(list(ip_to_id.keys()))
 
-        # Resolve PTR records in parallel
-        ptr_results = self._resolve_batch(list(ip_to_id.keys()))
+            # Only tag IPs that have actual PTR records — IPs without PTR
+            # are left untagged so they are rechecked once their cached result expires.
+            tag_entries = []
+            matched_ips = []
 
-        # Only tag IPs that have actual PTR records — IPs without PTR
-        # are left untagged so they can be rechecked on future runs.
-        tag_entries = []
-        matched_ips = []
+            for ip, ptr in ptr_results.items():
+                if not ptr:
+                    continue
 
-        for ip, ptr in ptr_results.items():
-            if not ptr:
-                continue
+                tag_entries.append({"ioc_id": ip_to_id[ip], "key": "ptr_record", "value": ptr})
 
-            tag_entries.append({"ioc_id": ip_to_id[ip], "key": "ptr_record", "value": ptr})
+                if self._matches_scanner_domain(ptr):
+                    matched_ips.append(ip)
 
-            if self._matches_scanner_domain(ptr):
-                matched_ips.append(ip)
+            if matched_ips:
+                updated_count = self.ioc_repo.bulk_update_ioc_reputation(matched_ips, IpReputation.MASS_SCANNER.value)
+                self.log.info(f"Marked {updated_count} IPs as mass scanners via rDNS")
 
-        if matched_ips:
-            updated_count = self.ioc_repo.bulk_update_ioc_reputation(matched_ips, IpReputation.MASS_SCANNER.value)
-            self.log.info(f"Marked {updated_count} IPs as mass scanners via rDNS")
+            checked_count += len(ptr_results)
+            created_count += self.tag_repo.add_tags(SOURCE_NAME, tag_entries)
+            matched_count += len(matched_ips)
 
-        created_count = self.tag_repo.add_tags(SOURCE_NAME, tag_entries)
-        self.log.info(f"Reverse DNS check completed. Checked {len(ptr_results)} IPs, created {created_count} tags, {len(matched_ips)} matched mass scanners")
+        self.log.info(f"Reverse DNS check completed. Checked {checked_count} IPs, created {created_count} tags, {matched_count} matched mass scanners")
 
     def _get_candidates(self):
         """
-        Select the top IOCs most likely to be mass scanners.
+        Select all IOCs likely to be mass scanners.
 
         Behavioral heuristics:
         - Seen on more than 2 distinct days (persistent presence)
@@ -98,7 +109,7 @@ class ReverseDNSCron(Cronjob):
         - No existing reputation classification
         - Not already tagged by this source (already has PTR on file)
 
-        Returns the top MAX_CANDIDATES ordered by persistence.
+        Returns the candidates ordered by persistence.
         """
         return list(
             IOC.objects.filter(
@@ -111,16 +122,15 @@ class ReverseDNSCron(Cronjob):
             .exclude(tags__source=SOURCE_NAME)
             .order_by("-number_of_days_seen")
             .values_list("id", "name")
-            .distinct()[:MAX_CANDIDATES]
+            .distinct()
         )
 
     def _resolve_batch(self, ips: list[str]) -> dict[str, str]:
         """
-        Resolve PTR records for a batch of IPs in parallel.
+        Resolve PTR records for a batch of IPs, using cached results where available.
 
-        Sets an explicit socket timeout for the duration of the batch
-        and restores the previous value afterwards.  Each IP is resolved
-        independently — one failure does not affect the rest of the batch.
+        The remaining IPs are resolved concurrently and their results are cached.
+        Failed lookups are not cached, so they are retried on the next run.
 
         Args:
             ips: List of IP addresses to resolve.
@@ -128,42 +138,20 @@ class ReverseDNSCron(Cronjob):
         Returns:
             Dict mapping IP address to PTR hostname (or empty string).
         """
-        results = {}
-        old_timeout = socket.getdefaulttimeout()
-        socket.setdefaulttimeout(DNS_TIMEOUT)
-        try:
-            with ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE) as executor:
-                future_to_ip = {executor.submit(self._resolve_ptr, ip): ip for ip in ips}
-                for future in as_completed(future_to_ip):
-                    ip = future_to_ip[future]
-                    try:
-                        results[ip] = future.result()
-                    except Exception:
-                        self.log.exception(f"Unexpected error resolving PTR for {ip}")
-                        results[ip] = ""
-        finally:
-            socket.setdefaulttimeout(old_timeout)
+        results = self.lookup_repo.get_results(ips)
+        missing = [ip for ip in ips if ip not in results]
+        if not missing:
+            return results
+
+        checked = timezone.now()
+        resolved = {ip: ptr for ip, ptr in self.resolver.resolve(missing).items() if ptr is not None}
+        self.lookup_repo.save_results(resolved, checked)
+        self.log.info(f"Resolved {len(missing)} IPs ({len(resolved)} answered), {len(results)} cached")
+
+        results.update(resolved)
+        results.update((ip, "") for ip in missing if ip not in resolved)
         return results
 
-    def _resolve_ptr(self, ip: str) -> str:
-        """
-        Perform a reverse DNS lookup.
-
-        The socket timeout is set once by _resolve_batch before threads
-        are spawned, so all lookups share the configured DNS_TIMEOUT.
-
-        Args:
-            ip: IP address to resolve.
-
-        Returns:
-            The PTR hostname, or an empty string on any failure.
-        """
-        try:
-            hostname, _, _ = socket.gethostbyaddr(ip)
-            return hostname
-        except (socket.herror, socket.gaierror, TimeoutError, OSError):
-            return ""
-
     @staticmethod
     def _matches_scanner_domain(hostname: str) -> bool:
         """
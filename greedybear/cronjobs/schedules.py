@@ -36,6 +36,12 @@ def setup_schedules():
             "func": "greedybear.tasks.extract_all",
             "cron": f"*/{extraction_interval} * * * *",
         },
+        # ThreatFox Submissions: Every EXTRACTION_INTERVAL minutes
+        {
+            "name": "submit_to_threatfox",
+            "func": "greedybear.tasks.submit_to_threatfox",
+            "cron": f"*/{extraction_interval} * * * *",
+        },
         # Monitor Honeypots: Hourly at :07
         {
             "name": "monitor_honeypots",
@@ -90,6 +96,12 @@ def setup_schedules():
             "func": "greedybear.tasks.get_tor_exit_nodes",
             "cron": _external_weekly_cron("get_tor_exit_nodes"),
         },
+        # Reference List Reconciliation: Hourly at :37
+        {
+            "name": "reconcile_reference_lists",
+            "func": "greedybear.tasks.reconcile_reference_lists",
+            "cron": "37 * * * *",
+        },
         # 10. Reverse DNS Scanner Check: Daily at 06:07
         {
             "name": "check_reverse_dns",
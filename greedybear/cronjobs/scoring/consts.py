@@ -21,3 +21,10 @@ MULTI_VAL_FEATURES = [
 ]
 
 SAMPLE_COUNT = 100
+
+# Bin edges of the score histograms stored with every scoring run.
+# Scores beyond the last edge are counted in the last bin.
+SCORE_HISTOGRAM_BINS = {
+    "recurrence_probability": [i / 10 for i in range(11)],
+    "expected_interactions": [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000],
+}
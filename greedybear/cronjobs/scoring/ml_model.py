@@ -1,18 +1,20 @@
+import json
+import os
 from abc import abstractmethod
+from datetime import datetime
 from functools import cached_property
-from io import BytesIO
+from pathlib import Path
 
 import joblib
 import numpy as np
 import pandas as pd
-from django.core.files.base import ContentFile
 from django.core.files.storage import FileSystemStorage
 from sklearn.model_selection import train_test_split
 
 from greedybear.cronjobs.scoring.consts import MULTI_VAL_FEATURES, SAMPLE_COUNT
 from greedybear.cronjobs.scoring.scorer import Scorer
 from greedybear.cronjobs.scoring.utils import multi_label_encode
-from greedybear.settings import ML_MODEL_DIRECTORY
+from greedybear.settings import ML_MODEL_DIRECTORY, VERSION
 
 
 class MLModel(Scorer):
@@ -34,43 +36,96 @@ class MLModel(Scorer):
         """
         return self.name.replace(" ", "_").lower()
 
+    @cached_property
+    def manifest_file_name(self) -> str:
+        """
+        Name of the JSON manifest stored next to the model file.
+
+        Returns:
+            str: Model file name with a '.manifest.json' suffix
+        """
+        return f"{self.file_name}.manifest.json"
+
     @cached_property
     def model(self):
         """
         Load the serialized model from persistent storage.
 
-        Attempts to deserialize and load the model using joblib from
-        the storage location determined by the model's name.
+        The model is loaded with joblib in read-only memory-mapped mode, so the
+        numpy arrays backing the trees are not copied into the process memory.
+        All processes loading the same model file share its pages via the OS page cache.
         """
         self.log.info(f"loading {self.name} model from file system")
         storage = FileSystemStorage(location=ML_MODEL_DIRECTORY)
         try:
-            with storage.open(self.file_name, "rb") as file:
-                result = joblib.load(file)
+            result = joblib.load(storage.path(self.file_name), mmap_mode="r")
         except Exception as exc:
             self.log.error(f"failed to load model for {self.name}")
             raise exc
         return result
 
-    def save(self) -> None:
+    @property
+    def manifest(self) -> dict:
         """
-        Serialize and save the model to persistent storage.
+        Read the model manifest without loading the model itself.
 
-        The model is saved using joblib serialization to a file location
-        determined by the model's name. If a file already exists for this
-        model, it will be overwritten.
+        Returns:
+            dict: Manifest containing version, features, training date and recall AUC
+                of the stored model, or an empty dict if no manifest is available.
+        """
+        storage = FileSystemStorage(location=ML_MODEL_DIRECTORY)
+        try:
+            with storage.open(self.manifest_file_name, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError) as exc:
+            self.log.warning(f"no manifest available for {self.name}: {exc}")
+            return {}
+
+    def save(self, recall_auc: float | None = None) -> None:
+        """
+        Serialize and save the model and its manifest to persistent storage.
+
+        The model is dumped by joblib directly into a temporary file, which then
+        atomically replaces the previous model file. Processes that still have the old
+        file memory-mapped keep reading the old version until they reload the model.
+        Compression is not applied, because compressed joblib files cannot be memory-mapped.
+
+        Args:
+            recall_auc: Optional recall AUC of the model, stored in the manifest
         """
         self.log.info(f"saving {self.name} model to file system")
         storage = FileSystemStorage(location=ML_MODEL_DIRECTORY)
-        with BytesIO() as model_buffer:
-            joblib.dump(self.model, model_buffer)
-            try:
-                if storage.exists(self.file_name):
-                    storage.delete(self.file_name)
-                storage.save(self.file_name, ContentFile(model_buffer.getvalue()))
-            except Exception as exc:
-                self.log.error(f"failed to save model for {self.name}")
-                raise exc
+        manifest = {
+            "name": self.name,
+            "version": VERSION,
+            "features": [str(feature) for feature in self.model.feature_names_in_],
+            "trained_at": datetime.now().isoformat(timespec="seconds"),
+            "recall_auc": recall_auc,
+        }
+        try:
+            os.makedirs(storage.location, exist_ok=True)
+            self._replace_file(storage.path(self.file_name), lambda path: joblib.dump(self.model, path))
+            self._replace_file(storage.path(self.manifest_file_name), lambda path: Path(path).write_text(json.dumps(manifest)))
+        except Exception as exc:
+            self.log.error(f"failed to save model for {self.name}")
+            raise exc
+
+    @staticmethod
+    def _replace_file(path: str, write) -> None:
+        """
+        Write a file next to its final location and atomically move it into place.
+
+        Args:
+            path: Final location of the file
+            write: Callable writing the file content to the path it receives
+        """
+        temp_path = f"{path}.tmp"
+        try:
+            write(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
     def add_missing_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
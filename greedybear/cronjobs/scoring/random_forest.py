@@ -34,7 +34,8 @@ class RFModel(MLModel):
         """
         Preprocesses features, splits data into train/test sets, and
         trains a Random Forest with optimized hyperparameters.
-        Logs model performance using recall AUC score.
+        Logs model performance using recall AUC score and stores it
+        in the model manifest.
 
         Args:
             df: Training data containing features and
@@ -51,7 +52,8 @@ class RFModel(MLModel):
         x_train, x_test, y_train, y_test = self.split_train_test(x, y)
 
         self.model = self.untrained_model.fit(x_train, y_train)
-        self.log.info(f"finished training {self.name} - recall AUC: {self.recall_auc(x_test, y_test):.4f}")
+        recall_auc = self.recall_auc(x_test, y_test)
+        self.log.info(f"finished training {self.name} - recall AUC: {recall_auc:.4f}")
 
         feature_names = x_train.columns.tolist()
 
@@ -61,7 +63,7 @@ class RFModel(MLModel):
         importance_lines = "\n".join(f"  {name}: {score:.4f}" for name, score in sorted_features)
 
         self.log.info(f"Feature importances for {self.name}:\n{importance_lines}")
-        self.save()
+        self.save(recall_auc=float(recall_auc))
 
     @property
     @abstractmethod
@@ -1,4 +1,5 @@
 import json
+import time
 from collections import defaultdict
 from datetime import date
 
@@ -7,15 +8,18 @@ from django.core.files.base import ContentFile
 from django.core.files.storage import FileSystemStorage
 
 from greedybear.cronjobs.base import Cronjob
-from greedybear.cronjobs.repositories import IocRepository
+from greedybear.cronjobs.repositories import IocRepository, ScoringRunRepository
+from greedybear.cronjobs.scoring.consts import SCORE_HISTOGRAM_BINS
 from greedybear.cronjobs.scoring.random_forest import RFClassifier, RFRegressor
 from greedybear.cronjobs.scoring.utils import (
     correlated_features,
+    feature_means,
     get_current_data,
     get_data_by_pks,
     get_features,
+    score_histogram,
 )
-from greedybear.models import IOC
+from greedybear.models import IOC, ScoringJob
 from greedybear.settings import ML_MODEL_DIRECTORY
 
 SCORERS = [RFClassifier(), RFRegressor()]
@@ -34,12 +38,14 @@ class TrainModels(Cronjob):
     previously stored training data. The class persists the current data after each run
     to serve as training data for the next iteration. Training requires historical data
     to calculate interaction deltas.
+    Metrics of every completed training run are stored for monitoring.
     """
 
-    def __init__(self):
+    def __init__(self, scoring_run_repo=None):
         super().__init__()
         self.storage = FileSystemStorage(location=ML_MODEL_DIRECTORY)
         self.current_data = None
+        self.scoring_run_repo = scoring_run_repo if scoring_run_repo is not None else ScoringRunRepository()
 
     def save_training_data(self) -> None:
         """
@@ -88,6 +94,7 @@ class TrainModels(Cronjob):
         6. Check for correlated features
         7. Train and save each model
         8. Store current data for next training iteration
+        9. Record feature means, recall AUC and durations of the run
 
         Raises:
             TrainingDataError: If training data is not older than current data.
@@ -132,13 +139,30 @@ class TrainModels(Cronjob):
         for f1, f2, corr in high_corr_pairs:
             self.log.debug(f"{f1} & {f2}: {corr:.2f}")
 
+        start = time.monotonic()
+        model_metrics = {}
         try:
             for s in SCORERS:
                 if s.trainable:
+                    model_start = time.monotonic()
                     s.train(training_df)
+                    model_metrics[s.name] = {
+                        "recall_auc": s.manifest.get("recall_auc"),
+                        "training_duration": round(time.monotonic() - model_start, 3),
+                    }
         finally:
             self.save_training_data()
 
+        self.scoring_run_repo.record_run(
+            ScoringJob.TRAINING,
+            duration=round(time.monotonic() - start, 3),
+            rows_processed=len(training_df),
+            metrics={
+                "models": model_metrics,
+                "feature_means": feature_means(training_df),
+            },
+        )
+
 
 class UpdateScores(Cronjob):
     """
@@ -148,12 +172,14 @@ class UpdateScores(Cronjob):
     extracts relevant features, applies a series of scorers,
     and writes the updated scores back to the database.
     Designed to run as a scheduled cronjob.
+    Metrics of every full update are stored for monitoring.
     """
 
-    def __init__(self, ioc_repo=None):
+    def __init__(self, ioc_repo=None, scoring_run_repo=None):
         super().__init__()
         self.data = None
         self.ioc_repo = ioc_repo if ioc_repo is not None else IocRepository()
+        self.scoring_run_repo = scoring_run_repo if scoring_run_repo is not None else ScoringRunRepository()
 
     def update_db(self, df: pd.DataFrame, iocs: set[IOC] = None) -> int:
         """
@@ -235,16 +261,34 @@ class UpdateScores(Cronjob):
         3. Extract features from IoC data
         4. Apply each scorer in sequence
         5. Write the updated scores back to the database
+        6. Record score histograms, feature means and durations of the run
 
         The scorers are expected to add
         their respective score columns to the dataframe.
         """
+        start = time.monotonic()
         if self.data is None:
             self.log.info("no data handed over from previous task - fetching current IoC data from DB")
             self.data = get_current_data()
         current_date = max(row["last_seen"] for row in self.data)
         self.log.info("extracting features")
         df = get_features(self.data, current_date)
+        scoring_start = time.monotonic()
         for s in SCORERS:
             df = s.score(df)
-        self.update_db(df)
+        scoring_duration = time.monotonic() - scoring_start
+        rows_updated = self.update_db(df)
+
+        self.scoring_run_repo.record_run(
+            ScoringJob.SCORING,
+            duration=round(time.monotonic() - start, 3),
+            rows_processed=len(df),
+            rows_updated=rows_updated,
+            metrics={
+                "scoring_duration": round(scoring_duration, 3),
+                "feature_means": feature_means(df),
+                "score_histograms": {
+                    s.score_name: score_histogram(df[s.score_name], SCORE_HISTOGRAM_BINS[s.score_name]) for s in SCORERS if s.score_name in SCORE_HISTOGRAM_BINS
+                },
+            },
+        )
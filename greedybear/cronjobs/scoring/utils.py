@@ -6,6 +6,7 @@ import pandas as pd
 
 from api.views.utils import FeedRequestParams, feeds_response
 from greedybear.cronjobs.repositories import IocRepository
+from greedybear.cronjobs.scoring.consts import NUM_FEATURES
 
 
 @cache
@@ -52,6 +53,41 @@ def correlated_features(df: pd.DataFrame, threshold: float = 0.7) -> list[tuple]
     return high_corr_pairs
 
 
+def feature_means(df: pd.DataFrame) -> dict[str, float]:
+    """
+    Calculate the mean of each numerical feature.
+
+    Args:
+        df: DataFrame as returned by get_features
+
+    Returns:
+        Mapping of feature name to its mean, features missing from the DataFrame are skipped
+    """
+    columns = [f for f in NUM_FEATURES if f in df.columns]
+    return {f: round(float(m), 4) for f, m in df[columns].mean().fillna(0).items()}
+
+
+def score_histogram(scores: pd.Series, bin_edges: list[float]) -> dict:
+    """
+    Count scores into fixed bins, so that histograms of different runs are comparable.
+
+    Args:
+        scores: Score values
+        bin_edges: Monotonically increasing bin edges,
+            values outside of the range are counted in the first or last bin
+
+    Returns:
+        Dictionary with the bin edges, the count per bin and the mean score
+    """
+    values = scores.dropna().clip(bin_edges[0], bin_edges[-1]).to_numpy()
+    counts, _ = np.histogram(values, bins=bin_edges)
+    return {
+        "bins": list(bin_edges),
+        "counts": counts.tolist(),
+        "mean": round(float(values.mean()), 4) if len(values) else 0.0,
+    }
+
+
 def get_features(iocs: list[dict], reference_day: str) -> pd.DataFrame:
     """
     Extract and calculate features from IOC data.
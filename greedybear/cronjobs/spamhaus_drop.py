@@ -3,6 +3,7 @@ import json
 import requests
 
 from greedybear.cronjobs.base import Cronjob
+from greedybear.cronjobs.feed_fetcher import FeedFetcher
 from greedybear.cronjobs.repositories import FireHolRepository
 from greedybear.utils import is_valid_cidr, is_valid_ipv4
 
@@ -18,9 +19,10 @@ class SpamhausDropCron(Cronjob):
     cyber-crime operations. Stored in FireHolList table (same as FireHOL).
     """
 
-    def __init__(self, firehol_repo=None):
+    def __init__(self, firehol_repo=None, fetcher=None):
         super().__init__()
         self.firehol_repo = firehol_repo if firehol_repo is not None else FireHolRepository()
+        self.fetcher = fetcher if fetcher is not None else FeedFetcher()
 
     def run(self) -> None:
         self.log.info("Starting Spamhaus DROP v4 import")
@@ -31,17 +33,19 @@ class SpamhausDropCron(Cronjob):
         """Fetch and process Spamhaus DROP v4 feed (JSON Lines format)."""
         try:
             self.log.info(f"Fetching from {FEED_URL}")
-            response = requests.get(FEED_URL, timeout=60)
-            response.raise_for_status()
-
-            lines = response.text.strip().splitlines()
-            self.log.info(f"Retrieved {len(lines)} entries from Spamhaus DROP v4")
-
-            added_count = 0
-            for line in lines:
+            response = self.fetcher.fetch(FEED_URL)
+            if response is None:
+                # the list did not change, keep its entries from expiring
+                self.firehol_repo.refresh_source(SOURCE_NAME)
+                return
+
+            line_count = 0
+            entries = set()
+            for line in self.fetcher.iter_lines(response):
                 line = line.strip()
                 if not line:
                     continue
+                line_count += 1
 
                 try:
                     entry = json.loads(line)
@@ -53,14 +57,18 @@ class SpamhausDropCron(Cronjob):
                         self.log.debug(f"Invalid CIDR skipped: {cidr}")
                         continue
 
-                    _, created = self.firehol_repo.get_or_create(cidr, SOURCE_NAME)
-                    if created:
-                        added_count += 1
+                    entries.add(cidr)
 
                 except json.JSONDecodeError:
                     self.log.debug(f"Failed to parse line: {line[:100]}")
 
+            self.log.info(f"Retrieved {line_count} entries from Spamhaus DROP v4")
+            if not entries:
+                self.log.warning("No valid entries in Spamhaus DROP v4, keeping the stored entries")
+                return
+            added_count, _, _ = self.firehol_repo.sync_source(SOURCE_NAME, entries)
             self.log.info(f"Added {added_count} new entries from Spamhaus DROP v4")
+            self.fetcher.mark_processed(FEED_URL, response)
 
         except requests.RequestException as e:
             self.log.error(f"Failed to fetch Spamhaus DROP v4: {e}")
@@ -0,0 +1,133 @@
+from itertools import batched
+
+import requests
+from django.conf import settings
+
+from greedybear.cronjobs.base import Cronjob
+from greedybear.cronjobs.feed_fetcher import get_session
+from greedybear.cronjobs.repositories import ThreatFoxSubmissionRepository
+from greedybear.models import ThreatFoxSubmission
+
+THREATFOX_API_URL = "https://threatfox-api.abuse.ch/api/v1/"
+
+# Number of queued submissions loaded at once.
+QUEUE_BATCH_SIZE = 1000
+
+# Maximum number of URLs submitted in a single request.
+REQUEST_BATCH_SIZE = 100
+
+
+class ThreatFoxRejectedError(Exception):
+    """ThreatFox refused a submission, sending it again would fail in the same way."""
+
+
+class ThreatFoxSubmissionCron(Cronjob):
+    """
+    Submit the payload URLs queued by the extraction to ThreatFox.
+
+    URLs seen by the same honeypots share the comment of the submission,
+    so they are sent together in batched requests over a pooled session.
+    Submissions are marked as sent only after ThreatFox accepted the request,
+    so that they are retried on the next run if the API is unavailable.
+    Submissions refused by ThreatFox are sent one by one to find the offending URLs,
+    which are marked as rejected so that they do not block the queue.
+    """
+
+    def __init__(self, submission_repo=None, session=None):
+        """
+        Initialize the cron job.
+
+        Args:
+            submission_repo: Optional ThreatFoxSubmissionRepository instance for testing.
+            session: Optional requests session, defaults to the shared session of this process.
+        """
+        super().__init__()
+        self.submission_repo = submission_repo if submission_repo is not None else ThreatFoxSubmissionRepository()
+        self.session = session if session is not None else get_session()
+
+    def run(self) -> None:
+        """Send all queued submissions, stopping at the first request that failed because ThreatFox is unavailable."""
+        if not settings.THREATFOX_API_KEY:
+            self.log.warning("Threatfox API Key not available")
+            return
+
+        submitted_count = 0
+        while pending := self.submission_repo.get_pending(QUEUE_BATCH_SIZE):
+            for honeypots, submissions in self._group_by_honeypots(pending).items():
+                for batch in batched(submissions, REQUEST_BATCH_SIZE, strict=False):
+                    try:
+                        submitted_count += self._submit_batch(honeypots, list(batch))
+                    except requests.RequestException as e:
+                        self.log.exception(f"Threatfox push error: {e}")
+                        self.log.info(f"Submitted {submitted_count} URLs, the remaining ones are retried on the next run")
+                        return
+        self.log.info(f"Submitted {submitted_count} URLs to Threatfox")
+
+    def _submit_batch(self, honeypots: tuple[str, ...], submissions: list[ThreatFoxSubmission]) -> int:
+        """
+        Submit a batch of queued submissions. If ThreatFox refuses the batch, its submissions are sent one by one
+        and the refused ones are marked as rejected.
+
+        Returns:
+            Number of submissions accepted by ThreatFox.
+
+        Raises:
+            requests.RequestException: If ThreatFox is unavailable.
+        """
+        try:
+            self._submit(honeypots, [submission.url for submission in submissions])
+        except ThreatFoxRejectedError as e:
+            if len(submissions) > 1:
+                return sum(self._submit_batch(honeypots, [submission]) for submission in submissions)
+            self.log.warning(f"Threatfox rejected {submissions[0].url}: {e}")
+            self.submission_repo.mark_rejected(submissions, str(e))
+            return 0
+        return self.submission_repo.mark_submitted(submissions)
+
+    @staticmethod
+    def _group_by_honeypots(submissions: list[ThreatFoxSubmission]) -> dict[tuple[str, ...], list[ThreatFoxSubmission]]:
+        groups = {}
+        for submission in submissions:
+            honeypots = tuple(sorted(honeypot.name for honeypot in submission.ioc.honeypots.all()))
+            groups.setdefault(honeypots, []).append(submission)
+        return groups
+
+    def _submit(self, honeypots: tuple[str, ...], urls: list[str]) -> None:
+        """
+        Submit payload URLs in a single request.
+
+        Args:
+            honeypots: Names of the honeypots the URLs were requested from.
+            urls: URLs to submit.
+
+        Raises:
+            requests.RequestException: If the request fails because ThreatFox is unavailable.
+            ThreatFoxRejectedError: If ThreatFox refused the submission.
+        """
+        self.log.info(f"submitting IOC {urls} to Threatfox")
+        json_data = {
+            "query": "submit_ioc",
+            "threat_type": "payload_delivery",
+            "ioc_type": "url",
+            "malware": "unknown",
+            "confidence_level": "75",
+            "reference": "https://greedybear.honeynet.org",
+            "comment": f"Seen requesting a payload from {', '.join(honeypots)} honeypot and collected in Greedybear, the Threat Intel Platform for T-POTs.",
+            "anonymous": 0,
+            "tags": ["honeypot"],
+            "iocs": urls,
+        }
+        r = self.session.post(THREATFOX_API_URL, headers={"Auth-Key": settings.THREATFOX_API_KEY}, json=json_data, timeout=30)
+        # server errors and rate limiting are temporary, other client errors are caused by the submission
+        if r.status_code >= 500 or r.status_code == 429:
+            r.raise_for_status()
+        if r.status_code >= 400:
+            raise ThreatFoxRejectedError(f"HTTP {r.status_code}: {r.text[:200]}")
+        try:
+            response_data = r.json()
+        except ValueError:
+            response_data = None
+        query_status = response_data.get("query_status") if isinstance(response_data, dict) else None
+        if query_status != "ok":
+            raise ThreatFoxRejectedError(f"query_status {query_status}: {r.text[:200]}")
+        self.log.info(f"Threatfox submission successful. Received response: {r.text}")
@@ -3,19 +3,23 @@ import re
 import requests
 
 from greedybear.cronjobs.base import Cronjob
-from greedybear.cronjobs.repositories import IocRepository
+from greedybear.cronjobs.feed_fetcher import FeedFetcher
+from greedybear.cronjobs.repositories import ReferenceListChangeRepository
 from greedybear.cronjobs.repositories.tor import TorRepository
-from greedybear.enums import IpReputation
+from greedybear.models import ReferenceList
 from greedybear.utils import is_valid_ipv4
 
+TOR_EXIT_ADDRESSES_URL = "https://check.torproject.org/exit-addresses"
+
 
 class TorExitNodesCron(Cronjob):
     """Fetch and store Tor exit node IP addresses from Tor Project."""
 
-    def __init__(self, tor_repo=None, ioc_repo=None):
+    def __init__(self, tor_repo=None, change_repo=None, fetcher=None):
         super().__init__()
         self.tor_repo = tor_repo if tor_repo is not None else TorRepository()
-        self.ioc_repo = ioc_repo if ioc_repo is not None else IocRepository()
+        self.change_repo = change_repo if change_repo is not None else ReferenceListChangeRepository()
+        self.fetcher = fetcher if fetcher is not None else FeedFetcher()
 
     def run(self) -> None:
         """Fetch Tor exit node IPs from torproject.org and store them."""
@@ -24,14 +28,13 @@ class TorExitNodesCron(Cronjob):
         try:
             self.log.info("Starting download of Tor exit node list from torproject.org")
 
-            r = requests.get(
-                "https://check.torproject.org/exit-addresses",
-                timeout=10,
-            )
-            r.raise_for_status()
+            r = self.fetcher.fetch(TOR_EXIT_ADDRESSES_URL, timeout=10)
+            if r is None:
+                return
 
-            findings = ip_regex.findall(r.text)
+            findings = (ip_candidate for line in self.fetcher.iter_lines(r) for ip_candidate in ip_regex.findall(line))
 
+            added_ips = []
             for ip_candidate in findings:
                 is_valid, ip_address = is_valid_ipv4(ip_candidate)
                 if not is_valid:
@@ -41,8 +44,12 @@ class TorExitNodesCron(Cronjob):
                 tor_node, created = self.tor_repo.get_or_create(ip_address)
                 if created:
                     self.log.info(f"Added new Tor exit node {ip_address}")
-                    self.ioc_repo.update_ioc_reputation(ip_address, IpReputation.TOR_EXIT_NODE)
+                    added_ips.append(ip_address)
+
+            # the reputation of existing IOCs is updated by the reference list reconciliation
+            self.change_repo.record(ReferenceList.TOR_EXIT_NODES, added_ips)
 
+            self.fetcher.mark_processed(TOR_EXIT_ADDRESSES_URL, r)
             self.log.info("Completed download of Tor exit node list")
 
         except requests.RequestException as e:
@@ -1,4 +1,7 @@
-from collections.abc import Mapping
+import heapq
+from bisect import bisect_right
+from collections.abc import Collection, Mapping
+from itertools import accumulate
 
 AttackerCounts = Mapping[str, int]
 AttackerRank = int | None
@@ -6,9 +9,59 @@ RankedAttacker = dict[str, str | int | float | None]
 
 UNRANKED_ATTACKER_SORT_ORDER = 10**9
 
+# rolling windows served by the trending feed, in hours
+TRENDING_WINDOWS = {
+    "1h": 1,
+    "6h": 6,
+    "24h": 24,
+    "7d": 24 * 7,
+}
+DEFAULT_TRENDING_WINDOW = "24h"
+# windows longer than this are served from the daily rollup buckets
+HOURLY_WINDOW_MAX_HOURS = 24
 
-def _rank_map(sorted_counts: list[tuple[str, int]]) -> dict[str, int]:
-    return {attacker_ip: rank for rank, (attacker_ip, _) in enumerate(sorted_counts, start=1)}
+
+def trending_windows(max_window_minutes: int) -> dict[str, int]:
+    return {name: hours for name, hours in TRENDING_WINDOWS.items() if hours * 60 <= max_window_minutes}
+
+
+def trending_window_spans(max_window_minutes: int) -> list[int]:
+    """Spans in hours of the maintained aggregates: every served window and twice its length, covering the previous window."""
+    spans = set()
+    for hours in trending_windows(max_window_minutes).values():
+        spans.update((hours, 2 * hours))
+    return sorted(spans)
+
+
+def daily_window_spans(max_window_minutes: int) -> list[int]:
+    """Spans in hours of the maintained aggregates that are computed from daily buckets."""
+    spans = set()
+    for hours in trending_windows(max_window_minutes).values():
+        if hours > HOURLY_WINDOW_MAX_HOURS:
+            spans.update((hours, 2 * hours))
+    return sorted(spans)
+
+
+def _count_sort_key(item: tuple[str, int]) -> tuple[int, str]:
+    return -item[1], item[0]
+
+
+def _top_counts(counts: AttackerCounts, limit: int) -> list[tuple[str, int]]:
+    return heapq.nsmallest(limit, counts.items(), key=_count_sort_key)
+
+
+def _rank_map(counts: AttackerCounts, top_counts: list[tuple[str, int]], attacker_ips: Collection[str]) -> dict[str, int]:
+    """Ranks of the given attackers in counts, without sorting all of counts."""
+    ranks = {attacker_ip: rank for rank, (attacker_ip, _) in enumerate(top_counts, start=1)}
+    missing_keys = sorted(_count_sort_key((ip, counts[ip])) for ip in attacker_ips if ip in counts and ip not in ranks)
+    if missing_keys:
+        # every count ordered before a missing attacker pushes its rank down by one
+        preceding = [0] * (len(missing_keys) + 1)
+        for item in counts.items():
+            preceding[bisect_right(missing_keys, _count_sort_key(item))] += 1
+        for (_, attacker_ip), count_before in zip(missing_keys, accumulate(preceding), strict=False):
+            ranks[attacker_ip] = count_before + 1
+    return ranks
 
 
 def growth_score(current_count: int, previous_count: int) -> float:
@@ -60,14 +113,14 @@ def _ranked_attacker(
 
 
 def build_ranked_attackers(current_counts: AttackerCounts, previous_counts: AttackerCounts, limit: int) -> list[RankedAttacker]:
-    sorted_current = sorted(current_counts.items(), key=lambda item: (-item[1], item[0]))
-    sorted_previous = sorted(previous_counts.items(), key=lambda item: (-item[1], item[0]))
+    top_current = _top_counts(current_counts, limit)
+    top_previous = _top_counts(previous_counts, limit)
 
-    current_ranks = _rank_map(sorted_current)
-    previous_ranks = _rank_map(sorted_previous)
+    candidate_ips = {ip for ip, _ in top_current}
+    candidate_ips |= {ip for ip, _ in top_previous}
 
-    candidate_ips = {ip for ip, _ in sorted_current[:limit]}
-    candidate_ips |= {ip for ip, _ in sorted_previous[:limit]}
+    current_ranks = _rank_map(current_counts, top_current, candidate_ips)
+    previous_ranks = _rank_map(previous_counts, top_previous, candidate_ips)
 
     previous_rank_offset = 1
 
@@ -1,22 +1,27 @@
 import requests
 
 from greedybear.cronjobs.base import Cronjob
+from greedybear.cronjobs.feed_fetcher import FeedFetcher
 from greedybear.models import IOC, WhatsMyIPDomain
 
+WHATSMYIP_LIST_URL = "https://raw.githubusercontent.com/MISP/misp-warninglists/refs/heads/main/lists/whats-my-ip/list.json"
+
 
 class WhatsMyIPCron(Cronjob):
     """Fetch and store 'What's My IP' domains from MISP warning lists."""
 
+    def __init__(self, fetcher=None):
+        super().__init__()
+        self.fetcher = fetcher if fetcher is not None else FeedFetcher()
+
     def run(self) -> None:
         try:
-            r = requests.get(
-                "https://raw.githubusercontent.com/MISP/misp-warninglists/refs/heads/main/lists/whats-my-ip/list.json",
-                timeout=10,
-            )
-            r.raise_for_status()
+            r = self.fetcher.fetch(WHATSMYIP_LIST_URL, timeout=10, stream=False)
         except requests.RequestException as e:
             self.log.error(f"Failed to fetch whats-my-ip list: {e}")
             raise
+        if r is None:
+            return
 
         try:
             json_file = r.json()
@@ -35,6 +40,7 @@ class WhatsMyIPCron(Cronjob):
                 WhatsMyIPDomain(domain=domain).save()
                 self.log.info(f"added new whatsmyip domain {domain=}")
                 self._remove_old_ioc(domain)
+        self.fetcher.mark_processed(WHATSMYIP_LIST_URL, r)
 
     def _remove_old_ioc(self, domain):
         try:
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.12 on 2026-10-19 12:00
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0050_attackeractivitybucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoringRun",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("job", models.CharField(choices=[("training", "Training"), ("scoring", "Scoring")], max_length=32)),
+                ("run_date", models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ("duration", models.FloatField(default=0)),
+                ("rows_processed", models.IntegerField(default=0)),
+                ("rows_updated", models.IntegerField(default=0)),
+                ("metrics", models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["job", "run_date"], name="greedybear__job_7ddf17_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.12 on 2026-10-19 12:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0051_scoringrun"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commandsequence",
+            name="clustering_digest",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="commandsequence",
+            name="minhash",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="CommandSequenceBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("band", models.SmallIntegerField()),
+                ("bucket", models.BigIntegerField()),
+                (
+                    "command_sequence",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lsh_buckets",
+                        to="greedybear.commandsequence",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["band", "bucket"], name="greedybear__band_092c33_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("command_sequence", "band"), name="unique_command_sequence_band"),
+                ],
+            },
+        ),
+    ]
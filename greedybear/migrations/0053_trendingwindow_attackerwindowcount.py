@@ -0,0 +1,43 @@
+# Generated by Django 5.2.12 on 2026-10-19 13:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0052_commandsequence_clustering_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrendingWindow",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("span_hours", models.PositiveSmallIntegerField(unique=True)),
+                ("window_end", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AttackerWindowCount",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("attacker_ip", models.GenericIPAddressField()),
+                ("feed_type", models.CharField(max_length=32)),
+                ("interaction_count", models.IntegerField(default=0)),
+                (
+                    "window",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="counts",
+                        to="greedybear.trendingwindow",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("window", "attacker_ip", "feed_type"), name="unique_attacker_window_count"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.12 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+def rollup_existing_buckets(apps, schema_editor):
+    schema_editor.execute("""
+        INSERT INTO greedybear_attackeractivitydailybucket (attacker_ip, feed_type, bucket_date, interaction_count)
+        SELECT attacker_ip, feed_type, bucket_start::date, SUM(interaction_count)
+        FROM greedybear_attackeractivitybucket
+        GROUP BY attacker_ip, feed_type, bucket_start::date
+        ON CONFLICT DO NOTHING;
+    """)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0053_trendingwindow_attackerwindowcount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttackerActivityDailyBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("attacker_ip", models.GenericIPAddressField()),
+                ("feed_type", models.CharField(max_length=32)),
+                ("bucket_date", models.DateField()),
+                ("interaction_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["bucket_date"], name="greedybear__bucket__2576de_idx"),
+                    models.Index(fields=["feed_type", "bucket_date"], name="greedybear__feed_ty_5fb62f_idx"),
+                    models.Index(fields=["attacker_ip", "bucket_date"], name="greedybear__attacke_e4820e_idx"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(fields=["attacker_ip", "feed_type", "bucket_date"], name="unique_attacker_activity_daily_bucket"),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="trendingwindow",
+            name="daily",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(rollup_existing_buckets, reverse_code=migrations.RunPython.noop),
+    ]
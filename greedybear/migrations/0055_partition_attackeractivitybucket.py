@@ -0,0 +1,70 @@
+"""
+Migration to turn the AttackerActivityBucket table into a table partitioned by day on bucket_start,
+so that expired buckets can be dropped a partition at a time.
+
+Rows outside of the daily partitions go to a default partition. The Django model state is unchanged,
+the primary key of the partitioned table includes bucket_start as required by PostgreSQL.
+"""
+
+from datetime import timedelta
+
+from django.db import migrations
+
+TABLE = "greedybear_attackeractivitybucket"
+PARTITIONS_AHEAD = 7
+
+
+def partition_buckets(apps, schema_editor):
+    schema_editor.execute(f"""
+        CREATE TABLE {TABLE}_partitioned (
+            id bigint NOT NULL,
+            attacker_ip inet NOT NULL,
+            feed_type varchar(32) NOT NULL,
+            bucket_start timestamp NOT NULL,
+            interaction_count integer NOT NULL,
+            PRIMARY KEY (id, bucket_start)
+        ) PARTITION BY RANGE (bucket_start);
+    """)
+    schema_editor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE}_partitioned DEFAULT;")
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(bucket_start)::date, MAX(bucket_start)::date, CURRENT_DATE FROM {TABLE};")
+        first_day, last_day, today = cursor.fetchone()
+    first_day = min(first_day or today, today)
+    last_day = max(last_day or today, today + timedelta(days=PARTITIONS_AHEAD))
+    day = first_day
+    while day <= last_day:
+        schema_editor.execute(
+            f"CREATE TABLE {TABLE}_p{day:%Y%m%d} PARTITION OF {TABLE}_partitioned "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}');"
+        )
+        day += timedelta(days=1)
+
+    schema_editor.execute(f"""
+        INSERT INTO {TABLE}_partitioned (id, attacker_ip, feed_type, bucket_start, interaction_count)
+        SELECT id, attacker_ip, feed_type, bucket_start, interaction_count FROM {TABLE};
+    """)
+    schema_editor.execute(f"DROP TABLE {TABLE};")
+    schema_editor.execute(f"ALTER TABLE {TABLE}_partitioned RENAME TO {TABLE};")
+    schema_editor.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {TABLE}_partitioned_pkey TO {TABLE}_pkey;")
+
+    # identity columns are not supported on partitioned tables before PostgreSQL 17
+    schema_editor.execute(f"CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id;")
+    schema_editor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq');")
+    schema_editor.execute(f"SELECT setval('{TABLE}_id_seq', COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false);")
+
+    # recreate the constraint and indexes of the model state on the partitioned table
+    schema_editor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT unique_attacker_activity_bucket UNIQUE (attacker_ip, feed_type, bucket_start);")
+    schema_editor.execute(f"CREATE INDEX greedybear__bucket__ce4aaf_idx ON {TABLE} (bucket_start);")
+    schema_editor.execute(f"CREATE INDEX greedybear__feed_ty_84e90b_idx ON {TABLE} (feed_type, bucket_start);")
+    schema_editor.execute(f"CREATE INDEX greedybear__attacke_910f2f_idx ON {TABLE} (attacker_ip, bucket_start);")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0054_attackeractivitydailybucket"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_buckets, reverse_code=migrations.RunPython.noop),
+    ]
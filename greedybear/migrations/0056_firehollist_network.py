@@ -0,0 +1,48 @@
+# Generated by Django 5.2.12 on 2026-10-19 16:00
+
+from ipaddress import ip_interface
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+import greedybear.models
+
+
+def delete_unparsable_entries(apps, schema_editor):
+    """Entries that are not an IP address or a network in prefix notation cannot be stored as inet."""
+    FireHolList = apps.get_model("greedybear", "FireHolList")
+    invalid_pks = []
+    for pk, ip_address in FireHolList.objects.values_list("pk", "ip_address").iterator():
+        try:
+            ip_interface(ip_address)
+        except ValueError:
+            invalid_pks.append(pk)
+            continue
+        # netmask notation, e.g. 10.0.0.0/255.0.0.0
+        if "/" in ip_address and not ip_address.partition("/")[2].isdigit():
+            invalid_pks.append(pk)
+    FireHolList.objects.filter(pk__in=invalid_pks).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0055_partition_attackeractivitybucket"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_unparsable_entries, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name="firehollist",
+            name="network",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.comparison.Cast("ip_address", greedybear.models.InetField()),
+                output_field=greedybear.models.InetField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="firehollist",
+            index=django.contrib.postgres.indexes.GistIndex(fields=["network"], name="firehollist_network_gist", opclasses=["inet_ops"]),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.12 on 2026-10-19 17:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+import greedybear.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0056_firehollist_network"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReferenceListChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "reference_list",
+                    models.CharField(
+                        choices=[("mass_scanners", "Mass Scanners"), ("firehol", "Firehol"), ("tor_exit_nodes", "Tor Exit Nodes")],
+                        max_length=32,
+                    ),
+                ),
+                ("network", greedybear.models.InetField()),
+                ("added", models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GistIndex(fields=["network"], name="referencelistchange_net_gist", opclasses=["inet_ops"]),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.12 on 2026-10-19 18:00
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0057_referencelistchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReverseDnsLookup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("ip_address", models.CharField(max_length=256, unique=True)),
+                ("ptr_record", models.CharField(blank=True, max_length=256)),
+                ("checked", models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+            ],
+            options={
+                "indexes": [models.Index(fields=["checked"], name="greedybear__checked_04a398_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.12 on 2026-10-19 19:00
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0058_reversednslookup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThreatFoxSubmission",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("url", models.CharField(max_length=900, unique=True)),
+                ("added", models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ("submitted", models.DateTimeField(blank=True, null=True)),
+                (
+                    "ioc",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="threatfox_submissions", to="greedybear.ioc"),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(condition=models.Q(("submitted__isnull", True)), fields=["id"], name="threatfoxsubmission_pending"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.12 on 2026-10-19 20:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0059_threatfoxsubmission"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HoneypotHitCount",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("window_start", models.DateTimeField()),
+                ("window_end", models.DateTimeField()),
+                ("hits", models.IntegerField()),
+                (
+                    "honeypot",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="hit_counts", to="greedybear.honeypot"),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["window_end"], name="greedybear__window__0b9999_idx")],
+                "constraints": [models.UniqueConstraint(fields=("honeypot", "window_end"), name="unique_honeypot_hit_count_window")],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.12 on 2026-10-19 21:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0060_honeypothitcount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SensorActivityBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("feed_type", models.CharField(max_length=32)),
+                ("bucket_start", models.DateTimeField()),
+                ("hit_count", models.IntegerField(default=0)),
+                (
+                    "sensor",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="activity_buckets", to="greedybear.sensor"),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["bucket_start"], name="greedybear__bucket__96e1f2_idx")],
+                "constraints": [models.UniqueConstraint(fields=("sensor", "feed_type", "bucket_start"), name="unique_sensor_activity_bucket")],
+            },
+        ),
+    ]
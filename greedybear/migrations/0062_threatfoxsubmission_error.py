@@ -0,0 +1,25 @@
+# Generated by Django 5.2.12 on 2026-10-19 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0061_sensoractivitybucket"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="threatfoxsubmission",
+            name="error",
+            field=models.CharField(blank=True, default="", max_length=256),
+        ),
+        migrations.RemoveIndex(
+            model_name="threatfoxsubmission",
+            name="threatfoxsubmission_pending",
+        ),
+        migrations.AddIndex(
+            model_name="threatfoxsubmission",
+            index=models.Index(condition=models.Q(("error", ""), ("submitted__isnull", True)), fields=["id"], name="threatfoxsubmission_pending"),
+        ),
+    ]
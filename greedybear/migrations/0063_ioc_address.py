@@ -0,0 +1,39 @@
+# Generated by Django 5.2.12 on 2026-10-19 23:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+import greedybear.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0062_threatfoxsubmission_error"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ioc",
+            name="address",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(
+                        models.Q(
+                            ("name__regex", "^((25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9]?[0-9])\\.){3}(25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9]?[0-9])$"),
+                            ("type", "ip"),
+                        ),
+                        then=django.db.models.functions.comparison.Cast("name", greedybear.models.InetField()),
+                    ),
+                    default=None,
+                    output_field=greedybear.models.InetField(),
+                ),
+                output_field=greedybear.models.InetField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ioc",
+            index=django.contrib.postgres.indexes.GistIndex(fields=["address"], name="ioc_address_gist", opclasses=["inet_ops"]),
+        ),
+    ]
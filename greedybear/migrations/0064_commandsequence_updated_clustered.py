@@ -0,0 +1,42 @@
+# Generated by Django 5.2.12 on 2026-10-19 23:30
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+def mark_indexed_sequences_as_clustered(apps, schema_editor):
+    """Sequences with stored LSH buckets do not have to be clustered again."""
+    CommandSequence = apps.get_model("greedybear", "CommandSequence")
+    CommandSequence.objects.exclude(clustering_digest="").update(clustered=models.F("updated"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("greedybear", "0063_ioc_address"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="commandsequence",
+            name="minhash",
+        ),
+        migrations.AddField(
+            model_name="commandsequence",
+            name="clustered",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="commandsequence",
+            name="updated",
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now()),
+        ),
+        migrations.RunPython(mark_indexed_sequences_as_clustered, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="commandsequence",
+            index=models.Index(
+                condition=models.Q(("clustered__isnull", True), ("updated__gt", models.F("clustered")), _connector="OR"),
+                fields=["id"],
+                name="commandsequence_unclustered",
+            ),
+        ),
+    ]
@@ -1,12 +1,25 @@
 # This file is a part of GreedyBear https://github.com/honeynet/GreedyBear
 # See the file 'LICENSE' for copying permission.
 from django.contrib.postgres import fields as pg_fields
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
-from django.db.models.functions import Lower, Now
+from django.db.models.functions import Cast, Lower, Now
 
 from greedybear.enums import IpReputation
 
 
+class InetField(models.Field):
+    """PostgreSQL `inet` column holding a single IP address or a network, exposed as its text representation."""
+
+    description = "IP address or network"
+
+    def db_type(self, connection):
+        return "inet"
+
+    def from_db_value(self, value, expression, connection):
+        return value if value is None else str(value)
+
+
 class ViewType(models.TextChoices):
     FEEDS_VIEW = "feeds"
     ENRICHMENT_VIEW = "enrichment"
@@ -14,6 +27,15 @@ class ViewType(models.TextChoices):
     COWRIE_SESSION_VIEW = "cowrie session"
 
 
+class ScoringJob(models.TextChoices):
+    TRAINING = "training"
+    SCORING = "scoring"
+
+
+# dotted quad with octets of at most 255, the only IP address names that can be cast to inet without an error
+IPV4_ADDRESS_REGEX = r"^((25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9]?[0-9])\.){3}(25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9]?[0-9])$"
+
+
 class IocType(models.TextChoices):
     IP = "ip"
     DOMAIN = "domain"
@@ -50,12 +72,19 @@ class Honeypot(models.Model):
 
 class FireHolList(models.Model):
     ip_address = models.CharField(max_length=256)
+    # ip_address as inet, so that containment of IP addresses can be checked in the database
+    network = models.GeneratedField(
+        expression=Cast("ip_address", InetField()),
+        output_field=InetField(),
+        db_persist=True,
+    )
     added = models.DateTimeField(db_default=Now())
     source = models.CharField(max_length=64, blank=True, default="")
 
     class Meta:
         indexes = [
             models.Index(fields=["ip_address"]),
+            GistIndex(fields=["network"], name="firehollist_network_gist", opclasses=["inet_ops"]),
         ]
 
     def __str__(self):
@@ -111,11 +140,22 @@ class IOC(models.Model):
     # SCORES
     recurrence_probability = models.FloatField(null=True, default=0)
     expected_interactions = models.FloatField(null=True, default=0)
+    # name of IP IOCs as inet, so that IOCs within a network can be found in the database, NULL for other IOCs
+    address = models.GeneratedField(
+        expression=models.Case(
+            models.When(models.Q(type=IocType.IP, name__regex=IPV4_ADDRESS_REGEX), then=Cast("name", InetField())),
+            default=None,
+            output_field=InetField(),
+        ),
+        output_field=InetField(),
+        db_persist=True,
+    )
 
     class Meta:
         indexes = [
             models.Index(fields=["name"]),
             models.Index(fields=["attacker_country"]),
+            GistIndex(fields=["address"], name="ioc_address_gist", opclasses=["inet_ops"]),
         ]
 
     def __str__(self):
@@ -131,12 +171,45 @@ class CommandSequence(models.Model):
     )
     commands_hash = models.CharField(max_length=64, unique=True, blank=True, null=True)
     cluster = models.IntegerField(blank=True, null=True)
+    # CLUSTERING INDEX - digest of the clustering input the stored LSH buckets were computed from
+    clustering_digest = models.CharField(max_length=64, blank=True, default="")
+    # time the clustering input may have changed, and the value of `updated` last seen by the clustering job
+    updated = models.DateTimeField(db_default=Now())
+    clustered = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                name="commandsequence_unclustered",
+                condition=models.Q(clustered__isnull=True) | models.Q(updated__gt=models.F("clustered")),
+            ),
+        ]
 
     def __str__(self):
         cmd_string = "; ".join(self.commands)
         return cmd_string[:29] + "..." if len(cmd_string) > 32 else cmd_string
 
 
+class CommandSequenceBucket(models.Model):
+    """LSH bucket of a command sequence's MinHash signature in one band, persisted across clustering runs."""
+
+    command_sequence = models.ForeignKey(CommandSequence, on_delete=models.CASCADE, related_name="lsh_buckets")
+    band = models.SmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["command_sequence", "band"], name="unique_command_sequence_band"),
+        ]
+        indexes = [
+            models.Index(fields=["band", "bucket"]),
+        ]
+
+    def __str__(self):
+        return f"{self.command_sequence_id} @ band {self.band}: {self.bucket}"
+
+
 class Credential(models.Model):
     username = models.CharField(max_length=256, blank=False)
     password = models.CharField(max_length=256, blank=False)
@@ -244,6 +317,28 @@ class TorExitNode(models.Model):
         return f"{self.ip_address} ({IpReputation.TOR_EXIT_NODE})"
 
 
+class ReferenceList(models.TextChoices):
+    MASS_SCANNERS = "mass_scanners"
+    FIREHOL = "firehol"
+    TOR_EXIT_NODES = "tor_exit_nodes"
+
+
+class ReferenceListChange(models.Model):
+    """An address or network added to or removed from a reference list, whose IOCs are not reconciled yet."""
+
+    reference_list = models.CharField(max_length=32, choices=ReferenceList.choices)
+    network = InetField()
+    added = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        indexes = [
+            GistIndex(fields=["network"], name="referencelistchange_net_gist", opclasses=["inet_ops"]),
+        ]
+
+    def __str__(self):
+        return f"{self.network} ({self.reference_list})"
+
+
 class WhatsMyIPDomain(models.Model):
     domain = models.CharField(max_length=256)
     added = models.DateTimeField(db_default=Now())
@@ -275,6 +370,63 @@ class Tag(models.Model):
         return f"{self.ioc.name} - {self.key}: {self.value} ({self.source})"
 
 
+class ThreatFoxSubmission(models.Model):
+    """Payload URL queued for submission to ThreatFox, kept once submitted so that it is not submitted again."""
+
+    ioc = models.ForeignKey(IOC, on_delete=models.CASCADE, related_name="threatfox_submissions")
+    url = models.CharField(max_length=900, unique=True)
+    added = models.DateTimeField(db_default=Now())
+    submitted = models.DateTimeField(null=True, blank=True)
+    # reason why ThreatFox refused the submission, which is then not sent again
+    error = models.CharField(max_length=256, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["id"], condition=models.Q(submitted__isnull=True, error=""), name="threatfoxsubmission_pending"),
+        ]
+
+    def __str__(self):
+        if self.error:
+            return f"{self.url} (rejected)"
+        return f"{self.url} ({'submitted' if self.submitted else 'pending'})"
+
+
+class ReverseDnsLookup(models.Model):
+    """Result of a reverse DNS lookup, kept so that the IP address is not looked up again before the result expires."""
+
+    ip_address = models.CharField(max_length=256, unique=True)
+    ptr_record = models.CharField(max_length=256, blank=True)  # empty if the IP address has no PTR record
+    checked = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["checked"]),
+        ]
+
+    def __str__(self):
+        return f"{self.ip_address} -> {self.ptr_record or 'no PTR record'}"
+
+
+class HoneypotHitCount(models.Model):
+    """Number of log entries of a honeypot in Elasticsearch within one monitoring window."""
+
+    honeypot = models.ForeignKey(Honeypot, on_delete=models.CASCADE, related_name="hit_counts")
+    window_start = models.DateTimeField()
+    window_end = models.DateTimeField()
+    hits = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["honeypot", "window_end"], name="unique_honeypot_hit_count_window"),
+        ]
+        indexes = [
+            models.Index(fields=["window_end"]),
+        ]
+
+    def __str__(self):
+        return f"{self.honeypot.name}: {self.hits} hits until {self.window_end}"
+
+
 class ShareToken(models.Model):
     """
     Tracks shared feed tokens issued via the ``/api/feeds/share`` endpoint.
@@ -325,3 +477,100 @@ class AttackerActivityBucket(models.Model):
 
     def __str__(self):
         return f"{self.attacker_ip} [{self.feed_type}] @ {self.bucket_start} ({self.interaction_count})"
+
+
+class AttackerActivityDailyBucket(models.Model):
+    """Daily rollup of AttackerActivityBucket, kept longer than the hourly buckets."""
+
+    attacker_ip = models.GenericIPAddressField()
+    feed_type = models.CharField(max_length=32)
+    bucket_date = models.DateField()
+    interaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["attacker_ip", "feed_type", "bucket_date"], name="unique_attacker_activity_daily_bucket"),
+        ]
+        indexes = [
+            models.Index(fields=["bucket_date"]),
+            models.Index(fields=["feed_type", "bucket_date"]),
+            models.Index(fields=["attacker_ip", "bucket_date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.attacker_ip} [{self.feed_type}] @ {self.bucket_date} ({self.interaction_count})"
+
+
+class SensorActivityBucket(models.Model):
+    """Hourly number of hits a T-Pot sensor logged for one honeypot, counted during extraction."""
+
+    sensor = models.ForeignKey(Sensor, on_delete=models.CASCADE, related_name="activity_buckets")
+    feed_type = models.CharField(max_length=32)
+    bucket_start = models.DateTimeField()
+    hit_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sensor", "feed_type", "bucket_start"], name="unique_sensor_activity_bucket"),
+        ]
+        indexes = [
+            models.Index(fields=["bucket_start"]),
+        ]
+
+    def __str__(self):
+        return f"{self.sensor.address} [{self.feed_type}] @ {self.bucket_start} ({self.hit_count})"
+
+
+class ScoringRun(models.Model):
+    """
+    Metrics recorded by a single run of the model training or score update job.
+
+    The `metrics` field holds per-model values (e.g. recall AUC and training duration),
+    the mean of each numerical feature and, for scoring runs, a histogram of each score.
+    """
+
+    job = models.CharField(max_length=32, choices=ScoringJob.choices)
+    run_date = models.DateTimeField(db_default=Now())
+    duration = models.FloatField(default=0)
+    rows_processed = models.IntegerField(default=0)
+    rows_updated = models.IntegerField(default=0)
+    metrics = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["job", "run_date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.job} run @ {self.run_date} ({self.duration:.1f}s)"
+
+
+class TrendingWindow(models.Model):
+    """
+    Rolling time window of the trending attacker aggregates.
+
+    Hourly windows cover the hourly buckets in (window_end - span, window_end],
+    daily windows cover the daily buckets of the last span / 24 days up to the day of window_end.
+    """
+
+    span_hours = models.PositiveSmallIntegerField(unique=True)
+    window_end = models.DateTimeField(null=True, blank=True)
+    daily = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.span_hours}h window until {self.window_end}"
+
+
+class AttackerWindowCount(models.Model):
+    window = models.ForeignKey(TrendingWindow, on_delete=models.CASCADE, related_name="counts")
+    attacker_ip = models.GenericIPAddressField()
+    feed_type = models.CharField(max_length=32)
+    interaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["window", "attacker_ip", "feed_type"], name="unique_attacker_window_count"),
+        ]
+
+    def __str__(self):
+        return f"{self.attacker_ip} [{self.feed_type}] in {self.window_id} ({self.interaction_count})"
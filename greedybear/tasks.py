@@ -83,6 +83,12 @@ def get_tor_exit_nodes():
     TorExitNodesCron().execute()
 
 
+def reconcile_reference_lists():
+    from greedybear.cronjobs.reference_list_reconciliation import ReferenceListReconciliationCron
+
+    ReferenceListReconciliationCron().execute()
+
+
 def check_reverse_dns():
     from greedybear.cronjobs.reverse_dns import ReverseDNSCron
 
@@ -95,6 +101,12 @@ def enrich_threatfox():
     ThreatFoxCron().execute()
 
 
+def submit_to_threatfox():
+    from greedybear.cronjobs.threatfox_submission import ThreatFoxSubmissionCron
+
+    ThreatFoxSubmissionCron().execute()
+
+
 def enrich_abuseipdb():
     from greedybear.cronjobs.abuseipdb_feed import AbuseIPDBCron
 
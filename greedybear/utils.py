@@ -2,7 +2,8 @@
 # See the file 'LICENSE' for copying permission.
 import re
 from datetime import datetime
-from ipaddress import IPv4Address, IPv4Network, ip_address
+from functools import lru_cache
+from ipaddress import IPv4Address, IPv4Network, IPv6Address, ip_address
 
 from greedybear.consts import DOMAIN, IP
 
@@ -40,6 +41,25 @@ def is_non_global_ip(value) -> bool:
     return value.is_loopback or value.is_private or value.is_multicast or value.is_link_local or value.is_reserved
 
 
+@lru_cache(maxsize=65_536)
+def global_ip_address(value: str) -> IPv4Address | IPv6Address | None:
+    """
+    Parse an IP address and classify it as global or not.
+    Memoized, as the same attacker IPs show up in thousands of hits per extraction chunk.
+
+    Args:
+        value: IP address string.
+
+    Returns:
+        IPv4Address or IPv6Address if the address is global, None otherwise.
+
+    Raises:
+        ValueError: If the value is not a valid IP address.
+    """
+    parsed_ip = ip_address(value)
+    return None if is_non_global_ip(parsed_ip) else parsed_ip
+
+
 def is_valid_domain(string: str) -> bool:
     """
     Validate if a string is a safe domain name for use in STIX patterns.
@@ -97,11 +117,10 @@ def is_valid_cidr(candidate: str) -> tuple[bool, str | None]:
         candidate: String to validate as CIDR.
 
     Returns:
-        True if valid CIDR, False otherwise.
+        Tuple of (True, network in prefix notation) if valid CIDR, (False, None) otherwise.
     """
     try:
-        IPv4Network(candidate.strip(), strict=False)
-        return True, candidate.strip()
+        return True, str(IPv4Network(candidate.strip(), strict=False))
     except ValueError:
         return False, None
 
@@ -217,6 +217,7 @@ class ExtractionTestCase(CustomTestCase):
         self.mock_sensor_repo = Mock()
         self.mock_sensor_repo.cache = {}  # Initialize cache as empty dict for sensor filtering
         self.mock_session_repo = Mock()
+        self.mock_credential_repo = Mock()
 
     def _create_mock_ioc(
         self,
@@ -1,6 +1,10 @@
+import hashlib
+
+from django.core.cache import caches
 from django.test import override_settings
 from rest_framework.test import APIClient
 
+from greedybear.models import CowrieSession
 from tests import CustomTestCase
 
 
@@ -125,3 +129,37 @@ class CommandSequenceViewTestCase(CustomTestCase):
         response = self.client.get(f"/api/command_sequence?query={self.hash}")
         self.assertEqual(response.status_code, 200)
         self.assertNotIn("license", response.data)
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        """Test that the number of queries is independent of the number of matching sessions."""
+        for i in range(20):
+            CowrieSession.objects.create(session_id=i + 1, start_time=self.current_time, duration=1.0, source=self.ioc, commands=self.command_sequence)
+
+        # statistics, cache version, cache lookup, sequences, IOCs and five queries of the cache write
+        with self.assertNumQueries(10):
+            response = self.client.get("/api/command_sequence?query=140.246.171.141&include_similar")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["executed_commands"]), 21)
+        self.assertEqual(response.data["executed_by"], ["140.246.171.141", "99.99.99.99"])
+
+        with self.assertNumQueries(10):
+            response = self.client.get(f"/api/command_sequence?query={self.hash}&include_similar")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["iocs"]), 22)
+
+    def test_responses_are_cached_until_version_changes(self):
+        """Test that repeated queries are served from the cache until the command sequences version is bumped."""
+        response = self.client.get(f"/api/command_sequence?query={self.hash}")
+        self.assertEqual(len(response.data["iocs"]), 1)
+        cached = caches["api-responses"].get(f"command_sequence_v1_{hashlib.sha256(self.hash.encode()).hexdigest()}_False")
+        self.assertEqual(cached["iocs"], response.data["iocs"])
+        CowrieSession.objects.create(session_id=1, start_time=self.current_time, duration=1.0, source=self.ioc, commands=self.command_sequence)
+
+        # statistics, cache version and cache lookup
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/command_sequence?query={self.hash}")
+        self.assertEqual(len(response.data["iocs"]), 1)
+
+        caches["django-q"].set("command_sequences_version", 2, timeout=None)
+        response = self.client.get(f"/api/command_sequence?query={self.hash}")
+        self.assertEqual(len(response.data["iocs"]), 2)
@@ -1,7 +1,7 @@
 from django.test import override_settings
 from rest_framework.test import APIClient
 
-from greedybear.models import CowrieSession
+from greedybear.models import CowrieSession, Credential
 from tests import CustomTestCase
 
 
@@ -117,6 +117,47 @@ class CowrieSessionViewTestCase(CustomTestCase):
         self.assertIn("sessions", response.data)
         self.assertEqual(len(response.data["sources"]), 2)
 
+    def _create_sessions(self, count):
+        credential, _ = Credential.objects.get_or_create(username="admin", password="admin", protocol="ssh")
+        for i in range(count):
+            session = CowrieSession.objects.create(
+                session_id=i + 1,
+                start_time=self.current_time,
+                duration=float(i + 1),
+                interaction_count=i,
+                source=self.ioc,
+                commands=self.command_sequence,
+            )
+            session.credentials.add(credential)
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        """Test that the number of queries is independent of the number of matching sessions."""
+        self._create_sessions(20)
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/cowrie_session?query=140.246.171.141&include_similar=true&include_credentials=true&include_session_data=true")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["session_count"], 22)
+        self.assertEqual(len(response.data["sessions"]), 22)
+        self.assertEqual(response.data["credentials"], ["admin | admin | ssh", "root | root", "user | user"])
+        self.assertEqual(response.data["sources"], ["99.99.99.99", "140.246.171.141"])
+
+    def test_session_data_is_paginated(self):
+        """Test that session details are returned in pages, most recent sessions first."""
+        self._create_sessions(5)
+        response = self.client.get("/api/cowrie_session?query=140.246.171.141&include_session_data=true&page=2&page_size=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["session_count"], 6)
+        # sessions with the same start time are ordered by descending session id
+        self.assertEqual([session["duration"] for session in response.data["sessions"]], [4.0, 3.0])
+        self.assertEqual(response.data["sessions"][0]["credentials"], ["admin | admin | ssh"])
+        self.assertEqual(response.data["sessions"][0]["commands"], "cd foo\nls -la")
+
+    def test_invalid_pagination_parameters(self):
+        """Test that invalid page or page_size values return 400."""
+        for params in ("page=0", "page=abc", "page_size=0", "page_size=1001"):
+            response = self.client.get(f"/api/cowrie_session?query=140.246.171.141&include_session_data=true&{params}")
+            self.assertEqual(response.status_code, 400, params)
+
     # # # # # IP Address Validation Tests # # # # #
     def test_nonexistent_ip_address(self):
         """Test that view returns 404 for IP with no sequences."""
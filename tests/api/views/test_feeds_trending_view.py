@@ -0,0 +1,96 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+from greedybear.cronjobs.repositories import TrendingBucketRepository
+from greedybear.models import AttackerActivityBucket
+from tests import CustomTestCase
+
+
+class FeedsTrendingViewTestCase(CustomTestCase):
+    """Tests for the trending attackers feed API"""
+
+    def setUp(self):
+        super().setUp()
+        caches["django-q"].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.superuser)
+        self.url = "/api/feeds/trending/"
+        self.now = datetime(2026, 3, 20, 12, 0)
+        AttackerActivityBucket.objects.bulk_create(
+            [
+                AttackerActivityBucket(attacker_ip="1.1.1.1", feed_type="cowrie", bucket_start=self.now, interaction_count=10),
+                AttackerActivityBucket(attacker_ip="2.2.2.2", feed_type="heralding", bucket_start=self.now, interaction_count=4),
+                AttackerActivityBucket(attacker_ip="2.2.2.2", feed_type="heralding", bucket_start=datetime(2026, 3, 20, 11, 0), interaction_count=8),
+            ]
+        )
+        TrendingBucketRepository().advance_windows([1, 2], self.now)
+
+    def tearDown(self):
+        caches["django-q"].clear()
+        super().tearDown()
+
+    def test_returns_ranked_attackers(self):
+        response = self.client.get(self.url, {"window": "1h"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["window"], "1h")
+        self.assertEqual(response.json()["feed_type"], "all")
+        attackers = response.json()["attackers"]
+        self.assertEqual([entry["attacker_ip"] for entry in attackers], ["1.1.1.1", "2.2.2.2"])
+        self.assertEqual(attackers[1]["current_interactions"], 4)
+        self.assertEqual(attackers[1]["previous_interactions"], 8)
+        self.assertEqual(attackers[1]["previous_rank"], 1)
+
+    def test_filters_by_feed_type(self):
+        response = self.client.get(self.url, {"window": "1h", "feed_type": "heralding"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry["attacker_ip"] for entry in response.json()["attackers"]], ["2.2.2.2"])
+
+    def test_limit(self):
+        response = self.client.get(self.url, {"window": "1h", "limit": 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["attackers"]), 1)
+
+    def test_window_without_aggregates_is_empty(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["window_end"])
+        self.assertEqual(response.json()["attackers"], [])
+
+    def test_response_is_cached_until_version_changes(self):
+        self.client.get(self.url, {"window": "1h"})
+        AttackerActivityBucket.objects.all().delete()
+        TrendingBucketRepository().advance_windows([1, 2], datetime(2026, 3, 20, 8, 0))
+        TrendingBucketRepository().advance_windows([1, 2], self.now)
+
+        response = self.client.get(self.url, {"window": "1h"})
+        self.assertEqual(len(response.json()["attackers"]), 2)
+
+        caches["django-q"].set("trending_feeds_version", 2)
+        response = self.client.get(self.url, {"window": "1h"})
+        self.assertEqual(response.json()["attackers"], [])
+
+    def test_cached_response_skips_window_aggregation(self):
+        first = self.client.get(self.url, {"window": "1h"})
+
+        with patch.object(TrendingBucketRepository, "get_window_counts") as mock_get_window_counts:
+            response = self.client.get(self.url, {"window": "1h"})
+
+        mock_get_window_counts.assert_not_called()
+        self.assertEqual(response.json(), first.json())
+
+    def test_invalid_parameters(self):
+        for params in ({"window": "2h"}, {"feed_type": "unknown"}, {"limit": "abc"}, {"limit": 0}, {"limit": 101}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
@@ -5,7 +5,7 @@ from django.contrib.auth import get_user_model
 from django.test import override_settings
 from rest_framework.test import APIClient
 
-from greedybear.models import IOC, Honeypot
+from greedybear.models import IOC, Honeypot, HoneypotHitCount
 from tests import CustomTestCase
 
 User = get_user_model()
@@ -89,6 +89,51 @@ class HealthViewTestCase(CustomTestCase):
         self.assertEqual(overview["honeypots"]["total"], 2)
         self.assertEqual(overview["honeypots"]["active"], 2)
 
+    # ingestion overview
+    def _add_hit_counts(self, honeypot, hits):
+        """Store hourly hit counts of a honeypot, from the oldest to the latest window."""
+        window_end = datetime.now().replace(minute=0, second=0, microsecond=0)
+        for hours_ago, count in enumerate(reversed(hits)):
+            end = window_end - timedelta(hours=hours_ago)
+            HoneypotHitCount.objects.create(honeypot=honeypot, window_start=end - timedelta(hours=1), window_end=end, hits=count)
+
+    def test_ingestion_overview(self):
+        self._add_hit_counts(self.testpot1, [100, 120, 110])
+        self._add_hit_counts(self.testpot2, [100, 120, 30])
+
+        payload = self._get_payload(self.client.get(self.url))
+        ingestion = payload["overview"]["ingestion"]
+
+        self.assertEqual(ingestion["testpot1"]["status"], "ok")
+        self.assertEqual(ingestion["testpot1"]["last_window_hits"], 110)
+        self.assertEqual(ingestion["testpot1"]["hits_per_hour"], 110)
+        self.assertEqual(ingestion["testpot1"]["previous_hits_per_hour"], 110)
+        self.assertEqual(ingestion["testpot2"]["status"], "drop")
+        self.assertEqual(ingestion["testpot2"]["hits_per_hour"], 30)
+
+    def test_ingestion_overview_flags_missing_logs(self):
+        self._add_hit_counts(self.testpot1, [100, 0])
+        self._add_hit_counts(self.testpot2, [0])
+
+        ingestion = self._get_payload(self.client.get(self.url))["overview"]["ingestion"]
+
+        self.assertEqual(ingestion["testpot1"]["status"], "no logs")
+        self.assertEqual(ingestion["testpot2"]["status"], "no logs")
+        self.assertIsNone(ingestion["testpot2"]["previous_hits_per_hour"])
+
+    def test_ingestion_overview_ignores_old_and_inactive(self):
+        inactive = Honeypot.objects.create(name="inactivepot", active=False)
+        self._add_hit_counts(inactive, [100])
+        old_end = datetime.now() - timedelta(days=2)
+        HoneypotHitCount.objects.create(honeypot=self.testpot1, window_start=old_end - timedelta(hours=1), window_end=old_end, hits=10_000)
+        self._add_hit_counts(self.testpot1, [100])
+
+        ingestion = self._get_payload(self.client.get(self.url))["overview"]["ingestion"]
+
+        self.assertEqual(set(ingestion), {"testpot1"})
+        self.assertEqual(ingestion["testpot1"]["status"], "ok")
+        self.assertIsNone(ingestion["testpot1"]["previous_hits_per_hour"])
+
     # db status checkup
     @patch("api.views.health.get_db_status", return_value="down")
     def test_database_down(self, mock_db):
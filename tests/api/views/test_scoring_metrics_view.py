@@ -0,0 +1,44 @@
+from rest_framework.test import APIClient
+
+from greedybear.models import ScoringJob, ScoringRun
+from tests import CustomTestCase
+
+
+class ScoringMetricsViewTestCase(CustomTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.training_run = ScoringRun.objects.create(job=ScoringJob.TRAINING, duration=12.5, rows_processed=100, metrics={"models": {}})
+        cls.scoring_run = ScoringRun.objects.create(job=ScoringJob.SCORING, duration=3.0, rows_processed=100, rows_updated=42)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.superuser)
+        self.url = "/api/scoring/metrics/"
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(user=self.regular_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_returns_runs_newest_first(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        runs = response.json()["runs"]
+        self.assertEqual([run["job"] for run in runs], ["scoring", "training"])
+        self.assertEqual(runs[0]["rows_updated"], 42)
+        self.assertEqual(runs[1]["duration"], 12.5)
+        self.assertEqual(runs[1]["metrics"], {"models": {}})
+
+    def test_filter_by_job(self):
+        response = self.client.get(self.url, {"job": "training"})
+        self.assertEqual([run["job"] for run in response.json()["runs"]], ["training"])
+
+    def test_limit(self):
+        response = self.client.get(self.url, {"limit": 1})
+        self.assertEqual(len(response.json()["runs"]), 1)
+
+    def test_invalid_parameters(self):
+        for params in [{"job": "other"}, {"limit": "abc"}, {"limit": 0}, {"limit": 1000}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
@@ -1,4 +1,8 @@
-from greedybear.models import Honeypot, Statistics, ViewType
+from datetime import datetime, timedelta
+
+from rest_framework.test import APIClient
+
+from greedybear.models import Honeypot, Sensor, SensorActivityBucket, Statistics, ViewType
 from tests import CustomTestCase
 
 
@@ -74,3 +78,46 @@ class StatisticsViewTestCase(CustomTestCase):
         # Results must be ordered descending by count
         count_values = [item["count"] for item in data]
         self.assertEqual(count_values, sorted(count_values, reverse=True))
+
+    def _create_sensor_buckets(self):
+        hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+        sensor = Sensor.objects.create(address="192.0.2.10", label="home-pi")
+        sensor_2 = Sensor.objects.create(address="192.0.2.20")
+        SensorActivityBucket.objects.bulk_create(
+            [
+                SensorActivityBucket(sensor=sensor, feed_type="cowrie", bucket_start=hour, hit_count=5),
+                SensorActivityBucket(sensor=sensor, feed_type="cowrie", bucket_start=hour - timedelta(hours=1), hit_count=2),
+                SensorActivityBucket(sensor=sensor, feed_type="heralding", bucket_start=hour, hit_count=1),
+                SensorActivityBucket(sensor=sensor_2, feed_type="cowrie", bucket_start=hour, hit_count=4),
+                SensorActivityBucket(sensor=sensor_2, feed_type="cowrie", bucket_start=hour - timedelta(days=30), hit_count=100),
+            ]
+        )
+
+    def test_200_sensors(self):
+        self._create_sensor_buckets()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.superuser)
+
+        response = self.client.get("/api/statistics/sensors?range=24h")
+
+        self.assertEqual(response.status_code, 200)
+        hits = [(item["sensor"], item["honeypot"], item["hits"]) for item in response.json()]
+        # buckets are grouped by hour for a range in hours
+        self.assertCountEqual(hits, [("192.0.2.10", "cowrie", 2), ("192.0.2.10", "cowrie", 5), ("192.0.2.10", "heralding", 1), ("192.0.2.20", "cowrie", 4)])
+        labels = {item["sensor"]: item["label"] for item in response.json()}
+        self.assertEqual(labels, {"192.0.2.10": "home-pi", "192.0.2.20": ""})
+
+    def test_200_sensors_filtered(self):
+        self._create_sensor_buckets()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.superuser)
+
+        response = self.client.get("/api/statistics/sensors?range=7d&sensor=192.0.2.10&honeypot=Cowrie")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(item["hits"] for item in response.json()), 7)
+        self.assertEqual({(item["sensor"], item["honeypot"]) for item in response.json()}, {("192.0.2.10", "cowrie")})
+
+    def test_sensors_requires_authentication(self):
+        response = self.client.get("/api/statistics/sensors")
+        self.assertEqual(response.status_code, 401)
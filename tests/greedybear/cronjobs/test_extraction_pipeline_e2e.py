@@ -51,7 +51,7 @@ class TestCowrieE2E(E2ETestCase):
             result = pipeline.execute()
 
         # Verify sensor was extracted
-        pipeline.sensor_repo.get_or_create_sensor.assert_called_with("10.0.0.1")
+        pipeline.sensor_repo.get_or_create_sensors.assert_called_with({"10.0.0.1"})
         # Verify IOC was created
         self.assertGreaterEqual(result, 0)
 
@@ -122,7 +122,7 @@ class TestGenericE2E(E2ETestCase):
             result = pipeline.execute()
 
         # Sensor should be registered
-        pipeline.sensor_repo.get_or_create_sensor.assert_called_with("10.0.0.5")
+        pipeline.sensor_repo.get_or_create_sensors.assert_called_with({"10.0.0.5"})
         self.assertGreaterEqual(result, 0)
 
 
@@ -441,7 +441,7 @@ class TestGeoIPEnrichmentE2E(E2ETestCase):
 
         # Real sensor
         real_sensor = Sensor(address="10.10.10.10", country="")
-        pipeline.sensor_repo.get_or_create_sensor.return_value = real_sensor
+        pipeline.sensor_repo.get_or_create_sensors.return_value = {"10.10.10.10": real_sensor}
 
         # Patch update_country to actually set the country
         pipeline.sensor_repo.update_country.side_effect = lambda sensor, country: setattr(sensor, "country", country)
@@ -475,8 +475,9 @@ class TestGeoIPEnrichmentE2E(E2ETestCase):
         with patch.object(IocProcessor, "add_ioc", new=add_ioc_side_effect):
             result = pipeline.execute()
 
-        # Verify sensor was enriched
+        # Verify sensor was enriched and the change was saved once
         self.assertEqual(real_sensor.country, "Nepal")
+        pipeline.sensor_repo.save_countries.assert_called_once()
 
         # Verify IOC attacker_country is populated
         self.assertTrue(real_iocs)
@@ -521,7 +522,7 @@ class TestTannerE2E(E2ETestCase):
             mock_add.return_value = mock_ioc
             result = pipeline.execute()
 
-        pipeline.sensor_repo.get_or_create_sensor.assert_called_with("10.0.0.7")
+        pipeline.sensor_repo.get_or_create_sensors.assert_called_with({"10.0.0.7"})
         self.assertGreaterEqual(result, 0)
 
     @patch("greedybear.cronjobs.extraction.pipeline.UpdateScores")
@@ -122,6 +122,31 @@ class TestEdgeCases(E2ETestCase):
         shared_cache.incr.assert_called_once_with("trending_feeds_version")
         mock_scores.return_value.score_only.assert_not_called()
 
+    @patch("greedybear.cronjobs.extraction.pipeline.caches")
+    @patch("greedybear.cronjobs.extraction.pipeline.BucketUpdater")
+    @patch("greedybear.cronjobs.extraction.pipeline.UpdateScores")
+    @patch("greedybear.cronjobs.extraction.pipeline.ExtractionStrategyFactory")
+    def test_extracted_iocs_invalidate_asn_and_command_sequence_caches(self, mock_factory, mock_scores, mock_bucket_updater_cls, mock_caches):
+        pipeline = self._create_pipeline_with_real_factory()
+        pipeline.log = MagicMock()
+
+        pipeline.elastic_repo.search.return_value = [[MockElasticHit({"src_ip": "2.2.2.2", "type": "SuccessHoneypot"})]]
+        pipeline.ioc_repo.is_empty.return_value = False
+        pipeline.ioc_repo.is_ready_for_extraction.return_value = True
+        mock_bucket_updater_cls.return_value.total_update_count = 0
+
+        mock_strategy = MagicMock()
+        mock_strategy.ioc_records = [self._create_mock_ioc("2.2.2.2")]
+        mock_factory.return_value.get_strategy.return_value = mock_strategy
+
+        shared_cache = MagicMock()
+        mock_caches.__getitem__.return_value = shared_cache
+
+        result = pipeline.execute()
+
+        self.assertEqual(result, 1)
+        self.assertEqual([call.args[0] for call in shared_cache.incr.call_args_list], ["asn_feeds_version", "command_sequences_version"])
+
     @patch("greedybear.cronjobs.extraction.pipeline.caches")
     @patch("greedybear.cronjobs.extraction.pipeline.BucketUpdater")
     @patch("greedybear.cronjobs.extraction.pipeline.UpdateScores")
@@ -73,6 +73,14 @@ class TestExtractionStrategyFactory(ExtractionTestCase):
         self.assertEqual(strategy.ioc_repo, mock_ioc_repo)
         self.assertEqual(strategy.sensor_repo, mock_sensor_repo)
 
+    def test_factory_shares_session_repository_between_cowrie_strategies(self):
+        """Cowrie strategies of all chunks should share the command sequence cache of one session repository."""
+        from greedybear.cronjobs.extraction.strategies.factory import ExtractionStrategyFactory
+
+        factory = ExtractionStrategyFactory(MagicMock(), MagicMock())
+
+        self.assertIs(factory.get_strategy("Cowrie").session_repo, factory.get_strategy("Cowrie").session_repo)
+
     def test_factory_creates_tanner_strategy_for_tanner(self):
         """Factory should return TannerExtractionStrategy for 'Tanner' honeypot."""
         from greedybear.cronjobs.extraction.strategies import TannerExtractionStrategy
@@ -101,7 +101,7 @@ class TestSensorExtraction(ExtractionPipelineTestCase):
 
         pipeline.execute()
 
-        pipeline.sensor_repo.get_or_create_sensor.assert_called_once_with("10.0.0.1")
+        pipeline.sensor_repo.get_or_create_sensors.assert_called_once_with({"10.0.0.1"})
         pipeline.elastic_repo.search.assert_called_once_with(10)
 
     @patch("greedybear.cronjobs.extraction.pipeline.UpdateScores")
@@ -129,7 +129,60 @@ class TestSensorExtraction(ExtractionPipelineTestCase):
         pipeline.execute()
 
         # Sensor should NOT be extracted for invalid hits (missing type)
+        pipeline.sensor_repo.get_or_create_sensors.assert_not_called()
+
+    @patch("greedybear.cronjobs.extraction.pipeline.UpdateScores")
+    @patch("greedybear.cronjobs.extraction.pipeline.ExtractionStrategyFactory")
+    def test_sensors_resolved_once_per_chunk(self, mock_factory, mock_scores):
+        """Sensors are resolved in one call per chunk and country changes are saved once at its end."""
+        pipeline = self._create_pipeline_with_mocks()
+        sensor_1, sensor_2 = MagicMock(), MagicMock()
+        pipeline.sensor_repo.get_or_create_sensors.return_value = {"10.0.0.1": sensor_1, "10.0.0.2": sensor_2}
+        hits = [
+            MockElasticHit({"src_ip": "1.2.3.4", "type": "Cowrie", "t-pot_ip_ext": "10.0.0.1", "geoip_ext": {"country_name": "Italy"}}),
+            MockElasticHit({"src_ip": "1.2.3.5", "type": "Cowrie", "t-pot_ip_ext": "10.0.0.1", "geoip_ext": {"country_name": "France"}}),
+            MockElasticHit({"src_ip": "1.2.3.6", "type": "Heralding", "t-pot_ip_ext": "10.0.0.2"}),
+            MockElasticHit({"src_ip": "1.2.3.7", "type": "Heralding", "t-pot_ip_ext": "10.0.0.3"}),
+        ]
+        pipeline.elastic_repo.search.return_value = [hits]
+        pipeline.ioc_repo.is_empty.return_value = False
+        pipeline.ioc_repo.is_ready_for_extraction.return_value = True
+        mock_factory.return_value.get_strategy.return_value.ioc_records = []
+
+        pipeline.execute()
+
+        pipeline.sensor_repo.get_or_create_sensors.assert_called_once_with({"10.0.0.1", "10.0.0.2", "10.0.0.3"})
         pipeline.sensor_repo.get_or_create_sensor.assert_not_called()
+        pipeline.sensor_repo.update_country.assert_called_once_with(sensor_1, "France")
+        pipeline.sensor_repo.save_countries.assert_called_once()
+        strategy_hits = [hit for call in mock_factory.return_value.get_strategy.return_value.extract_from_hits.call_args_list for hit in call.args[0]]
+        self.assertEqual([hit["_sensor"] for hit in strategy_hits], [sensor_1, sensor_1, sensor_2, None])
+
+    @patch("greedybear.cronjobs.extraction.pipeline.BucketUpdater")
+    @patch("greedybear.cronjobs.extraction.pipeline.UpdateScores")
+    @patch("greedybear.cronjobs.extraction.pipeline.ExtractionStrategyFactory")
+    def test_sensor_hits_of_skipped_honeypots_are_counted(self, mock_factory, mock_scores, mock_bucket_updater_cls):
+        """Hits reaching a sensor are counted for the sensor statistics even if their honeypot is not extracted."""
+        pipeline = self._create_pipeline_with_mocks()
+        sensor = MagicMock()
+        pipeline.sensor_repo.get_or_create_sensors.return_value = {"10.0.0.1": sensor}
+        pipeline.elastic_repo.search.return_value = [
+            [
+                MockElasticHit({"src_ip": "1.2.3.4", "type": "Cowrie", "t-pot_ip_ext": "10.0.0.1"}),
+                MockElasticHit({"src_ip": "1.2.3.5", "type": "Heralding"}),
+            ]
+        ]
+        pipeline.ioc_repo.is_empty.return_value = False
+        pipeline.ioc_repo.is_ready_for_extraction.return_value = False
+        bucket_updater = mock_bucket_updater_cls.return_value
+        bucket_updater.total_update_count = 0
+
+        pipeline.execute()
+
+        bucket_updater.collect_hits.assert_not_called()
+        bucket_updater.collect_sensor_hits.assert_called_once()
+        sensor_hits = bucket_updater.collect_sensor_hits.call_args.args[0]
+        self.assertEqual([(hit["src_ip"], hit["_sensor"]) for hit in sensor_hits], [("1.2.3.4", sensor)])
 
 
 class TestHitGrouping(ExtractionPipelineTestCase):
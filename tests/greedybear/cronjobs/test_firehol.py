@@ -9,20 +9,24 @@ from tests import CustomTestCase
 
 
 class FireHolCronTestCase(CustomTestCase):
-    @patch("greedybear.cronjobs.firehol.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_run_creates_all_firehol_entries(self, mock_get):
         # Setup mock responses
         mock_response_blocklist_de = MagicMock()
-        mock_response_blocklist_de.text = "# blocklist_de\n1.1.1.1\n2.2.2.2"
+        mock_response_blocklist_de.iter_lines.return_value = "# blocklist_de\n1.1.1.1\n2.2.2.2".splitlines()
+        mock_response_blocklist_de.headers = {}
 
         mock_response_greensnow = MagicMock()
-        mock_response_greensnow.text = "# greensnow\n3.3.3.3"
+        mock_response_greensnow.iter_lines.return_value = "# greensnow\n3.3.3.3".splitlines()
+        mock_response_greensnow.headers = {}
 
         mock_response_bruteforceblocker = MagicMock()
-        mock_response_bruteforceblocker.text = "# bruteforceblocker\n1.1.1.1"
+        mock_response_bruteforceblocker.iter_lines.return_value = "# bruteforceblocker\n1.1.1.1".splitlines()
+        mock_response_bruteforceblocker.headers = {}
 
         mock_response_dshield = MagicMock()
-        mock_response_dshield.text = "# dshield\n4.4.4.0/24"
+        mock_response_dshield.iter_lines.return_value = "# dshield\n4.4.4.0/24".splitlines()
+        mock_response_dshield.headers = {}
 
         # Side effect for multiple calls
         mock_get.side_effect = self._firehol_get_side_effect(
@@ -53,11 +57,12 @@ class FireHolCronTestCase(CustomTestCase):
         self.assertIn("blocklist_de", sources)
         self.assertIn("bruteforceblocker", sources)
 
-    @patch("greedybear.cronjobs.firehol.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_run_creates_some_firehol_entries(self, mock_get):
         # Setup mock response
         mock_response_blocklist_de = MagicMock()
-        mock_response_blocklist_de.text = "# blocklist_de\n1.1.1.1\n2.2.2.2"
+        mock_response_blocklist_de.iter_lines.return_value = "# blocklist_de\n1.1.1.1\n2.2.2.2".splitlines()
+        mock_response_blocklist_de.headers = {}
 
         mock_response_bruteforceblocker = MagicMock()
         mock_response_bruteforceblocker.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Client Error")
@@ -80,11 +85,12 @@ class FireHolCronTestCase(CustomTestCase):
         self.assertTrue(FireHolList.objects.filter(ip_address="2.2.2.2", source="blocklist_de").exists())
         self.assertFalse(FireHolList.objects.filter(source="bruteforceblocker").exists())
 
-    @patch("greedybear.cronjobs.firehol.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_run_creates_no_firehol_entries(self, mock_get):
         # Setup mock response
         mock_response_blocklist_de = MagicMock()
-        mock_response_blocklist_de.text = "# blocklist_de\n"
+        mock_response_blocklist_de.iter_lines.return_value = "# blocklist_de\n".splitlines()
+        mock_response_blocklist_de.headers = {}
 
         mock_response_bruteforceblocker = MagicMock()
         mock_response_bruteforceblocker.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Client Error")
@@ -106,7 +112,7 @@ class FireHolCronTestCase(CustomTestCase):
         self.assertFalse(FireHolList.objects.filter(source="blocklist_de").exists())
         self.assertFalse(FireHolList.objects.filter(source="bruteforceblocker").exists())
 
-    @patch("greedybear.cronjobs.firehol.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_run_handles_network_errors(self, mock_get):
         # Setup mock to raise a network error
         mock_get.side_effect = requests.exceptions.RequestException("Network error")
@@ -119,7 +125,7 @@ class FireHolCronTestCase(CustomTestCase):
         cronjob.log.error.assert_called()
         self.assertEqual(FireHolList.objects.count(), 0)
 
-    @patch("greedybear.cronjobs.firehol.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_run_handles_raise_for_status_errors(self, mock_get):
         # Setup mock to raise a 404 error
         mock_response = MagicMock()
@@ -133,11 +139,12 @@ class FireHolCronTestCase(CustomTestCase):
 
         cronjob.log.error.assert_called()
 
-    @patch("greedybear.cronjobs.firehol.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_run_handles_invalid_ip(self, mock_get):
         # Setup mock response
         mock_response = MagicMock()
-        mock_response.text = "# blocklist_de\n256.1.1.1\n999.999.999.999\n"
+        mock_response.iter_lines.return_value = "# blocklist_de\n256.1.1.1\n999.999.999.999\n".splitlines()
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         # Run the cronjob
@@ -148,11 +155,12 @@ class FireHolCronTestCase(CustomTestCase):
         self.assertFalse(FireHolList.objects.filter(ip_address="256.1.1.1", source="blocklist_de").exists())
         self.assertFalse(FireHolList.objects.filter(ip_address="999.999.999.999", source="blocklist_de").exists())
 
-    @patch("greedybear.cronjobs.firehol.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_run_handles_invalid_cidr(self, mock_get):
         # Setup mock response
         mock_response = MagicMock()
-        mock_response.text = "# blocklist_de\n192.168.1.256/24\n"
+        mock_response.iter_lines.return_value = "# blocklist_de\n192.168.1.256/24\n".splitlines()
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         # Run the cronjob
@@ -185,8 +193,53 @@ class FireHolCronTestCase(CustomTestCase):
         self.assertFalse(FireHolList.objects.filter(id=old_entry.id).exists())
         self.assertTrue(FireHolList.objects.filter(id=new_entry.id).exists())
 
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
+    def test_run_removes_entries_no_longer_listed(self, mock_get):
+        FireHolList.objects.create(ip_address="9.9.9.9", source="greensnow")
+        FireHolList.objects.create(ip_address="3.3.3.3", source="greensnow", added=datetime.now() - timedelta(days=29))
+        mock_response_greensnow = MagicMock()
+        mock_response_greensnow.iter_lines.return_value = "# greensnow\n3.3.3.3\n5.5.5.5".splitlines()
+        mock_response_greensnow.headers = {}
+        mock_get.side_effect = self._firehol_get_side_effect({"greensnow": mock_response_greensnow})
+
+        cronjob = FireHolCron()
+        cronjob.log = MagicMock()
+        cronjob.execute()
+
+        self.assertEqual(set(FireHolList.objects.filter(source="greensnow").values_list("ip_address", flat=True)), {"3.3.3.3", "5.5.5.5"})
+        self.assertGreater(FireHolList.objects.get(ip_address="3.3.3.3").added, datetime.now() - timedelta(days=1))
+
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
+    def test_run_keeps_entries_when_list_is_empty(self, mock_get):
+        FireHolList.objects.create(ip_address="9.9.9.9", source="greensnow")
+        mock_response_greensnow = MagicMock()
+        mock_response_greensnow.iter_lines.return_value = "# greensnow".splitlines()
+        mock_response_greensnow.headers = {}
+        mock_get.side_effect = self._firehol_get_side_effect({"greensnow": mock_response_greensnow})
+
+        cronjob = FireHolCron()
+        cronjob.log = MagicMock()
+        cronjob.execute()
+
+        self.assertTrue(FireHolList.objects.filter(ip_address="9.9.9.9", source="greensnow").exists())
+        cronjob.log.warning.assert_called()
+
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
+    def test_run_skips_unchanged_lists(self, mock_get):
+        FireHolList.objects.create(ip_address="9.9.9.9", source="greensnow", added=datetime.now() - timedelta(days=29))
+        mock_response_greensnow = MagicMock()
+        mock_response_greensnow.status_code = 304
+        mock_get.side_effect = self._firehol_get_side_effect({"greensnow": mock_response_greensnow})
+
+        cronjob = FireHolCron()
+        cronjob.log = MagicMock()
+        cronjob.execute()
+
+        mock_response_greensnow.iter_lines.assert_not_called()
+        self.assertGreater(FireHolList.objects.get(ip_address="9.9.9.9").added, datetime.now() - timedelta(days=1))
+
     def _firehol_get_side_effect(self, side_effect_map):
-        def _side_effect(url, timeout):
+        def _side_effect(url, **kwargs):
             for key, response in side_effect_map.items():
                 if key in url:
                     return response
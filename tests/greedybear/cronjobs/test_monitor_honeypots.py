@@ -1,64 +1,65 @@
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 from greedybear.cronjobs.monitor_honeypots import MonitorHoneypots
+from greedybear.models import Honeypot, HoneypotHitCount
 from tests import CustomTestCase
 
 
 class MonitorHoneypotsTestCase(CustomTestCase):
-    @patch("greedybear.cronjobs.monitor_honeypots.ElasticRepository")
-    def test_run_all_active_honeypots_are_hit(self, mock_elastic_repo_class):
-        # Setup mock responses
+    def _run(self, mock_elastic_repo_class, counts):
         mock_elastic_repo = mock_elastic_repo_class.return_value
-
-        mock_elastic_repo.has_honeypot_been_hit.return_value = True
+        mock_elastic_repo.count_hits_per_honeypot.return_value = counts
         cronjob = MonitorHoneypots(minutes_back=60)
         cronjob.log = MagicMock()
 
-        # Run the cronjob
         cronjob.execute()
 
-        self.assertEqual(mock_elastic_repo.has_honeypot_been_hit.call_count, 4)
-
+        # a single request for all honeypots
+        mock_elastic_repo.count_hits_per_honeypot.assert_called_once()
         info_calls = [call[0][0] for call in cronjob.log.info.call_args_list]
         warning_calls = [call[0][0] for call in cronjob.log.warning.call_args_list]
+        return info_calls, warning_calls
+
+    @patch("greedybear.cronjobs.monitor_honeypots.ElasticRepository")
+    def test_run_all_active_honeypots_are_hit(self, mock_elastic_repo_class):
+        counts = {honeypot.name: 10 for honeypot in Honeypot.objects.filter(active=True)}
+
+        info_calls, warning_calls = self._run(mock_elastic_repo_class, counts)
 
         self.assertEqual(len([msg for msg in info_calls if "logs available" in msg]), 4)
         self.assertEqual(len(warning_calls), 0)
 
     @patch("greedybear.cronjobs.monitor_honeypots.ElasticRepository")
     def test_run_some_active_honeypots_are_hit(self, mock_elastic_repo_class):
-        # Setup mock responses
-        mock_elastic_repo = mock_elastic_repo_class.return_value
-        mock_elastic_repo.has_honeypot_been_hit.side_effect = [True, False, True, False]
-        cronjob = MonitorHoneypots(minutes_back=60)
-        cronjob.log = MagicMock()
+        counts = {"Heralding": 5, "Cowrie": 100, "Ddospot": 7}
 
-        # Run the cronjob
-        cronjob.execute()
-
-        self.assertEqual(mock_elastic_repo.has_honeypot_been_hit.call_count, 4)
-
-        info_calls = [call[0][0] for call in cronjob.log.info.call_args_list]
-        warning_calls = [call[0][0] for call in cronjob.log.warning.call_args_list]
+        info_calls, warning_calls = self._run(mock_elastic_repo_class, counts)
 
         self.assertEqual(len([msg for msg in info_calls if "logs available" in msg]), 2)
         self.assertEqual(len(warning_calls), 2)
 
     @patch("greedybear.cronjobs.monitor_honeypots.ElasticRepository")
     def test_run_no_active_honeypots_are_hit(self, mock_elastic_repo_class):
-        # Setup mock responses
-        mock_elastic_repo = mock_elastic_repo_class.return_value
-        mock_elastic_repo.has_honeypot_been_hit.return_value = False
-        cronjob = MonitorHoneypots(minutes_back=60)
-        cronjob.log = MagicMock()
+        info_calls, warning_calls = self._run(mock_elastic_repo_class, {})
 
-        # Run the cronjob
-        cronjob.execute()
+        self.assertEqual(len([msg for msg in info_calls if "logs available" in msg]), 0)
+        self.assertEqual(len(warning_calls), 4)
 
-        self.assertEqual(mock_elastic_repo.has_honeypot_been_hit.call_count, 4)
+    @patch("greedybear.cronjobs.monitor_honeypots.ElasticRepository")
+    def test_run_stores_counts_of_active_honeypots(self, mock_elastic_repo_class):
+        self._run(mock_elastic_repo_class, {"Heralding": 5, "Cowrie": 100, "Ddospot": 7})
 
-        info_calls = [call[0][0] for call in cronjob.log.info.call_args_list]
-        warning_calls = [call[0][0] for call in cronjob.log.warning.call_args_list]
+        stored = {hit_count.honeypot.name: hit_count for hit_count in HoneypotHitCount.objects.select_related("honeypot")}
+        self.assertEqual({name: hit_count.hits for name, hit_count in stored.items()}, {"Heralding": 5, "Cowrie": 100, "Ciscoasa": 0, "Log4pot": 0})
+        window = stored["Cowrie"].window_end - stored["Cowrie"].window_start
+        self.assertEqual(window, timedelta(minutes=60))
 
-        self.assertEqual(len([msg for msg in info_calls if "logs available" in msg]), 0)
-        self.assertEqual(len(warning_calls), 4)
+    @patch("greedybear.cronjobs.monitor_honeypots.ElasticRepository")
+    def test_run_deletes_expired_counts(self, mock_elastic_repo_class):
+        old_window_end = datetime.now() - timedelta(days=30)
+        HoneypotHitCount.objects.create(honeypot=self.cowrie_hp, window_start=old_window_end - timedelta(hours=1), window_end=old_window_end, hits=1)
+
+        self._run(mock_elastic_repo_class, {})
+
+        self.assertFalse(HoneypotHitCount.objects.filter(window_end=old_window_end).exists())
@@ -0,0 +1,19 @@
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+
+from greedybear.cronjobs.reference_list_reconciliation import ReferenceListReconciliationCron
+
+
+class ReferenceListReconciliationCronTestCase(SimpleTestCase):
+    def test_run_reconciles_changes(self):
+        change_repo = MagicMock()
+        change_repo.reconcile.return_value = (2, 3)
+        cron = ReferenceListReconciliationCron(change_repo=change_repo)
+        cron.log = MagicMock()
+
+        cron.execute()
+
+        change_repo.reconcile.assert_called_once_with()
+        self.assertTrue(cron.success)
+        cron.log.info.assert_any_call("Updated the reputation of 2 and the FireHol categories of 3 IOCs")
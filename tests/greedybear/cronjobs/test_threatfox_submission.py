@@ -0,0 +1,130 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import override_settings
+
+from greedybear.cronjobs import threatfox_submission as threatfox_submission_module
+from greedybear.cronjobs.repositories import ThreatFoxSubmissionRepository
+from greedybear.cronjobs.threatfox_submission import THREATFOX_API_URL, ThreatFoxSubmissionCron
+from greedybear.models import ThreatFoxSubmission
+from tests import CustomTestCase
+
+
+@override_settings(THREATFOX_API_KEY="test-key")
+class ThreatFoxSubmissionCronTestCase(CustomTestCase):
+    def setUp(self):
+        self.repo = ThreatFoxSubmissionRepository()
+        self.session = MagicMock()
+        self.session.post.return_value.status_code = 200
+        self.session.post.return_value.text = '{"query_status": "ok"}'
+        self.session.post.return_value.json.return_value = {"query_status": "ok"}
+        self.cron = ThreatFoxSubmissionCron(session=self.session)
+        self.cron.log = MagicMock()
+
+    def test_submits_urls_grouped_by_honeypots(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh", "http://evil.com/b.sh"])
+        self.repo.enqueue(self.ioc_3, ["http://evil.com/c.sh"])
+
+        self.cron.execute()
+
+        self.assertEqual(self.session.post.call_count, 2)
+        requests_by_urls = {tuple(call.kwargs["json"]["iocs"]): call for call in self.session.post.call_args_list}
+        first = requests_by_urls[("http://evil.com/a.sh", "http://evil.com/b.sh")]
+        self.assertEqual(first.args, (THREATFOX_API_URL,))
+        self.assertEqual(first.kwargs["headers"], {"Auth-Key": "test-key"})
+        self.assertIn("Ciscoasa, Cowrie, Heralding, Log4pot honeypot", first.kwargs["json"]["comment"])
+        second = requests_by_urls[("http://evil.com/c.sh",)]
+        self.assertIn("from Cowrie honeypot", second.kwargs["json"]["comment"])
+        self.assertFalse(ThreatFoxSubmission.objects.filter(submitted__isnull=True).exists())
+
+    def test_submitted_urls_are_not_sent_again(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh"])
+        self.cron.execute()
+        self.repo.enqueue(self.ioc_2, ["http://evil.com/a.sh"])
+
+        self.cron.execute()
+
+        self.session.post.assert_called_once()
+
+    def test_splits_large_batches(self):
+        self.repo.enqueue(self.ioc, [f"http://evil.com/{i}.sh" for i in range(5)])
+
+        with patch.object(threatfox_submission_module, "REQUEST_BATCH_SIZE", 2):
+            self.cron.execute()
+
+        self.assertEqual([len(call.kwargs["json"]["iocs"]) for call in self.session.post.call_args_list], [2, 2, 1])
+
+    def test_failed_request_keeps_submissions_queued(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh"])
+        self.session.post.side_effect = requests.ConnectionError("unreachable")
+
+        self.cron.execute()
+
+        self.assertTrue(self.cron.success)
+        self.assertEqual([submission.url for submission in self.repo.get_pending(10)], ["http://evil.com/a.sh"])
+
+    def test_server_error_keeps_submissions_queued(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh"])
+        self.repo.enqueue(self.ioc_3, ["http://evil.com/c.sh"])
+        for status_code in (503, 429):
+            self.session.post.reset_mock()
+            self.session.post.return_value.status_code = status_code
+            self.session.post.return_value.raise_for_status.side_effect = requests.HTTPError(str(status_code))
+
+            self.cron.execute()
+
+            self.session.post.assert_called_once()
+            self.assertEqual(len(self.repo.get_pending(10)), 2)
+
+    def _respond(self, rejected_urls, status_code=200):
+        """Let the mocked ThreatFox refuse every request that contains one of the rejected URLs."""
+
+        def post(url, headers, json, timeout):
+            response = MagicMock()
+            response.text = ""
+            if set(json["iocs"]) & set(rejected_urls):
+                response.status_code = status_code
+                response.json.return_value = {"query_status": "illegal_ioc"}
+            else:
+                response.status_code = 200
+                response.json.return_value = {"query_status": "ok"}
+            return response
+
+        self.session.post.side_effect = post
+
+    def test_refused_urls_are_rejected_without_blocking_the_queue(self):
+        for status_code in (200, 400):
+            with self.subTest(status_code=status_code):
+                ThreatFoxSubmission.objects.all().delete()
+                self.repo.enqueue(self.ioc, ["http://evil.com/a.sh", "bad url", "http://evil.com/b.sh"])
+                self._respond(["bad url"], status_code)
+
+                self.cron.execute()
+
+                self.assertEqual(self.repo.get_pending(10), [])
+                self.assertEqual(
+                    set(ThreatFoxSubmission.objects.filter(submitted__isnull=False).values_list("url", flat=True)),
+                    {"http://evil.com/a.sh", "http://evil.com/b.sh"},
+                )
+                rejected = ThreatFoxSubmission.objects.get(url="bad url")
+                self.assertIsNone(rejected.submitted)
+                self.assertTrue(rejected.error.startswith("HTTP 400" if status_code == 400 else "query_status illegal_ioc"))
+
+    def test_rejected_urls_are_not_sent_again(self):
+        self.repo.enqueue(self.ioc, ["bad url"])
+        self._respond(["bad url"])
+        self.cron.execute()
+        self.session.post.reset_mock()
+
+        self.cron.execute()
+
+        self.session.post.assert_not_called()
+
+    @override_settings(THREATFOX_API_KEY="")
+    def test_skips_without_api_key(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh"])
+
+        self.cron.execute()
+
+        self.session.post.assert_not_called()
+        self.cron.log.warning.assert_called_once_with("Threatfox API Key not available")
@@ -1,19 +1,25 @@
-from datetime import datetime
+import random
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
 from django.test import SimpleTestCase, override_settings
 
 from greedybear.cronjobs.bucket_cleanup import TrendingBucketCleanupCron
-from greedybear.cronjobs.extraction.bucket_updater import BucketUpdater
+from greedybear.cronjobs.extraction.bucket_updater import BucketUpdater, _bucket_start, _hour_start
 from greedybear.cronjobs.repositories.trending_bucket import TrendingBucketRepository
 from greedybear.cronjobs.trending import (
+    _rank_map,
+    _top_counts,
     attacker_sort_tuple,
     build_ranked_attackers,
+    daily_window_spans,
     growth_score,
     rank_delta,
+    trending_window_spans,
+    trending_windows,
     validate_window_minutes,
 )
-from greedybear.models import AttackerActivityBucket
+from greedybear.models import AttackerActivityBucket, AttackerActivityDailyBucket, AttackerWindowCount, Sensor, SensorActivityBucket, TrendingWindow
 from tests import CustomTestCase
 
 
@@ -46,6 +52,48 @@ class TrendingHelpersTestCase(SimpleTestCase):
         self.assertIn("9.9.9.9", returned_ips)
         self.assertEqual(next(entry for entry in ranked if entry["attacker_ip"] == "9.9.9.9")["current_rank"], None)
 
+    def test_build_ranked_attackers_matches_full_sort_ranks(self):
+        rng = random.Random(31)
+        for _ in range(20):
+            current_counts = {f"10.0.{i // 256}.{i % 256}": rng.randint(1, 20) for i in rng.sample(range(1000), 300)}
+            previous_counts = {f"10.0.{i // 256}.{i % 256}": rng.randint(1, 20) for i in rng.sample(range(1000), 300)}
+            limit = rng.randint(1, 50)
+
+            full_current = sorted(current_counts.items(), key=lambda item: (-item[1], item[0]))
+            full_previous = sorted(previous_counts.items(), key=lambda item: (-item[1], item[0]))
+            current_ranks = {ip: rank for rank, (ip, _) in enumerate(full_current, start=1)}
+            previous_ranks = {ip: rank for rank, (ip, _) in enumerate(full_previous, start=1)}
+
+            ranked = build_ranked_attackers(current_counts, previous_counts, limit)
+
+            self.assertEqual(len(ranked), limit)
+            self.assertEqual(ranked[0]["attacker_ip"], full_current[0][0])
+            for entry in ranked:
+                self.assertEqual(entry["current_rank"], current_ranks.get(entry["attacker_ip"]))
+                self.assertEqual(entry["previous_rank"], previous_ranks.get(entry["attacker_ip"]))
+
+    def test_build_ranked_attackers_breaks_count_ties_by_ip(self):
+        ranked = build_ranked_attackers({"2.2.2.2": 5, "1.1.1.1": 5, "3.3.3.3": 1}, {}, limit=2)
+
+        self.assertEqual([entry["attacker_ip"] for entry in ranked], ["1.1.1.1", "2.2.2.2"])
+        self.assertEqual([entry["current_rank"] for entry in ranked], [1, 2])
+
+    def test_rank_map_ranks_candidates_outside_top(self):
+        counts = {"1.1.1.1": 10, "2.2.2.2": 9, "3.3.3.3": 9, "4.4.4.4": 1}
+        top_counts = _top_counts(counts, 1)
+
+        ranks = _rank_map(counts, top_counts, {"3.3.3.3", "4.4.4.4", "9.9.9.9"})
+
+        self.assertEqual(ranks, {"1.1.1.1": 1, "3.3.3.3": 3, "4.4.4.4": 4})
+
+    def test_trending_windows_respect_max_window(self):
+        self.assertEqual(trending_windows(24 * 60), {"1h": 1, "6h": 6, "24h": 24})
+        self.assertEqual(trending_window_spans(24 * 60), [1, 2, 6, 12, 24, 48])
+
+    def test_daily_window_spans_cover_multi_day_windows(self):
+        self.assertEqual(daily_window_spans(24 * 60), [])
+        self.assertEqual(daily_window_spans(24 * 7 * 60), [168, 336])
+
 
 class ValidateWindowMinutesTestCase(SimpleTestCase):
     def test_validate_window_minutes_returns_valid_value(self):
@@ -122,6 +170,14 @@ class UpdateActivityBucketsFromHitsTestCase(CustomTestCase):
         self.assertEqual(unique_keys, 0)
         self.assertEqual(AttackerActivityBucket.objects.count(), 0)
 
+    def test_bucket_start_uses_hour_prefix_of_timestamp(self):
+        _hour_start.cache_clear()
+        self.assertEqual(_bucket_start("2026-03-20T09:15:00.123Z"), datetime(2026, 3, 20, 9, 0))
+        self.assertEqual(_bucket_start("2026-03-20T09:59:59+02:00"), datetime(2026, 3, 20, 9, 0))
+        self.assertEqual(_bucket_start("2026-03-20 09:05:00"), datetime(2026, 3, 20, 9, 0))
+        self.assertEqual(_bucket_start("2026-03-20"), datetime(2026, 3, 20, 0, 0))
+        self.assertEqual(_hour_start.cache_info().hits, 1)
+
     def test_non_global_ip_hits_are_ignored(self):
         bu = BucketUpdater()
         bu.collect_hits(
@@ -184,6 +240,51 @@ class UpdateActivityBucketsFromHitsTestCase(CustomTestCase):
         self.assertEqual(unique_keys, 0)
         mock_upsert.assert_called_once()
 
+    @override_settings(TRENDING_MAX_WINDOW_MINUTES=60)
+    def test_update_adds_counts_to_rolling_windows(self):
+        now = datetime.now().replace(minute=0, second=0, microsecond=0)
+        bu = BucketUpdater()
+        bu.collect_hits(
+            [
+                {"src_ip": "1.1.1.1", "type": "cowrie", "@timestamp": now.isoformat()},
+                {"src_ip": "1.1.1.1", "type": "cowrie", "@timestamp": now.isoformat()},
+                {"src_ip": "2.2.2.2", "type": "cowrie", "@timestamp": (now - timedelta(hours=1)).isoformat()},
+            ]
+        )
+        bu.update()
+
+        self.assertEqual(set(TrendingWindow.objects.values_list("span_hours", flat=True)), {1, 2})
+        one_hour = {row.attacker_ip: row.interaction_count for row in AttackerWindowCount.objects.filter(window__span_hours=1)}
+        two_hours = {row.attacker_ip: row.interaction_count for row in AttackerWindowCount.objects.filter(window__span_hours=2)}
+        self.assertEqual(one_hour, {"1.1.1.1": 2})
+        self.assertEqual(two_hours, {"1.1.1.1": 2, "2.2.2.2": 1})
+
+    def test_update_counts_hits_per_sensor(self):
+        sensor = Sensor.objects.create(address="192.0.2.10")
+        bu = BucketUpdater()
+        bu.collect_sensor_hits(
+            [
+                {"src_ip": "8.8.8.8", "type": "Cowrie", "@timestamp": "2026-03-20T09:15:00", "_sensor": sensor},
+                # hits from non-global addresses still reached the sensor
+                {"src_ip": "10.0.0.1", "type": "cowrie", "@timestamp": "2026-03-20T09:30:00", "_sensor": sensor},
+                {"src_ip": "8.8.8.8", "type": "cowrie", "@timestamp": "2026-03-20T10:15:00", "_sensor": sensor},
+                {"src_ip": "8.8.8.8", "type": "cowrie", "@timestamp": "2026-03-20T10:15:00"},
+                {"src_ip": "8.8.8.8", "type": "cowrie", "@timestamp": "not-a-timestamp", "_sensor": sensor},
+            ]
+        )
+        bu.update()
+
+        counts = dict(SensorActivityBucket.objects.filter(sensor=sensor, feed_type="cowrie").values_list("bucket_start", "hit_count"))
+        self.assertEqual(counts, {datetime(2026, 3, 20, 9, 0): 2, datetime(2026, 3, 20, 10, 0): 1})
+        self.assertEqual(bu.sensor_counters, {})
+        # sensor hits do not count as attacker interactions
+        self.assertFalse(AttackerActivityBucket.objects.exists())
+
+    @override_settings(TRENDING_MAX_WINDOW_MINUTES=60)
+    def test_update_without_hits_still_advances_windows(self):
+        self.assertEqual(BucketUpdater().update(), 0)
+        self.assertEqual(TrendingWindow.objects.exclude(window_end=None).count(), 2)
+
 
 class TrendingBucketCleanupCronTestCase(CustomTestCase):
     def setUp(self):
@@ -218,6 +319,62 @@ class TrendingBucketCleanupCronTestCase(CustomTestCase):
         self.assertFalse(AttackerActivityBucket.objects.filter(attacker_ip="2.2.2.2").exists())
         self.assertTrue(AttackerActivityBucket.objects.filter(attacker_ip="3.3.3.3").exists())
 
+    @override_settings(
+        TRENDING_BUCKET_RETENTION_HOURS=48,
+        TRENDING_MAX_WINDOW_MINUTES=60,
+    )
+    def test_run_creates_partitions_ahead_and_drops_expired_partitions(self):
+        repository = TrendingBucketRepository()
+        repository.create_partitions(datetime(2026, 3, 15).date(), datetime(2026, 3, 16).date())
+
+        with patch("greedybear.cronjobs.bucket_cleanup.timezone.now", return_value=datetime(2026, 3, 20, 10, 30, 0)):
+            self.cron.run()
+
+        partition_days = [day for day in repository.get_partitions() if day.year == 2026 and day.month == 3]
+        self.assertEqual(min(partition_days), datetime(2026, 3, 18).date())
+        self.assertEqual(max(partition_days), datetime(2026, 3, 27).date())
+
+    @override_settings(
+        TRENDING_BUCKET_RETENTION_HOURS=48,
+        TRENDING_DAILY_BUCKET_RETENTION_DAYS=14,
+        TRENDING_MAX_WINDOW_MINUTES=24 * 7 * 60,
+    )
+    def test_run_applies_daily_bucket_retention_cleanup(self):
+        AttackerActivityBucket.objects.create(attacker_ip="2.2.2.2", feed_type="cowrie", bucket_start=datetime(2026, 3, 17, 9, 0), interaction_count=1)
+        AttackerActivityDailyBucket.objects.create(attacker_ip="2.2.2.2", feed_type="cowrie", bucket_date=datetime(2026, 3, 17).date(), interaction_count=1)
+        AttackerActivityDailyBucket.objects.create(attacker_ip="3.3.3.3", feed_type="cowrie", bucket_date=datetime(2026, 3, 5).date(), interaction_count=1)
+
+        with patch("greedybear.cronjobs.bucket_cleanup.timezone.now", return_value=datetime(2026, 3, 20, 10, 30, 0)):
+            self.cron.run()
+
+        self.assertFalse(AttackerActivityBucket.objects.exists())
+        self.assertEqual(list(AttackerActivityDailyBucket.objects.values_list("attacker_ip", flat=True)), ["2.2.2.2"])
+
+    @override_settings(
+        TRENDING_BUCKET_RETENTION_HOURS=48,
+        TRENDING_DAILY_BUCKET_RETENTION_DAYS=14,
+        TRENDING_MAX_WINDOW_MINUTES=24 * 7 * 60,
+    )
+    def test_run_applies_sensor_bucket_retention_cleanup(self):
+        sensor = Sensor.objects.create(address="192.0.2.10")
+        SensorActivityBucket.objects.create(sensor=sensor, feed_type="cowrie", bucket_start=datetime(2026, 3, 17, 9, 0), hit_count=1)
+        SensorActivityBucket.objects.create(sensor=sensor, feed_type="cowrie", bucket_start=datetime(2026, 3, 5, 9, 0), hit_count=1)
+
+        with patch("greedybear.cronjobs.bucket_cleanup.timezone.now", return_value=datetime(2026, 3, 20, 10, 30, 0)):
+            self.cron.run()
+
+        self.assertEqual(list(SensorActivityBucket.objects.values_list("bucket_start", flat=True)), [datetime(2026, 3, 17, 9, 0)])
+
+    @override_settings(
+        TRENDING_BUCKET_RETENTION_HOURS=48,
+        TRENDING_DAILY_BUCKET_RETENTION_DAYS=13,
+        TRENDING_MAX_WINDOW_MINUTES=24 * 7 * 60,
+    )
+    def test_run_raises_when_daily_retention_cannot_cover_two_windows(self):
+        with patch("greedybear.cronjobs.bucket_cleanup.timezone.now", return_value=datetime(2026, 3, 20, 10, 30, 0)):
+            with self.assertRaisesMessage(ValueError, "TRENDING_DAILY_BUCKET_RETENTION_DAYS must retain at least two windows"):
+                self.cron.run()
+
     @override_settings(
         TRENDING_BUCKET_RETENTION_HOURS=0,
     )
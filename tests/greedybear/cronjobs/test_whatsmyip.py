@@ -13,12 +13,13 @@ from tests import CustomTestCase
 class WhatsMyIPTestCase(CustomTestCase):
     """Test WhatsMyIPCron cronjob"""
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_add_new_domains(self, mock_get):
         """Test adding new domains from MISP warning list"""
         # Mock the HTTP response
         mock_response = MagicMock()
         mock_response.json.return_value = {"list": ["test-domain-1.com", "test-domain-2.com"]}
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         # Run the cronjob
@@ -30,7 +31,7 @@ class WhatsMyIPTestCase(CustomTestCase):
         self.assertTrue(WhatsMyIPDomain.objects.filter(domain="test-domain-1.com").exists())
         self.assertTrue(WhatsMyIPDomain.objects.filter(domain="test-domain-2.com").exists())
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_skip_existing_domains(self, mock_get):
         """Test that existing domains are skipped"""
         # Add an existing domain
@@ -39,6 +40,7 @@ class WhatsMyIPTestCase(CustomTestCase):
         # Mock the HTTP response with existing and new domains
         mock_response = MagicMock()
         mock_response.json.return_value = {"list": ["existing-domain.com", "new-domain.com"]}
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         # Run the cronjob
@@ -50,7 +52,7 @@ class WhatsMyIPTestCase(CustomTestCase):
         self.assertEqual(WhatsMyIPDomain.objects.get(domain="existing-domain.com").id, existing_domain.id)
         self.assertTrue(WhatsMyIPDomain.objects.filter(domain="new-domain.com").exists())
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_remove_old_ioc_records(self, mock_get):
         """Test that old IOC records are cleaned up"""
         # Create an IOC record for a domain
@@ -60,6 +62,7 @@ class WhatsMyIPTestCase(CustomTestCase):
         # Mock the HTTP response
         mock_response = MagicMock()
         mock_response.json.return_value = {"list": [domain_name]}
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         # Run the cronjob
@@ -70,12 +73,13 @@ class WhatsMyIPTestCase(CustomTestCase):
         self.assertFalse(IOC.objects.filter(id=ioc.id).exists())
         self.assertTrue(WhatsMyIPDomain.objects.filter(domain=domain_name).exists())
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_handle_missing_ioc_gracefully(self, mock_get):
         """Test that missing IOC records don't cause errors"""
         # Mock the HTTP response
         mock_response = MagicMock()
         mock_response.json.return_value = {"list": ["domain-with-no-ioc.com"]}
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         # Run the cronjob - should not raise exception
@@ -85,12 +89,13 @@ class WhatsMyIPTestCase(CustomTestCase):
         # Verify domain was added
         self.assertTrue(WhatsMyIPDomain.objects.filter(domain="domain-with-no-ioc.com").exists())
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_empty_domain_list(self, mock_get):
         """Test handling of empty domain list"""
         # Mock the HTTP response with empty list
         mock_response = MagicMock()
         mock_response.json.return_value = {"list": []}
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         # Run the cronjob
@@ -100,12 +105,13 @@ class WhatsMyIPTestCase(CustomTestCase):
         # Verify no domains were added
         self.assertEqual(WhatsMyIPDomain.objects.count(), 0)
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_http_request_parameters(self, mock_get):
         """Test that HTTP request is made with correct parameters"""
         # Mock the HTTP response
         mock_response = MagicMock()
         mock_response.json.return_value = {"list": []}
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         # Run the cronjob
@@ -121,7 +127,7 @@ class WhatsMyIPTestCase(CustomTestCase):
         )
         self.assertEqual(call_args[1]["timeout"], 10)
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_raises_on_http_error(self, mock_get):
         """Test that HTTP errors (4xx/5xx) are raised instead of silently ignored."""
         mock_response = MagicMock()
@@ -134,7 +140,7 @@ class WhatsMyIPTestCase(CustomTestCase):
 
         self.assertEqual(WhatsMyIPDomain.objects.count(), 0)
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_raises_on_network_error(self, mock_get):
         """Test that network errors (DNS failure, timeout) are raised."""
         mock_get.side_effect = requests.exceptions.ConnectionError("DNS resolution failed")
@@ -145,7 +151,7 @@ class WhatsMyIPTestCase(CustomTestCase):
 
         self.assertEqual(WhatsMyIPDomain.objects.count(), 0)
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_raises_on_invalid_json(self, mock_get):
         """Test that non-JSON responses raise an error."""
         mock_response = MagicMock()
@@ -159,12 +165,13 @@ class WhatsMyIPTestCase(CustomTestCase):
 
         self.assertEqual(WhatsMyIPDomain.objects.count(), 0)
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_raises_on_missing_list_key(self, mock_get):
         """Test that a JSON response missing the 'list' key raises KeyError."""
         mock_response = MagicMock()
         mock_response.raise_for_status.return_value = None
         mock_response.json.return_value = {"unexpected_key": ["domain.com"]}
+        mock_response.headers = {}
         mock_get.return_value = mock_response
 
         cron = whatsmyip.WhatsMyIPCron()
@@ -173,7 +180,7 @@ class WhatsMyIPTestCase(CustomTestCase):
 
         self.assertEqual(WhatsMyIPDomain.objects.count(), 0)
 
-    @patch("greedybear.cronjobs.whatsmyip.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_execute_raises_on_http_error(self, mock_get):
         """Test that base class execute() propagates HTTP errors"""
         mock_response = MagicMock()
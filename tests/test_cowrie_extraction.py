@@ -3,7 +3,8 @@ Tests for Cowrie extraction helper functions and strategy.
 """
 
 from datetime import datetime
-from unittest.mock import MagicMock, Mock, patch
+from hashlib import sha256
+from unittest.mock import Mock, patch
 
 from django.test import override_settings
 
@@ -13,7 +14,7 @@ from greedybear.cronjobs.extraction.strategies.cowrie import (
     normalize_credential_field,
     parse_url_hostname,
 )
-from greedybear.models import CommandSequence
+from greedybear.models import IOC, CommandSequence, CowrieSession
 from tests import ExtractionTestCase
 
 
@@ -100,12 +101,14 @@ class TestCowrieExtractionStrategy(ExtractionTestCase):
         self.mock_ioc_repo = Mock()
         self.mock_sensor_repo = Mock()
         self.mock_session_repo = Mock()
+        self.mock_credential_repo = Mock()
 
         self.strategy = CowrieExtractionStrategy(
             "Cowrie",
             self.mock_ioc_repo,
             self.mock_sensor_repo,
             self.mock_session_repo,
+            self.mock_credential_repo,
         )
         self.strategy.ioc_processor = Mock()
 
@@ -260,7 +263,26 @@ class TestCowrieExtractionStrategy(ExtractionTestCase):
         self.strategy._process_session_hit(session_record, hit, ioc)
 
         self.assertTrue(session_record.login_attempt)
-        self.mock_session_repo.add_credential.assert_called_once_with(session_record, "root", "password123")
+        key = ("root", "password123", "")
+        self.assertEqual(self.strategy.credential_sources, {key: {session_record.source.pk}})
+        self.assertEqual(self.strategy.credential_sessions, {key: {session_record.session_id}})
+        self.mock_credential_repo.add_credentials.assert_not_called()
+
+    def test_save_credentials(self):
+        """Test that the credentials of all sessions are stored in one repository call."""
+        key = ("root", "password123", "")
+        self.strategy.credential_sources[key].update({1, 2})
+        self.strategy.credential_sessions[key].update({11, 22})
+
+        self.strategy._save_credentials()
+
+        self.mock_credential_repo.add_credentials.assert_called_once_with({key: {1, 2}}, {key: {11, 22}})
+        self.assertEqual(self.strategy.credential_sessions, {})
+
+    def test_save_credentials_without_credentials(self):
+        self.strategy._save_credentials()
+
+        self.mock_credential_repo.add_credentials.assert_not_called()
 
     def test_process_session_hit_command_input(self):
         """Test processing of command input event."""
@@ -369,59 +391,91 @@ class TestCowrieExtractionStrategy(ExtractionTestCase):
         self.mock_session_repo.get_or_create_file_transfer.assert_not_called()
         self.assertEqual(session_record.interaction_count, 1)
 
-    def test_add_fks_both_exist(self):
-        """Test linking IOCs when both exist."""
-        scanner_mock = MagicMock()
-        hostname_mock = MagicMock()
+    def test_add_fks_queues_pair_once(self):
+        """Test that linking IOCs is deferred and deduplicated."""
+        self.strategy._add_fks("1.2.3.4", "evil.com")
+        self.strategy._add_fks("1.2.3.4", "evil.com")
 
-        self.mock_ioc_repo.get_ioc_by_name.side_effect = [scanner_mock, hostname_mock]
+        self.assertEqual(self.strategy.related_ioc_pairs, {("1.2.3.4", "evil.com")})
+        self.mock_ioc_repo.get_ioc_by_name.assert_not_called()
+        self.mock_ioc_repo.link_related_iocs.assert_not_called()
 
+    def test_link_related_iocs(self):
+        """Test that queued pairs are linked in one repository call."""
         self.strategy._add_fks("1.2.3.4", "evil.com")
+        self.strategy._add_fks("5.6.7.8", "evil.com")
 
-        scanner_mock.related_ioc.add.assert_called_once_with(hostname_mock)
-        hostname_mock.related_ioc.add.assert_called_once_with(scanner_mock)
-        self.assertEqual(self.mock_ioc_repo.save.call_count, 0)
+        self.strategy._link_related_iocs()
 
-    def test_add_fks_scanner_none(self):
-        """Test linking when scanner IOC doesn't exist."""
-        hostname_mock = MagicMock()
+        self.mock_ioc_repo.link_related_iocs.assert_called_once_with({("1.2.3.4", "evil.com"), ("5.6.7.8", "evil.com")})
+        self.assertEqual(self.strategy.related_ioc_pairs, set())
 
-        self.mock_ioc_repo.get_ioc_by_name.side_effect = [None, hostname_mock]
+    def test_link_related_iocs_without_pairs(self):
+        """Test that nothing is linked when no pairs were queued."""
+        self.strategy._link_related_iocs()
 
-        self.strategy._add_fks("1.2.3.4", "evil.com")
+        self.mock_ioc_repo.link_related_iocs.assert_not_called()
+
+    def test_get_sessions_defers_sessions_with_commands(self):
+        """Test that sessions with commands are saved with the command sequences of the chunk."""
+        ioc = Mock()
+        ioc.name = "1.2.3.4"
+        with_commands = CowrieSession(session_id=1, source=IOC(name="1.2.3.4"))
+        without_commands = CowrieSession(session_id=2, source=IOC(name="1.2.3.4"))
+        self.mock_session_repo.get_or_create_session.side_effect = [with_commands, without_commands]
+        hits = [
+            {"src_ip": "1.2.3.4", "session": "1", "eventid": "cowrie.command.input", "timestamp": "2023-01-01T10:00:05", "message": "CMD: ls"},
+            {"src_ip": "1.2.3.4", "session": "1", "eventid": "cowrie.command.input", "timestamp": "2023-01-01T10:00:06", "message": "CMD: pwd"},
+            {"src_ip": "1.2.3.4", "session": "2", "eventid": "cowrie.session.connect", "timestamp": "2023-01-01T10:00:05"},
+        ]
 
-        # Should not save anything (early return when either is None)
-        self.mock_ioc_repo.save.assert_not_called()
+        self.strategy._get_sessions(ioc, hits)
 
-    def test_deduplicate_command_sequence_new(self):
-        """Test command sequence deduplication for new sequence."""
-        session = Mock()
-        session.commands = Mock()
-        session.commands.commands = ["ls", "pwd", "whoami"]
+        self.mock_session_repo.save_session.assert_called_once_with(without_commands)
+        self.assertEqual(self.strategy.command_sessions, [with_commands])
+        self.assertEqual(with_commands.commands.commands_hash, sha256(b"ls\npwd").hexdigest())
 
-        self.mock_session_repo.get_command_sequence_by_hash.return_value = None
+    def test_save_command_sequences(self):
+        """Test that the command sequences of all sessions are stored in one repository call."""
+        sessions = []
+        for session_id, commands_hash in enumerate(["a" * 64, "b" * 64, "a" * 64]):
+            session = CowrieSession(session_id=session_id, source=IOC(name="1.2.3.4"))
+            session.commands = CommandSequence(commands=["ls"], commands_hash=commands_hash)
+            sessions.append(session)
+        self.strategy.command_sessions = list(sessions)
+        self.mock_session_repo.save_command_sequences.return_value = {"a" * 64: 7, "b" * 64: 8}
 
-        result = self.strategy._deduplicate_command_sequence(session)
+        self.strategy._save_command_sequences()
 
-        self.assertFalse(result)
-        self.assertIsNotNone(session.commands.commands_hash)
+        self.mock_session_repo.save_command_sequences.assert_called_once()
+        self.assertEqual(list(self.mock_session_repo.save_command_sequences.call_args.args[0]), [session.commands for session in sessions])
+        self.assertEqual([session.commands.pk for session in sessions], [7, 8, 7])
+        self.assertEqual(self.mock_session_repo.save_session.call_count, 3)
+        self.assertEqual(self.strategy.command_sessions, [])
 
-    def test_deduplicate_command_sequence_existing(self):
-        """Test command sequence deduplication for existing sequence."""
-        session = Mock()
-        session.commands = Mock()
-        session.commands.commands = ["ls", "pwd", "whoami"]
-        session.commands.last_seen = datetime(2023, 1, 1, 10, 0, 10)
+    def test_save_command_sequences_without_sessions(self):
+        self.strategy._save_command_sequences()
 
-        existing_cmd_seq = Mock()
-        self.mock_session_repo.get_command_sequence_by_hash.return_value = existing_cmd_seq
+        self.mock_session_repo.save_command_sequences.assert_not_called()
+
+    @patch("greedybear.cronjobs.extraction.strategies.cowrie.iocs_from_hits")
+    def test_extract_from_hits_stores_deferred_work_on_error(self, mock_iocs_from_hits):
+        """Test that sessions, links and credentials collected before a failing IOC are stored."""
+        session = CowrieSession(session_id=1, source=IOC(name="1.2.3.4"))
+        session.commands = CommandSequence(commands=["ls"], commands_hash="a" * 64)
+        self.strategy.command_sessions = [session]
+        self.strategy._add_fks("1.2.3.4", "evil.com")
+        self.strategy.credential_sources[("root", "root", "")].add(1)
+        self.strategy.credential_sessions[("root", "root", "")].add(1)
+        self.mock_session_repo.save_command_sequences.return_value = {"a" * 64: 7}
+        mock_iocs_from_hits.side_effect = RuntimeError("broken IOC")
 
-        result = self.strategy._deduplicate_command_sequence(session)
+        with self.assertRaises(RuntimeError):
+            self.strategy.extract_from_hits([])
 
-        self.assertTrue(result)
-        self.assertEqual(session.commands, existing_cmd_seq)
-        self.assertIsInstance(session.commands.last_seen, datetime)
-        self.assertIsNone(session.commands.last_seen.tzinfo)
+        self.mock_session_repo.save_session.assert_called_once_with(session)
+        self.mock_ioc_repo.link_related_iocs.assert_called_once_with({("1.2.3.4", "evil.com")})
+        self.mock_credential_repo.add_credentials.assert_called_once()
 
     def test_start_time_is_naive_datetime_not_string(self):
         """Regression: parse_timestamp() must be called so that timezone-aware
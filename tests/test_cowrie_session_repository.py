@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from django.db import IntegrityError
 
 from greedybear.cronjobs.repositories import CowrieSessionRepository
-from greedybear.models import IOC, CommandSequence, CowrieFileTransfer, CowrieSession, Credential
+from greedybear.models import IOC, CommandSequence, CowrieFileTransfer, CowrieSession
 
 from . import CustomTestCase
 
@@ -61,32 +61,60 @@ class TestCowrieSessionRepository(CustomTestCase):
             original_interaction_count,
         )
 
-    def test_get_command_sequence_by_hash_returns_existing(self):
-        existing = self.command_sequence
-        result = self.repo.get_command_sequence_by_hash(existing.commands_hash)
-        self.assertIsNotNone(result)
-        self.assertEqual(result.pk, existing.pk)
-        self.assertEqual(result.commands_hash, existing.commands_hash)
+    def test_save_command_sequences_creates_new(self):
+        cmd_seq = CommandSequence(commands=["ls", "pwd", "whoami"], commands_hash="def456", first_seen=datetime(2025, 1, 1), last_seen=datetime(2025, 1, 2))
+
+        ids = self.repo.save_command_sequences([cmd_seq])
 
-    def test_get_command_sequence_by_hash_returns_none_for_missing(self):
-        result = self.repo.get_command_sequence_by_hash("nonexistent")
-        self.assertIsNone(result)
+        stored = CommandSequence.objects.get(commands_hash="def456")
+        self.assertEqual(ids, {"def456": stored.pk})
+        self.assertEqual(stored.commands, ["ls", "pwd", "whoami"])
+        self.assertEqual(stored.first_seen, datetime(2025, 1, 1))
+        self.assertEqual(stored.last_seen, datetime(2025, 1, 2))
 
-    def test_save_command_sequence_persists_to_database(self):
-        cmd_seq = CommandSequence(
-            commands=["ls", "pwd", "whoami"],
-            commands_hash="def456",
+    def test_save_command_sequences_extends_existing(self):
+        existing = self.command_sequence
+        later = CommandSequence(
+            commands=existing.commands, commands_hash=existing.commands_hash, first_seen=existing.first_seen, last_seen=existing.last_seen + timedelta(days=1)
+        )
+        earlier = CommandSequence(
+            commands=["ignored"], commands_hash=existing.commands_hash, first_seen=existing.first_seen - timedelta(days=1), last_seen=existing.first_seen
         )
-        result = self.repo.save_command_sequence(cmd_seq)
-        self.assertIsNotNone(result.pk)
-        self.assertTrue(CommandSequence.objects.filter(commands_hash="def456").exists())
 
-    def test_save_command_sequence_updates_existing(self):
+        ids = self.repo.save_command_sequences([later, earlier])
+
+        self.assertEqual(ids, {existing.commands_hash: existing.pk})
+        stored = CommandSequence.objects.get(pk=existing.pk)
+        self.assertEqual(stored.commands, existing.commands)
+        self.assertEqual(stored.cluster, existing.cluster)
+        self.assertEqual(stored.first_seen, existing.first_seen - timedelta(days=1))
+        self.assertEqual(stored.last_seen, existing.last_seen + timedelta(days=1))
+        self.assertGreater(stored.updated, existing.updated)
+
+    def test_save_command_sequences_keeps_later_last_seen(self):
         existing = self.command_sequence
-        existing.last_seen = datetime(2025, 1, 2)
-        self.repo.save_command_sequence(existing)
-        updated = CommandSequence.objects.get(commands_hash=existing.commands_hash)
-        self.assertEqual(updated.last_seen.date(), datetime(2025, 1, 2).date())
+        older = CommandSequence(commands=existing.commands, commands_hash=existing.commands_hash, first_seen=existing.first_seen, last_seen=existing.first_seen)
+
+        self.repo.save_command_sequences([older])
+
+        self.assertEqual(CommandSequence.objects.get(pk=existing.pk).last_seen, existing.last_seen)
+
+    def test_save_command_sequences_skips_stored_time_range(self):
+        cmd_seq = CommandSequence(commands=["ls"], commands_hash="def456", first_seen=datetime(2025, 1, 1), last_seen=datetime(2025, 1, 3))
+        ids = self.repo.save_command_sequences([cmd_seq])
+        replay = CommandSequence(commands=["ls"], commands_hash="def456", first_seen=datetime(2025, 1, 2), last_seen=datetime(2025, 1, 2))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.repo.save_command_sequences([replay]), ids)
+
+        newer = CommandSequence(commands=["ls"], commands_hash="def456", first_seen=datetime(2025, 1, 4), last_seen=datetime(2025, 1, 4))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.repo.save_command_sequences([newer]), ids)
+        self.assertEqual(CommandSequence.objects.get(commands_hash="def456").last_seen, datetime(2025, 1, 4))
+
+    def test_save_command_sequences_empty(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.repo.save_command_sequences([]), {})
 
     def test_get_or_create_session_with_hex_session_id(self):
         session_id = "abc123"
@@ -146,30 +174,6 @@ class TestCowrieSessionRepository(CustomTestCase):
             1,
         )
 
-    def test_add_credential_uses_default_protocol_variant(self):
-        session = self.cowrie_session
-
-        self.repo.add_credential(session, username="root", password="root")
-
-        credential = Credential.objects.get(username="root", password="root", protocol="")
-        self.assertTrue(session.credentials.filter(pk=credential.pk).exists())
-
-    def test_add_credential_protocol_none_maps_to_default_protocol(self):
-        session = self.cowrie_session
-
-        self.repo.add_credential(session, username="admin", password="admin", protocol=None)
-
-        self.assertTrue(Credential.objects.filter(username="admin", password="admin", protocol="").exists())
-
-    def test_add_credential_does_not_raise_with_protocol_variants_present(self):
-        session = self.cowrie_session
-        Credential.objects.get_or_create(username="root", password="root", protocol="ssh")
-
-        self.repo.add_credential(session, username="root", password="root")
-
-        default_credential = Credential.objects.get(username="root", password="root", protocol="")
-        self.assertTrue(session.credentials.filter(pk=default_credential.pk).exists())
-
 
 class TestCowrieSessionRepositoryCleanup(CustomTestCase):
     """Tests for cleanup-related methods in CowrieSessionRepository."""
@@ -241,58 +245,3 @@ class TestCowrieSessionRepositoryCleanup(CustomTestCase):
         self.assertEqual(deleted_count, 1)
         self.assertFalse(CowrieSession.objects.filter(session_id=777).exists())
         self.assertTrue(CowrieSession.objects.filter(session_id=888).exists())
-
-
-class CredentialReuseTestCase(CustomTestCase):
-    def setUp(self):
-        self.repo = CowrieSessionRepository()
-        # counter for generating unique session_ids
-        self._session_counter = 1000
-
-    def create_cowrie_session(self, source_ip: str, session_id=None):
-        """Helper to create a CowrieSession with a unique session_id."""
-        source_ioc, _ = IOC.objects.get_or_create(name=source_ip, defaults={"type": "ip"})
-        if session_id is None:
-            session_id = self._session_counter
-            self._session_counter += 1
-        session = CowrieSession.objects.create(
-            session_id=session_id,
-            source=source_ioc,
-        )
-        return session
-
-    def test_same_ip_not_counted_twice(self):
-        session = self.create_cowrie_session(source_ip="1.2.3.4", session_id=111)
-
-        self.repo.add_credential(session, "admin", "123")
-        self.repo.add_credential(session, "admin", "123")
-
-        credential = Credential.objects.get(username="admin", password="123")
-        self.assertEqual(credential.sources.count(), 1)
-
-    def test_different_ips_counted(self):
-        session1 = self.create_cowrie_session(source_ip="1.2.3.4", session_id=111)
-        session2 = self.create_cowrie_session(source_ip="5.6.7.8", session_id=222)
-
-        self.repo.add_credential(session1, "admin", "123")
-        self.repo.add_credential(session2, "admin", "123")
-
-        credential = Credential.objects.get(username="admin", password="123")
-        self.assertEqual(credential.sources.count(), 2)
-
-    def test_same_source_ip_different_sessions_not_counted_twice(self):
-        """
-        Same credential added from two different sessions
-        but the same source IP should only be linked once.
-        """
-        # two DIFFERENT sessions, but SAME source IP
-        session1 = self.create_cowrie_session(source_ip="1.2.3.4", session_id=333)
-        session2 = self.create_cowrie_session(source_ip="1.2.3.4", session_id=444)
-
-        self.repo.add_credential(session1, "admin", "123")
-        self.repo.add_credential(session2, "admin", "123")
-
-        credential = Credential.objects.get(username="admin", password="123")
-
-        # despite two different sessions, same IP = count only 1
-        self.assertEqual(credential.sources.count(), 1)
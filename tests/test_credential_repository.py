@@ -0,0 +1,86 @@
+from greedybear.cronjobs.repositories import CredentialRepository
+from greedybear.models import IOC, CowrieSession, Credential
+
+from . import CustomTestCase
+
+
+class TestCredentialRepository(CustomTestCase):
+    def setUp(self):
+        self.repo = CredentialRepository()
+        self.source_1 = IOC.objects.create(name="1.2.3.4", type="ip")
+        self.source_2 = IOC.objects.create(name="5.6.7.8", type="ip")
+
+    def test_get_or_create_ids_creates_missing_credentials(self):
+        existing = Credential.objects.create(username="guest", password="guest", protocol="ssh")
+
+        ids, created_count = self.repo.get_or_create_ids([("guest", "guest", "ssh"), ("guest", "guest", ""), ("admin", "admin", "ftp")])
+
+        self.assertEqual(created_count, 2)
+        self.assertEqual(ids[("guest", "guest", "ssh")], existing.pk)
+        self.assertEqual(ids[("guest", "guest", "")], Credential.objects.get(username="guest", password="guest", protocol="").pk)
+        self.assertEqual(ids[("admin", "admin", "ftp")], Credential.objects.get(username="admin", protocol="ftp").pk)
+
+    def test_get_ids_in_batches(self):
+        self.repo.BATCH_SIZE = 2
+        keys = [(f"user{i}", "pass", "ssh") for i in range(5)]
+        self.repo.get_or_create_ids(keys)
+
+        self.assertEqual(set(self.repo.get_ids(keys)), set(keys))
+
+    def test_get_or_create_ids_uses_few_queries(self):
+        keys = [(f"user{i}", "pass", "ssh") for i in range(50)]
+
+        with self.assertNumQueries(1):
+            ids, created_count = self.repo.get_or_create_ids(keys)
+
+        self.assertEqual(created_count, 50)
+        self.assertEqual(len(ids), 50)
+
+        # existing credentials are looked up after the insert
+        with self.assertNumQueries(2):
+            ids, created_count = self.repo.get_or_create_ids(keys + [("new", "pass", "ssh")])
+
+        self.assertEqual(created_count, 1)
+        self.assertEqual(len(ids), 51)
+
+    def test_add_credentials_links_sources(self):
+        created_count = self.repo.add_credentials({("admin", "123", "ssh"): {self.source_1.pk, self.source_2.pk}})
+
+        self.assertEqual(created_count, 1)
+        credential = Credential.objects.get(username="admin", password="123", protocol="ssh")
+        self.assertCountEqual(credential.sources.all(), [self.source_1, self.source_2])
+
+    def test_add_credentials_links_sessions(self):
+        session = CowrieSession.objects.create(session_id=111, source=self.source_1)
+        key = ("root", "root", "")
+
+        self.repo.add_credentials({key: {self.source_1.pk}}, {key: {session.pk}})
+
+        credential = Credential.objects.get(username="root", password="root", protocol="")
+        self.assertEqual(list(session.credentials.all()), [credential])
+        self.assertEqual(list(credential.sources.all()), [self.source_1])
+
+    def test_same_source_not_linked_twice(self):
+        session_1 = CowrieSession.objects.create(session_id=333, source=self.source_1)
+        session_2 = CowrieSession.objects.create(session_id=444, source=self.source_1)
+        key = ("admin", "123", "")
+
+        self.repo.add_credentials({key: {self.source_1.pk}}, {key: {session_1.pk}})
+        created_count = self.repo.add_credentials({key: {self.source_1.pk}}, {key: {session_1.pk, session_2.pk}})
+
+        self.assertEqual(created_count, 0)
+        credential = Credential.objects.get(username="admin", password="123")
+        self.assertEqual(credential.sources.count(), 1)
+        self.assertEqual(credential.cowriesession_set.count(), 2)
+
+    def test_protocol_variants_are_separate_credentials(self):
+        Credential.objects.create(username="root", password="root", protocol="ssh")
+
+        self.repo.add_credentials({("root", "root", ""): {self.source_1.pk}})
+
+        self.assertEqual(Credential.objects.filter(username="root", password="root").count(), 2)
+        self.assertEqual(list(Credential.objects.get(username="root", password="root", protocol="").sources.all()), [self.source_1])
+
+    def test_add_credentials_without_credentials(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.repo.add_credentials({}), 0)
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from unittest.mock import Mock, call, patch
 
 from greedybear.consts import FIELDS_TO_EXTRACT
-from greedybear.cronjobs.repositories import ElasticRepository, get_time_window
+from greedybear.cronjobs.repositories import HONEYPOT_AGGREGATION_SIZE, ElasticRepository, get_time_window
 
 from . import CustomTestCase
 
@@ -19,38 +19,37 @@ class TestElasticRepository(CustomTestCase):
 
         self.repo = ElasticRepository()
 
-    @patch("greedybear.cronjobs.repositories.elastic.get_time_window")
     @patch("greedybear.cronjobs.repositories.elastic.Search")
-    def test_has_honeypot_been_hit_returns_true_when_hits_exist(self, mock_search_class, mock_get_time_window):
+    def test_count_hits_per_honeypot_uses_single_aggregation(self, mock_search_class):
         mock_search = Mock()
         mock_search_class.return_value = mock_search
         mock_search.query.return_value = mock_search
-        mock_search.filter.return_value = mock_search
-        mock_search.count.return_value = 1
-        mock_get_time_window.return_value = (datetime(2025, 1, 1), datetime(2025, 1, 1, 0, 10))
+        mock_search.extra.return_value = mock_search
+        mock_search.execute.return_value.aggregations.honeypots.buckets = [
+            Mock(key="Cowrie", doc_count=1200),
+            Mock(key="Heralding", doc_count=3),
+        ]
+        window_start, window_end = datetime(2025, 1, 1), datetime(2025, 1, 1, 1)
+
+        result = self.repo.count_hits_per_honeypot(window_start, window_end)
 
-        result = self.repo.has_honeypot_been_hit(minutes_back_to_lookup=10, honeypot_name="test_honeypot")
-        self.assertTrue(result)
+        self.assertEqual(result, {"Cowrie": 1200, "Heralding": 3})
         mock_search.query.assert_called_once()
-        mock_search.filter.assert_called_once_with("term", **{"type.keyword": "test_honeypot"})
-        mock_search.count.assert_called_once()
+        mock_search.extra.assert_called_once_with(size=0)
+        mock_search.aggs.bucket.assert_called_once_with("honeypots", "terms", field="type.keyword", size=HONEYPOT_AGGREGATION_SIZE)
+        mock_search.execute.assert_called_once()
 
-    @patch("greedybear.cronjobs.repositories.elastic.get_time_window")
     @patch("greedybear.cronjobs.repositories.elastic.Search")
-    def test_has_honeypot_been_hit_returns_false_when_no_hits(self, mock_search_class, mock_get_time_window):
+    def test_count_hits_per_honeypot_without_hits(self, mock_search_class):
         mock_search = Mock()
         mock_search_class.return_value = mock_search
         mock_search.query.return_value = mock_search
-        mock_search.filter.return_value = mock_search
-        mock_search.count.return_value = 0
-        mock_get_time_window.return_value = (datetime(2025, 1, 1), datetime(2025, 1, 1, 0, 10))
+        mock_search.extra.return_value = mock_search
+        mock_search.execute.return_value.aggregations.honeypots.buckets = []
 
-        result = self.repo.has_honeypot_been_hit(minutes_back_to_lookup=10, honeypot_name="test_honeypot")
+        result = self.repo.count_hits_per_honeypot(datetime(2025, 1, 1), datetime(2025, 1, 1, 1))
 
-        self.assertFalse(result)
-        mock_search.query.assert_called_once()
-        mock_search.filter.assert_called_once_with("term", **{"type.keyword": "test_honeypot"})
-        mock_search.count.assert_called_once()
+        self.assertEqual(result, {})
 
     def test_healthcheck_passes_when_ping_succeeds(self):
         self.mock_client.ping.return_value = True
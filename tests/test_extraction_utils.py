@@ -195,6 +195,11 @@ class TestIsValidCIDR(CustomTestCase):
         self.assertTrue(is_valid)
         self.assertEqual(cidr, "192.168.1.0/24")
 
+    def test_netmask_notation_returns_prefix_notation(self):
+        is_valid, cidr = is_valid_cidr("10.0.0.0/255.0.0.0")
+        self.assertTrue(is_valid)
+        self.assertEqual(cidr, "10.0.0.0/8")
+
     def test_invalid_cidr_out_of_range_octets(self):
         invalid = [
             "256.1.1.0/24",
@@ -805,57 +810,37 @@ class ThreatfoxSubmissionTestCase(ExtractionTestCase):
         threatfox_submission(ioc_record, ["http://malicious.com", "http://evil.com/"], self.mock_log)
         self.assertTrue(any("skipping" in str(call) for call in self.mock_log.info.call_args_list))
 
-    @patch("greedybear.cronjobs.extraction.utils.requests.post")
+    @patch("greedybear.cronjobs.extraction.utils.ThreatFoxSubmissionRepository")
     @patch("greedybear.cronjobs.extraction.utils.settings")
-    def test_submits_urls_with_path(self, mock_settings, mock_post):
+    def test_queues_urls_with_path(self, mock_settings, mock_repo_class):
         mock_settings.THREATFOX_API_KEY = "test-key"
-        mock_post.return_value = Mock(text='{"status": "ok"}')
-        mock_honeypot_cowrie = Mock()
-        mock_honeypot_cowrie.name = "Cowrie"
         ioc_record = self._create_mock_payload_request()
-        ioc_record.honeypots.all.return_value = [mock_honeypot_cowrie]
         threatfox_submission(ioc_record, ["http://malicious.com/payload.sh"], self.mock_log)
-        mock_post.assert_called_once()
-        call_kwargs = mock_post.call_args[1]
-        self.assertEqual(call_kwargs["headers"]["Auth-Key"], "test-key")
-        self.assertIn("http://malicious.com/payload.sh", call_kwargs["json"]["iocs"])
+        mock_repo_class.return_value.enqueue.assert_called_once_with(ioc_record, ["http://malicious.com/payload.sh"])
 
-    @patch("greedybear.cronjobs.extraction.utils.requests.post")
+    @patch("greedybear.cronjobs.extraction.utils.ThreatFoxSubmissionRepository")
     @patch("greedybear.cronjobs.extraction.utils.settings")
-    def test_includes_honeypot_names_in_comment(self, mock_settings, mock_post):
+    def test_does_not_query_honeypots(self, mock_settings, mock_repo_class):
+        """Honeypot names are resolved by the submission job, not during extraction."""
         mock_settings.THREATFOX_API_KEY = "test-key"
-        mock_post.return_value = Mock(text='{"status": "ok"}')
         ioc_record = self._create_mock_payload_request()
-        mock_honeypot_cowrie = Mock()
-        mock_honeypot_cowrie.name = "Cowrie"
-        mock_honeypot_log4pot = Mock()
-        mock_honeypot_log4pot.name = "Log4pot"
-        mock_honeypot_dionaea = Mock()
-        mock_honeypot_dionaea.name = "Dionaea"
-        ioc_record.honeypots.all.return_value = [mock_honeypot_cowrie, mock_honeypot_log4pot, mock_honeypot_dionaea]
         threatfox_submission(ioc_record, ["http://malicious.com/payload.sh"], self.mock_log)
-        call_kwargs = mock_post.call_args[1]
-        comment = call_kwargs["json"]["comment"]
-        self.assertIn("Cowrie", comment)
-        self.assertIn("Log4pot", comment)
-        self.assertIn("Dionaea", comment)
+        ioc_record.honeypots.all.assert_not_called()
 
-    @patch("greedybear.cronjobs.extraction.utils.requests.post")
+    @patch("greedybear.cronjobs.extraction.utils.ThreatFoxSubmissionRepository")
     @patch("greedybear.cronjobs.extraction.utils.settings")
-    def test_logs_successful_submission(self, mock_settings, mock_post):
-        mock_settings.THREATFOX_API_KEY = "test-key"
-        mock_post.return_value = Mock(text='{"status": "ok"}')
+    def test_skips_queue_without_api_key(self, mock_settings, mock_repo_class):
+        mock_settings.THREATFOX_API_KEY = ""
         ioc_record = self._create_mock_payload_request()
         threatfox_submission(ioc_record, ["http://malicious.com/payload.sh"], self.mock_log)
-        self.assertTrue(any("successful" in str(call) for call in self.mock_log.info.call_args_list))
+        mock_repo_class.assert_not_called()
 
     @patch("greedybear.cronjobs.extraction.utils.settings")
     def test_filters_mixed_urls(self, mock_settings):
         mock_settings.THREATFOX_API_KEY = "test-key"
         ioc_record = self._create_mock_payload_request()
 
-        with patch("greedybear.cronjobs.extraction.utils.requests.post") as mock_post:
-            mock_post.return_value = Mock(text='{"status": "ok"}')
+        with patch("greedybear.cronjobs.extraction.utils.ThreatFoxSubmissionRepository") as mock_repo_class:
             urls = [
                 "http://malicious.com",  # No path - skip
                 "http://evil.com/",  # Root path - skip
@@ -864,8 +849,7 @@ class ThreatfoxSubmissionTestCase(ExtractionTestCase):
             ]
             threatfox_submission(ioc_record, urls, self.mock_log)
 
-            call_kwargs = mock_post.call_args[1]
-            submitted_urls = call_kwargs["json"]["iocs"]
+            submitted_urls = mock_repo_class.return_value.enqueue.call_args[0][1]
             self.assertEqual(len(submitted_urls), 2)
             self.assertIn("http://bad.com/malware.exe", submitted_urls)
             self.assertIn("http://worse.com/path/to/payload", submitted_urls)
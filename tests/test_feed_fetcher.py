@@ -0,0 +1,128 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.cache import caches
+from django.test import TestCase
+
+from greedybear.cronjobs.feed_fetcher import FeedFetcher, get_session
+
+FEED_BODY = b"# comment\n1.1.1.1\r\n2.2.2.2\n\n3.3.3.0/24"
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 19 Oct 2026 10:00:00 GMT"
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serve a feed with validators, a feed without validators and a missing feed."""
+
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, dict(self.headers)))
+        if self.path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/feed" and self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(FEED_BODY)))
+        if self.path == "/feed":
+            self.send_header("ETag", ETAG)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(FEED_BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFeedFetcher(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        FeedHandler.requests_seen = []
+        self.cache = caches["default"]
+        self.cache.clear()
+        self.fetcher = FeedFetcher(session=requests.Session(), cache=self.cache)
+
+    def test_fetch_streams_lines(self):
+        response = self.fetcher.fetch(f"{self.base_url}/feed")
+
+        self.assertEqual(list(self.fetcher.iter_lines(response)), ["# comment", "1.1.1.1", "2.2.2.2", "", "3.3.3.0/24"])
+
+    def test_unchanged_feed_is_skipped_once_processed(self):
+        url = f"{self.base_url}/feed"
+        response = self.fetcher.fetch(url)
+        self.assertIsNotNone(response)
+        # not processed yet, so the feed is downloaded again
+        self.assertIsNotNone(self.fetcher.fetch(url))
+
+        self.fetcher.mark_processed(url, response)
+
+        self.assertIsNone(self.fetcher.fetch(url))
+        _, headers = FeedHandler.requests_seen[-1]
+        self.assertEqual(headers["If-None-Match"], ETAG)
+        self.assertEqual(headers["If-Modified-Since"], LAST_MODIFIED)
+
+    def test_unconditional_fetch_ignores_validators(self):
+        url = f"{self.base_url}/feed"
+        self.fetcher.mark_processed(url, self.fetcher.fetch(url))
+
+        self.assertIsNotNone(self.fetcher.fetch(url, conditional=False))
+        _, headers = FeedHandler.requests_seen[-1]
+        self.assertNotIn("If-None-Match", headers)
+
+    def test_feed_without_validators_is_always_downloaded(self):
+        url = f"{self.base_url}/plain"
+        self.fetcher.mark_processed(url, self.fetcher.fetch(url))
+
+        self.assertIsNotNone(self.fetcher.fetch(url))
+        self.assertIsNone(self.cache.get(FeedFetcher._cache_key(url)))
+
+    def test_fetch_raises_on_http_error(self):
+        with self.assertRaises(requests.HTTPError):
+            self.fetcher.fetch(f"{self.base_url}/missing")
+
+    def test_fetch_all_returns_result_per_feed(self):
+        feed_url = f"{self.base_url}/feed"
+        self.fetcher.mark_processed(feed_url, self.fetcher.fetch(feed_url))
+
+        results = self.fetcher.fetch_all(
+            {
+                "feed": feed_url,
+                "plain": f"{self.base_url}/plain",
+                "missing": f"{self.base_url}/missing",
+                "unreachable": "http://127.0.0.1:1/feed",
+            },
+            timeout=5,
+        )
+
+        self.assertEqual(list(results), ["feed", "plain", "missing", "unreachable"])
+        self.assertIsNone(results["feed"])
+        self.assertEqual(results["plain"].content, FEED_BODY)
+        self.assertIsInstance(results["missing"], requests.HTTPError)
+        self.assertIsInstance(results["unreachable"], requests.ConnectionError)
+
+    def test_fetch_all_without_feeds(self):
+        self.assertEqual(self.fetcher.fetch_all({}), {})
+
+    def test_shared_session_is_reused(self):
+        self.assertIs(get_session(), get_session())
+        self.assertIs(FeedFetcher(cache=self.cache).session, get_session())
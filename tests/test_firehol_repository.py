@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 
 from greedybear.cronjobs.repositories import FireHolRepository
-from greedybear.models import FireHolList
+from greedybear.models import FireHolList, ReferenceList, ReferenceListChange
 
 from . import CustomTestCase
 
@@ -37,3 +37,100 @@ class TestFireHolRepository(CustomTestCase):
         deleted_count = self.repo.cleanup_old_entries(days=60)
 
         self.assertEqual(deleted_count, 1)
+
+    def test_sync_source_creates_refreshes_and_deletes(self):
+        old_date = datetime.now() - timedelta(days=20)
+        kept = FireHolList.objects.create(ip_address="1.1.1.1", source="blocklist_de")
+        stale = FireHolList.objects.create(ip_address="2.2.2.2", source="blocklist_de")
+        other_source = FireHolList.objects.create(ip_address="2.2.2.2", source="greensnow")
+        FireHolList.objects.update(added=old_date)
+
+        created, refreshed, deleted = self.repo.sync_source("blocklist_de", {"1.1.1.1", "3.3.3.3", "4.4.4.0/24"})
+
+        self.assertEqual((created, refreshed, deleted), (2, 1, 1))
+        self.assertEqual(
+            set(FireHolList.objects.filter(source="blocklist_de").values_list("ip_address", flat=True)),
+            {"1.1.1.1", "3.3.3.3", "4.4.4.0/24"},
+        )
+        self.assertFalse(FireHolList.objects.filter(pk=stale.pk).exists())
+        kept.refresh_from_db()
+        other_source.refresh_from_db()
+        self.assertGreater(kept.added, old_date + timedelta(days=19))
+        self.assertEqual(other_source.added, old_date)
+
+    def test_sync_source_is_idempotent(self):
+        self.repo.sync_source("dshield", {"4.4.4.0/24"})
+        created, refreshed, deleted = self.repo.sync_source("dshield", {"4.4.4.0/24"})
+
+        self.assertEqual((created, refreshed, deleted), (0, 1, 0))
+        self.assertEqual(FireHolList.objects.filter(source="dshield").count(), 1)
+
+    def test_sync_source_stores_netmask_notation_as_prefix(self):
+        created, _, _ = self.repo.sync_source("dshield", {"10.0.0.0/255.0.0.0", "4.4.4.7/24", "not/a/network"})
+
+        self.assertEqual(created, 2)
+        entries = FireHolList.objects.filter(source="dshield")
+        self.assertEqual(set(entries.values_list("ip_address", flat=True)), {"10.0.0.0/8", "4.4.4.0/24"})
+        self.assertEqual(self.repo.get_categories(["10.1.2.3"]), {"10.1.2.3": ["dshield"]})
+
+        created, refreshed, deleted = self.repo.sync_source("dshield", {"10.0.0.0/255.0.0.0", "4.4.4.0/24"})
+        self.assertEqual((created, refreshed, deleted), (0, 2, 0))
+
+    def test_refresh_source_only_touches_the_source(self):
+        old = datetime.now() - timedelta(days=20)
+        FireHolList.objects.create(ip_address="1.1.1.1", source="greensnow", added=old)
+        FireHolList.objects.create(ip_address="2.2.2.2", source="dshield", added=old)
+
+        refreshed = self.repo.refresh_source("greensnow")
+
+        self.assertEqual(refreshed, 1)
+        self.assertGreater(FireHolList.objects.get(source="greensnow").added, datetime.now() - timedelta(days=1))
+        self.assertEqual(FireHolList.objects.get(source="dshield").added, old)
+
+    def test_get_categories_matches_addresses_and_networks(self):
+        FireHolList.objects.create(ip_address="8.8.0.0/16", source="dshield")
+        FireHolList.objects.create(ip_address="8.8.8.8", source="blocklist_de")
+        FireHolList.objects.create(ip_address="8.8.8.0/24", source="blocklist_de")
+        FireHolList.objects.create(ip_address="8.8.8.8", source="")
+        FireHolList.objects.create(ip_address="9.9.9.9", source="greensnow")
+
+        categories = self.repo.get_categories(["8.8.8.8", "8.8.4.4", "1.1.1.1"])
+
+        self.assertEqual(categories, {"8.8.8.8": ["blocklist_de", "dshield"], "8.8.4.4": ["dshield"]})
+
+    def test_get_categories_in_batches(self):
+        FireHolList.objects.create(ip_address="10.0.0.0/8", source="dshield")
+        self.repo.BATCH_SIZE = 2
+
+        categories = self.repo.get_categories(["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+
+        self.assertEqual(set(categories), {"10.0.0.1", "10.0.0.2", "10.0.0.3"})
+
+    def test_get_categories_without_addresses(self):
+        self.assertEqual(self.repo.get_categories([]), {})
+
+    def test_network_is_stored_as_inet(self):
+        entry = FireHolList.objects.create(ip_address="1.2.3.0/24", source="dshield")
+        entry.refresh_from_db()
+
+        self.assertEqual(entry.network, "1.2.3.0/24")
+        self.assertTrue(FireHolList.objects.filter(network="1.2.3.0/24").exists())
+
+    def test_sync_source_records_created_and_deleted_entries(self):
+        FireHolList.objects.create(ip_address="1.1.1.1", source="greensnow")
+        FireHolList.objects.create(ip_address="2.2.2.2", source="greensnow")
+
+        self.repo.sync_source("greensnow", {"2.2.2.2", "3.3.3.0/24"})
+
+        self.assertEqual(
+            set(ReferenceListChange.objects.values_list("reference_list", "network")),
+            {(ReferenceList.FIREHOL, "1.1.1.1"), (ReferenceList.FIREHOL, "3.3.3.0/24")},
+        )
+
+    def test_delete_old_entries_records_deleted_entries(self):
+        FireHolList.objects.create(ip_address="1.1.1.1", source="greensnow", added=datetime.now() - timedelta(days=40))
+        FireHolList.objects.create(ip_address="2.2.2.2", source="greensnow")
+
+        self.repo.cleanup_old_entries(days=30)
+
+        self.assertEqual(list(ReferenceListChange.objects.values_list("network", flat=True)), ["1.1.1.1"])
@@ -27,14 +27,14 @@ class TestHeraldingExtractionStrategy(ExtractionTestCase):
             honeypot="Heralding",
             ioc_repo=self.mock_ioc_repo,
             sensor_repo=self.mock_sensor_repo,
+            credential_repo=self.mock_credential_repo,
         )
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
     @patch("greedybear.cronjobs.extraction.strategies.heralding.threatfox_submission")
-    def test_extract_scanner_ips(self, mock_threatfox, mock_credential_objects, mock_iocs_from_hits):
+    def test_extract_scanner_ips(self, mock_threatfox, mock_iocs_from_hits):
         """Scanner IPs are extracted as SCANNER-type IOCs linked to Heralding."""
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
         mock_ioc = self._create_mock_ioc("1.2.3.4")
         mock_iocs_from_hits.return_value = [mock_ioc]
         self.strategy.ioc_processor.add_ioc = Mock(return_value=mock_ioc)
@@ -52,12 +52,11 @@ class TestHeraldingExtractionStrategy(ExtractionTestCase):
         mock_threatfox.assert_called_once()
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_none_ioc_record_skipped(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_none_ioc_record_skipped(self, mock_iocs_from_hits):
         """IOC records that resolve to None are silently skipped."""
         mock_ioc = self._create_mock_ioc()
         mock_iocs_from_hits.return_value = [mock_ioc]
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
         self.strategy.ioc_processor.add_ioc = Mock(return_value=None)
 
         hits = [{"src_ip": "1.2.3.4", "dest_port": 22, "@timestamp": "2025-01-01T00:00:00"}]
@@ -66,11 +65,10 @@ class TestHeraldingExtractionStrategy(ExtractionTestCase):
         self.assertEqual(len(self.strategy.ioc_records), 0)
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
     @patch("greedybear.cronjobs.extraction.strategies.heralding.threatfox_submission")
-    def test_multiple_scanners(self, mock_threatfox, mock_credential_objects, mock_iocs_from_hits):
+    def test_multiple_scanners(self, mock_threatfox, mock_iocs_from_hits):
         """Multiple scanner IPs from the same batch are all processed."""
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
         ioc1 = self._create_mock_ioc("1.2.3.4")
         ioc2 = self._create_mock_ioc("5.6.7.8")
         mock_iocs_from_hits.return_value = [ioc1, ioc2]
@@ -85,12 +83,11 @@ class TestHeraldingExtractionStrategy(ExtractionTestCase):
         self.assertEqual(len(self.strategy.ioc_records), 2)
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_extract_from_hits_calls_both_phases(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_extract_from_hits_calls_both_phases(self, mock_iocs_from_hits):
         """extract_from_hits runs both scanner extraction and credential classification."""
         mock_ioc = self._create_mock_ioc("1.2.3.4")
         mock_iocs_from_hits.return_value = [mock_ioc]
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         self.strategy.ioc_processor.add_ioc = Mock(return_value=mock_ioc)
 
@@ -115,6 +112,7 @@ class TestHeraldingProtocolExtraction(ExtractionTestCase):
             honeypot="Heralding",
             ioc_repo=self.mock_ioc_repo,
             sensor_repo=self.mock_sensor_repo,
+            credential_repo=self.mock_credential_repo,
         )
 
     def test_known_protocol_returned(self):
@@ -160,30 +158,29 @@ class TestHeraldingCredentialClassification(ExtractionTestCase):
             honeypot="Heralding",
             ioc_repo=self.mock_ioc_repo,
             sensor_repo=self.mock_sensor_repo,
+            credential_repo=self.mock_credential_repo,
         )
 
+    def _stored_credentials(self):
+        """Source IOC IDs by credential tuple, as passed to the repository."""
+        return self.mock_credential_repo.add_credentials.call_args[0][0]
+
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_protocol_persisted_on_credential(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_protocol_persisted_on_credential(self, mock_iocs_from_hits):
         """A valid protocol and credential pair is persisted on Credential."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         hits = [{"src_ip": "1.2.3.4", "protocol": "ssh", "username": "root", "password": "toor"}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential_objects.get_or_create.assert_called_once_with(
-            username="root",
-            password="toor",
-            protocol="ssh",
-        )
+        self.assertEqual(set(self._stored_credentials()), {("root", "toor", "ssh")})
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_multiple_protocols_all_stored(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_multiple_protocols_all_stored(self, mock_iocs_from_hits):
         """Credential tuples for multiple protocols are all stored."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         hits = [
             {"src_ip": "1.2.3.4", "protocol": "ssh", "username": "u1", "password": "p1"},
@@ -192,15 +189,14 @@ class TestHeraldingCredentialClassification(ExtractionTestCase):
         ]
         self.strategy.extract_from_hits(hits)
 
-        stored_protocols = {call[1]["protocol"] for call in mock_credential_objects.get_or_create.call_args_list}
+        stored_protocols = {protocol for _, _, protocol in self._stored_credentials()}
         self.assertEqual(stored_protocols, {"ssh", "ftp", "telnet"})
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_duplicate_credential_protocol_deduplicated(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_duplicate_credential_protocol_deduplicated(self, mock_iocs_from_hits):
         """Repeated hits for same username/password/protocol are deduplicated per batch."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         hits = [
             {"src_ip": "1.2.3.4", "protocol": "ssh", "username": "root", "password": "toor"},
@@ -209,52 +205,44 @@ class TestHeraldingCredentialClassification(ExtractionTestCase):
         ]
         self.strategy.extract_from_hits(hits)
 
-        ssh_calls = [c for c in mock_credential_objects.get_or_create.call_args_list if c[1]["protocol"] == "ssh"]
-        self.assertEqual(len(ssh_calls), 1)
+        self.mock_credential_repo.add_credentials.assert_called_once()
+        self.assertEqual(list(self._stored_credentials()), [("root", "toor", "ssh")])
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_missing_credentials_skipped(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_missing_credentials_skipped(self, mock_iocs_from_hits):
         """Hits with protocol but no credentials are ignored in classification."""
         mock_iocs_from_hits.return_value = []
         hits = [{"src_ip": "1.2.3.4", "protocol": "ssh"}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential_objects.get_or_create.assert_not_called()
+        self.mock_credential_repo.add_credentials.assert_not_called()
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_unknown_protocol_not_stored(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_unknown_protocol_not_stored(self, mock_iocs_from_hits):
         """Hits with an unknown protocol value do not produce credentials."""
         mock_iocs_from_hits.return_value = []
 
         hits = [{"src_ip": "1.2.3.4", "protocol": "bogus_protocol", "username": "root", "password": "root"}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential_objects.get_or_create.assert_not_called()
+        self.mock_credential_repo.add_credentials.assert_not_called()
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_missing_password_stores_empty_string(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_missing_password_stores_empty_string(self, mock_iocs_from_hits):
         """Missing password is normalized to empty string for persistence."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         hits = [{"src_ip": "9.9.9.9", "protocol": "ssh", "username": "root"}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential_objects.get_or_create.assert_called_once_with(
-            username="root",
-            password="",
-            protocol="ssh",
-        )
+        self.assertEqual(set(self._stored_credentials()), {("root", "", "ssh")})
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_new_credential_increments_counter(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_new_credential_increments_counter(self, mock_iocs_from_hits):
         """Creating a new credential increments credentials_added."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         hits = [{"src_ip": "1.2.3.4", "protocol": "ftp", "username": "root", "password": "root"}]
         self.strategy.extract_from_hits(hits)
@@ -262,11 +250,10 @@ class TestHeraldingCredentialClassification(ExtractionTestCase):
         self.assertGreater(self.strategy.credentials_added, 0)
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_existing_credential_not_counted(self, mock_credential_objects, mock_iocs_from_hits):
-        """Existing credentials (get_or_create returns created=False) do not increment counter."""
+    def test_existing_credential_not_counted(self, mock_iocs_from_hits):
+        """Existing credentials (no new credential created) do not increment counter."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), False)
+        self.mock_credential_repo.add_credentials.return_value = 0
 
         hits = [{"src_ip": "1.2.3.4", "protocol": "ssh", "username": "root", "password": "root"}]
         self.strategy.extract_from_hits(hits)
@@ -274,11 +261,10 @@ class TestHeraldingCredentialClassification(ExtractionTestCase):
         self.assertEqual(self.strategy.credentials_added, 0)
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_two_credentials_same_protocol_both_stored(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_two_credentials_same_protocol_both_stored(self, mock_iocs_from_hits):
         """Different username/password tuples are both stored for the same protocol."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         hits = [
             {"src_ip": "1.2.3.4", "protocol": "ssh", "username": "root", "password": "toor"},
@@ -286,61 +272,48 @@ class TestHeraldingCredentialClassification(ExtractionTestCase):
         ]
         self.strategy.extract_from_hits(hits)
 
-        stored_users = {call[1]["username"] for call in mock_credential_objects.get_or_create.call_args_list}
+        stored_users = {username for username, _, _ in self._stored_credentials()}
         self.assertEqual(stored_users, {"root", "admin"})
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_hits_without_protocol_produce_no_credentials(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_hits_without_protocol_produce_no_credentials(self, mock_iocs_from_hits):
         """Hits without protocol are ignored during credential classification."""
         mock_iocs_from_hits.return_value = []
 
         hits = [{"src_ip": "1.2.3.4", "dest_port": 22, "username": "root", "password": "root"}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential_objects.get_or_create.assert_not_called()
+        self.mock_credential_repo.add_credentials.assert_not_called()
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_null_byte_credentials_are_normalized(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_null_byte_credentials_are_normalized(self, mock_iocs_from_hits):
         """NUL bytes in credentials are replaced before persistence."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         hits = [{"src_ip": "1.2.3.4", "protocol": "ssh", "username": "ro\x00ot", "password": "pa\x00ss"}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential_objects.get_or_create.assert_called_once_with(
-            username="ro[NUL]ot",
-            password="pa[NUL]ss",
-            protocol="ssh",
-        )
+        self.assertEqual(set(self._stored_credentials()), {("ro[NUL]ot", "pa[NUL]ss", "ssh")})
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_credential_fields_are_truncated_to_model_length(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_credential_fields_are_truncated_to_model_length(self, mock_iocs_from_hits):
         """Credential fields longer than model max_length are truncated."""
         mock_iocs_from_hits.return_value = []
-        mock_credential_objects.get_or_create.return_value = (Mock(), True)
+        self.mock_credential_repo.add_credentials.return_value = 1
 
         long_username = "u" * 400
         long_password = "p" * 500
         hits = [{"src_ip": "1.2.3.4", "protocol": "ssh", "username": long_username, "password": long_password}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential_objects.get_or_create.assert_called_once_with(
-            username="u" * 256,
-            password="p" * 256,
-            protocol="ssh",
-        )
+        self.assertEqual(set(self._stored_credentials()), {("u" * 256, "p" * 256, "ssh")})
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
     @patch("greedybear.cronjobs.extraction.strategies.heralding.threatfox_submission")
-    def test_credential_sources_linked(self, mock_threatfox, mock_credential_objects, mock_iocs_from_hits):
-        """Credentials are linked to their source IOC via credential.sources.add()."""
-        mock_credential = Mock()
-        mock_credential_objects.get_or_create.return_value = (mock_credential, True)
+    def test_credential_sources_linked(self, mock_threatfox, mock_iocs_from_hits):
+        """Credentials are linked to the ID of their source IOC."""
+        self.mock_credential_repo.add_credentials.return_value = 1
         mock_ioc = self._create_mock_ioc("1.2.3.4")
         mock_iocs_from_hits.return_value = [mock_ioc]
         self.strategy.ioc_processor.add_ioc = Mock(return_value=mock_ioc)
@@ -348,15 +321,13 @@ class TestHeraldingCredentialClassification(ExtractionTestCase):
         hits = [{"src_ip": "1.2.3.4", "protocol": "ssh", "username": "root", "password": "toor", "@timestamp": "2025-01-01T00:00:00"}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential.sources.add.assert_called_once_with(mock_ioc)
+        self.assertEqual(self._stored_credentials(), {("root", "toor", "ssh"): {mock_ioc.pk}})
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
     @patch("greedybear.cronjobs.extraction.strategies.heralding.threatfox_submission")
-    def test_credential_sources_multiple_ips(self, mock_threatfox, mock_credential_objects, mock_iocs_from_hits):
+    def test_credential_sources_multiple_ips(self, mock_threatfox, mock_iocs_from_hits):
         """Same credential from two IPs links both sources."""
-        mock_credential = Mock()
-        mock_credential_objects.get_or_create.return_value = (mock_credential, True)
+        self.mock_credential_repo.add_credentials.return_value = 1
         ioc1 = self._create_mock_ioc("1.2.3.4")
         ioc2 = self._create_mock_ioc("5.6.7.8")
         mock_iocs_from_hits.return_value = [ioc1, ioc2]
@@ -368,21 +339,18 @@ class TestHeraldingCredentialClassification(ExtractionTestCase):
         ]
         self.strategy.extract_from_hits(hits)
 
-        linked_iocs = {call[0][0] for call in mock_credential.sources.add.call_args_list}
-        self.assertEqual(linked_iocs, {ioc1, ioc2})
+        self.assertEqual(self._stored_credentials(), {("root", "toor", "ssh"): {ioc1.pk, ioc2.pk}})
 
     @patch("greedybear.cronjobs.extraction.strategies.heralding.iocs_from_hits")
-    @patch("greedybear.cronjobs.extraction.strategies.heralding.Credential.objects")
-    def test_credential_sources_skipped_without_ioc(self, mock_credential_objects, mock_iocs_from_hits):
+    def test_credential_sources_skipped_without_ioc(self, mock_iocs_from_hits):
         """Credentials from IPs without a matching IOC record are not linked."""
-        mock_credential = Mock()
-        mock_credential_objects.get_or_create.return_value = (mock_credential, True)
+        self.mock_credential_repo.add_credentials.return_value = 1
         mock_iocs_from_hits.return_value = []
 
         hits = [{"src_ip": "9.9.9.9", "protocol": "ssh", "username": "root", "password": "toor"}]
         self.strategy.extract_from_hits(hits)
 
-        mock_credential.sources.add.assert_not_called()
+        self.assertEqual(self._stored_credentials(), {("root", "toor", "ssh"): set()})
 
 
 class TestHeraldingCredentialNormalization(ExtractionTestCase):
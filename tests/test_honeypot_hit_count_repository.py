@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from greedybear.cronjobs.repositories import HoneypotHitCountRepository
+from greedybear.models import HoneypotHitCount
+
+from . import CustomTestCase
+
+
+class TestHoneypotHitCountRepository(CustomTestCase):
+    def setUp(self):
+        self.repo = HoneypotHitCountRepository()
+        self.window_end = self.current_time.replace(minute=0, second=0, microsecond=0)
+        self.window_start = self.window_end - timedelta(hours=1)
+
+    def test_save_counts_stores_zero_for_missing_honeypots(self):
+        saved = self.repo.save_counts([self.cowrie_hp, self.heralding], {"Cowrie": 42, "Unknown": 3}, self.window_start, self.window_end)
+
+        self.assertEqual(saved, 2)
+        self.assertEqual(HoneypotHitCount.objects.get(honeypot=self.cowrie_hp).hits, 42)
+        self.assertEqual(HoneypotHitCount.objects.get(honeypot=self.heralding).hits, 0)
+
+    def test_save_counts_replaces_counts_of_same_window(self):
+        self.repo.save_counts([self.cowrie_hp], {"Cowrie": 42}, self.window_start, self.window_end)
+        self.repo.save_counts([self.cowrie_hp], {"Cowrie": 50}, self.window_start, self.window_end)
+
+        self.assertEqual(list(HoneypotHitCount.objects.values_list("hits", flat=True)), [50])
+
+    def test_delete_older_than(self):
+        self.repo.save_counts([self.cowrie_hp], {"Cowrie": 1}, self.window_start - timedelta(days=8), self.window_end - timedelta(days=8))
+        self.repo.save_counts([self.cowrie_hp], {"Cowrie": 2}, self.window_start, self.window_end)
+
+        deleted = self.repo.delete_older_than(self.window_end - timedelta(days=7))
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(list(HoneypotHitCount.objects.values_list("hits", flat=True)), [2])
@@ -2,10 +2,11 @@ from datetime import datetime, timedelta
 from unittest.mock import Mock
 
 from django.db import IntegrityError, transaction
+from django.db.models import F
 
 from greedybear.cronjobs.repositories import IocRepository
 from greedybear.enums import IpReputation
-from greedybear.models import IOC, Honeypot
+from greedybear.models import IOC, CommandSequence, CowrieSession, Honeypot
 
 from . import CustomTestCase
 
@@ -650,19 +651,6 @@ class TestIocRepositoryCleanup(CustomTestCase):
 
         self.assertEqual(deleted_count, 0)
 
-    def test_update_ioc_reputation_updates_existing(self):
-        IOC.objects.create(name="1.2.3.4", type="ip", ip_reputation="")
-
-        result = self.repo.update_ioc_reputation("1.2.3.4", IpReputation.MASS_SCANNER)
-
-        self.assertTrue(result)
-        updated = IOC.objects.get(name="1.2.3.4")
-        self.assertEqual(updated.ip_reputation, IpReputation.MASS_SCANNER)
-
-    def test_update_ioc_reputation_returns_false_for_missing(self):
-        result = self.repo.update_ioc_reputation("9.9.9.9", IpReputation.MASS_SCANNER)
-        self.assertFalse(result)
-
     def test_bulk_update_ioc_reputation_returns_zero_for_empty_list(self):
         result = self.repo.bulk_update_ioc_reputation([], IpReputation.MASS_SCANNER.value)
         self.assertEqual(result, 0)
@@ -698,3 +686,58 @@ class TestIocRepositoryCleanup(CustomTestCase):
         # Non-empty list but IPs don't exist in DB
         result = self.repo.bulk_update_ioc_reputation(["8.8.8.8", "8.8.4.4"], IpReputation.MASS_SCANNER.value)
         self.assertEqual(result, 0)
+
+    def test_link_related_iocs_links_both_directions(self):
+        scanner = IOC.objects.create(name="10.0.1.1", type="ip")
+        payload = IOC.objects.create(name="evil-link.com", type="domain")
+
+        result = self.repo.link_related_iocs([("10.0.1.1", "evil-link.com")])
+
+        self.assertEqual(result, 1)
+        self.assertEqual(list(scanner.related_ioc.all()), [payload])
+        self.assertEqual(list(payload.related_ioc.all()), [scanner])
+
+    def test_link_related_iocs_resolves_names_in_one_query(self):
+        IOC.objects.create(name="10.0.1.2", type="ip")
+        IOC.objects.create(name="10.0.1.3", type="ip")
+        IOC.objects.create(name="evil-link.com", type="domain")
+
+        with self.assertNumQueries(3):
+            result = self.repo.link_related_iocs([("10.0.1.2", "evil-link.com"), ("10.0.1.3", "evil-link.com")])
+
+        self.assertEqual(result, 2)
+        self.assertEqual(IOC.objects.get(name="evil-link.com").related_ioc.count(), 2)
+
+    def test_link_related_iocs_ignores_existing_links(self):
+        scanner = IOC.objects.create(name="10.0.1.4", type="ip")
+        payload = IOC.objects.create(name="evil-link.com", type="domain")
+        scanner.related_ioc.add(payload)
+
+        result = self.repo.link_related_iocs([("10.0.1.4", "evil-link.com")])
+
+        self.assertEqual(result, 1)
+        self.assertEqual(scanner.related_ioc.count(), 1)
+        self.assertEqual(payload.related_ioc.count(), 1)
+
+    def test_link_related_iocs_marks_command_sequences_of_linked_iocs_as_updated(self):
+        scanner = IOC.objects.create(name="10.0.1.6", type="ip", scanner=True)
+        IOC.objects.create(name="evil-link.com", type="domain", payload_request=True)
+        CowrieSession.objects.create(session_id=int("c0ffee", 16), source=scanner, commands=self.command_sequence)
+        CommandSequence.objects.filter(pk=self.command_sequence.pk).update(clustered=F("updated"))
+
+        self.repo.link_related_iocs([("10.0.1.6", "evil-link.com")])
+
+        stored = CommandSequence.objects.get(pk=self.command_sequence.pk)
+        self.assertGreater(stored.updated, stored.clustered)
+
+    def test_link_related_iocs_skips_missing_iocs(self):
+        IOC.objects.create(name="10.0.1.5", type="ip")
+
+        with self.assertLogs("greedybear.cronjobs.repositories.ioc", level="WARNING"):
+            result = self.repo.link_related_iocs([("10.0.1.5", "missing.com")])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(IOC.objects.get(name="10.0.1.5").related_ioc.count(), 0)
+
+    def test_link_related_iocs_returns_zero_for_no_pairs(self):
+        self.assertEqual(self.repo.link_related_iocs([]), 0)
@@ -1,18 +1,62 @@
+from unittest.mock import patch
+
+import numpy as np
+from datasketch import MinHash, MinHashLSH
 from django.test import SimpleTestCase
 
-from greedybear.cronjobs.commands.lsh import LSHConnectedComponents, UnionFind
+from greedybear.cronjobs.commands.lsh import (
+    LSH_NUM_PERM,
+    LSHConnectedComponents,
+    UnionFind,
+    get_band_keys,
+    get_band_ranges,
+    get_permutations,
+    get_signatures,
+)
+
+
+def get_min_hashes(sequences, num_perm=LSH_NUM_PERM):
+    """Wrap the vectorized signatures into datasketch MinHash objects."""
+    permutations = get_permutations(num_perm)
+    return [MinHash(num_perm=num_perm, hashvalues=signature, permutations=permutations) for signature in get_signatures(sequences, num_perm)]
 
 
 class UnionFindTestCase(SimpleTestCase):
-    def test_find_representative_applies_path_compression(self):
+    def test_find_representative_applies_path_halving(self):
         u = UnionFind(4)
-        u.parents = [0, 0, 1, 2]
+        u.parents[:] = [0, 0, 1, 2]
 
         representative = u.find_representative(3)
 
         self.assertEqual(representative, 0)
+        self.assertEqual(u.parents[3], 1)
+        self.assertEqual(u.parents[1], 0)
+        self.assertEqual(u.find_representative(3), 0)
         self.assertEqual(u.parents[3], 0)
-        self.assertEqual(u.parents[2], 0)
+
+    def test_find_representative_long_chain(self):
+        size = 100_000
+        u = UnionFind(size)
+        u.parents[1:] = range(size - 1)
+
+        self.assertEqual(u.find_representative(size - 1), 0)
+
+    def test_union_by_size_attaches_smaller_set(self):
+        u = UnionFind(4)
+        u.union(0, 1)
+        u.union(0, 2)
+
+        u.union(3, 0)
+
+        self.assertEqual(u.find_representative(3), u.find_representative(0))
+        self.assertEqual(u.find_representative(0), u.find_representative(1))
+        self.assertEqual(u.sizes[u.find_representative(3)], 4)
+        self.assertNotEqual(u.find_representative(3), 3)
+
+    def test_find_representative_returns_python_int(self):
+        u = UnionFind(3)
+        u.union(0, 2)
+        self.assertIs(type(u.find_representative(2)), int)
 
     def test_union_merges_two_sets(self):
         u = UnionFind(3)
@@ -33,20 +77,6 @@ class UnionFindTestCase(SimpleTestCase):
 
 
 class LSHConnectedComponentsTestCase(SimpleTestCase):
-    def test_get_min_hashes_generates_matching_signatures(self):
-        lsh = LSHConnectedComponents(num_perm=64)
-        sequences = [
-            ["ls", "-la", "/tmp"],
-            ["ls", "-la", "/tmp"],
-            ["python", "-m", "http.server"],
-        ]
-
-        min_hashes = lsh._get_min_hashes(sequences)
-
-        self.assertEqual(len(min_hashes), len(sequences))
-        self.assertEqual(min_hashes[0].jaccard(min_hashes[1]), 1.0)
-        self.assertLess(min_hashes[0].jaccard(min_hashes[2]), 0.5)
-
     def test_get_labels_maps_components_to_compact_labels(self):
         sequences = [["a"], ["b"], ["c"], ["d"], ["e"]]
         u = UnionFind(len(sequences))
@@ -76,6 +106,25 @@ class LSHConnectedComponentsTestCase(SimpleTestCase):
         labels = LSHConnectedComponents().get_components(sequences)
         self.assertEqual(labels, [0, 0, 0])
 
+    def test_get_components_matches_pairwise_lsh_queries(self):
+        sequences = [["a", "b", "c", str(i % 7)] for i in range(30)] + [[str(i), "x", "y"] for i in range(20)]
+        lsh_components = LSHConnectedComponents()
+        min_hashes = get_min_hashes(sequences)
+        index = MinHashLSH(threshold=lsh_components.threshold, num_perm=lsh_components.num_perm)
+        for idx, min_hash in enumerate(min_hashes):
+            index.insert(idx, min_hash)
+        u = UnionFind(len(sequences))
+        for idx, min_hash in enumerate(min_hashes):
+            for similar_idx in index.query(min_hash):
+                u.union(idx, similar_idx)
+
+        self.assertEqual(lsh_components.get_components(sequences), lsh_components._get_labels(sequences, u))
+
+    def test_get_components_uses_precomputed_signatures(self):
+        sequences = [["a"], ["b"]]
+        signatures = get_signatures([["same"], ["same"]])
+        self.assertEqual(LSHConnectedComponents().get_components(sequences, signatures=signatures), [0, 0])
+
     def test_get_components_groups_similar_sequences(self):
         sequences = [
             ["echo", "hello", "world"],
@@ -90,3 +139,67 @@ class LSHConnectedComponentsTestCase(SimpleTestCase):
         self.assertEqual(labels[0], labels[1])
         self.assertEqual(labels[2], labels[3])
         self.assertNotEqual(labels[0], labels[2])
+
+
+class BandKeysTestCase(SimpleTestCase):
+    def test_band_ranges_cover_signature(self):
+        ranges = get_band_ranges(0.55, 128)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertLessEqual(ranges[-1][1], 128)
+
+    def test_identical_signatures_share_all_buckets(self):
+        first, second, third = get_min_hashes([["ls", "-la"], ["ls", "-la"], ["python", "-m", "http.server"]])
+        self.assertEqual(get_band_keys(first.hashvalues), get_band_keys(second.hashvalues))
+        self.assertEqual(len(get_band_keys(first.hashvalues)), len(get_band_ranges()))
+        self.assertFalse(set(get_band_keys(first.hashvalues)) & set(get_band_keys(third.hashvalues)))
+
+    def test_band_keys_fit_signed_64_bit(self):
+        (min_hash,) = get_min_hashes([["a", "b", "c"]])
+        for key in get_band_keys(min_hash.hashvalues):
+            self.assertTrue(-(2**63) <= key < 2**63)
+
+
+class VectorizedMinHashTestCase(SimpleTestCase):
+    SEQUENCES = [
+        ["ls", "-la", "/tmp"],
+        [],
+        ["cat", "/proc/cpuinfo", "|", "grep", "name", "|", "wc", "-l"],
+        ["ls", "ls", "ls"],
+        ["uname", "-a"],
+    ]
+
+    @staticmethod
+    def _reference(sequences, num_perm):
+        result = []
+        for seq in sequences:
+            min_hash = MinHash(num_perm=num_perm)
+            for token in seq:
+                min_hash.update(token.encode("utf8"))
+            result.append(min_hash.hashvalues)
+        return np.array(result, dtype=np.uint64)
+
+    def test_signatures_match_datasketch(self):
+        for num_perm in [16, 128]:
+            signatures = get_signatures(self.SEQUENCES, num_perm)
+            self.assertEqual(signatures.shape, (len(self.SEQUENCES), num_perm))
+            self.assertEqual(signatures.dtype, np.uint64)
+            np.testing.assert_array_equal(signatures, self._reference(self.SEQUENCES, num_perm))
+
+    def test_signatures_match_datasketch_across_chunks(self):
+        with patch("greedybear.cronjobs.commands.lsh.MAX_CHUNK_TOKENS", 3):
+            signatures = get_signatures(self.SEQUENCES, 32)
+        np.testing.assert_array_equal(signatures, self._reference(self.SEQUENCES, 32))
+
+    def test_empty_input(self):
+        self.assertEqual(get_signatures([], 64).shape, (0, 64))
+
+    def test_min_hashes_work_with_minhash_lsh(self):
+        min_hashes = get_min_hashes(self.SEQUENCES)
+        lsh = MinHashLSH(threshold=0.55, num_perm=128)
+        for idx, min_hash in enumerate(min_hashes):
+            lsh.insert(idx, min_hash)
+        reference = MinHash(num_perm=128)
+        for token in self.SEQUENCES[2]:
+            reference.update(token.encode("utf8"))
+        self.assertIn(2, lsh.query(reference))
+        self.assertEqual(min_hashes[2].jaccard(reference), 1.0)
@@ -3,7 +3,7 @@ from unittest.mock import Mock, patch
 import requests
 
 from greedybear.cronjobs.mass_scanners import MassScannersCron
-from greedybear.models import MassScanner
+from greedybear.models import MassScanner, ReferenceListChange
 
 from . import CustomTestCase
 
@@ -17,12 +17,13 @@ class TestMassScannersCron(CustomTestCase):
         """Create a mock response object that iter_lines() can use."""
         mock_response = Mock()
         mock_response.iter_lines.return_value = [line.encode("utf-8") for line in lines]
+        mock_response.headers = {}
         return mock_response
 
     def test_parses_ip_with_comment(self):
         """Test parsing IP address with comment after #"""
         lines = ["192.168.1.100 # normal comment"]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -34,7 +35,7 @@ class TestMassScannersCron(CustomTestCase):
     def test_parses_plain_ip_without_comment(self):
         """Test parsing plain IP address without any comment"""
         lines = ["45.83.67.252"]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -46,7 +47,7 @@ class TestMassScannersCron(CustomTestCase):
     def test_parses_ip_with_multiple_hash_signs(self):
         """Test parsing IP with comment containing # symbols"""
         lines = ["1.1.1.1 # comment with # spaces"]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -56,7 +57,7 @@ class TestMassScannersCron(CustomTestCase):
     def test_parses_ip_without_space_before_comment(self):
         """Test parsing IP with comment but no space before #"""
         lines = ["1.1.1.1#comment_without_space"]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -70,7 +71,7 @@ class TestMassScannersCron(CustomTestCase):
             "2001:db8::1 # compressed IPv6",
             "fe80::1ff:fe23:4567:890a # link-local",
         ]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -86,7 +87,7 @@ class TestMassScannersCron(CustomTestCase):
             "<w00tw00t.at.blackhats.romanian.anti-sec:>",
             "abc.def.ghi.jkl",
         ]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -96,7 +97,7 @@ class TestMassScannersCron(CustomTestCase):
     def test_skips_invalid_ip_out_of_range(self):
         """Test that IPs with octets >255 are skipped"""
         lines = ["999.999.999.999 # structurally matches but invalid IP"]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -109,7 +110,7 @@ class TestMassScannersCron(CustomTestCase):
             "# This is a comment",
             "## Another comment",
         ]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -120,7 +121,7 @@ class TestMassScannersCron(CustomTestCase):
     def test_skips_empty_lines(self):
         """Test that empty lines are skipped"""
         lines = ["", "  ", "\n"]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -138,7 +139,7 @@ class TestMassScannersCron(CustomTestCase):
             "999.999.999.999",
             "193.142.146.101",
         ]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -157,7 +158,7 @@ class TestMassScannersCron(CustomTestCase):
         MassScanner.objects.create(ip_address="1.2.3.4", reason="existing")
 
         lines = ["1.2.3.4 # new comment"]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -167,6 +168,18 @@ class TestMassScannersCron(CustomTestCase):
         self.assertEqual(scanner.reason, "existing")
         # Should not log "added new mass scanner"
         self.cron.log.info.assert_not_called()
+        self.assertFalse(ReferenceListChange.objects.exists())
+
+    def test_records_new_scanners_in_change_log(self):
+        """Test that new mass scanners are recorded for the reference list reconciliation"""
+        MassScanner.objects.create(ip_address="1.2.3.4", reason="existing")
+
+        lines = ["1.2.3.4 # existing", "5.6.7.8 # new"]
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
+            mock_get.return_value = self._create_mock_response(lines)
+            self.cron.run()
+
+        self.assertEqual(list(ReferenceListChange.objects.values_list("reference_list", "network")), [("mass_scanners", "5.6.7.8")])
 
     def test_parses_broadcast_and_special_ips(self):
         """Test parsing special IPs like broadcast, localhost, etc."""
@@ -175,7 +188,7 @@ class TestMassScannersCron(CustomTestCase):
             "127.0.0.1 # localhost",
             "0.0.0.0 # all interfaces",
         ]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -192,7 +205,7 @@ class TestMassScannersCron(CustomTestCase):
             "123.456.78",
             "1.2",
         ]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -203,7 +216,7 @@ class TestMassScannersCron(CustomTestCase):
     def test_extracts_ip_from_beginning_of_line(self):
         """Test that IP is correctly extracted when at start of line"""
         lines = ["45.83.67.252"]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -216,7 +229,7 @@ class TestMassScannersCron(CustomTestCase):
             "C91.196.152.28 # probe.onyphe.net",
             "C91.196.152.38 # probe.onyphe.net",
         ]
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = self._create_mock_response(lines)
             self.cron.run()
 
@@ -232,7 +245,7 @@ class TestMassScannersCron(CustomTestCase):
         """Test that HTTP errors (4xx/5xx) are raised instead of silently ignored."""
         mock_response = Mock()
         mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Client Error")
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = mock_response
             with self.assertRaises(requests.exceptions.HTTPError):
                 self.cron.run()
@@ -242,7 +255,7 @@ class TestMassScannersCron(CustomTestCase):
 
     def test_raises_on_network_error(self):
         """Test that network errors (DNS failure, timeout) are raised."""
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.side_effect = requests.exceptions.ConnectionError("DNS resolution failed")
             with self.assertRaises(requests.exceptions.ConnectionError):
                 self.cron.run()
@@ -252,7 +265,7 @@ class TestMassScannersCron(CustomTestCase):
 
     def test_raises_on_timeout(self):
         """Test that request timeouts are raised."""
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.side_effect = requests.exceptions.Timeout("Connection timed out")
             with self.assertRaises(requests.exceptions.Timeout):
                 self.cron.run()
@@ -264,7 +277,7 @@ class TestMassScannersCron(CustomTestCase):
         """Test that base class execute() propagates HTTPError."""
         mock_response = Mock()
         mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("500 Server Error")
-        with patch("greedybear.cronjobs.mass_scanners.requests.get") as mock_get:
+        with patch("greedybear.cronjobs.feed_fetcher.requests.Session.get") as mock_get:
             mock_get.return_value = mock_response
             # Expect exception to be raised now
             with self.assertRaises(requests.exceptions.HTTPError):
@@ -261,3 +261,24 @@ class TestSensorLabelMigration(MigrationTestCase):
         sensor_new = new_state.apps.get_model(self.app_name, "Sensor")
         migrated = sensor_new.objects.get(address="10.0.0.1")
         self.assertEqual(migrated.label, "")
+
+
+class TestFireHolListNetworkMigration(MigrationTestCase):
+    """Tests the addition of the inet network column to the FireHolList model."""
+
+    migrate_from = "0055_partition_attackeractivitybucket"
+    migrate_to = "0056_firehollist_network"
+
+    def test_entries_get_network_and_unparsable_entries_are_deleted(self):
+        FireHolList = self.old_state.apps.get_model(self.app_name, "FireHolList")
+        FireHolList.objects.create(ip_address="1.2.3.4", source="blocklist_de")
+        FireHolList.objects.create(ip_address="5.6.7.0/24", source="dshield")
+        FireHolList.objects.create(ip_address="10.0.0.0/255.0.0.0", source="dshield")
+        FireHolList.objects.create(ip_address="not an ip", source="dshield")
+
+        new_state = self.apply_tested_migration()
+        firehol_new = new_state.apps.get_model(self.app_name, "FireHolList")
+        self.assertEqual(
+            set(firehol_new.objects.values_list("ip_address", "network")),
+            {("1.2.3.4", "1.2.3.4"), ("5.6.7.0/24", "5.6.7.0/24")},
+        )
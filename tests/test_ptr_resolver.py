@@ -0,0 +1,162 @@
+import socketserver
+import struct
+import threading
+from unittest import TestCase
+
+from greedybear.cronjobs.ptr_resolver import PtrResolver, build_query, parse_response
+
+PTR_RECORDS = {
+    "4.3.2.1.in-addr.arpa": "scanner.shodan.io",
+    "1.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.ip6.arpa": "localhost",
+}
+NXDOMAIN = {"8.7.6.5.in-addr.arpa"}
+SERVFAIL = {"2.2.2.2.in-addr.arpa"}
+DROPPED = {"1.1.1.1.in-addr.arpa"}
+# names whose answer is preceded by a response with the same ID to another question
+SPOOFED = {"3.3.3.3.in-addr.arpa"}
+
+
+def encode_name(name):
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.split(".")) + b"\x00"
+
+
+class StubDnsHandler(socketserver.BaseRequestHandler):
+    """Answer PTR queries from a fixed zone, with NXDOMAIN, SERVFAIL or not at all for some names."""
+
+    def handle(self):
+        data, sock = self.request
+        query_id = struct.unpack_from("!H", data)[0]
+        labels = []
+        offset = 12
+        while data[offset]:
+            labels.append(data[offset + 1 : offset + 1 + data[offset]].decode())
+            offset += 1 + data[offset]
+        question = data[12 : offset + 5]
+        name = ".".join(labels)
+        if name in DROPPED:
+            return
+        if name in SPOOFED:
+            other_question = encode_name("4.3.2.1.in-addr.arpa") + struct.pack("!HH", 12, 1)
+            rdata = encode_name("spoofed.example.com")
+            spoofed_answer = struct.pack("!HHHIH", 0xC00C, 12, 1, 3600, len(rdata)) + rdata
+            sock.sendto(struct.pack("!HHHHHH", query_id, 0x8180, 1, 1, 0, 0) + other_question + spoofed_answer, self.client_address)
+            ptr = "real.example.com"
+        if name.endswith(".10.in-addr.arpa"):
+            ptr = "host-" + "-".join(reversed(labels[:4])) + ".example.com"
+        elif name not in SPOOFED:
+            ptr = PTR_RECORDS.get(name)
+        rcode = 3 if name in NXDOMAIN else 2 if name in SERVFAIL else 0
+        answers = b""
+        if ptr and not rcode:
+            rdata = encode_name(ptr)
+            # the owner name points to the question name
+            answers = struct.pack("!HHHIH", 0xC00C, 12, 1, 3600, len(rdata)) + rdata
+        header = struct.pack("!HHHHHH", query_id, 0x8180 | rcode, 1, 1 if answers else 0, 0, 0)
+        sock.sendto(header + question + answers, self.client_address)
+
+
+class TestPtrResolver(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = socketserver.UDPServer(("127.0.0.1", 0), StubDnsHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def _resolver(self, **kwargs):
+        kwargs.setdefault("timeout", 0.2)
+        return PtrResolver(nameserver="127.0.0.1", port=self.server.server_address[1], **kwargs)
+
+    def test_resolves_ptr_record(self):
+        self.assertEqual(self._resolver().resolve(["1.2.3.4"]), {"1.2.3.4": "scanner.shodan.io"})
+
+    def test_resolves_ipv6_ptr_record(self):
+        self.assertEqual(self._resolver().resolve(["::1"]), {"::1": "localhost"})
+
+    def test_nxdomain_is_negative_result(self):
+        self.assertEqual(self._resolver().resolve(["5.6.7.8"]), {"5.6.7.8": ""})
+
+    def test_no_answer_is_negative_result(self):
+        self.assertEqual(self._resolver().resolve(["9.9.9.9"]), {"9.9.9.9": ""})
+
+    def test_servfail_is_failure(self):
+        self.assertEqual(self._resolver().resolve(["2.2.2.2"]), {"2.2.2.2": None})
+
+    def test_timeout_is_failure(self):
+        self.assertEqual(self._resolver(attempts=2).resolve(["1.1.1.1"]), {"1.1.1.1": None})
+
+    def test_ignores_response_to_another_question(self):
+        self.assertEqual(self._resolver().resolve(["3.3.3.3"]), {"3.3.3.3": "real.example.com"})
+
+    def test_invalid_ip_is_failure(self):
+        with self.assertLogs("greedybear.cronjobs.ptr_resolver", level="WARNING"):
+            results = self._resolver().resolve(["not-an-ip"])
+
+        self.assertEqual(results, {"not-an-ip": None})
+
+    def test_timeout_does_not_delay_other_queries(self):
+        results = self._resolver().resolve(["1.1.1.1", "1.2.3.4", "5.6.7.8"])
+
+        self.assertEqual(results, {"1.1.1.1": None, "1.2.3.4": "scanner.shodan.io", "5.6.7.8": ""})
+
+    def test_resolves_many_ips_concurrently(self):
+        ips = [f"10.0.{i // 250}.{i % 250}" for i in range(1000)]
+
+        results = self._resolver(timeout=1, concurrency=200).resolve(ips)
+
+        self.assertEqual(len(results), 1000)
+        self.assertEqual(results["10.0.3.17"], "host-10-0-3-17.example.com")
+        self.assertTrue(all(results.values()))
+
+    def test_empty_input(self):
+        self.assertEqual(self._resolver().resolve([]), {})
+
+
+class TestParseResponse(TestCase):
+    NAME = "4.3.2.1.in-addr.arpa"
+
+    def _response(self, query_id=1, flags=0x8180, answers=b"", answer_count=0, name=NAME):
+        header = struct.pack("!HHHHHH", query_id, flags, 1, answer_count, 0, 0)
+        return header + encode_name(name) + struct.pack("!HH", 12, 1) + answers
+
+    def test_query_asks_for_ptr_record(self):
+        query = build_query(0x1234, self.NAME)
+
+        self.assertEqual(query[:4], b"\x12\x34\x01\x00")
+        self.assertEqual(query[12:], encode_name(self.NAME) + b"\x00\x0c\x00\x01")
+
+    def test_follows_cname_of_classless_delegation(self):
+        target = encode_name("4.0-25.3.2.1.in-addr.arpa")
+        rdata = encode_name("host.example.com")
+        answers = struct.pack("!HHHIH", 0xC00C, 5, 1, 60, len(target)) + target + struct.pack("!HHHIH", 0xC00C, 12, 1, 60, len(rdata)) + rdata
+
+        self.assertEqual(parse_response(self._response(answers=answers, answer_count=2), 1, self.NAME), "host.example.com")
+
+    def test_rejects_mismatching_id(self):
+        with self.assertRaises(ValueError):
+            parse_response(self._response(query_id=2), 1, self.NAME)
+
+    def test_rejects_mismatching_question(self):
+        with self.assertRaises(ValueError):
+            parse_response(self._response(name="8.7.6.5.in-addr.arpa"), 1, self.NAME)
+
+    def test_rejects_truncated_message(self):
+        with self.assertRaises(ValueError):
+            parse_response(self._response(answer_count=1), 1, self.NAME)
+
+    def test_rejects_compression_loop(self):
+        # the PTR data points to itself
+        rdata_offset = 12 + len(encode_name(self.NAME)) + 4 + 12
+        loop = struct.pack("!HHHIH", 0xC00C, 12, 1, 60, 2) + struct.pack("!H", 0xC000 | rdata_offset)
+
+        with self.assertRaises(ValueError):
+            parse_response(self._response(answers=loop, answer_count=1), 1, self.NAME)
+
+    def test_truncated_flag_is_failure(self):
+        self.assertIsNone(parse_response(self._response(flags=0x8380), 1, self.NAME))
@@ -0,0 +1,94 @@
+from django.test import TestCase
+
+from greedybear.cronjobs.repositories import ReferenceListChangeRepository
+from greedybear.enums import IpReputation
+from greedybear.models import IOC, FireHolList, IocType, ReferenceList, ReferenceListChange
+
+
+class TestReferenceListChangeRepository(TestCase):
+    def setUp(self):
+        self.repo = ReferenceListChangeRepository()
+
+    def _ioc(self, name, ioc_type=IocType.IP, **kwargs):
+        return IOC.objects.create(name=name, type=ioc_type, **kwargs)
+
+    def test_record(self):
+        recorded = self.repo.record(ReferenceList.FIREHOL, ["1.1.1.1", "2.2.0.0/16"])
+
+        self.assertEqual(recorded, 2)
+        self.assertEqual(set(ReferenceListChange.objects.values_list("network", flat=True)), {"1.1.1.1", "2.2.0.0/16"})
+
+    def test_reconcile_without_changes(self):
+        ioc = self._ioc("1.1.1.1")
+
+        self.assertEqual(self.repo.reconcile(), (0, 0))
+        ioc.refresh_from_db()
+        self.assertEqual(ioc.ip_reputation, "")
+
+    def test_reconcile_sets_reputation_of_added_ips(self):
+        scanner = self._ioc("1.1.1.1", ip_reputation=IpReputation.KNOWN_ATTACKER)
+        tor_node = self._ioc("2.2.2.2")
+        unchanged = self._ioc("3.3.3.3")
+        self.repo.record(ReferenceList.MASS_SCANNERS, ["1.1.1.1"])
+        self.repo.record(ReferenceList.TOR_EXIT_NODES, ["2.2.2.2", "9.9.9.9"])
+
+        self.assertEqual(self.repo.reconcile(), (2, 0))
+
+        for ioc in (scanner, tor_node, unchanged):
+            ioc.refresh_from_db()
+        self.assertEqual(scanner.ip_reputation, IpReputation.MASS_SCANNER)
+        self.assertEqual(tor_node.ip_reputation, IpReputation.TOR_EXIT_NODE)
+        self.assertEqual(unchanged.ip_reputation, "")
+        self.assertFalse(ReferenceListChange.objects.exists())
+
+    def test_reconcile_most_recent_reputation_change_wins(self):
+        ioc = self._ioc("1.1.1.1")
+        self.repo.record(ReferenceList.MASS_SCANNERS, ["1.1.1.1"])
+        self.repo.record(ReferenceList.TOR_EXIT_NODES, ["1.1.1.1"])
+
+        self.repo.reconcile()
+
+        ioc.refresh_from_db()
+        self.assertEqual(ioc.ip_reputation, IpReputation.TOR_EXIT_NODE)
+
+    def test_reconcile_recomputes_firehol_categories(self):
+        added = self._ioc("8.8.8.8")
+        removed = self._ioc("9.9.9.9", firehol_categories=["greensnow", "dshield"])
+        untouched = self._ioc("7.7.7.7", firehol_categories=["stale"])
+        domain = self._ioc("example.com", ioc_type=IocType.DOMAIN)
+        FireHolList.objects.create(ip_address="8.8.8.8", source="blocklist_de")
+        FireHolList.objects.create(ip_address="8.8.0.0/16", source="dshield")
+        FireHolList.objects.create(ip_address="9.9.9.9", source="greensnow")
+        # dshield dropped 9.9.0.0/16, blocklist_de and dshield added entries covering 8.8.8.8
+        self.repo.record(ReferenceList.FIREHOL, ["8.8.8.8", "8.8.0.0/16", "9.9.0.0/16"])
+
+        self.assertEqual(self.repo.reconcile(), (0, 2))
+
+        for ioc in (added, removed, untouched, domain):
+            ioc.refresh_from_db()
+        self.assertEqual(added.firehol_categories, ["blocklist_de", "dshield"])
+        self.assertEqual(removed.firehol_categories, ["greensnow"])
+        self.assertEqual(untouched.firehol_categories, ["stale"])
+        self.assertEqual(domain.firehol_categories, [])
+
+    def test_reconcile_skips_ip_iocs_that_are_not_addresses(self):
+        invalid = self._ioc("999.1.1.1")
+        ioc = self._ioc("8.8.8.8")
+        FireHolList.objects.create(ip_address="8.8.8.8", source="blocklist_de")
+        self.repo.record(ReferenceList.FIREHOL, ["0.0.0.0/0"])
+
+        self.assertEqual(self.repo.reconcile(), (0, 1))
+
+        invalid.refresh_from_db()
+        ioc.refresh_from_db()
+        self.assertIsNone(invalid.address)
+        self.assertEqual(ioc.address, "8.8.8.8")
+        self.assertEqual(ioc.firehol_categories, ["blocklist_de"])
+        self.assertFalse(ReferenceListChange.objects.exists())
+
+    def test_reconcile_keeps_changes_recorded_afterwards(self):
+        self.repo.record(ReferenceList.FIREHOL, ["1.1.1.1"])
+        self.repo.reconcile()
+        self.repo.record(ReferenceList.FIREHOL, ["2.2.2.2"])
+
+        self.assertEqual(list(ReferenceListChange.objects.values_list("network", flat=True)), ["2.2.2.2"])
@@ -1,11 +1,11 @@
-import socket
-from datetime import date
+from datetime import date, timedelta
 from unittest.mock import Mock, patch
 
 from greedybear.cronjobs import reverse_dns as reverse_dns_module
+from greedybear.cronjobs.repositories import ReverseDnsLookupRepository
 from greedybear.cronjobs.reverse_dns import ReverseDNSCron
 from greedybear.enums import IpReputation
-from greedybear.models import IOC, IocType, Tag
+from greedybear.models import IOC, IocType, ReverseDnsLookup, Tag
 
 from . import CustomTestCase
 
@@ -15,10 +15,14 @@ class TestReverseDNSCron(CustomTestCase):
 
     def setUp(self):
         self.mock_tag_repo = Mock()
+        self.mock_tag_repo.add_tags.return_value = 0
         self.mock_ioc_repo = Mock()
+        self.mock_lookup_repo = Mock()
         self.cron = ReverseDNSCron(
             tag_repo=self.mock_tag_repo,
             ioc_repo=self.mock_ioc_repo,
+            lookup_repo=self.mock_lookup_repo,
+            resolver=Mock(),
         )
         self.cron.log = Mock()
 
@@ -181,11 +185,11 @@ class TestReverseDNSCron(CustomTestCase):
 
         more_persistent.delete()
 
-    def test_max_candidates_limit(self):
-        """No more than MAX_CANDIDATES should be checked per run."""
-        max_candidates = 3
+    def test_candidates_resolved_in_chunks(self):
+        """All candidates should be checked, CANDIDATE_CHUNK_SIZE at a time."""
+        chunk_size = 3
         extra_iocs = []
-        for i in range(max_candidates + 2):
+        for i in range(chunk_size + 2):
             ioc = IOC.objects.create(
                 name=f"10.0.{i}.1",
                 type=IocType.IP.value,
@@ -203,17 +207,30 @@ class TestReverseDNSCron(CustomTestCase):
             extra_iocs.append(ioc)
 
         with (
-            patch.object(reverse_dns_module, "MAX_CANDIDATES", max_candidates),
+            patch.object(reverse_dns_module, "CANDIDATE_CHUNK_SIZE", chunk_size),
             patch.object(self.cron, "_resolve_batch", side_effect=self._mock_resolve("")) as mock_resolve,
         ):
             self.cron.run()
 
-        resolved_ips = mock_resolve.call_args[0][0]
-        self.assertLessEqual(len(resolved_ips), max_candidates)
+        chunks = [call.args[0] for call in mock_resolve.call_args_list]
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(all(len(chunk) <= chunk_size for chunk in chunks))
+        resolved_ips = [ip for chunk in chunks for ip in chunk]
+        self.assertCountEqual(resolved_ips, [self.candidate_ioc.name] + [ioc.name for ioc in extra_iocs])
+        self.assertEqual(self.mock_tag_repo.add_tags.call_count, 2)
 
         for ioc in extra_iocs:
             ioc.delete()
 
+    def test_expired_lookups_deleted(self):
+        """Expired lookup results should be dropped before selecting candidates."""
+        with patch.object(self.cron, "_resolve_batch", side_effect=self._mock_resolve("")):
+            self.cron.run()
+
+        positive_ttl, negative_ttl, _ = self.mock_lookup_repo.delete_expired.call_args[0]
+        self.assertEqual(positive_ttl, reverse_dns_module.POSITIVE_TTL)
+        self.assertEqual(negative_ttl, reverse_dns_module.NEGATIVE_TTL)
+
     def test_fixture_iocs_excluded_by_behavioral_filters(self):
         """Base fixture IOCs should not match (they have login_attempts=1, days_seen=1)."""
         # Delete the candidate so only fixtures remain
@@ -226,96 +243,69 @@ class TestReverseDNSCron(CustomTestCase):
 
 
 class TestReverseDNSCronResolveBatch(CustomTestCase):
-    """Tests for _resolve_batch — parallel PTR resolution."""
+    """Tests for _resolve_batch — cached and concurrent PTR resolution."""
 
     def setUp(self):
-        self.cron = ReverseDNSCron(tag_repo=Mock(), ioc_repo=Mock())
+        self.mock_resolver = Mock()
+        self.cron = ReverseDNSCron(tag_repo=Mock(), ioc_repo=Mock(), lookup_repo=ReverseDnsLookupRepository(), resolver=self.mock_resolver)
 
-    @patch("greedybear.cronjobs.reverse_dns.socket.gethostbyaddr")
-    def test_resolve_batch_returns_results_for_all_ips(self, mock_gethostbyaddr):
-        mock_gethostbyaddr.side_effect = lambda ip: (f"host-{ip}.example.com", [], [ip])
+    def test_resolve_batch_returns_results_for_all_ips(self):
+        self.mock_resolver.resolve.side_effect = lambda ips: {ip: f"host-{ip}.example.com" for ip in ips}
 
         results = self.cron._resolve_batch(["1.2.3.4", "5.6.7.8"])
 
         self.assertEqual(results["1.2.3.4"], "host-1.2.3.4.example.com")
         self.assertEqual(results["5.6.7.8"], "host-5.6.7.8.example.com")
 
-    @patch("greedybear.cronjobs.reverse_dns.socket.gethostbyaddr")
-    def test_resolve_batch_handles_mixed_results(self, mock_gethostbyaddr):
-        def side_effect(ip):
-            if ip == "1.2.3.4":
-                return ("scanner.shodan.io", [], [ip])
-            raise socket.herror("Host not found")
-
-        mock_gethostbyaddr.side_effect = side_effect
-
-        results = self.cron._resolve_batch(["1.2.3.4", "5.6.7.8"])
-
-        self.assertEqual(results["1.2.3.4"], "scanner.shodan.io")
-        self.assertEqual(results["5.6.7.8"], "")
-
-    def test_resolve_batch_handles_unexpected_exception(self):
-        """An unexpected exception in one IP should not crash the batch."""
-        self.cron.log = Mock()
-
-        def bad_resolve(ip):
-            if ip == "1.2.3.4":
-                raise RuntimeError("unexpected")
-            return "host.example.com"
-
-        with patch.object(self.cron, "_resolve_ptr", side_effect=bad_resolve):
-            results = self.cron._resolve_batch(["1.2.3.4", "5.6.7.8"])
+    def test_resolve_batch_caches_positive_and_negative_results(self):
+        self.mock_resolver.resolve.return_value = {"1.2.3.4": "scanner.shodan.io", "5.6.7.8": ""}
 
-        self.assertEqual(results["1.2.3.4"], "")
-        self.assertEqual(results["5.6.7.8"], "host.example.com")
-
-
-class TestReverseDNSCronResolvePTR(CustomTestCase):
-    """Tests for _resolve_ptr method."""
-
-    def setUp(self):
-        self.cron = ReverseDNSCron(tag_repo=Mock(), ioc_repo=Mock())
-
-    @patch("greedybear.cronjobs.reverse_dns.socket.gethostbyaddr")
-    def test_resolve_ptr_success(self, mock_gethostbyaddr):
-        mock_gethostbyaddr.return_value = ("scanner.shodan.io", [], ["1.2.3.4"])
+        self.cron._resolve_batch(["1.2.3.4", "5.6.7.8"])
 
-        result = self.cron._resolve_ptr("1.2.3.4")
-
-        self.assertEqual(result, "scanner.shodan.io")
-        mock_gethostbyaddr.assert_called_once_with("1.2.3.4")
+        self.assertEqual(
+            dict(ReverseDnsLookup.objects.values_list("ip_address", "ptr_record")),
+            {"1.2.3.4": "scanner.shodan.io", "5.6.7.8": ""},
+        )
 
-    @patch("greedybear.cronjobs.reverse_dns.socket.gethostbyaddr")
-    def test_resolve_ptr_herror(self, mock_gethostbyaddr):
-        mock_gethostbyaddr.side_effect = socket.herror("Host not found")
+    def test_resolve_batch_uses_cached_results(self):
+        ReverseDnsLookup.objects.create(ip_address="1.2.3.4", ptr_record="scanner.shodan.io")
+        ReverseDnsLookup.objects.create(ip_address="5.6.7.8", ptr_record="")
+        self.mock_resolver.resolve.return_value = {"9.9.9.9": "dns9.quad9.net"}
 
-        result = self.cron._resolve_ptr("1.2.3.4")
+        results = self.cron._resolve_batch(["1.2.3.4", "5.6.7.8", "9.9.9.9"])
 
-        self.assertEqual(result, "")
+        self.mock_resolver.resolve.assert_called_once_with(["9.9.9.9"])
+        self.assertEqual(results, {"1.2.3.4": "scanner.shodan.io", "5.6.7.8": "", "9.9.9.9": "dns9.quad9.net"})
 
-    @patch("greedybear.cronjobs.reverse_dns.socket.gethostbyaddr")
-    def test_resolve_ptr_timeout(self, mock_gethostbyaddr):
-        mock_gethostbyaddr.side_effect = TimeoutError("timed out")
+    def test_resolve_batch_skips_resolver_when_all_cached(self):
+        ReverseDnsLookup.objects.create(ip_address="1.2.3.4", ptr_record="")
 
-        result = self.cron._resolve_ptr("1.2.3.4")
+        results = self.cron._resolve_batch(["1.2.3.4"])
 
-        self.assertEqual(result, "")
+        self.mock_resolver.resolve.assert_not_called()
+        self.assertEqual(results, {"1.2.3.4": ""})
 
-    @patch("greedybear.cronjobs.reverse_dns.socket.gethostbyaddr")
-    def test_resolve_ptr_gaierror(self, mock_gethostbyaddr):
-        mock_gethostbyaddr.side_effect = socket.gaierror("Name resolution failed")
+    def test_resolve_batch_does_not_cache_failed_lookups(self):
+        """A failed lookup should count as no PTR record, but be retried on the next run."""
+        self.cron.log = Mock()
+        self.mock_resolver.resolve.return_value = {"1.2.3.4": None, "5.6.7.8": "host.example.com"}
 
-        result = self.cron._resolve_ptr("1.2.3.4")
+        results = self.cron._resolve_batch(["1.2.3.4", "5.6.7.8"])
 
-        self.assertEqual(result, "")
+        self.assertEqual(results["1.2.3.4"], "")
+        self.assertEqual(results["5.6.7.8"], "host.example.com")
+        self.assertFalse(ReverseDnsLookup.objects.filter(ip_address="1.2.3.4").exists())
 
-    @patch("greedybear.cronjobs.reverse_dns.socket.gethostbyaddr")
-    def test_resolve_ptr_oserror(self, mock_gethostbyaddr):
-        mock_gethostbyaddr.side_effect = OSError("Network unreachable")
+    def test_expired_results_are_resolved_again(self):
+        ReverseDnsLookup.objects.create(ip_address="1.2.3.4", ptr_record="", checked=self.current_time - timedelta(days=8))
+        self.mock_resolver.resolve.return_value = {"1.2.3.4": "host.example.com"}
+        self.cron.lookup_repo.delete_expired(reverse_dns_module.POSITIVE_TTL, reverse_dns_module.NEGATIVE_TTL, self.current_time)
 
-        result = self.cron._resolve_ptr("1.2.3.4")
+        results = self.cron._resolve_batch(["1.2.3.4"])
 
-        self.assertEqual(result, "")
+        self.mock_resolver.resolve.assert_called_once_with(["1.2.3.4"])
+        self.assertEqual(results, {"1.2.3.4": "host.example.com"})
+        self.assertEqual(ReverseDnsLookup.objects.get(ip_address="1.2.3.4").ptr_record, "host.example.com")
 
 
 class TestReverseDNSCronMatchesScannerDomain(CustomTestCase):
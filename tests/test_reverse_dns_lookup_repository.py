@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from greedybear.cronjobs.repositories import ReverseDnsLookupRepository
+from greedybear.models import ReverseDnsLookup
+
+from . import CustomTestCase
+
+
+class TestReverseDnsLookupRepository(CustomTestCase):
+    def setUp(self):
+        self.repo = ReverseDnsLookupRepository()
+
+    def test_save_results_replaces_previous_results(self):
+        ReverseDnsLookup.objects.create(ip_address="1.2.3.4", ptr_record="", checked=self.current_time - timedelta(days=3))
+
+        saved = self.repo.save_results({"1.2.3.4": "scanner.shodan.io", "5.6.7.8": ""}, self.current_time)
+
+        self.assertEqual(saved, 2)
+        lookup = ReverseDnsLookup.objects.get(ip_address="1.2.3.4")
+        self.assertEqual(lookup.ptr_record, "scanner.shodan.io")
+        self.assertEqual(lookup.checked, self.current_time)
+        self.assertEqual(ReverseDnsLookup.objects.count(), 2)
+
+    def test_get_results_returns_only_cached_ips(self):
+        self.repo.save_results({"1.2.3.4": "scanner.shodan.io", "5.6.7.8": ""}, self.current_time)
+
+        results = self.repo.get_results(["1.2.3.4", "5.6.7.8", "9.9.9.9"])
+
+        self.assertEqual(results, {"1.2.3.4": "scanner.shodan.io", "5.6.7.8": ""})
+
+    def test_get_results_in_batches(self):
+        self.repo.BATCH_SIZE = 2
+        ips = [f"10.0.0.{i}" for i in range(5)]
+        self.repo.save_results(dict.fromkeys(ips, ""), self.current_time)
+
+        self.assertEqual(self.repo.get_results(ips), dict.fromkeys(ips, ""))
+
+    def test_delete_expired_uses_separate_ttls(self):
+        week_ago = self.current_time - timedelta(days=8)
+        month_ago = self.current_time - timedelta(days=31)
+        self.repo.save_results({"1.1.1.1": "", "2.2.2.2": "host.example.com"}, week_ago)
+        self.repo.save_results({"3.3.3.3": "host.example.com"}, month_ago)
+        self.repo.save_results({"4.4.4.4": ""}, self.current_time)
+
+        deleted = self.repo.delete_expired(timedelta(days=30), timedelta(days=7), self.current_time)
+
+        self.assertEqual(deleted, 2)
+        self.assertCountEqual(ReverseDnsLookup.objects.values_list("ip_address", flat=True), ["2.2.2.2", "4.4.4.4"])
@@ -1,7 +1,10 @@
+import os
+from tempfile import TemporaryDirectory
 from unittest.mock import Mock, patch
 
 import numpy as np
 import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
 
 from greedybear.cronjobs.scoring.ml_model import Classifier, Regressor
 from greedybear.cronjobs.scoring.random_forest import RFModel
@@ -329,3 +332,63 @@ class TestFeatureImportanceLogging(CustomTestCase):
         logged_messages = [call.args[0] for call in model.log.info.call_args_list]
 
         self.assertTrue(any("Feature importances for" in msg for msg in logged_messages))
+
+
+class TestModelPersistence(CustomTestCase):
+    """Test saving and memory-mapped loading of models and their manifests."""
+
+    class MockRFClassifier(TestClassifier.MockRFModel, Classifier):
+        def __init__(self):
+            super().__init__("Mock RF Classifier", "mock_score")
+
+        @property
+        def untrained_model(self):
+            return RandomForestClassifier(n_estimators=3, random_state=0)
+
+    def setUp(self):
+        self.model_dir = TemporaryDirectory()
+        patcher = patch("greedybear.cronjobs.scoring.ml_model.ML_MODEL_DIRECTORY", self.model_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.model_dir.cleanup)
+
+    def _trained_classifier(self):
+        classifier = self.MockRFClassifier()
+        x = SAMPLE_DATA[["feature1", "feature2", "feature3"]]
+        classifier.model = classifier.untrained_model.fit(x, CLASSIFIER_TARGET)
+        return classifier, x
+
+    def test_save_and_load_memory_mapped_model(self):
+        classifier, x = self._trained_classifier()
+        expected = classifier.predict(x)
+        classifier.save(recall_auc=0.5)
+
+        self.assertEqual(os.listdir(self.model_dir.name).count("mock_rf_classifier"), 1)
+        self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(self.model_dir.name)))
+
+        loaded = self.MockRFClassifier()
+        self.assertTrue(loaded.is_available)
+        np.testing.assert_array_equal(loaded.predict(x), expected)
+
+    def test_manifest_readable_without_loading_model(self):
+        classifier, _ = self._trained_classifier()
+        classifier.save(recall_auc=0.75)
+
+        other = self.MockRFClassifier()
+        manifest = other.manifest
+
+        self.assertNotIn("model", other.__dict__)
+        self.assertEqual(manifest["features"], ["feature1", "feature2", "feature3"])
+        self.assertEqual(manifest["recall_auc"], 0.75)
+        self.assertIn("version", manifest)
+        self.assertIn("trained_at", manifest)
+
+    def test_manifest_missing_returns_empty_dict(self):
+        self.assertEqual(self.MockRFClassifier().manifest, {})
+
+    def test_save_overwrites_existing_model(self):
+        classifier, _ = self._trained_classifier()
+        classifier.save(recall_auc=0.1)
+        classifier.save(recall_auc=0.2)
+
+        self.assertEqual(self.MockRFClassifier().manifest["recall_auc"], 0.2)
@@ -0,0 +1,107 @@
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+from greedybear.cronjobs.repositories import ScoringRunRepository
+from greedybear.cronjobs.scoring.scoring_jobs import TrainModels, UpdateScores
+from greedybear.models import ScoringJob, ScoringRun
+
+from . import CustomTestCase
+
+
+class TestScoringRunRepository(CustomTestCase):
+    def setUp(self):
+        self.repo = ScoringRunRepository()
+
+    def test_record_run(self):
+        run = self.repo.record_run(ScoringJob.SCORING, duration=1.5, rows_processed=10, rows_updated=3, metrics={"a": 1})
+        run.refresh_from_db()
+        self.assertEqual(run.job, ScoringJob.SCORING)
+        self.assertEqual(run.duration, 1.5)
+        self.assertEqual(run.rows_processed, 10)
+        self.assertEqual(run.rows_updated, 3)
+        self.assertEqual(run.metrics, {"a": 1})
+        self.assertIsNotNone(run.run_date)
+
+    def test_record_run_without_metrics(self):
+        run = self.repo.record_run(ScoringJob.TRAINING, duration=2.0)
+        self.assertEqual(run.metrics, {})
+
+    def test_get_recent_runs_newest_first(self):
+        first = self.repo.record_run(ScoringJob.TRAINING, duration=1)
+        second = self.repo.record_run(ScoringJob.SCORING, duration=2)
+        third = self.repo.record_run(ScoringJob.SCORING, duration=3)
+        self.assertEqual(self.repo.get_recent_runs(), [third, second, first])
+        self.assertEqual(self.repo.get_recent_runs(limit=1), [third])
+
+    def test_get_recent_runs_by_job(self):
+        training = self.repo.record_run(ScoringJob.TRAINING, duration=1)
+        self.repo.record_run(ScoringJob.SCORING, duration=2)
+        self.assertEqual(self.repo.get_recent_runs(job=ScoringJob.TRAINING), [training])
+
+
+class TestUpdateScoresMetrics(CustomTestCase):
+    @patch("greedybear.cronjobs.scoring.scoring_jobs.SCORERS")
+    def test_run_records_metrics(self, mock_scorers):
+        def add_scores(df):
+            df = df.copy()
+            df["recurrence_probability"] = 0.5
+            df["expected_interactions"] = 4.0
+            return df
+
+        scorers = []
+        for score_name in ["recurrence_probability", "expected_interactions"]:
+            scorer = Mock()
+            scorer.score_name = score_name
+            scorer.score.side_effect = add_scores
+            scorers.append(scorer)
+        mock_scorers.__iter__ = Mock(side_effect=lambda: iter(scorers))
+
+        UpdateScores().run()
+
+        run = ScoringRun.objects.get()
+        self.assertEqual(run.job, ScoringJob.SCORING)
+        self.assertEqual(run.rows_processed, 3)
+        self.assertGreater(run.rows_updated, 0)
+        self.assertIn("scoring_duration", run.metrics)
+        self.assertEqual(run.metrics["feature_means"]["login_attempts"], 1.0)
+        histograms = run.metrics["score_histograms"]
+        self.assertEqual(sum(histograms["recurrence_probability"]["counts"]), 3)
+        self.assertEqual(histograms["recurrence_probability"]["counts"][5], 3)
+        self.assertEqual(histograms["expected_interactions"]["mean"], 4.0)
+
+
+class TestTrainModelsMetrics(CustomTestCase):
+    @patch("greedybear.cronjobs.scoring.scoring_jobs.SCORERS")
+    @patch("greedybear.cronjobs.scoring.scoring_jobs.get_features")
+    @patch("greedybear.cronjobs.scoring.scoring_jobs.get_current_data")
+    def test_run_records_metrics(self, mock_get_data, mock_get_features, mock_scorers):
+        mock_get_data.return_value = [{"value": "1.2.3.4", "last_seen": "2024-01-02", "interaction_count": 5}]
+        mock_get_features.return_value = pd.DataFrame({"value": ["1.2.3.4"], "login_attempts": [4]})
+
+        scorer = Mock()
+        scorer.trainable = True
+        scorer.name = "Test Scorer"
+        scorer.manifest = {"recall_auc": 0.75}
+        mock_scorers.__iter__ = Mock(return_value=iter([scorer]))
+
+        job = TrainModels()
+        job.save_training_data = Mock()
+        job.load_training_data = Mock(return_value=[{"value": "1.2.3.4", "last_seen": "2024-01-01", "interaction_count": 2, "feed_type": ["scanner"]}])
+        job.run()
+
+        run = ScoringRun.objects.get()
+        self.assertEqual(run.job, ScoringJob.TRAINING)
+        self.assertEqual(run.rows_processed, 1)
+        self.assertEqual(run.metrics["models"]["Test Scorer"]["recall_auc"], 0.75)
+        self.assertIn("training_duration", run.metrics["models"]["Test Scorer"])
+        self.assertEqual(run.metrics["feature_means"], {"login_attempts": 4.0})
+
+    @patch("greedybear.cronjobs.scoring.scoring_jobs.get_current_data")
+    def test_skipped_training_records_nothing(self, mock_get_data):
+        mock_get_data.return_value = [{"value": "1.2.3.4", "last_seen": "2024-01-02", "interaction_count": 5}]
+        job = TrainModels()
+        job.save_training_data = Mock()
+        job.load_training_data = Mock(return_value=[])
+        job.run()
+        self.assertFalse(ScoringRun.objects.exists())
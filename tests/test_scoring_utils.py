@@ -5,9 +5,11 @@ import pandas as pd
 from greedybear.cronjobs.scoring.utils import (
     correlated_features,
     date_delta,
+    feature_means,
     get_current_data,
     get_features,
     multi_label_encode,
+    score_histogram,
 )
 
 from . import CustomTestCase
@@ -133,3 +135,35 @@ class TestMultiLabelEncode(CustomTestCase):
         for idx, feat in enumerate(SAMPLE_DATA["multi_val_feature"]):
             for f in ["A", "B", "C"]:
                 self.assertEqual(features[idx][f"has_{f}"], f in feat)
+
+
+class TestScoreHistogram(CustomTestCase):
+    def test_counts_scores_into_bins(self):
+        """Scores are counted into the given bins"""
+        histogram = score_histogram(pd.Series([0.05, 0.15, 0.18, 0.95]), [0, 0.1, 0.2, 1.0])
+        self.assertEqual(histogram["bins"], [0, 0.1, 0.2, 1.0])
+        self.assertEqual(histogram["counts"], [1, 2, 1])
+        self.assertEqual(histogram["mean"], 0.3325)
+
+    def test_out_of_range_scores_are_clipped(self):
+        """Scores beyond the edges are counted in the first or last bin"""
+        histogram = score_histogram(pd.Series([-1, 5000, 3]), [0, 1, 10])
+        self.assertEqual(histogram["counts"], [1, 2])
+
+    def test_empty_scores(self):
+        """Empty and missing scores produce an empty histogram"""
+        histogram = score_histogram(pd.Series([None], dtype=float), [0, 1])
+        self.assertEqual(histogram["counts"], [0])
+        self.assertEqual(histogram["mean"], 0.0)
+
+
+class TestFeatureMeans(CustomTestCase):
+    def test_means_of_numerical_features(self):
+        """Only known numerical features present in the DataFrame are averaged"""
+        df = pd.DataFrame({"login_attempts": [1, 2, 3], "interaction_count": [10, 20, 60], "value": ["a", "b", "c"]})
+        self.assertEqual(feature_means(df), {"login_attempts": 2.0, "interaction_count": 30.0})
+
+    def test_empty_dataframe(self):
+        """Means of an empty DataFrame are zero"""
+        df = pd.DataFrame({"login_attempts": pd.Series([], dtype=float)})
+        self.assertEqual(feature_means(df), {"login_attempts": 0.0})
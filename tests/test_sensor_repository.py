@@ -64,15 +64,76 @@ class TestSensorRepository(CustomTestCase):
         result = self.repo.get_or_create_sensor("192.168.1.10")
         self.assertEqual(result.label, "")
 
+    def test_get_or_create_sensors_creates_missing_sensors_in_bulk(self):
+        existing = self.repo.get_or_create_sensor("192.168.1.1")
+
+        with self.assertNumQueries(2):
+            result = self.repo.get_or_create_sensors(["192.168.1.1", "192.168.1.2", "192.168.1.2", "not-an-ip"])
+
+        self.assertEqual(set(result), {"192.168.1.1", "192.168.1.2"})
+        self.assertEqual(result["192.168.1.1"].pk, existing.pk)
+        self.assertEqual(Sensor.objects.filter(address="192.168.1.2").get().pk, result["192.168.1.2"].pk)
+        self.assertIn("192.168.1.2", self.repo.cache)
+
+    def test_get_or_create_sensors_normalizes_ipv6_addresses(self):
+        existing = Sensor.objects.create(address="2001:db8::1")
+        repo = SensorRepository()
+
+        with self.assertNumQueries(0):
+            result = repo.get_or_create_sensors(["2001:DB8:0:0::1", "2001:0db8::0001"])
+
+        self.assertEqual(result, {"2001:DB8:0:0::1": existing, "2001:0db8::0001": existing})
+
+    def test_get_or_create_sensors_creates_ipv6_sensor_once(self):
+        first = self.repo.get_or_create_sensors(["2001:DB8::2"])["2001:DB8::2"]
+
+        with self.assertNumQueries(0):
+            second = self.repo.get_or_create_sensors(["2001:db8:0::2"])["2001:db8:0::2"]
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Sensor.objects.get().address, "2001:db8::2")
+
+    def test_get_or_create_sensors_logs_inserted_sensors_only(self):
+        repo = SensorRepository()
+        Sensor.objects.create(address="192.168.1.5")
+
+        with self.assertLogs("greedybear.cronjobs.repositories.sensor", level="INFO") as logs:
+            result = repo.get_or_create_sensors(["192.168.1.5", "192.168.1.6"])
+
+        self.assertEqual(set(result), {"192.168.1.5", "192.168.1.6"})
+        self.assertIn("added 1 sensors to the database", logs.output[0])
+
+    def test_get_or_create_sensors_uses_cache(self):
+        self.repo.get_or_create_sensors(["192.168.1.1"])
+
+        with self.assertNumQueries(0):
+            result = self.repo.get_or_create_sensors(["192.168.1.1"])
+
+        self.assertEqual(list(result), ["192.168.1.1"])
+
     def test_update_country_sets_country(self):
-        """update_country sets the Sensor's country if different."""
+        """update_country sets the Sensor's country if different, save_countries writes it."""
         sensor = Sensor.objects.create(address="1.2.3.4", country="")
 
         self.repo.update_country(sensor, "Nepal")
+        self.assertEqual(Sensor.objects.get(pk=sensor.pk).country, "")
+        self.assertEqual(self.repo.save_countries(), 1)
 
         sensor.refresh_from_db()
         self.assertEqual(sensor.country, "Nepal")
 
+    def test_save_countries_writes_each_sensor_once(self):
+        sensor = Sensor.objects.create(address="1.2.3.4", country="Italy")
+
+        self.repo.update_country(sensor, "Nepal")
+        self.repo.update_country(sensor, "India")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.repo.save_countries(), 1)
+
+        sensor.refresh_from_db()
+        self.assertEqual(sensor.country, "India")
+        self.assertEqual(self.repo.save_countries(), 0)
+
     def test_update_country_skips_if_same_value(self):
         """update_country does not call save if country is unchanged."""
         sensor = Sensor.objects.create(address="1.2.3.5", country="Nepal")
@@ -80,14 +141,15 @@ class TestSensorRepository(CustomTestCase):
         with patch.object(Sensor, "save") as mock_save:
             self.repo.update_country(sensor, "Nepal")
             mock_save.assert_not_called()
+        self.assertEqual(self.repo.changed_countries, {})
 
     def test_update_country_updates_if_different(self):
-        """update_country writes to DB if country differs."""
+        """update_country records the sensor for saving if country differs."""
         sensor = Sensor.objects.create(address="1.2.3.6", country="India")
 
-        with patch.object(Sensor, "save") as mock_save:
-            self.repo.update_country(sensor, "Nepal")
-            mock_save.assert_called_once()
+        self.repo.update_country(sensor, "Nepal")
+
+        self.assertEqual(self.repo.changed_countries, {"1.2.3.6": sensor})
 
     def test_update_country_skips_if_invalid_input(self):
         """update_country should not save if sensor is None or country is empty."""
@@ -97,3 +159,4 @@ class TestSensorRepository(CustomTestCase):
             self.repo.update_country(None, "Nepal")
             self.repo.update_country(sensor, "")
             mock_save.assert_not_called()
+        self.assertEqual(self.repo.changed_countries, {})
@@ -5,36 +5,56 @@ from requests.exceptions import RequestException
 
 from greedybear.cronjobs.repositories import FireHolRepository
 from greedybear.cronjobs.spamhaus_drop import SpamhausDropCron
+from greedybear.models import FireHolList
 
 
 class TestSpamhausDropCron(TestCase):
-    @patch("greedybear.cronjobs.spamhaus_drop.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_fetch_drop_feed_adds_entries(self, mock_requests_get):
         """Test that valid CIDRs are processed successfully."""
         mock_response = MagicMock()
         mock_response.raise_for_status.return_value = None
-        mock_response.text = """
+        mock_response.iter_lines.return_value = """
         {"cidr":"1.2.3.0/24","sblid":"SBL123","rir":"arin"}
-        {"cidr":"4.5.6.0/24","sblid":"SBL456","rir":"arin"}"""
+        {"cidr":"4.5.6.0/24","sblid":"SBL456","rir":"arin"}""".splitlines()
+        mock_response.headers = {}
         mock_requests_get.return_value = mock_response
 
         cron = SpamhausDropCron()
         cron._fetch_drop_feed()
 
-    @patch("greedybear.cronjobs.spamhaus_drop.requests.get")
+        self.assertEqual(set(FireHolList.objects.filter(source="spamhaus_drop").values_list("ip_address", flat=True)), {"1.2.3.0/24", "4.5.6.0/24"})
+
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
+    def test_fetch_drop_feed_removes_delisted_entries(self, mock_requests_get):
+        FireHolList.objects.create(ip_address="7.7.7.0/24", source="spamhaus_drop")
+        FireHolList.objects.create(ip_address="7.7.7.0/24", source="dshield")
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.iter_lines.return_value = '{"cidr":"1.2.3.0/24","sblid":"SBL123","rir":"arin"}'.splitlines()
+        mock_response.headers = {}
+        mock_requests_get.return_value = mock_response
+
+        SpamhausDropCron()._fetch_drop_feed()
+
+        self.assertEqual(list(FireHolList.objects.filter(source="spamhaus_drop").values_list("ip_address", flat=True)), ["1.2.3.0/24"])
+        self.assertTrue(FireHolList.objects.filter(ip_address="7.7.7.0/24", source="dshield").exists())
+
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_invalid_cidrs_are_skipped(self, mock_requests_get):
         """Test that invalid CIDRs are skipped without error."""
         mock_response = MagicMock()
         mock_response.raise_for_status.return_value = None
-        mock_response.text = """
+        mock_response.iter_lines.return_value = """
         {"cidr":"invalid_cidr"}
-        {"cidr":"999.999.999.999/24"}"""
+        {"cidr":"999.999.999.999/24"}""".splitlines()
+        mock_response.headers = {}
         mock_requests_get.return_value = mock_response
 
         cron = SpamhausDropCron()
         cron._fetch_drop_feed()
 
-    @patch("greedybear.cronjobs.spamhaus_drop.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_request_exception_is_handled(self, mock_requests_get):
         """Test that network errors are logged but do not crash the cronjob."""
         mock_requests_get.side_effect = RequestException("Network error")
@@ -42,7 +62,7 @@ class TestSpamhausDropCron(TestCase):
         cron = SpamhausDropCron()
         cron._fetch_drop_feed()
 
-    @patch("greedybear.cronjobs.spamhaus_drop.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_unexpected_exception_is_raised(self, mock_requests_get):
         """Test that unexpected exceptions are re-raised."""
         mock_requests_get.side_effect = ValueError("Unexpected error")
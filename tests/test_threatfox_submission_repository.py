@@ -0,0 +1,54 @@
+from greedybear.cronjobs.repositories import ThreatFoxSubmissionRepository
+from greedybear.models import ThreatFoxSubmission
+
+from . import CustomTestCase
+
+
+class TestThreatFoxSubmissionRepository(CustomTestCase):
+    def setUp(self):
+        self.repo = ThreatFoxSubmissionRepository()
+
+    def test_enqueue_skips_duplicate_urls(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh", "http://evil.com/a.sh", "http://evil.com/b.sh"])
+        self.repo.enqueue(self.ioc_2, ["http://evil.com/b.sh", "http://evil.com/c.sh"])
+
+        self.assertCountEqual(
+            ThreatFoxSubmission.objects.values_list("url", "ioc__name"),
+            [("http://evil.com/a.sh", self.ioc.name), ("http://evil.com/b.sh", self.ioc.name), ("http://evil.com/c.sh", self.ioc_2.name)],
+        )
+
+    def test_enqueue_skips_submitted_urls(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh"])
+        self.repo.mark_submitted(self.repo.get_pending(10))
+
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh"])
+
+        self.assertEqual(self.repo.get_pending(10), [])
+        self.assertEqual(ThreatFoxSubmission.objects.count(), 1)
+
+    def test_get_pending_oldest_first_with_limit(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh"])
+        self.repo.enqueue(self.ioc, ["http://evil.com/b.sh"])
+        self.repo.enqueue(self.ioc, ["http://evil.com/c.sh"])
+
+        pending = self.repo.get_pending(2)
+
+        self.assertEqual([submission.url for submission in pending], ["http://evil.com/a.sh", "http://evil.com/b.sh"])
+
+    def test_mark_submitted(self):
+        self.repo.enqueue(self.ioc, ["http://evil.com/a.sh", "http://evil.com/b.sh"])
+        pending = self.repo.get_pending(10)
+
+        self.assertEqual(self.repo.mark_submitted(pending[:1]), 1)
+
+        self.assertIsNotNone(ThreatFoxSubmission.objects.get(url="http://evil.com/a.sh").submitted)
+        self.assertEqual([submission.url for submission in self.repo.get_pending(10)], ["http://evil.com/b.sh"])
+
+    def test_mark_rejected(self):
+        self.repo.enqueue(self.ioc, ["bad url", "http://evil.com/b.sh"])
+        pending = self.repo.get_pending(10)
+
+        self.assertEqual(self.repo.mark_rejected(pending[:1], "x" * 300), 1)
+
+        self.assertEqual(ThreatFoxSubmission.objects.get(url="bad url").error, "x" * 256)
+        self.assertEqual([submission.url for submission in self.repo.get_pending(10)], ["http://evil.com/b.sh"])
@@ -5,6 +5,7 @@ import requests
 from greedybear.cronjobs.repositories.tor import TorRepository
 from greedybear.cronjobs.tor_exit_nodes import TorExitNodesCron
 from greedybear.enums import IpReputation
+from greedybear.models import ReferenceList
 from tests import CustomTestCase
 
 
@@ -49,16 +50,17 @@ class TestTorExitNodesCron(CustomTestCase):
     def setUp(self):
         """Set up test fixtures."""
         self.mock_tor_repo = Mock()
-        self.mock_ioc_repo = Mock()
-        self.cron = TorExitNodesCron(tor_repo=self.mock_tor_repo, ioc_repo=self.mock_ioc_repo)
+        self.mock_change_repo = Mock()
+        self.cron = TorExitNodesCron(tor_repo=self.mock_tor_repo, change_repo=self.mock_change_repo)
 
-    @patch("greedybear.cronjobs.tor_exit_nodes.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     @patch("greedybear.cronjobs.tor_exit_nodes.is_valid_ipv4")
     def test_run_success(self, mock_is_valid, mock_requests_get):
         """Test successful Tor exit nodes fetching."""
         # Arrange
         mock_response = Mock()
-        mock_response.text = "ExitAddress 1.2.3.4\\nExitAddress 5.6.7.8"
+        mock_response.iter_lines.return_value = "ExitAddress 1.2.3.4\nExitAddress 5.6.7.8".splitlines()
+        mock_response.headers = {}
         mock_requests_get.return_value = mock_response
 
         # Mock validation to return valid for both IPs
@@ -71,11 +73,11 @@ class TestTorExitNodesCron(CustomTestCase):
         self.cron.run()
 
         # Assert
-        mock_requests_get.assert_called_once_with("https://check.torproject.org/exit-addresses", timeout=10)
+        mock_requests_get.assert_called_once_with("https://check.torproject.org/exit-addresses", headers={}, timeout=10, stream=True)
         self.assertEqual(self.mock_tor_repo.get_or_create.call_count, 2)
-        self.assertEqual(self.mock_ioc_repo.update_ioc_reputation.call_count, 2)
+        self.mock_change_repo.record.assert_called_once_with(ReferenceList.TOR_EXIT_NODES, ["1.2.3.4", "5.6.7.8"])
 
-    @patch("greedybear.cronjobs.tor_exit_nodes.requests.get")
+    @patch("greedybear.cronjobs.feed_fetcher.requests.Session.get")
     def test_run_request_failure(self, mock_requests_get):
         """Test handling of request failures."""
         # Arrange
@@ -1,8 +1,11 @@
 from collections import Counter
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from django.db import connection
 
 from greedybear.cronjobs.repositories.trending_bucket import TrendingBucketRepository
-from greedybear.models import AttackerActivityBucket
+from greedybear.models import AttackerActivityBucket, AttackerActivityDailyBucket, AttackerWindowCount, Sensor, SensorActivityBucket, TrendingWindow
 from tests import CustomTestCase
 
 
@@ -49,71 +52,51 @@ class TestTrendingBucketRepository(CustomTestCase):
     def test_upsert_bucket_counts_returns_zero_for_empty_counter(self):
         self.assertEqual(self.repo.upsert_bucket_counts(Counter()), 0)
 
-    def test_get_counts_in_window_filters_feed_types(self):
-        AttackerActivityBucket.objects.bulk_create(
-            [
-                AttackerActivityBucket(
-                    attacker_ip="1.1.1.1",
-                    feed_type="cowrie",
-                    bucket_start=datetime(2026, 3, 20, 9, 0),
-                    interaction_count=4,
-                ),
-                AttackerActivityBucket(
-                    attacker_ip="1.1.1.1",
-                    feed_type="heralding",
-                    bucket_start=datetime(2026, 3, 20, 9, 0),
-                    interaction_count=2,
-                ),
-                AttackerActivityBucket(
-                    attacker_ip="2.2.2.2",
-                    feed_type="cowrie",
-                    bucket_start=datetime(2026, 3, 20, 9, 0),
-                    interaction_count=3,
-                ),
-            ]
+    def test_upsert_bucket_counts_rolls_up_daily_buckets(self):
+        self.repo.upsert_bucket_counts(
+            Counter(
+                {
+                    ("1.1.1.1", "cowrie", datetime(2026, 3, 20, 9, 0)): 2,
+                    ("1.1.1.1", "cowrie", datetime(2026, 3, 20, 23, 0)): 3,
+                    ("1.1.1.1", "cowrie", datetime(2026, 3, 21, 0, 0)): 4,
+                    ("2001:4860:4860::8888", "heralding", datetime(2026, 3, 20, 9, 0)): 1,
+                }
+            )
         )
+        self.repo.upsert_bucket_counts(Counter({("1.1.1.1", "cowrie", datetime(2026, 3, 20, 9, 0)): 5}))
 
-        counts = self.repo.get_counts_in_window(
-            window_start=datetime(2026, 3, 20, 9, 0),
-            window_end=datetime(2026, 3, 20, 10, 0),
-            feed_types=["cowrie"],
+        self.assertEqual(AttackerActivityBucket.objects.get(attacker_ip="1.1.1.1", bucket_start=datetime(2026, 3, 20, 9, 0)).interaction_count, 7)
+        daily = {(row.attacker_ip, row.bucket_date): row.interaction_count for row in AttackerActivityDailyBucket.objects.all()}
+        self.assertEqual(
+            daily,
+            {
+                ("1.1.1.1", date(2026, 3, 20)): 10,
+                ("1.1.1.1", date(2026, 3, 21)): 4,
+                ("2001:4860:4860::8888", date(2026, 3, 20)): 1,
+            },
         )
 
-        self.assertEqual(counts, {"1.1.1.1": 4, "2.2.2.2": 3})
+    def test_upsert_bucket_counts_uses_copy_above_threshold(self):
+        AttackerActivityBucket.objects.create(attacker_ip="10.0.0.2", feed_type="cowrie", bucket_start=datetime(2026, 3, 20, 9, 0), interaction_count=3)
+        counters = Counter({(f"10.0.0.{i}", "cowrie", datetime(2026, 3, 20, 9 + i % 2, 0)): i for i in range(1, 21)})
 
-    def test_get_counts_in_window_with_all_feed_type_combines_totals(self):
-        AttackerActivityBucket.objects.bulk_create(
-            [
-                AttackerActivityBucket(
-                    attacker_ip="1.1.1.1",
-                    feed_type="cowrie",
-                    bucket_start=datetime(2026, 3, 20, 9, 0),
-                    interaction_count=4,
-                ),
-                AttackerActivityBucket(
-                    attacker_ip="1.1.1.1",
-                    feed_type="heralding",
-                    bucket_start=datetime(2026, 3, 20, 9, 0),
-                    interaction_count=2,
-                ),
-            ]
-        )
+        with patch.object(TrendingBucketRepository, "COPY_THRESHOLD", 10):
+            with patch.object(TrendingBucketRepository, "_build_upsert_query") as mock_build_upsert_query:
+                self.assertEqual(self.repo.upsert_bucket_counts(counters), 20)
+                self.assertEqual(self.repo.upsert_bucket_counts(counters), 20)
 
-        counts = self.repo.get_counts_in_window(
-            window_start=datetime(2026, 3, 20, 9, 0),
-            window_end=datetime(2026, 3, 20, 10, 0),
-            feed_types="all",
-        )
+        mock_build_upsert_query.assert_not_called()
+        self.assertEqual(AttackerActivityBucket.objects.count(), 20)
+        self.assertEqual(AttackerActivityBucket.objects.get(attacker_ip="10.0.0.2").interaction_count, 7)
+        self.assertEqual(AttackerActivityBucket.objects.get(attacker_ip="10.0.0.1", bucket_start=datetime(2026, 3, 20, 10, 0)).interaction_count, 2)
+        self.assertEqual(AttackerActivityDailyBucket.objects.get(attacker_ip="10.0.0.20").interaction_count, 40)
 
-        self.assertEqual(counts, {"1.1.1.1": 6})
+    def test_delete_daily_older_than_removes_only_older_rows(self):
+        AttackerActivityDailyBucket.objects.create(attacker_ip="1.1.1.1", feed_type="cowrie", bucket_date=date(2026, 3, 18), interaction_count=1)
+        AttackerActivityDailyBucket.objects.create(attacker_ip="2.2.2.2", feed_type="cowrie", bucket_date=date(2026, 3, 19), interaction_count=1)
 
-    def test_get_counts_in_window_returns_empty_when_no_matches(self):
-        counts = self.repo.get_counts_in_window(
-            window_start=datetime(2026, 3, 20, 9, 0),
-            window_end=datetime(2026, 3, 20, 10, 0),
-            feed_types=["cowrie"],
-        )
-        self.assertEqual(counts, {})
+        self.assertEqual(self.repo.delete_daily_older_than(date(2026, 3, 19)), 1)
+        self.assertEqual(list(AttackerActivityDailyBucket.objects.values_list("attacker_ip", flat=True)), ["2.2.2.2"])
 
     def test_delete_older_than_removes_only_older_rows(self):
         old_bucket = AttackerActivityBucket.objects.create(
@@ -134,3 +117,246 @@ class TestTrendingBucketRepository(CustomTestCase):
         self.assertEqual(deleted_count, 1)
         self.assertFalse(AttackerActivityBucket.objects.filter(id=old_bucket.id).exists())
         self.assertTrue(AttackerActivityBucket.objects.filter(id=fresh_bucket.id).exists())
+
+    def test_upsert_sensor_bucket_counts_increments_existing_buckets(self):
+        sensor = Sensor.objects.create(address="192.0.2.10")
+        SensorActivityBucket.objects.create(sensor=sensor, feed_type="cowrie", bucket_start=datetime(2026, 3, 20, 9, 0), hit_count=3)
+        counters = Counter(
+            {
+                (sensor.pk, "cowrie", datetime(2026, 3, 20, 9, 0)): 2,
+                (sensor.pk, "heralding", datetime(2026, 3, 20, 9, 0)): 4,
+            }
+        )
+
+        self.assertEqual(self.repo.upsert_sensor_bucket_counts(counters), 2)
+
+        counts = dict(SensorActivityBucket.objects.values_list("feed_type", "hit_count"))
+        self.assertEqual(counts, {"cowrie": 5, "heralding": 4})
+
+    def test_upsert_sensor_bucket_counts_returns_zero_for_empty_counter(self):
+        self.assertEqual(self.repo.upsert_sensor_bucket_counts(Counter()), 0)
+
+    def test_delete_sensor_buckets_older_than_removes_only_older_rows(self):
+        sensor = Sensor.objects.create(address="192.0.2.10")
+        SensorActivityBucket.objects.create(sensor=sensor, feed_type="cowrie", bucket_start=datetime(2026, 3, 20, 7, 0), hit_count=1)
+        fresh_bucket = SensorActivityBucket.objects.create(sensor=sensor, feed_type="cowrie", bucket_start=datetime(2026, 3, 20, 9, 0), hit_count=1)
+
+        self.assertEqual(self.repo.delete_sensor_buckets_older_than(datetime(2026, 3, 20, 8, 0)), 1)
+        self.assertEqual(list(SensorActivityBucket.objects.all()), [fresh_bucket])
+
+
+class TestTrendingWindowAggregates(CustomTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo = TrendingBucketRepository()
+        self.now = datetime(2026, 3, 20, 12, 0)
+
+    def _bucket(self, attacker_ip, hours_ago, interaction_count, feed_type="cowrie"):
+        AttackerActivityBucket.objects.create(
+            attacker_ip=attacker_ip,
+            feed_type=feed_type,
+            bucket_start=self.now - timedelta(hours=hours_ago),
+            interaction_count=interaction_count,
+        )
+
+    def _window_counts(self, span_hours):
+        return {row.attacker_ip: row.interaction_count for row in AttackerWindowCount.objects.filter(window__span_hours=span_hours)}
+
+    def _expected_counts(self, span_hours, window_end):
+        counts = {}
+        for bucket in AttackerActivityBucket.objects.filter(
+            bucket_start__gt=window_end - timedelta(hours=span_hours),
+            bucket_start__lte=window_end,
+        ):
+            counts[bucket.attacker_ip] = counts.get(bucket.attacker_ip, 0) + bucket.interaction_count
+        return counts
+
+    def test_advance_windows_builds_new_windows(self):
+        self._bucket("1.1.1.1", 0, 3)
+        self._bucket("1.1.1.1", 2, 4)
+        self._bucket("2.2.2.2", 5, 1)
+
+        moved = self.repo.advance_windows([1, 6], self.now + timedelta(minutes=30))
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(TrendingWindow.objects.get(span_hours=1).window_end, self.now)
+        self.assertEqual(self._window_counts(1), {"1.1.1.1": 3})
+        self.assertEqual(self._window_counts(6), {"1.1.1.1": 7, "2.2.2.2": 1})
+
+    def test_advance_windows_slides_incrementally(self):
+        for hours_ago, attacker_ip in enumerate(["1.1.1.1", "2.2.2.2", "3.3.3.3", "1.1.1.1", "2.2.2.2", "4.4.4.4"]):
+            self._bucket(attacker_ip, hours_ago - 3, hours_ago + 1)
+        self.repo.advance_windows([3], self.now)
+
+        for step in range(1, 4):
+            window_end = self.now + timedelta(hours=step)
+            self.assertEqual(self.repo.advance_windows([3], window_end), 1)
+            self.assertEqual(self._window_counts(3), self._expected_counts(3, window_end))
+        self.assertFalse(AttackerWindowCount.objects.filter(interaction_count__lte=0).exists())
+
+    def test_advance_windows_rebuilds_window_whose_expired_buckets_were_deleted(self):
+        self._bucket("1.1.1.1", 40, 5)
+        self._bucket("2.2.2.2", 1, 2)
+        self.repo.advance_windows([48], self.now, retention_hours=72)
+        self.assertEqual(self._window_counts(48), {"1.1.1.1": 5, "2.2.2.2": 2})
+
+        # the extraction was paused for 30 hours, meanwhile the cleanup deleted the buckets older than 72 hours
+        window_end = self.now + timedelta(hours=30)
+        AttackerActivityBucket.objects.filter(bucket_start__lt=window_end - timedelta(hours=72)).delete()
+        self.repo.advance_windows([48], window_end, retention_hours=72)
+
+        self.assertEqual(self._window_counts(48), {"2.2.2.2": 2})
+
+    def test_advance_windows_slides_incrementally_within_retention(self):
+        self._bucket("1.1.1.1", 40, 5)
+        self._bucket("2.2.2.2", 1, 2)
+        self.repo.advance_windows([48], self.now, retention_hours=72)
+
+        self.repo.advance_windows([48], self.now + timedelta(hours=10), retention_hours=72)
+
+        self.assertEqual(self._window_counts(48), {"2.2.2.2": 2})
+
+    def test_advance_windows_is_noop_within_same_hour(self):
+        self.repo.advance_windows([1], self.now)
+        self.assertEqual(self.repo.advance_windows([1], self.now + timedelta(minutes=59)), 0)
+
+    def test_advance_windows_drops_unconfigured_windows(self):
+        self.repo.advance_windows([1, 2], self.now)
+        self.repo.advance_windows([1], self.now)
+        self.assertEqual(list(TrendingWindow.objects.values_list("span_hours", flat=True)), [1])
+
+    def test_add_to_windows_only_counts_covered_buckets(self):
+        self.repo.advance_windows([1, 6], self.now)
+        counters = Counter(
+            {
+                ("1.1.1.1", "cowrie", self.now): 2,
+                ("2.2.2.2", "cowrie", self.now - timedelta(hours=3)): 5,
+                ("3.3.3.3", "cowrie", self.now - timedelta(hours=8)): 7,
+            }
+        )
+
+        self.assertEqual(self.repo.add_to_windows(counters), 3)
+        self.repo.add_to_windows(Counter({("1.1.1.1", "cowrie", self.now): 1}))
+
+        self.assertEqual(self._window_counts(1), {"1.1.1.1": 3})
+        self.assertEqual(self._window_counts(6), {"1.1.1.1": 3, "2.2.2.2": 5})
+
+    def _daily_bucket(self, attacker_ip, days_ago, interaction_count):
+        AttackerActivityDailyBucket.objects.create(
+            attacker_ip=attacker_ip,
+            feed_type="cowrie",
+            bucket_date=self.now.date() - timedelta(days=days_ago),
+            interaction_count=interaction_count,
+        )
+
+    def test_daily_windows_are_built_from_daily_buckets(self):
+        self._daily_bucket("1.1.1.1", 0, 3)
+        self._daily_bucket("1.1.1.1", 1, 4)
+        self._daily_bucket("2.2.2.2", 2, 5)
+        self._bucket("3.3.3.3", 0, 9)
+
+        self.repo.advance_windows([48], self.now, daily_spans=[48])
+
+        self.assertTrue(TrendingWindow.objects.get(span_hours=48).daily)
+        self.assertEqual(self._window_counts(48), {"1.1.1.1": 7})
+
+    def test_daily_windows_slide_when_the_day_changes(self):
+        for days_ago in range(-2, 4):
+            self._daily_bucket(f"1.1.1.{days_ago + 3}", days_ago, days_ago + 3)
+        self.repo.advance_windows([48], self.now, daily_spans=[48])
+
+        self.assertEqual(self.repo.advance_windows([48], self.now + timedelta(hours=1), daily_spans=[48]), 1)
+        self.assertEqual(self._window_counts(48), {"1.1.1.3": 3, "1.1.1.4": 4})
+
+        self.repo.advance_windows([48], self.now + timedelta(days=1), daily_spans=[48])
+        self.assertEqual(self._window_counts(48), {"1.1.1.2": 2, "1.1.1.3": 3})
+
+    def test_window_is_rebuilt_when_granularity_changes(self):
+        self._bucket("1.1.1.1", 0, 3)
+        self._daily_bucket("2.2.2.2", 0, 4)
+        self.repo.advance_windows([24], self.now)
+        self.assertEqual(self._window_counts(24), {"1.1.1.1": 3})
+
+        self.repo.advance_windows([24], self.now, daily_spans=[24])
+        self.assertEqual(self._window_counts(24), {"2.2.2.2": 4})
+
+    def test_add_to_windows_uses_bucket_date_for_daily_windows(self):
+        self.repo.advance_windows([24], self.now, daily_spans=[24])
+
+        self.repo.add_to_windows(
+            Counter(
+                {
+                    ("1.1.1.1", "cowrie", self.now.replace(hour=23)): 2,
+                    ("2.2.2.2", "cowrie", self.now - timedelta(days=1)): 5,
+                }
+            )
+        )
+
+        self.assertEqual(self._window_counts(24), {"1.1.1.1": 2})
+
+    def test_get_window_counts_filters_feed_types(self):
+        self._bucket("1.1.1.1", 0, 3, feed_type="cowrie")
+        self._bucket("1.1.1.1", 0, 2, feed_type="heralding")
+        self._bucket("2.2.2.2", 0, 4, feed_type="heralding")
+        self.repo.advance_windows([1], self.now)
+
+        self.assertEqual(self.repo.get_window_counts(1, "all"), (self.now, {"1.1.1.1": 5, "2.2.2.2": 4}))
+        self.assertEqual(self.repo.get_window_counts(1, "cowrie"), (self.now, {"1.1.1.1": 3}))
+
+    def test_get_window_counts_without_window(self):
+        self.assertEqual(self.repo.get_window_counts(24, "all"), (None, {}))
+
+    def test_get_window_end(self):
+        self.repo.advance_windows([1], self.now)
+
+        self.assertEqual(self.repo.get_window_end(1), self.now)
+        self.assertIsNone(self.repo.get_window_end(24))
+
+
+class TestTrendingBucketPartitions(CustomTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo = TrendingBucketRepository()
+
+    @staticmethod
+    def _partition_of(bucket):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM greedybear_attackeractivitybucket WHERE id = %s", [bucket.id])
+            return cursor.fetchone()[0]
+
+    def test_buckets_without_partition_go_to_default_partition(self):
+        bucket = AttackerActivityBucket.objects.create(attacker_ip="1.1.1.1", feed_type="cowrie", bucket_start=datetime(2020, 1, 1, 9, 0), interaction_count=1)
+        self.assertEqual(self._partition_of(bucket), "greedybear_attackeractivitybucket_default")
+
+    def test_create_partitions_moves_buckets_from_default_partition(self):
+        bucket = AttackerActivityBucket.objects.create(attacker_ip="1.1.1.1", feed_type="cowrie", bucket_start=datetime(2020, 1, 2, 9, 0), interaction_count=1)
+
+        created = self.repo.create_partitions(date(2020, 1, 1), date(2020, 1, 3))
+
+        self.assertEqual(created, 3)
+        self.assertEqual(self.repo.create_partitions(date(2020, 1, 1), date(2020, 1, 3)), 0)
+        self.assertEqual(self._partition_of(bucket), "greedybear_attackeractivitybucket_p20200102")
+        self.assertEqual(self.repo.get_partitions()[date(2020, 1, 3)], "greedybear_attackeractivitybucket_p20200103")
+
+    def test_upsert_into_partition(self):
+        self.repo.create_partitions(date(2020, 1, 1), date(2020, 1, 1))
+        key = ("1.1.1.1", "cowrie", datetime(2020, 1, 1, 9, 0))
+
+        self.repo.upsert_bucket_counts(Counter({key: 2}))
+        self.repo.upsert_bucket_counts(Counter({key: 3}))
+
+        bucket = AttackerActivityBucket.objects.get(attacker_ip="1.1.1.1")
+        self.assertEqual(bucket.interaction_count, 5)
+        self.assertEqual(self._partition_of(bucket), "greedybear_attackeractivitybucket_p20200101")
+
+    def test_drop_partitions_older_than_keeps_partition_of_cutoff(self):
+        self.repo.create_partitions(date(2020, 1, 1), date(2020, 1, 3))
+        AttackerActivityBucket.objects.create(attacker_ip="1.1.1.1", feed_type="cowrie", bucket_start=datetime(2020, 1, 1, 9, 0), interaction_count=1)
+        AttackerActivityBucket.objects.create(attacker_ip="2.2.2.2", feed_type="cowrie", bucket_start=datetime(2020, 1, 2, 9, 0), interaction_count=1)
+
+        dropped = self.repo.drop_partitions_older_than(datetime(2020, 1, 2, 12, 0))
+
+        self.assertEqual(dropped, 1)
+        self.assertNotIn(date(2020, 1, 1), self.repo.get_partitions())
+        self.assertIn(date(2020, 1, 2), self.repo.get_partitions())
+        self.assertEqual(list(AttackerActivityBucket.objects.values_list("attacker_ip", flat=True)), ["2.2.2.2"])
@@ -5,7 +5,7 @@ from ipaddress import ip_address
 
 from django.test import SimpleTestCase
 
-from greedybear.utils import is_ip_address, is_non_global_ip, is_sha256hash, is_valid_domain
+from greedybear.utils import global_ip_address, is_ip_address, is_non_global_ip, is_sha256hash, is_valid_domain
 
 
 class UtilsTestCase(SimpleTestCase):
@@ -59,3 +59,17 @@ class UtilsTestCase(SimpleTestCase):
 
         self.assertFalse(is_non_global_ip(ip_address("8.8.8.8")))
         self.assertFalse(is_non_global_ip(ip_address("2001:4860:4860::8888")))
+
+    def test_global_ip_address(self):
+        self.assertEqual(global_ip_address("8.8.8.8"), ip_address("8.8.8.8"))
+        self.assertEqual(global_ip_address("2001:4860:4860::8888"), ip_address("2001:4860:4860::8888"))
+        self.assertIsNone(global_ip_address("10.0.0.1"))
+        self.assertIsNone(global_ip_address("::1"))
+        with self.assertRaises(ValueError):
+            global_ip_address("999.999.999.999")
+
+    def test_global_ip_address_is_memoized(self):
+        global_ip_address.cache_clear()
+        global_ip_address("8.8.8.8")
+        global_ip_address("8.8.8.8")
+        self.assertEqual(global_ip_address.cache_info().hits, 1)